@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Compares the throughput of the available DBSCAN implementations."""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+# Add parent spine directory to the python path
+current_directory = os.path.dirname(os.path.abspath(__file__))
+current_directory = os.path.dirname(current_directory)
+sys.path.insert(0, current_directory)
+
+from spine.utils.numba_local import dbscan
+
+
+def main(sizes, eps, density, repeat, max_brute):
+    """Times the DBSCAN implementations on random point clouds.
+
+    The points are drawn uniformly in a cube whose size is adjusted such that
+    the number of points per unit volume is constant.
+
+    Parameters
+    ----------
+    sizes : List[int]
+        Number of points in each point cloud to cluster
+    eps : float
+        Distance below which two points are considered neighbors
+    density : float
+        Number of points per unit volume
+    repeat : int
+        Number of times each measurement is repeated (best time is kept)
+    max_brute : int
+        Maximum number of points for which to run the brute-force algorithm
+    """
+    # Compile the numba functions ahead of time
+    x = np.random.rand(10, 3).astype(np.float32)
+    dbscan(x, eps, 'euclidean', 'grid')
+    dbscan(x, eps, 'euclidean', 'brute')
+
+    # Define the algorithms to compare
+    algorithms = {
+        'numba (grid)': lambda x: dbscan(x, eps, 'euclidean', 'grid'),
+        'numba (brute)': lambda x: dbscan(x, eps, 'euclidean', 'brute'),
+        'sklearn': lambda x: DBSCAN(eps=eps, min_samples=1).fit(x).labels_
+    }
+
+    # Loop over the point cloud sizes
+    header = f"{'Num. points':>12} | " + ' | '.join(
+            f'{name:>14}' for name in algorithms)
+    print(header)
+    print('-'*len(header))
+    for size in sizes:
+        np.random.seed(seed=0)
+        length = (size/density)**(1./3)
+        x = (length*np.random.rand(size, 3)).astype(np.float32)
+
+        times = []
+        for name, func in algorithms.items():
+            if name == 'numba (brute)' and size > max_brute:
+                times.append('skipped')
+                continue
+
+            best = np.inf
+            for _ in range(repeat):
+                start = time.time()
+                func(x)
+                best = min(best, time.time() - start)
+            times.append(f'{1e3*best:.2f} ms')
+
+        print(f'{size:>12} | ' + ' | '.join(f'{t:>14}' for t in times))
+
+
+if __name__ == "__main__":
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(description="Benchmark DBSCAN")
+
+    parser.add_argument('--sizes', '-n',
+                        help='Number of points in each point cloud',
+                        type=int, nargs='+',
+                        default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--eps',
+                        help='Neighborhood radius',
+                        type=float, default=1.9)
+    parser.add_argument('--density',
+                        help='Number of points per unit volume',
+                        type=float, default=0.05)
+    parser.add_argument('--repeat',
+                        help='Number of repetitions of each measurement',
+                        type=int, default=3)
+    parser.add_argument('--max-brute',
+                        help='Maximum number of points to run brute force on',
+                        type=int, default=10000)
+
+    args = parser.parse_args()
+
+    # Execute the main function
+    main(args.sizes, args.eps, args.density, args.repeat, args.max_brute)
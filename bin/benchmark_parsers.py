@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Compares the throughput of the per-cluster and vectorized cluster parsing."""
+
+import os
+import sys
+import time
+import argparse
+from collections import OrderedDict
+
+import numpy as np
+
+# Add parent spine directory to the python path
+current_directory = os.path.dirname(os.path.abspath(__file__))
+current_directory = os.path.dirname(current_directory)
+sys.path.insert(0, current_directory)
+
+from spine.io.parse.cluster import broadcast_cluster_labels
+
+
+def parse_loop(clusters, labels, num_particles):
+    """Reference parsing which builds the voxel and label arrays of each
+    cluster separately before concatenating them.
+
+    Parameters
+    ----------
+    clusters : List[Tuple[np.ndarray]]
+        (C) List of (x, y, z, value) arrays, one per cluster
+    labels : Dict[str, np.ndarray]
+        (L) Dictionary of cluster-wise labels
+    num_particles : int
+        Number of clusters associated with a particle
+
+    Returns
+    -------
+    voxels : np.ndarray
+        (N, 3) Voxel coordinates
+    features : np.ndarray
+        (N, 1 + L) Voxel values and labels
+    """
+    clusters_voxels, clusters_features = [], []
+    for i, (x, y, z, value) in enumerate(clusters):
+        num_points = len(value)
+        if num_points > 0:
+            # Mimic the copy of the cluster into freshly allocated arrays
+            xc, yc, zc = np.empty_like(x), np.empty_like(y), np.empty_like(z)
+            vc = np.empty_like(value)
+            xc[:], yc[:], zc[:], vc[:] = x, y, z, value
+            clusters_voxels.append(np.stack([xc, yc, zc], axis=1))
+
+            features = [vc]
+            for l in labels.values():
+                val = l[i] if i < num_particles else -1
+                features.append(np.full(num_points, val, dtype=np.float32))
+            clusters_features.append(np.column_stack(features))
+
+    return (np.concatenate(clusters_voxels, axis=0),
+            np.concatenate(clusters_features, axis=0))
+
+
+def parse_vectorized(clusters, labels, num_particles):
+    """Vectorized parsing which fills all clusters into a single buffer and
+    broadcasts the cluster-wise labels in one operation.
+
+    Parameters
+    ----------
+    clusters : List[Tuple[np.ndarray]]
+        (C) List of (x, y, z, value) arrays, one per cluster
+    labels : Dict[str, np.ndarray]
+        (L) Dictionary of cluster-wise labels
+    num_particles : int
+        Number of clusters associated with a particle
+
+    Returns
+    -------
+    voxels : np.ndarray
+        (N, 3) Voxel coordinates
+    features : np.ndarray
+        (N, 1 + L) Voxel values and labels
+    """
+    # Mimic the fill of each cluster into its slice of a single buffer
+    counts = np.array([len(c[-1]) for c in clusters], dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    num_voxels = int(np.sum(counts))
+    coords = np.empty((3, num_voxels), dtype=np.int32)
+    values = np.empty(num_voxels, dtype=np.float32)
+    for i in np.where(counts > 0)[0]:
+        index = slice(offsets[i], offsets[i] + counts[i])
+        x, y, z, value = clusters[i]
+        coords[0, index], coords[1, index], coords[2, index] = x, y, z
+        values[index] = value
+
+    # Broadcast the labels
+    features = np.empty((num_voxels, len(labels) + 1), dtype=np.float32)
+    features[:, 0] = values
+    features[:, 1:] = broadcast_cluster_labels(
+            counts, labels, num_particles, np.float32)
+
+    return np.ascontiguousarray(coords.T), features
+
+
+def main(num_clusters, mean_size, num_labels, repeat):
+    """Times the per-cluster and vectorized parsing on synthetic cluster sets.
+
+    The cluster sizes are drawn from an exponential distribution, such that
+    the sets contain many small clusters and a few large ones, as is typical
+    of the MC truth clusters of a neutrino event.
+
+    Parameters
+    ----------
+    num_clusters : List[int]
+        Number of clusters in each synthetic cluster set
+    mean_size : float
+        Mean number of voxels per cluster
+    num_labels : int
+        Number of cluster-wise label columns
+    repeat : int
+        Number of times each measurement is repeated (best time is kept)
+    """
+    # Define the algorithms to compare
+    algorithms = {'loop': parse_loop, 'vectorized': parse_vectorized}
+
+    # Loop over the cluster set sizes
+    header = f"{'Num. clusters':>13} | {'Num. voxels':>11} | " + ' | '.join(
+            f'{name:>14}' for name in algorithms) + f" | {'Speedup':>8}"
+    print(header)
+    print('-'*len(header))
+    for num in num_clusters:
+        # Generate a synthetic cluster set (last cluster is a catch-all)
+        np.random.seed(seed=0)
+        sizes = np.random.exponential(mean_size, size=num).astype(np.int64)
+        clusters = [(*np.random.randint(0, 768, size=(3, s), dtype=np.int32),
+                     np.random.rand(s).astype(np.float32)) for s in sizes]
+        num_particles = num - 1
+        labels = OrderedDict(
+                (f'label_{i}', np.random.randint(0, 10, size=num_particles))
+                for i in range(num_labels))
+
+        # Check that the two methods agree
+        ref = parse_loop(clusters, labels, num_particles)
+        res = parse_vectorized(clusters, labels, num_particles)
+        for r, v in zip(ref, res):
+            np.testing.assert_array_equal(r, v)
+
+        # Time each method
+        times = []
+        for name, func in algorithms.items():
+            best = np.inf
+            for _ in range(repeat):
+                start = time.time()
+                func(clusters, labels, num_particles)
+                best = min(best, time.time() - start)
+            times.append(best)
+
+        print(f'{num:>13} | {int(np.sum(sizes)):>11} | ' + ' | '.join(
+            f'{1e3*t:>11.2f} ms' for t in times) +
+              f' | {times[0]/times[1]:>7.1f}x')
+
+
+if __name__ == "__main__":
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(description="Benchmark cluster parsing")
+
+    parser.add_argument('--num-clusters', '-n',
+                        help='Number of clusters in each cluster set',
+                        type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--mean-size',
+                        help='Mean number of voxels per cluster',
+                        type=float, default=50.)
+    parser.add_argument('--num-labels',
+                        help='Number of cluster-wise label columns',
+                        type=int, default=13)
+    parser.add_argument('--repeat',
+                        help='Number of repetitions of each measurement',
+                        type=int, default=3)
+
+    args = parser.parse_args()
+
+    # Execute the main function
+    main(args.num_clusters, args.mean_size, args.num_labels, args.repeat)
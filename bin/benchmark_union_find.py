@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Compares the throughput of union-find implementations on GNN-sized graphs."""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import numba as nb
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import connected_components
+
+# Add parent spine directory to the python path
+current_directory = os.path.dirname(os.path.abspath(__file__))
+current_directory = os.path.dirname(current_directory)
+sys.path.insert(0, current_directory)
+
+from spine.utils.numba_local import union_find
+
+
+@nb.njit(cache=True)
+def union_find_relabel(edge_index: nb.int64[:,:],
+                       count: nb.int64) -> nb.int64[:]:
+    """Reference union-find which relabels every member of a group each time
+    two groups are merged (O(N*E)).
+
+    Parameters
+    ----------
+    edge_index : np.ndarray
+        (E, 2) List of edges (sparse adjacency matrix)
+    count : int
+        Number of nodes in the graph, C
+
+    Returns
+    -------
+    np.ndarray
+        (C) Group assignments for each of the nodes in the graph
+    """
+    labels = np.arange(count)
+    for e in edge_index:
+        if labels[e[0]] != labels[e[1]]:
+            labels[labels == labels[e[1]]] = labels[e[0]]
+
+    return labels
+
+
+def scipy_components(edge_index, count):
+    """Reference connected components computed with scipy.
+
+    Parameters
+    ----------
+    edge_index : np.ndarray
+        (E, 2) List of edges (sparse adjacency matrix)
+    count : int
+        Number of nodes in the graph, C
+
+    Returns
+    -------
+    np.ndarray
+        (C) Group assignments for each of the nodes in the graph
+    """
+    adj = coo_array((np.ones(len(edge_index)), edge_index.T),
+                    shape=(count, count))
+    return connected_components(adj, connection='weak')[1]
+
+
+def main(sizes, degree, repeat):
+    """Times the union-find implementations on random sparse graphs.
+
+    Parameters
+    ----------
+    sizes : List[int]
+        Number of nodes in each graph
+    degree : float
+        Average number of edges per node
+    repeat : int
+        Number of times each measurement is repeated (best time is kept)
+    """
+    # Compile the numba functions ahead of time
+    edge_index = np.zeros((1, 2), dtype=np.int64)
+    union_find(edge_index, 1)
+    union_find_relabel(edge_index, 1)
+
+    # Define the algorithms to compare
+    algorithms = {
+        'path compression': union_find,
+        'relabel': union_find_relabel,
+        'scipy': scipy_components
+    }
+
+    # Loop over the graph sizes
+    header = f"{'Num. nodes':>10} | {'Num. edges':>10} | " + ' | '.join(
+            f'{name:>16}' for name in algorithms)
+    print(header)
+    print('-'*len(header))
+    for size in sizes:
+        np.random.seed(seed=0)
+        num_edges = int(degree*size)
+        edge_index = np.random.randint(0, size, (num_edges, 2))
+
+        times = []
+        for func in algorithms.values():
+            best = np.inf
+            for _ in range(repeat):
+                start = time.time()
+                func(edge_index, size)
+                best = min(best, time.time() - start)
+            times.append(f'{1e3*best:.3f} ms')
+
+        print(f'{size:>10} | {num_edges:>10} | ' + ' | '.join(
+            f'{t:>16}' for t in times))
+
+
+if __name__ == "__main__":
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(description="Benchmark union-find")
+
+    parser.add_argument('--sizes', '-n',
+                        help='Number of nodes in each graph',
+                        type=int, nargs='+',
+                        default=[100, 1000, 5000, 20000])
+    parser.add_argument('--degree',
+                        help='Average number of edges per node',
+                        type=float, default=5.)
+    parser.add_argument('--repeat',
+                        help='Number of repetitions of each measurement',
+                        type=int, default=3)
+
+    args = parser.parse_args()
+
+    # Execute the main function
+    main(args.sizes, args.degree, args.repeat)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Builds or refreshes the persistent file index of a dataset."""
+
+import os
+import sys
+import time
+import argparse
+
+# Add parent spine directory to the python path
+current_directory = os.path.dirname(os.path.abspath(__file__))
+current_directory = os.path.dirname(current_directory)
+sys.path.insert(0, current_directory)
+
+from spine.io.read.index import FileIndex
+
+
+def main(source, source_list, output, file_type, run_info_key, tree_key):
+    """Indexes the number of entries and the run information of each file.
+
+    Only the files which are missing from the index, or which have been
+    modified since they were indexed, are scanned.
+
+    Parameters
+    ----------
+    source : Union[str, List[str]]
+        Path or list of paths to the input files
+    source_list : str
+        Path to a text file containing a list of data file paths
+    output : str
+        Path to the index file
+    file_type : str
+        Type of input file, one of 'hdf5' or 'larcv'
+    run_info_key : str
+        Key of the data product which contains the run information
+    tree_key : str
+        Name of the tree used to count the entries in LArCV files
+    """
+    # If using source list, read it in
+    if source_list is not None:
+        with open(source_list, 'r', encoding='utf-8') as f:
+            source = f.read().splitlines()
+
+    # Define the function used to scan each file
+    if file_type == 'hdf5':
+        from spine.io.read import HDF5Reader
+        scan_fn = lambda path: HDF5Reader.scan_file(path, run_info_key)
+
+    else:
+        assert tree_key is not None, (
+                "Must provide the `--tree-key` to count LArCV entries.")
+        from spine.io.read import LArCVReader
+        scan_fn = lambda path: LArCVReader.scan_file(
+                path, tree_key, run_info_key)
+
+    # Loop over the list of files, scan the ones which are not up to date
+    index = FileIndex(output)
+    print(f"\nIndexing {len(source)} file(s) ({len(index)} already indexed):")
+    num_scanned, start = 0, time.time()
+    for file_path in source:
+        if index.get(file_path, run_info_key is not None) is None:
+            index.update(file_path, *scan_fn(file_path))
+            num_scanned += 1
+            print(f"- Indexed {index.get(file_path)['count']} entries "
+                  f"in {file_path}")
+
+    # Save the index
+    index.save_if_modified()
+    print(f"\nScanned {num_scanned} file(s) in {time.time() - start:.2f} s, "
+          f"{len(index)} file(s) in the index stored at {output}")
+
+
+if __name__ == "__main__":
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(description="Build a dataset file index")
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--source', '-s',
+                       help='Path or list of paths to data files',
+                       type=str, nargs="+")
+    group.add_argument('--source-list', '-S',
+                       help='Path to a text file of data file paths',
+                       type=str)
+
+    parser.add_argument('--output', '-o',
+                        help='Path to the index file',
+                        type=str, required=True)
+    parser.add_argument('--file-type', '-t',
+                        help='Type of data file',
+                        type=str, choices=['hdf5', 'larcv'], default='hdf5')
+    parser.add_argument('--run-info-key',
+                        help='Name of the data product with the run info',
+                        type=str, default=None)
+    parser.add_argument('--tree-key',
+                        help='TTree name used to count LArCV entries',
+                        type=str, default=None)
+
+    args = parser.parse_args()
+
+    # Execture the main function
+    main(args.source, args.source_list, args.output, args.file_type,
+         args.run_info_key, args.tree_key)
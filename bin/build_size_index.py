@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Builds the per-entry size index used by the budget batch sampler."""
+
+import os
+import sys
+import time
+import argparse
+
+import yaml
+import numpy as np
+
+# Add parent spine directory to the python path
+current_directory = os.path.dirname(os.path.abspath(__file__))
+current_directory = os.path.dirname(current_directory)
+sys.path.insert(0, current_directory)
+
+from spine.io.factories import dataset_factory
+
+# Dataset arguments which restrict the list of entries to load
+ENTRY_SELECTION_KEYS = ['n_entry', 'n_skip', 'entry_list', 'skip_entry_list',
+                        'run_event_list', 'skip_run_event_list']
+
+
+def main(config, keys, output, source, dtype):
+    """Records the size of each entry of a dataset.
+
+    The size of an entry is the total number of rows (voxels, points, etc.)
+    of the requested data products. For (index, offset) pairs, the number of
+    indexes (e.g. edges) is used instead. The sizes are stored in a `.npy`
+    file, one per entry in the dataset files (in order), regardless of the
+    entry selection in the configuration.
+
+    Parameters
+    ----------
+    config : str
+        Path to a SPINE configuration file which defines the dataset
+    keys : List[str]
+        Data products used to measure the size of each entry
+    output : str
+        Path to the output `.npy` file
+    source : List[str], optional
+        Path or list of paths to data files. If not specified, uses the files
+        listed in the configuration
+    dtype : str
+        Data type to cast the parsed data to
+    """
+    # Load the dataset configuration, only parse the required products
+    with open(config, 'r', encoding='utf-8') as cfg_yaml:
+        cfg = yaml.safe_load(cfg_yaml)
+    dataset_cfg = cfg['io']['loader']['dataset']
+    for key in ENTRY_SELECTION_KEYS:
+        dataset_cfg.pop(key, None)
+    if source is not None:
+        dataset_cfg['file_keys'] = source
+    if 'schema' in dataset_cfg:
+        for key in keys:
+            assert key in dataset_cfg['schema'], (
+                    f"Data product `{key}` is not in the dataset schema.")
+        dataset_cfg['schema'] = {k: dataset_cfg['schema'][k] for k in keys}
+
+    # Initialize the dataset
+    dataset = dataset_factory(dataset_cfg, dtype=dtype)
+
+    # Loop over the entries, record their size
+    num_entries = len(dataset)
+    print(f"\nMeasuring the size of {num_entries} entries:")
+    sizes = np.empty(num_entries, dtype=np.int64)
+    start = time.time()
+    for i in range(num_entries):
+        data = dataset[i]
+        sizes[i] = sum(get_size(data[key]) for key in keys)
+        if (i + 1)%1000 == 0 or i == num_entries - 1:
+            print(f"- Processed {i + 1}/{num_entries} entries "
+                  f"in {time.time() - start:.2f} s")
+
+    # Save the index
+    np.save(output, sizes)
+    print(f"\nStored the size index in {output} (total size: {np.sum(sizes)}, "
+          f"max. size: {np.max(sizes)})")
+
+
+def get_size(value):
+    """Returns the number of rows of a parsed data product.
+
+    Parameters
+    ----------
+    value : object
+        Parsed data product
+
+    Returns
+    -------
+    int
+        Number of rows in the data product
+    """
+    # Case of a (voxels, features, meta) tuple
+    if isinstance(value, tuple) and len(value) == 3:
+        return len(value[0])
+
+    # Case of an (index, offset) pair
+    if isinstance(value, tuple) and len(value) == 2:
+        return np.shape(value[0])[-1]
+
+    return len(value)
+
+
+if __name__ == "__main__":
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(description="Build an entry size index")
+
+    parser.add_argument('--config', '-c',
+                        help='SPINE configuration which defines the dataset',
+                        type=str, required=True)
+    parser.add_argument('--keys', '-k',
+                        help='Data products used to measure the entry size',
+                        type=str, nargs='+', required=True)
+    parser.add_argument('--output', '-o',
+                        help='Path to the output size index file',
+                        type=str, required=True)
+    parser.add_argument('--source', '-s',
+                        help='Path or list of paths to data files',
+                        type=str, nargs='+', default=None)
+    parser.add_argument('--dtype',
+                        help='Data type to cast the parsed data to',
+                        type=str, default='float32')
+
+    args = parser.parse_args()
+
+    # Execute the main function
+    main(args.config, args.keys, args.output, args.source, args.dtype)
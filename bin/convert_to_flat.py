@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""Converts HDF5 or LArCV files to memory-mappable flat event stores."""
+
+import os
+import sys
+import time
+import argparse
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import yaml
+
+# Add parent spine directory to the python path
+current_directory = os.path.dirname(os.path.abspath(__file__))
+current_directory = os.path.dirname(current_directory)
+sys.path.insert(0, current_directory)
+
+from spine.io.write import FlatWriter
+
+# Conversion settings and open datasets of the current process
+WORKER = {'settings': None, 'datasets': {}}
+
+
+def main(source, source_list, output_dir, file_type, config, dtype,
+         num_workers, shard_size, overwrite):
+    """Converts each input file to one or more flat event store files.
+
+    HDF5 files are converted as is. LArCV files are first parsed using the
+    schema of the dataset specified in a SPINE configuration file, such that
+    the flat event stores contain the parsed data products. These can then be
+    loaded directly by the `LArCVDataset` class by setting `parsed: true`.
+
+    The entries of each file can be split into shards of `shard_size` entries,
+    each converted into its own output file by one of `num_workers` worker
+    processes. The output files are only moved in place once they are
+    complete, such that rerunning the same command after a failure only
+    converts the shards which are missing.
+
+    Parameters
+    ----------
+    source : Union[str, List[str]]
+        Path or list of paths to the input files
+    source_list : str
+        Path to a text file containing a list of data file paths
+    output_dir : str
+        Path to the output directory. If not specified, each flat event store
+        is placed alongside its input file
+    file_type : str
+        Type of input file, one of 'hdf5' or 'larcv'
+    config : str
+        Path to a SPINE configuration file which defines the dataset schema
+        used to parse the LArCV files
+    dtype : str
+        Data type to cast the parsed LArCV data to
+    num_workers : int
+        Number of worker processes
+    shard_size : int
+        Maximum number of entries per output file. If not specified, each
+        input file is converted to a single output file
+    overwrite : bool
+        If `True`, overwrite existing output files
+    """
+    # If using source list, read it in
+    if source_list is not None:
+        with open(source_list, 'r', encoding='utf-8') as f:
+            source = f.read().splitlines()
+
+    # Load the parsing configuration, if needed
+    settings = {'file_type': file_type, 'dataset_cfg': None, 'dtype': dtype}
+    if file_type == 'larcv':
+        assert config is not None, (
+                "Must provide a `--config` to parse the LArCV files.")
+        with open(config, 'r', encoding='utf-8') as cfg_yaml:
+            cfg = yaml.safe_load(cfg_yaml)
+        settings['dataset_cfg'] = get_parsing_config(
+                cfg['io']['loader']['dataset'])
+
+    assert shard_size is None or shard_size > 0, (
+            "If `shard_size` is provided, it must be larger than 0.")
+    assert num_workers > 0, "Must use at least one worker."
+
+    # Initialize the worker pool
+    executor = None
+    if num_workers > 1:
+        executor = ProcessPoolExecutor(
+                num_workers, initializer=initialize_worker,
+                initargs=(settings,))
+    else:
+        initialize_worker(settings)
+
+    def run(func, tasks):
+        """Runs a function on a list of tasks, yields the results."""
+        if executor is None:
+            for task in tasks:
+                yield task, func(*task)
+        else:
+            futures = {executor.submit(func, *task): task for task in tasks}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    # Count the entries in each file, build the list of shards
+    start = time.time()
+    print(f"\nCounting the entries in {len(source)} file(s)")
+    counts = dict(run(count_entries, [(path,) for path in source]))
+    shards, num_done = [], 0
+    for file_path in source:
+        count = counts[(file_path,)]
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        out_dir = output_dir or os.path.dirname(file_path)
+        size = shard_size or max(count, 1)
+        num_shards = max((count - 1)//size + 1, 1)
+        for shard_id in range(num_shards):
+            name = stem if shard_size is None else f'{stem}_{shard_id:04d}'
+            out_path = os.path.join(out_dir, f'{name}.flat')
+            first, last = shard_id*size, min((shard_id + 1)*size, count)
+            if not overwrite and os.path.isfile(out_path):
+                num_done += 1
+                continue
+
+            shards.append((file_path, first, last, out_path))
+
+    print(f"Converting {len(shards)} shard(s) "
+          f"({num_done} already converted):")
+
+    # Convert the shards
+    stats = defaultdict(lambda: [0, 0, 0.])
+    failed = []
+    for (file_path, first, last, out_path), result in run(
+            convert_shard, shards):
+        pid, num_entries, duration, error = result
+        if error is not None:
+            failed.append(out_path)
+            print(f"- Failed to convert entries [{first}, {last}) of "
+                  f"{file_path}:\n{error}")
+            continue
+
+        stats[pid][0] += 1
+        stats[pid][1] += num_entries
+        stats[pid][2] += duration
+        print(f"- Converted entries [{first}, {last}) of {file_path} "
+              f"to {out_path} in {duration:.2f} s")
+
+    if executor is not None:
+        executor.shutdown()
+
+    # Dump the throughput summary
+    total = time.time() - start
+    total_entries = sum(s[1] for s in stats.values())
+    print("\nThroughput summary:")
+    for i, (pid, (num_shards, num_entries, duration)) in enumerate(
+            sorted(stats.items())):
+        rate = num_entries/duration if duration > 0 else 0.
+        print(f"- Worker {i} (PID {pid}): {num_shards} shard(s), "
+              f"{num_entries} entries in {duration:.2f} s "
+              f"({rate:.2f} entries/s)")
+    print(f"\nConverted {total_entries} entries in {total:.2f} s "
+          f"({total_entries/total:.2f} entries/s)")
+
+    if failed:
+        print(f"\n{len(failed)} shard(s) failed to convert. Rerun the "
+              "same command to convert the missing shards only.")
+        sys.exit(1)
+
+
+def get_parsing_config(dataset_cfg):
+    """Strips a dataset configuration of everything but the parsing.
+
+    The flat event stores must contain the raw output of the parsers. Random
+    transforms (augmentation) are applied by the dataset each time an entry
+    is loaded from the flat event stores, they must not be frozen into them.
+
+    Parameters
+    ----------
+    dataset_cfg : dict
+        Dataset configuration
+
+    Returns
+    -------
+    dict
+        Dataset configuration used to parse the LArCV files
+    """
+    dataset_cfg = dict(dataset_cfg)
+    for key in ('augment', 'cache', 'parsed'):
+        dataset_cfg.pop(key, None)
+
+    return dataset_cfg
+
+
+def initialize_worker(settings):
+    """Stores the conversion settings in the worker process.
+
+    Parameters
+    ----------
+    settings : dict
+        Type of input file, dataset configuration and data type
+    """
+    WORKER['settings'] = settings
+    WORKER['datasets'] = {}
+
+
+def get_dataset(file_path):
+    """Opens an input file as a sequence of entries, once per process.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the input file
+
+    Returns
+    -------
+    object
+        Reader (HDF5) or dataset (LArCV) instance
+    """
+    if file_path not in WORKER['datasets']:
+        settings = WORKER['settings']
+        if settings['file_type'] == 'hdf5':
+            from spine.io.read import HDF5Reader
+            dataset = HDF5Reader(file_path)
+
+        else:
+            from spine.io.factories import dataset_factory
+            dataset = dataset_factory(
+                    {**settings['dataset_cfg'], 'file_keys': file_path},
+                    dtype=settings['dtype'])
+
+        WORKER['datasets'][file_path] = dataset
+
+    return WORKER['datasets'][file_path]
+
+
+def count_entries(file_path):
+    """Counts the entries in an input file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the input file
+
+    Returns
+    -------
+    int
+        Number of entries in the file
+    """
+    return len(get_dataset(file_path))
+
+
+def convert_shard(file_path, first, last, out_path):
+    """Converts a range of entries of an input file to a flat event store.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the input file
+    first : int
+        Index of the first entry to convert
+    last : int
+        Index of the entry after the last one to convert
+    out_path : str
+        Path to the output file
+
+    Returns
+    -------
+    pid : int
+        ID of the process which converted the shard
+    num_entries : int
+        Number of entries converted
+    duration : float
+        Time it took to convert the shard
+    error : str
+        Error traceback, if the conversion failed
+    """
+    start = time.time()
+    try:
+        # Store the parsing configuration with the parsed data products
+        settings = WORKER['settings']
+        cfg = None
+        if settings['file_type'] == 'larcv':
+            cfg = {'dtype': settings['dtype'],
+                   'schema': settings['dataset_cfg']['schema']}
+
+        # Copy every entry of the shard to the flat event store
+        dataset = get_dataset(file_path)
+        writer = FlatWriter(out_path, overwrite=True)
+        for i in range(first, last):
+            data = dataset[i]
+            data.pop('file_index', None)
+            writer(data, cfg)
+        writer.close()
+
+    except Exception: # pylint: disable=W0718
+        return os.getpid(), 0, time.time() - start, traceback.format_exc()
+
+    return os.getpid(), last - first, time.time() - start, None
+
+
+if __name__ == "__main__":
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(
+            description="Convert files to flat event stores")
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--source', '-s',
+                       help='Path or list of paths to data files',
+                       type=str, nargs="+")
+    group.add_argument('--source-list', '-S',
+                       help='Path to a text file of data file paths',
+                       type=str)
+
+    parser.add_argument('--output-dir', '-o',
+                        help='Directory in which to store the converted files',
+                        type=str, default=None)
+    parser.add_argument('--file-type', '-t',
+                        help='Type of data file',
+                        type=str, choices=['hdf5', 'larcv'], default='hdf5')
+    parser.add_argument('--config', '-c',
+                        help='SPINE configuration used to parse LArCV files',
+                        type=str, default=None)
+    parser.add_argument('--dtype',
+                        help='Data type to cast the parsed LArCV data to',
+                        type=str, default='float32')
+    parser.add_argument('--num-workers', '-j',
+                        help='Number of worker processes',
+                        type=int, default=1)
+    parser.add_argument('--shard-size',
+                        help='Maximum number of entries per output file',
+                        type=int, default=None)
+    parser.add_argument('--overwrite',
+                        help='Overwrite existing output files',
+                        action='store_true')
+
+    args = parser.parse_args()
+
+    # Execture the main function
+    main(args.source, args.source_list, args.output_dir, args.file_type,
+         args.config, args.dtype, args.num_workers, args.shard_size,
+         args.overwrite)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Compiles the numba kernels ahead of time into a persistent cache."""
+
+import os
+import sys
+import pathlib
+import argparse
+
+import yaml
+
+# Add parent spine directory to the python path
+current_directory = os.path.dirname(os.path.abspath(__file__))
+current_directory = os.path.dirname(current_directory)
+sys.path.insert(0, current_directory)
+
+
+def main(signatures, config, iterations, cache_dir):
+    """Records the signatures of the numba kernels used by a configuration,
+    or compiles a set of recorded signatures into the numba cache.
+
+    If a configuration is provided, it is run for a few iterations in the
+    current process (without loader workers) and the signature of every
+    kernel compiled in the process is added to the `signatures` file.
+
+    Otherwise, the kernels are compiled for each of the signatures in the
+    `signatures` file and stored in the cache. Subsequent jobs which share
+    the same cache directory (`NUMBA_CACHE_DIR`) load them instead of
+    compiling them (this can also be done explicitly at startup by setting
+    the `jit_signatures` parameter of the `base` configuration block).
+
+    In both cases, a report of which kernel signatures were loaded from the
+    cache and which had to be compiled is printed.
+
+    Parameters
+    ----------
+    signatures : str
+        Path to the kernel signature file
+    config : str, optional
+        Path to a SPINE configuration file to record the signatures from
+    iterations : int
+        Number of iterations to run the configuration for
+    cache_dir : str, optional
+        Path to the numba cache directory. If not specified, the kernels are
+        cached in the `__pycache__` directory next to their source file
+    """
+    # The cache directory is read by numba when a kernel is defined, it must
+    # be set before any module which defines kernels is imported
+    if cache_dir is not None:
+        os.environ['NUMBA_CACHE_DIR'] = cache_dir
+
+    from spine.utils.jit import (
+            save_signatures, load_signatures, compile_kernels, get_report,
+            format_report)
+
+    if config is not None:
+        # Load the configuration, run it for a few iterations in this process
+        from spine.main import run
+
+        with open(config, 'r', encoding='utf-8') as cfg_yaml:
+            cfg = yaml.safe_load(cfg_yaml)
+        cfg.setdefault('base', {})
+        cfg['base']['parent_path'] = str(pathlib.Path(config).parent)
+        cfg['base']['iterations'] = iterations
+        cfg['base'].pop('jit_signatures', None)
+        if 'loader' in cfg['io']:
+            cfg['io']['loader']['num_workers'] = 0
+
+        run(cfg)
+
+        # Store the signature of every kernel compiled in this process
+        sigs = save_signatures(signatures)
+        num_sigs = sum(len(s) for s in sigs.values())
+        print(f"\nStored {num_sigs} signature(s) of {len(sigs)} kernel(s) "
+              f"to {signatures}\n")
+        report = get_report()
+
+    else:
+        # Compile every recorded signature (or load it from the cache)
+        report = compile_kernels(load_signatures(signatures))
+
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(
+            description="Compile the numba kernels into a persistent cache")
+
+    parser.add_argument('--signatures', '-s',
+                        help='Path to the kernel signature file',
+                        type=str, required=True)
+    parser.add_argument('--config', '-c',
+                        help='SPINE configuration to record the signatures from',
+                        type=str, default=None)
+    parser.add_argument('--iterations', '-n',
+                        help='Number of iterations to run the configuration for',
+                        type=int, default=2)
+    parser.add_argument('--cache-dir',
+                        help='Path to the numba cache directory',
+                        type=str, default=None)
+
+    args = parser.parse_args()
+
+    # Execute the main function
+    main(args.signatures, args.config, args.iterations, args.cache_dir)
@@ -37,7 +37,8 @@ class AnaBase(ABC):
     _run_modes = ('reco', 'truth', 'both', 'all')
 
     def __init__(self, obj_type=None, run_mode=None, append=False,
-                 overwrite=False, log_dir=None, prefix=None):
+                 overwrite=False, log_dir=None, prefix=None, buffer_size=None,
+                 backend='csv'):
         """Initialize default anlysis script object properties.
 
         Parameters
@@ -56,6 +57,11 @@ class AnaBase(ABC):
             Output CSV file directory (shared with driver log)
         prefix : str, default None
             Name to prefix every output CSV file with
+        buffer_size : int, optional
+            If specified, number of rows accumulated before they are written
+            to the output files in one block
+        backend : str, default 'csv'
+            Output file format, one of 'csv', 'parquet' or 'feather'
         """
         # Initialize default keys
         if self.keys is None:
@@ -113,6 +119,8 @@ class AnaBase(ABC):
         # Initialize a writer dictionary to be filled by the children classes
         self.log_dir = log_dir
         self.output_prefix = prefix
+        self.buffer_size = buffer_size
+        self.backend = backend
         self.writers = {}
 
     def initialize_writer(self, name):
@@ -125,7 +133,7 @@ class AnaBase(ABC):
         """
         # Define the name of the file to write to
         assert len(name) > 0, "Must provide a non-empty name."
-        file_name = f'{self.name}_{name}.csv'
+        file_name = f'{self.name}_{name}.{self.backend}'
         if self.output_prefix:
             file_name = f'{self.output_prefix}_{file_name}'
         if self.log_dir:
@@ -134,7 +142,8 @@ class AnaBase(ABC):
         # Initialize the writer
         self.writers[name] = CSVWriter(
                 file_name, append=self.append_file,
-                overwrite=self.overwrite_file)
+                overwrite=self.overwrite_file, buffer_size=self.buffer_size,
+                backend=self.backend)
 
     def get_base_dict(self, data):
         """Builds the entry information dictionary.
@@ -10,7 +10,8 @@ for module in [metric, script]:
     ANA_DICT.update(**module_dict(module))
 
 
-def ana_script_factory(name, cfg, overwrite=False, log_dir=None, prefix=None):
+def ana_script_factory(name, cfg, overwrite=False, log_dir=None, prefix=None,
+                       buffer_size=None, backend='csv'):
     """Instantiates an analyzer module from a configuration dictionary.
 
     Parameters
@@ -29,6 +30,11 @@ def ana_script_factory(name, cfg, overwrite=False, log_dir=None, prefix=None):
     prefix : str, optional
         Input file prefix. If requested, it will be used to prefix
         all the output CSV files.
+    buffer_size : int, optional
+        If specified, number of rows accumulated by the CSV writers before
+        they are written to file in one block
+    backend : str, default 'csv'
+        Output file format, one of 'csv', 'parquet' or 'feather'
 
     Returns
     -------
@@ -40,4 +46,5 @@ def ana_script_factory(name, cfg, overwrite=False, log_dir=None, prefix=None):
 
     # Instantiate the analysis script module
     return instantiate(
-            ANA_DICT, cfg, overwrite=overwrite, log_dir=log_dir, prefix=prefix)
+            ANA_DICT, cfg, overwrite=overwrite, log_dir=log_dir, prefix=prefix,
+            buffer_size=buffer_size, backend=backend)
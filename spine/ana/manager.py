@@ -36,7 +36,8 @@ class AnaManager:
         self.parse_config(log_dir, prefix, **cfg)
 
     def parse_config(self, log_dir, prefix, overwrite=False,
-                     prefix_output=False, **modules):
+                     prefix_output=False, buffer_size=None, backend='csv',
+                     **modules):
         """Parse the analysis tool configuration.
 
         Parameters
@@ -50,6 +51,11 @@ class AnaManager:
             If `True`, overwrite the CSV logs if they already exist
         prefix_output : bool, optional
             If `True`, will prefix the output CSV names with the input file name
+        buffer_size : int, optional
+            If specified, number of rows accumulated by the CSV writers before
+            they are written to file in one block
+        backend : str, default 'csv'
+            Output file format, one of 'csv', 'parquet' or 'feather'
         **modules : dict
             List of analysis script modules
         """
@@ -74,7 +80,8 @@ class AnaManager:
 
             # Append
             self.modules[k] = ana_script_factory(
-                    k, modules[k], overwrite, log_dir, prefix)
+                    k, modules[k], overwrite, log_dir, prefix, buffer_size,
+                    backend)
 
     def __call__(self, data):
         """Pass one batch of data through the analysis scripts
@@ -111,3 +118,9 @@ class AnaManager:
                                 f"The number {key} ({len(val)}) does not match "
                                 f"the number of entries ({num_entries}).")
                     data[key] = val
+
+    def close(self):
+        """Writes the rows buffered by the analysis scripts to file."""
+        for module in self.modules.values():
+            for writer in module.writers.values():
+                writer.close()
@@ -65,7 +65,7 @@ class BuilderBase(ABC):
     # List of recognized run modes
     _run_modes = ['reco', 'truth', 'both', 'all']
 
-    def __init__(self, mode, units):
+    def __init__(self, mode, units, lazy=False):
         """Initializes the builder.
 
         Parameters
@@ -76,6 +76,11 @@ class BuilderBase(ABC):
         units : str, default 'cm'
             Units in which the position arguments of the constructed objects
             should be expressed (one of 'cm' or 'px')
+        lazy : bool, default False
+            If `True`, the objects only store their indexes and a reference
+            to the per-entry point/deposition buffers. Their long-form
+            attributes (`points`, `depositions`, etc.) are gathered from the
+            buffers when they are accessed, rather than copied in each object
         """
         # Check on the mode, store it
         assert mode in self._run_modes, (
@@ -86,6 +91,9 @@ class BuilderBase(ABC):
         # Store the target units
         self.units = units
 
+        # Store whether the long-form attributes are gathered lazily
+        self.lazy = lazy
+
     def __call__(self, data):
         """Build representations for a batch of data.
 
@@ -191,7 +199,17 @@ class BuilderBase(ABC):
                     input_data[key] = data[key]
 
         obj_list = getattr(self, func)(input_data)
-        default = getattr(self, f'{dtype}_type')()
+        obj_type = getattr(self, f'{dtype}_type')
+        default = obj_type()
+
+        # If requested, attach the shared buffers the long-form attributes
+        # of the objects are to be gathered from
+        if self.lazy:
+            buffer_keys = {k for k, _ in obj_type._lazy_attrs.values()}
+            buffers = {k: input_data[k] for k in buffer_keys if k in input_data}
+            if len(buffers):
+                for obj in obj_list:
+                    obj.attach_buffers(buffers)
 
         return ObjectList(obj_list, default)
 
@@ -108,13 +108,16 @@ class FragmentBuilder(BuilderBase):
             fragment = RecoFragment(
                     id=i,
                     shape=fragment_shapes[i],
-                    index=index,
-                    points=points[index],
-                    depositions=depositions[index])
+                    index=index)
+
+            # Add long-form attributes, unless gathered from shared buffers
+            if not self.lazy:
+                fragment.points = points[index]
+                fragment.depositions = depositions[index]
+                if sources is not None:
+                    fragment.sources = sources[index]
 
             # Add optional arguments
-            if sources is not None:
-                fragment.sources = sources[index]
             if fragment_start_points is not None:
                 fragment.start_point = fragment_start_points[i]
             if fragment_end_points is not None and fragment.shape == TRACK_SHP:
@@ -217,22 +220,24 @@ class FragmentBuilder(BuilderBase):
 
             # Always fill adapted long-form attributes
             fragment.index_adapt = index_adapt
-            fragment.points_adapt = points[index_adapt]
-            fragment.depositions_adapt = depositions[index_adapt]
-            if sources is not None:
-                fragment.sources_adapt = sources[index_adapt]
+            if not self.lazy:
+                fragment.points_adapt = points[index_adapt]
+                fragment.depositions_adapt = depositions[index_adapt]
+                if sources is not None:
+                    fragment.sources_adapt = sources[index_adapt]
 
             # If the input cluster label is not adapted, fill other long-form
             if id(label_tensor) == id(label_adapt_tensor):
                 # Update the fragment with its true long-form attributes
                 index = np.where(label_tensor[:, CLUST_COL] == frag_id)[0]
                 fragment.index = index
-                fragment.points = points_label[index]
-                fragment.depositions = depositions_label[index]
-                if depositions_q_label is not None:
-                    fragment.depositions_q = depositions_q_label[index]
-                if sources_label is not None:
-                    fragment.sources = sources_label[index]
+                if not self.lazy:
+                    fragment.points = points_label[index]
+                    fragment.depositions = depositions_label[index]
+                    if depositions_q_label is not None:
+                        fragment.depositions_q = depositions_q_label[index]
+                    if sources_label is not None:
+                        fragment.sources = sources_label[index]
 
                 # If the fragments are not broken, can match to G4 info
                 if not broken:
@@ -241,8 +246,9 @@ class FragmentBuilder(BuilderBase):
                         index_g4 = np.where(
                                 label_g4_tensor[:, CLUST_COL] == frag_id)[0]
                         fragment.index_g4 = index_g4
-                        fragment.points_g4 = poins_g4[index_g4]
-                        fragment.depositions_g4 = depositions_g4[index_g4]
+                        if not self.lazy:
+                            fragment.points_g4 = points_g4[index_g4]
+                            fragment.depositions_g4 = depositions_g4[index_g4]
 
             # Append
             truth_fragments.append(fragment)
@@ -289,6 +295,11 @@ class FragmentBuilder(BuilderBase):
             assert fragment.id == i, (
                     "The ordering of the stored fragments is wrong.")
 
+            # If the long-form attributes are gathered from the shared
+            # buffers, there is nothing to restore
+            if self.lazy:
+                continue
+
             # Update the fragment with its long-form attributes
             fragment.points = points[fragment.index]
             fragment.depositions = depositions[fragment.index]
@@ -352,6 +363,11 @@ class FragmentBuilder(BuilderBase):
             assert fragment.id == i, (
                     "The ordering of the stored fragments is wrong.")
 
+            # If the long-form attributes are gathered from the shared
+            # buffers, there is nothing to restore
+            if self.lazy:
+                continue
+
             # Update the fragment with its long-form attributes
             fragment.points = points_label[fragment.index]
             fragment.depositions = depositions_label[fragment.index]
@@ -207,10 +207,13 @@ class InteractionBuilder(BuilderBase):
                     "Every interaction should contain >= 1 particle.")
             interaction.particles = inter_particles
 
-            # Update the interaction with its long-form attributes
+            # Update the interaction with its long-form attributes, unless
+            # they are gathered from the buffers shared with its particles
+            interaction.attach_buffers(inter_particles[0]._buffers)
             for attr in interaction._cat_attrs:
-                val_list = [getattr(p, attr) for p in inter_particles]
-                setattr(interaction, attr, np.concatenate(val_list))
+                if not interaction.is_lazy(attr):
+                    val_list = [getattr(p, attr) for p in inter_particles]
+                    setattr(interaction, attr, np.concatenate(val_list))
 
         return reco_interactions
 
@@ -262,9 +265,12 @@ class InteractionBuilder(BuilderBase):
                     "Every interaction should contain >= 1 particle.")
             interaction.particles = inter_particles
 
-            # Update the interaction with its long-form attributes
+            # Update the interaction with its long-form attributes, unless
+            # they are gathered from the buffers shared with its particles
+            interaction.attach_buffers(inter_particles[0]._buffers)
             for attr in interaction._cat_attrs:
-                val_list = [getattr(p, attr) for p in inter_particles]
-                setattr(interaction, attr, np.concatenate(val_list))
+                if not interaction.is_lazy(attr):
+                    val_list = [getattr(p, attr) for p in inter_particles]
+                    setattr(interaction, attr, np.concatenate(val_list))
 
         return truth_interactions
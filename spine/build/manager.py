@@ -34,7 +34,7 @@ class BuildManager:
     }
 
     def __init__(self, fragments, particles, interactions,
-                 mode='both', units='cm', sources=None):
+                 mode='both', units='cm', lazy=False, sources=None):
         """Initializes the build manager.
 
         Parameters
@@ -47,6 +47,13 @@ class BuildManager:
             Build/load RecoInteraction/TruthInteraction objects
         mode : str, default 'both'
             Whether to construct reconstructed objects, true objects or both
+        units : str, default 'cm'
+            Units in which the position arguments of the constructed objects
+            should be expressed (one of 'cm' or 'px')
+        lazy : bool, default False
+            If `True`, the objects do not hold a copy of their long-form
+            attributes (`points`, `depositions`, etc.), which are gathered
+            from the per-entry buffers shared by all objects when accessed
         sources : Dict[str, str], optional
             Dictionary which maps the necessary data products onto a name
             in the input/output dictionary of the reconstruction chain.
@@ -57,6 +64,7 @@ class BuildManager:
                  "'truth', 'both' or 'all'.")
         self.mode = mode
         self.units = units
+        self.lazy = lazy
         
         # Parse the build sources based on defaults
         if sources is not None:
@@ -75,15 +83,15 @@ class BuildManager:
         # Initialize the builders
         self.builders = OrderedDict()
         if fragments:
-            self.builders['fragment'] = FragmentBuilder(mode, units)
+            self.builders['fragment'] = FragmentBuilder(mode, units, lazy)
         if particles:
-            self.builders['particle'] = ParticleBuilder(mode, units)
+            self.builders['particle'] = ParticleBuilder(mode, units, lazy)
         if interactions:
             assert particles, (
                     "Interactions are built from particles. If "
                     "`interactions` is True, so must "
                     "`particles` be.")
-            self.builders['interaction'] = InteractionBuilder(mode, units)
+            self.builders['interaction'] = InteractionBuilder(mode, units, lazy)
 
         assert len(self.builders), (
                 "Do not call the builder unless it does anything.")
@@ -114,8 +114,6 @@ class ParticleBuilder(BuilderBase):
                     interaction_id=particle_group_pred[i],
                     shape=particle_shapes[i],
                     index=index,
-                    points=points[index],
-                    depositions=depositions[index],
                     pid=pid_pred[i],
                     primary_scores=primary_scores[i],
                     is_primary=bool(primary_pred[i]))
@@ -135,9 +133,12 @@ class ParticleBuilder(BuilderBase):
                     particle.start_point, particle.end_point = (
                             particle.end_point, particle.start_point)
 
-            # Add optional arguments
-            if sources is not None:
-                particle.sources = sources[index]
+            # Add long-form attributes, unless gathered from shared buffers
+            if not self.lazy:
+                particle.points = points[index]
+                particle.depositions = depositions[index]
+                if sources is not None:
+                    particle.sources = sources[index]
 
             # Append
             reco_particles.append(particle)
@@ -224,27 +225,30 @@ class ParticleBuilder(BuilderBase):
             # Update the particle with its long-form attributes
             index = np.where(label_tensor[:, GROUP_COL] == group_id)[0]
             particle.index = index
-            particle.points = points_label[index]
-            particle.depositions = depositions_label[index]
-            if depositions_q_label is not None:
-                particle.depositions_q = depositions_q_label[index]
-            if sources_label is not None:
-                particle.sources = sources_label[index]
+            if not self.lazy:
+                particle.points = points_label[index]
+                particle.depositions = depositions_label[index]
+                if depositions_q_label is not None:
+                    particle.depositions_q = depositions_q_label[index]
+                if sources_label is not None:
+                    particle.sources = sources_label[index]
 
             index_adapt = np.where(
                     label_adapt_tensor[:, GROUP_COL] == group_id)[0]
             particle.index_adapt = index_adapt
-            particle.points_adapt = points[index_adapt]
-            particle.depositions_adapt = depositions[index_adapt]
-            if sources is not None:
-                particle.sources_adapt = sources[index_adapt]
+            if not self.lazy:
+                particle.points_adapt = points[index_adapt]
+                particle.depositions_adapt = depositions[index_adapt]
+                if sources is not None:
+                    particle.sources_adapt = sources[index_adapt]
 
             if label_g4_tensor is not None:
                 index_g4 = np.where(
                         label_g4_tensor[:, GROUP_COL] == group_id)[0]
                 particle.index_g4 = index_g4
-                particle.points_g4 = points_g4[index_g4]
-                particle.depositions_g4 = depositions_g4[index_g4]
+                if not self.lazy:
+                    particle.points_g4 = points_g4[index_g4]
+                    particle.depositions_g4 = depositions_g4[index_g4]
 
             # Append
             truth_particles.append(particle)
@@ -286,6 +290,11 @@ class ParticleBuilder(BuilderBase):
             assert particle.id == i, (
                     "The ordering of the stored particles is wrong.")
 
+            # If the long-form attributes are gathered from the shared
+            # buffers, there is nothing to restore
+            if self.lazy:
+                continue
+
             # Update the particle with its long-form attributes
             particle.points = points[particle.index]
             particle.depositions = depositions[particle.index]
@@ -344,6 +353,11 @@ class ParticleBuilder(BuilderBase):
             assert particle.id == i, (
                     "The ordering of the stored particles is wrong.")
 
+            # If the long-form attributes are gathered from the shared
+            # buffers, there is nothing to restore
+            if self.lazy:
+                continue
+
             # Update the particle with its long-form attributes
             particle.points = points_label[particle.index]
             particle.depositions = depositions_label[particle.index]
@@ -103,8 +103,11 @@ class DataBase:
         if self.__class__ != other.__class__:
             return False
 
-        # Check that all attributes are identical
+        # Check that all attributes are identical (skip private attributes)
         for k, v in self.__dict__.items():
+            if k.startswith('_'):
+                continue
+            v = getattr(self, k)
             if np.isscalar(v):
                 # For scalars, regular comparison will do
                 if getattr(other, k) != v:
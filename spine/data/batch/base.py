@@ -77,8 +77,11 @@ class BatchBase:
         if self.__class__ != other.__class__:
             return False
 
-        # Check that all attributes are identical
+        # Check that all attributes are identical (skip private caches)
         for k, v in self.__dict__.items():
+            if k.startswith('_'):
+                continue
+
             v_other = getattr(other, k)
             if v is None:
                 # If not filled, make sure neither are
@@ -245,3 +245,40 @@ class EdgeIndexBatch(BatchBase):
         offsets = self._to_tensor(self.offsets, dtype, device)
 
         return EdgeIndexBatch(data, counts, offsets, self.directed)
+
+    @classmethod
+    def from_list(cls, index_list, offsets, directed):
+        """Builds a batch from a list of entry-level edge indexes.
+
+        The final edge index is allocated once from the number of edges in
+        each entry and filled in a single pass, offsets included.
+
+        Parameters
+        ----------
+        index_list : List[np.ndarray]
+            (B) List of (E_b, 2) edge indexes, relative to the start of each
+            entry (as returned by :meth:`split`)
+        offsets : Union[List[int], np.ndarray]
+            (B) Offsets between successive indexes in the batch
+        directed : bool
+            Whether the edge index is directed or undirected
+
+        Returns
+        -------
+        EdgeIndexBatch
+            Batch of edge indexes
+        """
+        # Allocate the edge index
+        counts = np.array([len(index) for index in index_list], dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        data = np.empty((2, np.sum(counts)), dtype=np.int64)
+
+        # Fill it, one entry at a time
+        start = 0
+        for b, index in enumerate(index_list):
+            end = start + len(index)
+            data[:, start:end] = np.transpose(index)
+            data[:, start:end] += offsets[b]
+            start = end
+
+        return cls(data, counts, offsets, directed)
@@ -19,19 +19,32 @@ __all__ = ['IndexBatch']
 class IndexBatch(BatchBase):
     """Batched index with the necessary methods to slice it.
 
+    A list of indexes is stored in a flat compressed sparse row (CSR) layout:
+    the indexes are concatenated into a single array of values and the
+    boundaries between successive indexes are stored in `single_edges`. The
+    list of individual indexes is only built (as views of the values) when it
+    is explicitly requested.
+
     Attributes
     ----------
+    values : Union[np.ndarray, torch.Tensor]
+        (N) Concatenated index elements
     offsets : Union[np.ndarray, torch.Tensor]
         (B) Offsets between successive indexes in the batch
     single_counts : Union[np.ndarray, torch.Tensor]
         (I) Number of index elements per index in the index list. This
         is the same as counts if the underlying data is a single index
+    single_edges : Union[np.ndarray, torch.Tensor]
+        (I+1) Edges separating the indexes in the flat array of values
     """
+    values: Union[np.ndarray, torch.Tensor]
     offsets: Union[np.ndarray, torch.Tensor]
     single_counts: Union[np.ndarray, torch.Tensor]
+    single_edges: Union[np.ndarray, torch.Tensor]
 
     def __init__(self, data, offsets, counts=None, single_counts=None,
-                 batch_ids=None, batch_size=None, default=None, is_numpy=True): # TODO is_numpy does nothing
+                 batch_ids=None, batch_size=None, default=None, is_numpy=True, # TODO is_numpy does nothing
+                 flat=False):
         """Initialize the attributes of the class.
 
         Parameters
@@ -53,12 +66,16 @@ class IndexBatch(BatchBase):
             Number of entries in the batch. Must be specified along batch_ids
         is_numpy : bool, default True
             Default type of index. Provide if `data` may be empty
+        flat : bool, default False
+            If `True`, `data` is the flat concatenation of a list of indexes,
+            each of which is `single_counts` long
         """
         # Check weather the input is a single index or a list
-        is_list = isinstance(data, (list, tuple)) or data.dtype == object
+        is_list = (flat or isinstance(data, (list, tuple)) or
+                   data.dtype == object)
 
         # Initialize the base class
-        if not is_list:
+        if not is_list or flat:
             init_data = data
 
         elif len(data):
@@ -74,6 +91,14 @@ class IndexBatch(BatchBase):
 
         super().__init__(init_data, is_list=is_list)
 
+        # Flatten the list of indexes, if needed
+        if not is_list or flat:
+            values = data
+        elif len(data):
+            values = self._cat(list(data))
+        else:
+            values = init_data
+
         # Get the counts if they are not provided for free
         if counts is None:
             assert batch_ids is not None and batch_size is not None, (
@@ -89,7 +114,7 @@ class IndexBatch(BatchBase):
                     "When initializing an index list, provide `single_counts`.")
             single_counts = counts
         else:
-            assert len(single_counts) == len(data), (
+            assert flat or len(single_counts) == len(data), (
                     "There must be one single count per index in the list.")
 
         # Cast
@@ -98,21 +123,27 @@ class IndexBatch(BatchBase):
         offsets = self._as_long(offsets)
 
         # Do a couple of basic sanity checks
-        assert self._sum(counts) == len(data), (
+        assert self._sum(counts) == len(single_counts if is_list else values), (
                 "The `counts` provided must add up to the index length.")
+        assert self._sum(single_counts) == len(values), (
+                "The `single_counts` provided must add up to the number of "
+                "index elements.")
         assert len(counts) == len(offsets), (
                 "The number of `offsets` must match the number of `counts`.")
 
-        # Get the boundaries between successive index using the counts
+        # Get the boundaries between successive entries and indexes
         edges = self.get_edges(counts)
+        single_edges = self.get_edges(single_counts) if is_list else edges
 
         # Store the attributes
-        self.data = data
+        self.values = values
         self.counts = counts
         self.single_counts = single_counts
+        self.single_edges = single_edges
         self.edges = edges
         self.offsets = offsets
         self.batch_size = batch_size
+        self._index_list = None
 
     def __getitem__(self, batch_id):
         """Returns a subset of the index corresponding to one entry.
@@ -130,14 +161,47 @@ class IndexBatch(BatchBase):
         # Return
         lower, upper = self.edges[batch_id], self.edges[batch_id + 1]
         if not self.is_list:
-            return self.data[lower:upper] - self.offsets[batch_id]
+            return self.values[lower:upper] - self.offsets[batch_id]
 
         else:
-            entry = np.empty(upper-lower, dtype=object)
-            for i, index in enumerate(self.data[lower:upper]):
-                entry[i] = index - self.offsets[batch_id]
+            edges = self.single_edges[lower:upper + 1]
+            values = self.values[edges[0]:edges[-1]] - self.offsets[batch_id]
 
-            return entry
+            return self._split_list(values, edges - edges[0])
+
+    @property
+    def data(self):
+        """Underlying index or list of indexes.
+
+        If the underlying data is a list of indexes, it is built once from
+        views of the flat array of values.
+
+        Returns
+        -------
+        Union[np.ndarray, torch.Tensor, np.ndarray[object]]
+            Underlying index or list of indexes
+        """
+        if not self.is_list:
+            return self.values
+
+        if self._index_list is None:
+            self._index_list = self._split_list(self.values, self.single_edges)
+
+        return self._index_list
+
+    @property
+    def shape(self):
+        """Shape of the underlying data.
+
+        Returns
+        -------
+        tuple
+            Tuple of sizes in each dimension
+        """
+        if not self.is_list:
+            return self.values.shape
+        else:
+            return len(self.single_counts),
 
     @property
     def index(self):
@@ -151,7 +215,7 @@ class IndexBatch(BatchBase):
         assert not self.is_list, (
                 "Underlying data is not a single index, use `index_list`")
 
-        return self.data
+        return self.values
 
     @property
     def index_list(self):
@@ -176,10 +240,7 @@ class IndexBatch(BatchBase):
         Union[np.ndarray, torch.Tensor]
             (N) Complete concatenated index
         """
-        if not self.is_list:
-            return self.data
-        else:
-            return self._cat(self.data) if len(self.data) else self._empty(0)
+        return self.values
 
     @property
     def index_ids(self):
@@ -193,7 +254,8 @@ class IndexBatch(BatchBase):
         assert self.is_list, (
                 "Underlying data must be a list of index")
 
-        return self._repeat(self._arange(len(self.data)), self.single_counts)
+        return self._repeat(
+                self._arange(len(self.single_counts)), self.single_counts)
 
     @property
     def full_counts(self):
@@ -207,12 +269,8 @@ class IndexBatch(BatchBase):
         if not self.is_list:
             return self.counts
         else:
-            full_counts = self._empty(self.batch_size)
-            for b in range(self.batch_size):
-                lower, upper = self.edges[b], self.edges[b+1]
-                full_counts[b] = self._sum(self.single_counts[lower:upper])
-
-            return self._as_long(full_counts)
+            edges = self.single_edges[self.edges]
+            return edges[1:] - edges[:-1]
 
     @property
     def batch_ids(self):
@@ -239,22 +297,30 @@ class IndexBatch(BatchBase):
     def split(self):
         """Breaks up the index batch into its constituents.
 
+        The offsets are removed from all the index elements at once, each
+        entry is then a view of the shifted values.
+
         Returns
         -------
         List[List[Union[np.ndarray, torch.Tensor]]]
             List of list of indexes per entry in the batch
         """
-        # Cast to numpy object array to be able to use split
-        if self.is_list and not isinstance(self.data, np.ndarray):
-            data_np = np.empty(len(self.data), dtype=object)
-            data_np[:] = self.data
-        else:
-            data_np = self.data
+        # Remove the entry offsets from all the elements at once
+        shifts = self._repeat(self.offsets, self.full_counts)
+        if not self.is_numpy:
+            shifts = shifts.to(self.device)
+        values = self.values - shifts
 
-        # Split, offset
-        indexes = np.split(data_np, self.splits)
+        # Split
+        if not self.is_list:
+            return self._split(values, self.splits)
+
+        indexes = []
         for batch_id in range(self.batch_size):
-            indexes[batch_id] = indexes[batch_id] - self.offsets[batch_id]
+            lower, upper = self.edges[batch_id], self.edges[batch_id + 1]
+            edges = self.single_edges[lower:upper + 1]
+            indexes.append(self._split_list(
+                values[edges[0]:edges[-1]], edges - edges[0]))
 
         return indexes
 
@@ -275,32 +341,54 @@ class IndexBatch(BatchBase):
         assert (self.offsets == index_batch.offsets).all(), (
                 "Both index batches should point to the same tensor.")
 
-        # Stack the indexes entry-wise in the batch
-        indexes, single_counts = [], []
-        for b in range(self.batch_size):
-            if self.is_list:
-                lower, upper = self.edges[b], self.edges[b+1]
-                indexes.extend(self.index_list[lower:upper])
-                single_counts.extend(self.single_counts[lower:upper])
+        # Stack the indexes entry-wise in the batch. In each entry, the
+        # elements of this batch come first, followed by those of the other
+        full_counts = self.full_counts
+        other_full_counts = index_batch.full_counts
+        values = self._empty(len(self.values) + len(index_batch.values))
+        values[self._shift(full_counts, other_full_counts)] = self.values
+        values[self._shift(other_full_counts, full_counts, True)] = (
+                index_batch.values)
+        counts = self.counts + index_batch.counts
 
-                lower, upper = index_batch.edges[b], index_batch.edges[b+1]
-                indexes.extend(index_batch.index_list[lower:upper])
-                single_counts.extend(index_batch.single_counts[lower:upper])
+        if not self.is_list:
+            return IndexBatch(values, self.offsets, counts)
 
-            else:
-                lower, upper = self.edges[b], self.edges[b+1]
-                indexes.append(self.index[lower:upper])
+        single_counts = self._empty(
+                len(self.single_counts) + len(index_batch.single_counts))
+        single_counts[self._shift(self.counts, index_batch.counts)] = (
+                self.single_counts)
+        single_counts[self._shift(index_batch.counts, self.counts, True)] = (
+                index_batch.single_counts)
 
-                lower, upper = index_batch.edges[b], index_batch.edges[b+1]
-                indexes.append(index_batch.index[lower:upper])
+        return IndexBatch(
+                values, self.offsets, counts, single_counts, flat=True)
 
-        counts = self.counts + index_batch.counts
+    def _shift(self, counts, other_counts, after=False):
+        """Finds the position of each element of a batch once it is merged,
+        entry-wise, with the elements of another batch.
 
-        if self.is_list:
-            return IndexBatch(indexes, self.offsets, counts, single_counts)
-        else:
-            return IndexBatch(indexes, self.offsets, counts)
+        Parameters
+        ----------
+        counts : Union[np.ndarray, torch.Tensor]
+            (B) Number of elements in each entry of the batch
+        other_counts : Union[np.ndarray, torch.Tensor]
+            (B) Number of elements in each entry of the other batch
+        after : bool, default False
+            If `True`, the elements are placed after those of the other batch
 
+        Returns
+        -------
+        Union[np.ndarray, torch.Tensor]
+            (N) Position of each element in the merged batch
+        """
+        other_edges = self.get_edges(other_counts)
+        shifts = self._repeat(
+                other_edges[1:] if after else other_edges[:-1], counts)
+        if self.is_numpy:
+            return shifts + np.arange(len(shifts))
+        else:
+            return shifts + torch.arange(len(shifts), device=shifts.device)
 
     def to_numpy(self):
         """Cast underlying index to a `np.ndarray` and return a new instance.
@@ -314,21 +402,16 @@ class IndexBatch(BatchBase):
         if self.is_numpy:
             return self
 
-        if not self.is_list:
-            data = self._to_numpy(self.data)
-        else:
-            data = np.empty(len(self.data), dtype=object)
-            for i, d in enumerate(self.data):
-                data[i] = self._to_numpy(d)
-
+        values = self._to_numpy(self.values)
         offsets = self._to_numpy(self.offsets)
         counts = self._to_numpy(self.counts)
 
-        single_counts = None
-        if self.is_list:
-            single_counts = self._to_numpy(self.single_counts)
+        if not self.is_list:
+            return IndexBatch(values, offsets, counts)
+
+        single_counts = self._to_numpy(self.single_counts)
 
-        return IndexBatch(data, offsets, counts, single_counts)
+        return IndexBatch(values, offsets, counts, single_counts, flat=True)
 
     def to_tensor(self, dtype=None, device=None):
         """Cast underlying index to a `torch.tensor` and return a new instance.
@@ -349,18 +432,89 @@ class IndexBatch(BatchBase):
         if not self.is_numpy:
             return self
 
+        values = self._to_tensor(self.values, dtype, device)
+        offsets = self._to_tensor(self.offsets, dtype, device)
+        counts = self._to_tensor(self.counts, dtype, device)
+
         if not self.is_list:
-            data = self._to_tensor(self.data, dtype, device)
+            return IndexBatch(values, offsets, counts)
+
+        single_counts = self._to_tensor(self.single_counts, dtype, device)
+
+        return IndexBatch(values, offsets, counts, single_counts, flat=True)
+
+    @classmethod
+    def from_list(cls, index_list, offsets, default=None):
+        """Builds a batch from a list of entry-level indexes.
+
+        The final array of values is allocated once from the sizes of the
+        indexes and filled in a single pass, offsets included.
+
+        Parameters
+        ----------
+        index_list : List[Union[np.ndarray, List[np.ndarray]]]
+            (B) One index per entry, or one list of indexes per entry. The
+            index elements are relative to the start of each entry
+        offsets : Union[List[int], np.ndarray]
+            (B) Offsets between successive indexes in the batch
+        default : np.ndarray, optional
+            Default index, used to define the index type of an empty list
+
+        Returns
+        -------
+        IndexBatch
+            Batch of indexes
+        """
+        # Check whether each entry is a single index or a list of indexes
+        is_list = not (len(index_list) and
+                       isinstance(index_list[0], np.ndarray) and
+                       index_list[0].dtype != object)
+
+        # Count the index elements in each entry
+        if not is_list:
+            counts = [len(index) for index in index_list]
+            single_counts = None
+            num_values = sum(counts)
         else:
-            data = np.empty(len(data), dtype=object)
-            for i, d in enumerate(self.data):
-                data[i] = self._to_tensor(d, dtype, device)
+            counts = [len(indexes) for indexes in index_list]
+            single_counts = np.fromiter(
+                    (len(index) for indexes in index_list for index in indexes),
+                    dtype=np.int64, count=sum(counts))
+            num_values = int(np.sum(single_counts))
+
+        # Allocate the array of values once, fill it
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if default is None:
+            default = np.empty(0, dtype=np.int64)
+        values = np.empty(num_values, dtype=default.dtype)
+        start = 0
+        for b, indexes in enumerate(index_list):
+            for index in ([indexes] if not is_list else indexes):
+                end = start + len(index)
+                values[start:end] = index
+                values[start:end] += offsets[b]
+                start = end
+
+        return cls(values, offsets, counts, single_counts, flat=is_list)
+
+    def _split_list(self, values, edges):
+        """Breaks up a flat array of values into an array of index views.
 
-        offsets = self._to_tensor(self.offsets, dtype, device)
-        counts = self._to_tensor(self.counts, dtype, device)
+        Parameters
+        ----------
+        values : Union[np.ndarray, torch.Tensor]
+            (N) Concatenated index elements
+        edges : Union[np.ndarray, torch.Tensor]
+            (I+1) Edges separating the indexes in the array of values
 
-        single_counts = None
-        if self.is_list:
-            single_counts = self._to_tensor(self.single_counts, dtype, device)
+        Returns
+        -------
+        np.ndarray
+            (I) Object array of index views
+        """
+        index_list = np.empty(len(edges) - 1, dtype=object)
+        edges = edges.tolist()
+        for i in range(len(index_list)):
+            index_list[i] = values[edges[i]:edges[i + 1]]
 
-        return IndexBatch(data, offsets, counts, single_counts)
+        return index_list
@@ -247,3 +247,51 @@ class TensorBatch(BatchBase):
             return cls(np.concatenate(data_list, axis=0), counts)
         else:
             return cls(torch.cat(data_list, dim=0), counts)
+
+    @classmethod
+    def from_sparse_list(cls, voxels_list, features_list, dtype=None):
+        """Builds a batch of sparse tensors from a list of voxel coordinates
+        and features, one per entry in the batch.
+
+        The final tensor, of rows [batch_id, *coords, *features], is allocated
+        once from the sizes of the entries and filled in a single pass.
+
+        Parameters
+        ----------
+        voxels_list : List[np.ndarray]
+            (B) List of (N_b, D) voxel coordinates, one per entry
+        features_list : List[np.ndarray]
+            (B) List of (N_b, F) voxel features, one per entry
+        dtype : np.dtype, optional
+            Data type of the tensor. If not specified, use that of the features
+
+        Returns
+        -------
+        TensorBatch
+            (N, 1 + D + F) Batch of sparse tensors
+        """
+        # Check that we are not fed an empty list of tensors
+        assert len(voxels_list) and len(voxels_list) == len(features_list), (
+                "Must provide one set of voxels and features per entry.")
+
+        # Allocate the final tensor
+        counts = np.array([len(v) for v in voxels_list], dtype=np.int64)
+        num_coords = voxels_list[0].shape[1]
+        num_features = features_list[0].shape[1]
+        if dtype is None:
+            dtype = features_list[0].dtype
+
+        tensor = np.empty(
+                (np.sum(counts), 1 + num_coords + num_features), dtype=dtype)
+        tensor[:, BATCH_COL] = np.repeat(np.arange(len(counts)), counts)
+
+        # Fill it, one entry at a time
+        start = 0
+        for voxels, features in zip(voxels_list, features_list):
+            end = start + len(voxels)
+            tensor[start:end, 1:1 + num_coords] = voxels
+            tensor[start:end, 1 + num_coords:] = features
+            start = end
+
+        return cls(tensor, counts, has_batch_col=True,
+                   coord_cols=np.arange(1, 1 + num_coords))
@@ -1,6 +1,6 @@
 """Module with a class object which represent object lists."""
 
-__all__ = ['ObjectList']
+__all__ = ['ObjectList', 'ObjectColumns']
 
 
 class ObjectList(list):
@@ -27,3 +27,120 @@ class ObjectList(list):
 
         # Store the default object class
         self.default = default
+
+
+class ObjectColumns:
+    """Struct-of-arrays view of a list of stored objects.
+
+    Wraps the structured array in which a list of objects is stored. Each
+    attribute can be accessed as a column for the whole list at once (e.g.
+    `particles.pid`), without building any object. The objects themselves
+    are only built when they are accessed by index or iterated over, and
+    they are cached such that each is built at most once.
+
+    Attributes
+    ----------
+    array : np.ndarray
+        Structured array of stored object attributes, one row per object
+    obj_class : type
+        Data class of the stored objects
+    """
+
+    def __init__(self, array, obj_class):
+        """Initialize the view.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Structured array of stored object attributes, one row per object
+        obj_class : type
+            Data class of the stored objects
+        """
+        self.array = array
+        self.obj_class = obj_class
+        self._objects = [None]*len(array)
+
+    def __len__(self):
+        """Returns the number of objects in the list."""
+        return len(self.array)
+
+    def __getattr__(self, name):
+        """Returns one attribute of all the objects in the list.
+
+        Parameters
+        ----------
+        name : str
+            Name of the attribute
+
+        Returns
+        -------
+        np.ndarray
+            (N) Column of attribute values, one per object
+        """
+        array = self.__dict__.get('array')
+        if array is None or name not in array.dtype.names:
+            raise AttributeError(
+                    f"'{type(self).__name__}' object has no attribute "
+                    f"'{name}'")
+
+        return array[name]
+
+    def __getitem__(self, idx):
+        """Builds (if needed) and returns one or more objects of the list.
+
+        Parameters
+        ----------
+        idx : Union[int, slice]
+            Index or slice of objects to fetch
+
+        Returns
+        -------
+        Union[object, List[object]]
+            Object or list of objects
+        """
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        if self._objects[idx] is None:
+            row = self.array[idx]
+            self._objects[idx] = self.obj_class(
+                    **dict(zip(self.array.dtype.names, row)))
+
+        return self._objects[idx]
+
+    def __iter__(self):
+        """Iterates over the objects of the list, building them as needed."""
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def names(self):
+        """List of attribute names stored for each object.
+
+        Returns
+        -------
+        List[str]
+            List of attribute names
+        """
+        return list(self.array.dtype.names)
+
+    @property
+    def default(self):
+        """Default object used to type the list.
+
+        Returns
+        -------
+        object
+            Default object of the list class
+        """
+        return self.obj_class()
+
+    def to_list(self):
+        """Builds all the objects in the list.
+
+        Returns
+        -------
+        ObjectList
+            List of objects
+        """
+        return ObjectList(list(self), self.default)
@@ -1,5 +1,6 @@
 """Module with classes for all reconstructed and true objects."""
 
+from copy import copy
 from dataclasses import dataclass, field
 
 import numpy as np
@@ -9,10 +10,112 @@ from spine.utils.decorators import inherit_docstring
 from spine.data.base import PosDataBase
 
 
+class LazyAttr:
+    """Descriptor of a long-form attribute which can be gathered on access
+    from shared per-entry buffers.
+
+    If the attribute was set explicitly, the stored value is returned. If not
+    and shared buffers are attached to the object (see
+    :meth:`OutBase.attach_buffers`), the attribute is gathered from the
+    buffers using the object index the first time it is accessed. The
+    gathered value is cached until the buffer or the index is replaced.
+    """
+
+    def __init__(self, name):
+        """Stores the name of the attribute.
+
+        Parameters
+        ----------
+        name : str
+            Name of the attribute
+        """
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        """Fetches the attribute value.
+
+        Parameters
+        ----------
+        obj : OutBase
+            Object the attribute belongs to
+        objtype : type, optional
+            Type of the object
+
+        Returns
+        -------
+        object
+            Attribute value
+        """
+        if obj is None:
+            return self
+
+        # If the value was set explicitly or cannot be gathered, return it
+        value = obj.__dict__.get(self.name, None)
+        if value is not None or not obj.is_lazy(self.name):
+            return value
+
+        # If the value was already gathered from the same arrays, return it
+        buffer_key, index_attr = obj._lazy_attrs[self.name]
+        source = (obj._buffers[buffer_key], getattr(obj, index_attr))
+        if obj._lazy_values is None:
+            obj._lazy_values = {}
+        if self.name in obj._lazy_values:
+            cached_source, value = obj._lazy_values[self.name]
+            if all(c is s for c, s in zip(cached_source, source)):
+                return value
+
+        # Gather the value, cache it
+        value = source[0][source[1]]
+        obj._lazy_values[self.name] = (source, value)
+
+        return value
+
+    def __set__(self, obj, value):
+        """Sets the attribute value explicitly.
+
+        Parameters
+        ----------
+        obj : OutBase
+            Object the attribute belongs to
+        value : object
+            Attribute value
+        """
+        obj.__dict__[self.name] = value
+
+
+def lazy_attrs(cls):
+    """Class decorator which installs a :class:`LazyAttr` descriptor for
+    each of the attributes listed in the `_lazy_attrs` of a class.
+
+    It must be applied to the class built by the `dataclass` decorator, such
+    that the fields keep their own default values.
+
+    Parameters
+    ----------
+    cls : type
+        Data class
+
+    Returns
+    -------
+    type
+        Data class with the lazy attribute descriptors
+    """
+    for name in cls._lazy_attrs:
+        setattr(cls, name, LazyAttr(name))
+
+    return cls
+
+
+@lazy_attrs
 @dataclass(eq=False)
 class OutBase(PosDataBase):
     """Base data structure shared among all output classes.
 
+    The long-form attributes (`points`, `depositions`, `sources`, etc.) can
+    either be stored in each object or, to avoid duplicating every voxel in
+    each object which contains it, be gathered on access from per-entry
+    buffers shared by all the objects (see :meth:`attach_buffers`).
+
     Attributes
     ----------
     id : int
@@ -87,6 +190,122 @@ class OutBase(PosDataBase):
     # Attributes that should not be stored
     _skip_attrs = ['points', 'depositions', 'sources']
 
+    # Long-form attributes which can be gathered from shared buffers, as
+    # (attribute, (buffer key, index attribute)) pairs
+    _lazy_attrs = {
+            'points': ('points', 'index'),
+            'depositions': ('depositions', 'index'),
+            'sources': ('sources', 'index')
+    }
+
+    # Shared per-entry buffers the long-form attributes are gathered from
+    _buffers = None
+
+    # Cached long-form attributes gathered from the shared buffers, as
+    # (attribute, (source arrays, value)) pairs
+    _lazy_values = None
+
+    # Cached bounding boxes of the point attributes, as
+    # (attribute, (source arrays, box)) pairs
+    _bounding_boxes = None
+
+    def attach_buffers(self, buffers):
+        """Attaches shared per-entry buffers to the object.
+
+        The long-form attributes which can be gathered from the buffers are no
+        longer stored in the object, they are gathered from the buffers using
+        the object index when they are accessed.
+
+        Parameters
+        ----------
+        buffers : Dict[str, np.ndarray]
+            Dictionary of per-entry buffers (e.g. `points`, `depositions`)
+        """
+        self._buffers = buffers
+        self._lazy_values = None
+        if buffers is not None:
+            for attr in self._lazy_attrs:
+                if self.is_lazy(attr):
+                    self.__dict__[attr] = None
+
+    def as_dict(self):
+        """Returns the data class as dictionary of (key, value) pairs.
+
+        The conversion is done on a shallow copy of the object, such that the
+        long-form attributes it gathers from the shared buffers (e.g. to
+        derive the `module_ids`) are not cached in the object itself.
+
+        Returns
+        -------
+        dict
+            Dictionary of attribute names and their values
+        """
+        obj = copy(self)
+        obj._lazy_values = None
+
+        return super(OutBase, obj).as_dict()
+
+    def is_lazy(self, attr):
+        """Checks whether an attribute is gathered from the shared buffers.
+
+        Parameters
+        ----------
+        attr : str
+            Name of the attribute
+
+        Returns
+        -------
+        bool
+            `True` if the attribute is gathered from the shared buffers
+        """
+        return (self._buffers is not None and attr in self._lazy_attrs and
+                self._lazy_attrs[attr][0] in self._buffers)
+
+    def get_bounding_box(self, attr='points'):
+        """Axis-aligned bounding box of a point attribute of the object.
+
+        The box is computed once and cached. It is recomputed if the point
+        attribute is replaced (or, if it is gathered from shared buffers, if
+        the buffer or the index is replaced), but not if the coordinates are
+        modified in place.
+
+        Parameters
+        ----------
+        attr : str, default 'points'
+            Name of the point attribute
+
+        Returns
+        -------
+        np.ndarray
+            (2, 3) Lower and upper bounds of the points along each axis. If
+            there are no points, the lower (upper) bounds are `inf` (`-inf`)
+        """
+        # Identify the arrays the point coordinates are obtained from
+        source = (self.__dict__.get(attr),)
+        if source[0] is None and self.is_lazy(attr):
+            buffer_key, index_attr = self._lazy_attrs[attr]
+            source = (self._buffers[buffer_key], getattr(self, index_attr))
+
+        # If the cached box was computed from the same arrays, return it
+        if self._bounding_boxes is None:
+            self._bounding_boxes = {}
+        if attr in self._bounding_boxes:
+            cached_source, box = self._bounding_boxes[attr]
+            if (len(cached_source) == len(source) and
+                all(c is s for c, s in zip(cached_source, source))):
+                return box
+
+        # Compute the bounding box, cache it
+        points = getattr(self, attr)
+        if points is not None and len(points):
+            box = np.vstack((points.min(axis=0), points.max(axis=0)))
+        else:
+            box = np.array([[np.inf]*3, [-np.inf]*3])
+
+        self._bounding_boxes[attr] = (source, box)
+
+        return box
+
     @property
     def size(self):
         """Total number of voxels that make up the object.
@@ -140,6 +359,7 @@ class RecoBase(OutBase):
     is_truth: bool = False
 
 
+@lazy_attrs
 @dataclass(eq=False)
 @inherit_docstring(OutBase)
 class TruthBase(OutBase):
@@ -224,6 +444,19 @@ class TruthBase(OutBase):
                    'depositions_adapt_q', 'sources_adapt', 'depositions_g4',
                    'points_g4', 'depositions_g4', *OutBase._skip_attrs]
 
+    # Long-form attributes which can be gathered from shared buffers
+    _lazy_attrs = {
+            'points': ('points_label', 'index'),
+            'depositions': ('depositions_label', 'index'),
+            'depositions_q': ('depositions_q_label', 'index'),
+            'sources': ('sources_label', 'index'),
+            'points_adapt': ('points', 'index_adapt'),
+            'depositions_adapt': ('depositions', 'index_adapt'),
+            'sources_adapt': ('sources', 'index_adapt'),
+            'points_g4': ('points_g4', 'index_g4'),
+            'depositions_g4': ('depositions_g4', 'index_g4')
+    }
+
     @property
     def size_adapt(self):
         """Total number of voxels that make up the object in the adapted tensor.
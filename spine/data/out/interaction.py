@@ -204,10 +204,13 @@ class InteractionBase:
         interaction.particles = particles
         interaction.particle_ids = np.array([p.id for p in particles])
 
-        # Build long-form attributes
+        # Build long-form attributes, unless they are gathered from the
+        # buffers shared with the particles
+        interaction.attach_buffers(particles[0]._buffers)
         for attr in cls._cat_attrs:
-            val_list = [getattr(p, attr) for p in particles]
-            setattr(interaction, attr, np.concatenate(val_list))
+            if not interaction.is_lazy(attr):
+                val_list = [getattr(p, attr) for p in particles]
+                setattr(interaction, attr, np.concatenate(val_list))
 
         return interaction
 
@@ -12,6 +12,8 @@ Takes care of everything in one centralized place:
 
 import os
 import time
+from queue import Queue, Full, Empty
+from threading import Thread, Event
 from datetime import datetime
 import subprocess as sc
 
@@ -25,8 +27,11 @@ from .io.write import CSVWriter
 
 from .utils.logger import logger
 from .utils.numba_local import seed as numba_seed
+from .utils.jit import (
+        load_signatures, compile_kernels, format_report, launch_threads,
+        run_serially)
 from .utils.unwrap import Unwrapper
-from .utils.stopwatch import StopwatchManager
+from .utils.stopwatch import StopwatchManager, Time
 
 from .version import __version__
 from .logo import ascii_logo
@@ -51,6 +56,12 @@ class Driver:
       6. Run analysis scripts
       7. Write to file
 
+    By default, these steps are executed in sequence for each iteration. If
+    `pipeline` is set in the `base` block, the driver instead runs loading,
+    model forward (including unwrapping and building), post-processing
+    (including analysis) and writing as concurrent stages connected by
+    bounded queues. Iterations still come out of the pipeline in order.
+
     It takes a configuration dictionary of the form:
 
     .. code-block:: yaml
@@ -123,7 +134,9 @@ class Driver:
             assert self.model is None or self.unwrap, (
                     "Must unwrap the model output to run post-processors.")
             self.watch.initialize('post')
-            self.post = PostManager(post, parent_path=self.parent_path)
+            self.post = PostManager(
+                    post, parent_path=self.parent_path,
+                    num_workers=self.post_num_workers)
 
         # Initialize the analysis scripts
         self.ana = None
@@ -232,7 +245,9 @@ class Driver:
                         log_dir='logs', prefix_log=False, overwrite_log=False,
                         parent_path=None, iterations=None, epochs=None,
                         unwrap=False, rank=None, log_step=1, distributed=False,
-                        split_output=False, train=None, verbosity='info'):
+                        split_output=False, train=None, verbosity='info',
+                        pipeline=False, pipeline_depth=2, post_num_workers=0,
+                        log_buffer_size=None, jit_signatures=None):
         """Initialize the base driver parameters.
 
         Parameters
@@ -270,6 +285,22 @@ class Driver:
         verbosity : int, default 'info'
             Verbosity level to pass to the `logging` module. Pick one of
             'debug', 'info', 'warning', 'error', 'critical'.
+        pipeline : bool, default False
+            If `True`, run the load, model, post-processing and writing
+            steps as concurrent stages. The parallel numba kernels then run
+            on one thread in each stage
+        pipeline_depth : int, default 2
+            Maximum number of iterations waiting between two pipeline stages
+        post_num_workers : int, default 0
+            Number of worker processes used to run the post-processors on the
+            entries of a batch in parallel (0 means no parallelism)
+        log_buffer_size : int, optional
+            If specified, number of log rows accumulated before they are
+            written to the log file in one block
+        jit_signatures : str, optional
+            Path to a file of numba kernel signatures (as produced by
+            `bin/warm_numba_cache.py`) to compile, or load from the cache,
+            before anything else runs. A report of the cache hits is logged
 
         Returns
         -------
@@ -283,6 +314,11 @@ class Driver:
         numba_seed(seed)
         torch.manual_seed(seed)
 
+        # Compile the numba kernels (or load them from the cache), if requested
+        if jit_signatures is not None:
+            report = compile_kernels(load_signatures(jit_signatures))
+            logger.info("Numba kernel report:\n%s\n", format_report(report))
+
         # Set up the device the model will run on
         if rank is None and world_size > 0:
             assert world_size < 2, (
@@ -314,6 +350,13 @@ class Driver:
         self.seed = seed
         self.log_step = log_step
         self.split_output = split_output
+        self.log_buffer_size = log_buffer_size
+
+        assert pipeline_depth > 0, (
+                "The `pipeline_depth` must be a positive integer.")
+        self.pipeline = pipeline
+        self.pipeline_depth = pipeline_depth
+        self.post_num_workers = post_num_workers
 
         return train
 
@@ -347,6 +390,12 @@ class Driver:
             self.iter_per_epoch = len(self.loader)
             self.reader = self.loader.dataset.reader
 
+            # Samplers which draw batches of variable size produce a
+            # different number of batches in each epoch
+            self.variable_epochs = getattr(
+                    self.loader.batch_sampler, 'batched', False)
+            self.epoch_cnt, self.epoch_start = 0, 0
+
             # If requested, initialize the unwrapper
             if self.unwrap:
                 geo = None
@@ -455,7 +504,9 @@ class Driver:
 
         # Initialize the log
         log_path = os.path.join(self.log_dir, log_name)
-        self.logger = CSVWriter(log_path, overwrite=self.overwrite_log)
+        self.logger = CSVWriter(
+                log_path, overwrite=self.overwrite_log,
+                buffer_size=self.log_buffer_size)
 
     def run(self):
         """Loop over the requested number of iterations, process them."""
@@ -472,29 +523,91 @@ class Driver:
             start_iteration = self.model.start_iteration
 
         # Loop and process each iteration
-        for iteration in range(start_iteration, self.iterations):
-            # When switching to a new epoch, reset the loader iterator
-            if (self.loader is not None and
-                (self.loader_iter is None or
-                 iteration%self.iter_per_epoch == 0)):
+        if not self.pipeline:
+            for iteration in range(start_iteration, self.iterations):
+                # Prepare the iteration
+                entry, epoch, tstamp = self.prepare_iteration(iteration)
+
+                # Process one batch/entry of data
+                data = self.process(entry=entry, iteration=iteration)
+
+                # Log the output
+                self.log(data, tstamp, iteration, epoch)
+
+                # Release the memory for the next iteration
+                data = None
+
+        else:
+            # Run the concurrent stages, log their output in order
+            self.run_pipeline(start_iteration)
+
+        # Flush whatever the writers may still be holding in memory
+        if self.writer is not None and hasattr(self.writer, 'close'):
+            self.writer.close()
+        if self.post is not None:
+            self.post.close()
+        if self.ana is not None:
+            self.ana.close()
+        self.logger.close()
+
+    def prepare_iteration(self, iteration):
+        """Prepares the loader for an iteration, records its metadata.
+
+        Parameters
+        ----------
+        iteration : int
+            Iteration number
+
+        Returns
+        -------
+        entry : int
+            Entry to read (`None` if the data comes from the loader)
+        epoch : float
+            Progress in the process in number of epochs
+        tstamp : str
+            Time when this iteration was started
+        """
+        # When switching to a new epoch, reset the loader iterator. If the
+        # number of batches varies from one epoch to the next, the epoch
+        # boundaries are set by the length of the epoch which just started
+        if self.loader is not None:
+            if not self.variable_epochs:
+                new_epoch = (self.loader_iter is None or
+                             iteration%self.iter_per_epoch == 0)
+                if new_epoch:
+                    self.epoch_cnt = iteration//self.iter_per_epoch
+            else:
+                new_epoch = (self.loader_iter is None or
+                             iteration - self.epoch_start == self.iter_per_epoch)
+                if new_epoch:
+                    if self.loader_iter is None:
+                        self.epoch_cnt = iteration//self.iter_per_epoch
+                    else:
+                        self.epoch_cnt += 1
+                    self.epoch_start = iteration
+
+            if new_epoch:
                 if self.distributed:
-                    epoch_cnt = iteration//self.iter_per_epoch
-                    self.loader.sampler.set_epoch(epoch_cnt)
+                    sampler = self.loader.sampler
+                    if not hasattr(sampler, 'set_epoch'):
+                        sampler = self.loader.batch_sampler
+                    sampler.set_epoch(self.epoch_cnt)
+                if self.variable_epochs:
+                    self.iter_per_epoch = len(self.loader)
                 self.loader_iter = iter(self.loader)
 
-            # Update the epoch counter, record the execution date/time
+        # Update the epoch counter, record the execution date/time
+        if self.loader is not None and self.variable_epochs:
+            epoch = (self.epoch_cnt +
+                     (iteration - self.epoch_start + 1)/self.iter_per_epoch)
+        else:
             epoch = (iteration + 1)/self.iter_per_epoch
-            tstamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        tstamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            # Process one batch/entry of data
-            entry = iteration if self.loader is None else None
-            data = self.process(entry=entry, iteration=iteration)
+        # Fetch the entry to read, if relevant
+        entry = iteration if self.loader is None else None
 
-            # Log the output
-            self.log(data, tstamp, iteration, epoch)
-
-            # Release the memory for the next iteration
-            data = None
+        return entry, epoch, tstamp
 
     def process(self, entry=None, run=None, event=None, iteration=None):
         """Process one entry or a batch of entries.
@@ -526,7 +639,39 @@ class Driver:
         # 1. Load data
         data = self.load(entry, run, event)
 
-        # 2. Pass data through the model
+        # 2-4. Pass data through the model, unwrap and build representations
+        data = self.forward(data, iteration)
+
+        # 5-6. Run post-processing and analysis scripts, if requested
+        self.post_process(data)
+
+        # 7. Write output to file, if requested
+        self.write(data)
+
+        # Stop the iteration timer
+        self.watch.stop('iteration')
+
+        # Return
+        return data
+
+    def forward(self, data, iteration=None):
+        """Passes data through the model, unwraps it and builds
+        representations, when requested.
+
+        Parameters
+        ----------
+        data : dict
+            Data dictionary containing the input
+        iteration : int, optional
+            Iteration number. Only needed to train models and/or to apply
+            time-dependant model losses, no-op otherwise
+
+        Returns
+        -------
+        Union[dict, List[dict]]
+            Either one combined data dictionary, or one per entry in the batch
+        """
+        # Pass data through the model
         if self.model is not None:
             self.watch.start('model')
             result = self.model(data, iteration=iteration)
@@ -534,43 +679,317 @@ class Driver:
             self.watch.stop('model')
             self.watch.update(self.model.watch, 'model')
 
-        # 3. Unwrap
+        # Unwrap
         if self.unwrapper is not None:
             self.watch.start('unwrap')
             data = self.unwrapper(data)
             self.watch.stop('unwrap')
 
-        # 4. Build representations
+        # Build representations
         if self.builder is not None:
             self.watch.start('build')
             self.builder(data)
             self.watch.stop('build')
 
-        # 5. Run post-processing, if requested
+        return data
+
+    def post_process(self, data):
+        """Runs post-processors and analysis scripts, when requested.
+
+        Parameters
+        ----------
+        data : Union[dict, List[dict]]
+            Either one combined data dictionary, or one per entry in the batch
+        """
+        # Run post-processing, if requested
         if self.post is not None:
             self.watch.start('post')
             self.post(data)
             self.watch.stop('post')
             self.watch.update(self.post.watch, 'post')
 
-        # 6. Run scripts, if requested
+        # Run scripts, if requested
         if self.ana is not None:
             self.watch.start('ana')
             self.ana(data)
             self.watch.stop('ana')
             self.watch.update(self.ana.watch, 'ana')
 
-        # 7. Write output to file, if requested
+    def write(self, data):
+        """Writes output to file, when requested.
+
+        Parameters
+        ----------
+        data : Union[dict, List[dict]]
+            Either one combined data dictionary, or one per entry in the batch
+        """
         if self.writer is not None:
             self.watch.start('write')
             self.writer(data, self.cfg)
             self.watch.stop('write')
 
-        # Stop the iteration timer
-        self.watch.stop('iteration')
+    def run_pipeline(self, start_iteration=0):
+        """Runs the requested iterations as a pipeline of concurrent stages.
 
-        # Return
-        return data
+        Each stage runs in its own thread and processes the iterations in
+        order. Two consecutive stages are connected by a bounded queue of
+        size `pipeline_depth`. The main thread logs the output of the last
+        stage, such that the logs are produced in order.
+
+        The time spent by each stage on an iteration is recorded under the
+        `<stage>_stage` stopwatch (with the CPU time of the stage thread only),
+        while the `iteration` stopwatch measures the time elapsed between two
+        consecutive iterations coming out of the pipeline (inverse throughput).
+
+        If a stage fails, all the stages are stopped and the error is raised
+        again in the calling thread.
+
+        Parameters
+        ----------
+        start_iteration : int, default 0
+            First iteration to process
+        """
+        # Define the list of stages and the stopwatches they own
+        stages = [('load', self.load_stage, ('load', 'read'))]
+        if (self.model is not None or self.unwrapper is not None or
+            self.builder is not None):
+            stages.append(('model', self.forward_stage,
+                           ('model', 'unwrap', 'build')))
+        if self.post is not None or self.ana is not None:
+            stages.append(('post', self.post_stage, ('post', 'ana')))
+        if self.writer is not None:
+            stages.append(('write', self.write_stage, ('write',)))
+
+        # Initialize one stopwatch per stage
+        for name, _, _ in stages:
+            self.watch.initialize(f'{name}_stage')
+
+        # Start the numba thread pool here, before the stages may launch
+        # parallel kernels concurrently
+        launch_threads()
+
+        # Initialize the queues, feed the iterations to the first one. If a
+        # stage fails, it records its error and sets the stop event
+        stop, errors = Event(), []
+        queues = [Queue(maxsize=self.pipeline_depth) for _ in stages]
+        queues.append(Queue(maxsize=self.pipeline_depth))
+        iterations = range(start_iteration, self.iterations)
+        feeder = Thread(target=self.feed_pipeline,
+                        args=(iterations, queues[0], stop), daemon=True)
+        feeder.start()
+
+        # Start the stage threads
+        threads = [feeder]
+        for i, (name, func, watch_keys) in enumerate(stages):
+            threads.append(Thread(
+                target=self.run_stage, daemon=True,
+                args=(name, func, watch_keys, queues[i], queues[i + 1],
+                      stop, errors)))
+            threads[-1].start()
+
+        # Log the output of the pipeline as it comes out
+        try:
+            self.watch.start('iteration')
+            while True:
+                item = self.get_item(queues[-1], stop)
+                if item is None:
+                    break
+
+                # Record the time between iterations
+                self.watch.stop('iteration')
+                item['times']['iteration'] = (
+                        self.watch.time('iteration'),
+                        self.watch.time_sum('iteration'))
+                self.watch.start('iteration')
+
+                # Log the output
+                self.log(item['data'], item['tstamp'], item['iteration'],
+                         item['epoch'], item['times'])
+                item = None
+
+            self.watch.stop('iteration')
+
+        finally:
+            # Stop the stages, release whatever is left in the queues
+            stop.set()
+            for thread in threads:
+                thread.join()
+            for queue in queues:
+                while not queue.empty():
+                    queue.get_nowait()
+
+        # If a stage failed, raise its error
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def get_item(queue, stop):
+        """Fetches the next item from a pipeline queue, unless the pipeline
+        is stopped.
+
+        Parameters
+        ----------
+        queue : queue.Queue
+            Queue to fetch the item from
+        stop : threading.Event
+            Event set when the pipeline must stop
+
+        Returns
+        -------
+        dict
+            Pipeline item, `None` if there is nothing left to process
+        """
+        while not stop.is_set():
+            try:
+                return queue.get(timeout=0.1)
+            except Empty:
+                pass
+
+        return None
+
+    @staticmethod
+    def put_item(queue, item, stop):
+        """Puts an item in a pipeline queue, unless the pipeline is stopped.
+
+        Parameters
+        ----------
+        queue : queue.Queue
+            Queue to put the item in
+        item : dict
+            Pipeline item
+        stop : threading.Event
+            Event set when the pipeline must stop
+
+        Returns
+        -------
+        bool
+            `True` if the item was put in the queue
+        """
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+
+        return False
+
+    def feed_pipeline(self, iterations, queue, stop):
+        """Feeds the first stage of the pipeline with iterations to process.
+
+        Parameters
+        ----------
+        iterations : range
+            Iterations to process
+        queue : queue.Queue
+            Input queue of the first pipeline stage
+        stop : threading.Event
+            Event set when the pipeline must stop
+        """
+        for iteration in iterations:
+            if not self.put_item(
+                    queue, {'iteration': iteration, 'times': {}}, stop):
+                return
+        self.put_item(queue, None, stop)
+
+    def run_stage(self, name, func, watch_keys, in_queue, out_queue, stop,
+                  errors):
+        """Runs one pipeline stage until it receives the end signal (`None`).
+
+        If the stage fails, its error is recorded and the pipeline is stopped.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage
+        func : callable
+            Function which processes one pipeline item in place
+        watch_keys : List[str]
+            Names of the stopwatches owned by this stage
+        in_queue : queue.Queue
+            Queue to receive iterations from
+        out_queue : queue.Queue
+            Queue to send processed iterations to
+        stop : threading.Event
+            Event set when the pipeline must stop
+        errors : list
+            List of errors raised by the stages
+        """
+        # The stages run concurrently, do not let each of them use every core
+        run_serially()
+
+        watch_keys = (*watch_keys, f'{name}_stage')
+        while True:
+            # Fetch the next item, stop if there is nothing left to process
+            item = self.get_item(in_queue, stop)
+            if item is None:
+                self.put_item(out_queue, None, stop)
+                break
+
+            # Process the item, only count the CPU time of this thread
+            try:
+                start = Time(time.time(), time.thread_time())
+                func(item)
+                self.watch.record(
+                        f'{name}_stage',
+                        Time(time.time(), time.thread_time()) - start)
+
+            except Exception as err: # pylint: disable=W0718
+                errors.append(err)
+                stop.set()
+                break
+
+            # Snapshot the times recorded by this stage, pass the item on
+            for key, watch in list(self.watch.items()):
+                if np.any([key == k or key.startswith(f'{k}_')
+                           for k in watch_keys]):
+                    item['times'][key] = (
+                            watch.time.copy(), watch.time_sum.copy())
+
+            if not self.put_item(out_queue, item, stop):
+                break
+
+    def load_stage(self, item):
+        """Loads the data of one iteration in the pipeline.
+
+        Parameters
+        ----------
+        item : dict
+            Pipeline item to fill
+        """
+        entry, item['epoch'], item['tstamp'] = (
+                self.prepare_iteration(item['iteration']))
+        item['data'] = self.load(entry)
+
+    def forward_stage(self, item):
+        """Runs the model, unwrapping and building step of the pipeline.
+
+        Parameters
+        ----------
+        item : dict
+            Pipeline item to process
+        """
+        item['data'] = self.forward(item['data'], item['iteration'])
+
+    def post_stage(self, item):
+        """Runs the post-processing and analysis step of the pipeline.
+
+        Parameters
+        ----------
+        item : dict
+            Pipeline item to process
+        """
+        self.post_process(item['data'])
+
+    def write_stage(self, item):
+        """Runs the writing step of the pipeline.
+
+        Parameters
+        ----------
+        item : dict
+            Pipeline item to process
+        """
+        self.write(item['data'])
 
     def load(self, entry=None, run=None, event=None):
         """Loads one batch/entry to process.
@@ -653,7 +1072,7 @@ class Driver:
         # Reset the iterator
         self.loader_iter = None
 
-    def log(self, data, tstamp, iteration, epoch=None):
+    def log(self, data, tstamp, iteration, epoch=None, times=None):
         """Log relevant information to CSV files and stdout.
 
         Parameters
@@ -666,6 +1085,9 @@ class Driver:
             Iteration counter
         epoch : float
             Progress in the training process in number of epochs
+        times : Dict[str, Tuple[Time, Time]], optional
+            (time, time_sum) pair of each stopwatch. If not specified, they
+            are fetched from the driver stopwatch manager
         """
         # Fetch the first entry in the batch
         first_entry = data['index']
@@ -689,9 +1111,12 @@ class Driver:
             log_dict['gpu_mem_perc'] = 100 * log_dict['gpu_mem'] / gpu_total
 
         # Fetch the times
+        if times is None:
+            times = {key: (watch.time, watch.time_sum)
+                     for key, watch in self.watch.items()}
+
         suff = '_time'
-        for key, watch in self.watch.items():
-            time, time_sum = watch.time, watch.time_sum
+        for key, (time, time_sum) in times.items():
             log_dict[f'{key}{suff}'] = time.wall
             log_dict[f'{key}{suff}_cpu'] = time.cpu
             log_dict[f'{key}{suff}_sum'] = time_sum.wall
@@ -730,10 +1155,10 @@ class Driver:
                 torch.distributed.barrier()
 
             # Dump information pertaining to a specific process
-            t_iter = self.watch.time('iteration').wall
+            t_iter = times['iteration'][0].wall
             t_net  = 0.
             if self.model is not None:
-                t_net  = self.watch.time('model').wall
+                t_net  = times['model'][0].wall
 
             if self.rank is not None:
                 mem, mem_perc = log_dict['gpu_mem'], log_dict['gpu_mem_perc']
@@ -0,0 +1,297 @@
+"""Contains a two-tier cache of the parser outputs of a dataset.
+
+Parsing an entry requires reading it from disk and running every parser of
+the schema on it. When the same entries are loaded at every epoch (or in
+every trial of a hyperparameter sweep), the output of the parsers does not
+change. The :class:`ParserCache` class stores it:
+- in memory, in a least-recently-used (LRU) cache of bounded size;
+- on disk, in a spill directory shared by all processes, such that the
+  entries parsed by one loader worker (or one job) can be reused by others.
+
+Each entry is identified by the parsing configuration (schema and data
+type), the identity of the file it comes from (absolute path, size and
+modification time) and its index in the file. A file which has been
+modified, or a change in the parsing configuration, invalidates the cache.
+"""
+
+import os
+import pickle
+import hashlib
+from collections import OrderedDict
+
+import yaml
+import numpy as np
+
+from spine.version import __version__
+
+__all__ = ['ParserCache']
+
+
+class ParserCache:
+    """Two-tier (memory and disk) cache of the parser outputs of each entry.
+
+    The memory tier is local to each process. It is most useful when the
+    entries are loaded in the main process or by persistent loader workers.
+    The disk tier is written to as soon as an entry is parsed, such that it
+    can be shared between loader workers and across epochs.
+
+    Attributes
+    ----------
+    hits : int
+        Number of entries fetched from the memory tier
+    disk_hits : int
+        Number of entries fetched from the disk tier
+    misses : int
+        Number of entries which had to be parsed
+    """
+
+    def __init__(self, schema, dtype, memory_size=1024., disk_dir=None,
+                 disk_size=None):
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        schema : dict
+            Dictionary of (string, dictionary) parser configuration pairs
+        dtype : str
+            Data type the parsed data is cast to
+        memory_size : float, default 1024.
+            Maximum size of the memory tier, in MB (0 to disable it)
+        disk_dir : str, optional
+            Path to the directory in which to store the disk tier. If not
+            specified, only the memory tier is used
+        disk_size : float, optional
+            Maximum size of the disk tier, in GB. Once it is reached, no new
+            entries are written to disk
+        """
+        # Build the hash of the parsing configuration
+        cfg = yaml.dump({'schema': schema, 'dtype': str(dtype),
+                         'version': __version__}, sort_keys=True)
+        self.cfg_hash = hashlib.sha1(cfg.encode('utf-8')).hexdigest()
+
+        # Initialize the memory tier
+        assert memory_size >= 0., "The `memory_size` must be positive."
+        self.memory_size = int(memory_size*1024**2)
+        self.memory_usage = 0
+        self._memory = OrderedDict()
+
+        # Initialize the disk tier
+        self.disk_dir = disk_dir
+        self.disk_size = None
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+            if disk_size is not None:
+                self.disk_size = int(disk_size*1024**3)
+        self._disk_usage = None
+
+        # Initialize the file identity hashes and the counters
+        self._file_hashes = {}
+        self.hits, self.disk_hits, self.misses = 0, 0, 0
+
+    def __getstate__(self):
+        """Drops the memory tier before the cache gets pickled (e.g. when
+        sent to a DataLoader worker).
+
+        Returns
+        -------
+        dict
+            Picklable state of the cache
+        """
+        state = self.__dict__.copy()
+        state['_memory'] = OrderedDict()
+        state['memory_usage'] = 0
+
+        return state
+
+    def get_key(self, file_path, entry):
+        """Builds the cache key of one entry.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file the entry lives in
+        entry : int
+            Index of the entry within the file
+
+        Returns
+        -------
+        str
+            Cache key
+        """
+        if file_path not in self._file_hashes:
+            path = os.path.abspath(file_path)
+            stat = os.stat(path)
+            identity = f'{self.cfg_hash}:{path}:{stat.st_size}:{stat.st_mtime_ns}'
+            self._file_hashes[file_path] = hashlib.sha1(
+                    identity.encode('utf-8')).hexdigest()[:16]
+
+        return f'{self._file_hashes[file_path]}_{entry}'
+
+    def get_path(self, key):
+        """Returns the path to the disk tier file of an entry.
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+
+        Returns
+        -------
+        str
+            Path to the file
+        """
+        prefix, entry = key.split('_')
+
+        return os.path.join(self.disk_dir, prefix, f'{entry}.pkl')
+
+    @property
+    def disk_usage(self):
+        """Size of the disk tier, in bytes.
+
+        It is measured once per process and then updated as entries are
+        written by this process.
+
+        Returns
+        -------
+        int
+            Size of the disk tier
+        """
+        if self._disk_usage is None:
+            self._disk_usage = 0
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    self._disk_usage += os.path.getsize(
+                            os.path.join(root, name))
+
+        return self._disk_usage
+
+    def get(self, file_path, entry):
+        """Fetches the parser outputs of one entry, if they are cached.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file the entry lives in
+        entry : int
+            Index of the entry within the file
+
+        Returns
+        -------
+        dict
+            Dictionary of data product names and their parsed data. If the
+            entry is not cached, returns `None`
+        """
+        # Check the memory tier first
+        key = self.get_key(file_path, entry)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key][0]
+
+        # Check the disk tier
+        if self.disk_dir is not None:
+            path = self.get_path(key)
+            if os.path.isfile(path):
+                try:
+                    with open(path, 'rb') as in_file:
+                        value = pickle.load(in_file)
+                except (EOFError, pickle.UnpicklingError):
+                    # Incomplete file, parse the entry again
+                    self.misses += 1
+                    return None
+
+                self.disk_hits += 1
+                self.store_memory(key, value)
+                return value
+
+        self.misses += 1
+
+        return None
+
+    def put(self, file_path, entry, value):
+        """Stores the parser outputs of one entry.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file the entry lives in
+        entry : int
+            Index of the entry within the file
+        value : dict
+            Dictionary of data product names and their parsed data
+        """
+        # Store in memory
+        key = self.get_key(file_path, entry)
+        self.store_memory(key, value)
+
+        # Store on disk, if there is room left
+        if self.disk_dir is not None:
+            path = self.get_path(key)
+            if os.path.isfile(path):
+                return
+
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if (self.disk_size is not None and
+                self.disk_usage + len(data) > self.disk_size):
+                return
+
+            # Write atomically, such that concurrent readers never see a
+            # partially written file
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as out_file:
+                out_file.write(data)
+            os.replace(tmp_path, path)
+            self._disk_usage = self.disk_usage + len(data)
+
+    def store_memory(self, key, value):
+        """Stores an entry in the memory tier, evicts the least recently used
+        entries until it fits.
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+        value : dict
+            Dictionary of data product names and their parsed data
+        """
+        # If the entry is too large for the memory tier, skip
+        size = self.get_size(value)
+        if size > self.memory_size:
+            return
+
+        # Evict entries until there is room left
+        while self.memory_usage + size > self.memory_size:
+            _, (_, old_size) = self._memory.popitem(last=False)
+            self.memory_usage -= old_size
+
+        self._memory[key] = (value, size)
+        self.memory_usage += size
+
+    @staticmethod
+    def get_size(value):
+        """Estimates the memory footprint of a parsed value.
+
+        Only the arrays are accounted for, any other object is counted as a
+        fixed overhead.
+
+        Parameters
+        ----------
+        value : object
+            Parsed value
+
+        Returns
+        -------
+        int
+            Approximate size of the value, in bytes
+        """
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            return value.nbytes
+
+        if isinstance(value, dict):
+            value = list(value.values())
+
+        if isinstance(value, (tuple, list, np.ndarray)):
+            return 64 + sum(ParserCache.get_size(v) for v in value)
+
+        return 64
@@ -99,6 +99,7 @@ class CollateAll:
         """
         # Loop over the data keys, merge all events in a batch
         batch_size = len(batch)
+        module_cache = [[] for _ in range(batch_size)]
         data = {}
         for key in batch[0].keys():
             # Fetch the reference object
@@ -115,69 +116,26 @@ class CollateAll:
                 # Case where a coordinates tensor and a feature tensor
                 # are provided, along with the metadata information
                 if not self.split:
-                    # If not split, simply stack everything
-                    voxels    = np.vstack([sample[key][0] for sample in batch])
-                    features  = np.vstack([sample[key][1] for sample in batch])
-                    counts    = [len(sample[key][0]) for sample in batch]
-                    batch_ids = np.repeat(
-                            np.arange(batch_size, dtype=voxels.dtype), counts)
+                    # If not split, fill the batch tensor entry by entry
+                    data[key] = TensorBatch.from_sparse_list(
+                            [sample[key][0] for sample in batch],
+                            [sample[key][1] for sample in batch])
 
                 else:
                     # If split, must shift the voxel coordinates and create
                     # one batch ID per [batch, volume] pair
-                    voxels_v, features_v, batch_ids_v = [], [], []
-                    counts = np.empty(
-                            batch_size*self.geo.num_modules, dtype=np.int64)
-                    for s, sample in enumerate(batch):
-                        # Identify which point belongs to which module
-                        voxels, features, meta = sample[key]
-                        voxels_wrapped, module_indexes = self.geo.split(
-                                voxels.reshape(-1, 3),
-                                self.target_id, meta=meta)
-                        voxels = voxels_wrapped.reshape(-1, voxels.shape[1])
-
-                        # If there are more than one point per row and they
-                        # are in separate volumes, the choice is arbitrary
-                        if voxels.shape[1] > 3:
-                            num_points = voxels.shape[1]//3
-                            free = np.ones(len(voxels), dtype=bool)
-                            for m, module_index in enumerate(module_indexes):
-                                mask = np.zeros(len(voxels_wrapped), dtype=bool)
-                                mask[module_index] = True
-                                mask = mask.reshape(-1, num_points).any(axis=1)
-                                module_indexes[m] = np.where(free & mask)[0]
-                                free[module_indexes[m]] = False
-
-                        # Assign a different batch ID to each volume
-                        for m, module_index in enumerate(module_indexes):
-                            voxels_v.append(voxels[module_index])
-                            features_v.append(features[module_index])
-                            idx = self.geo.num_modules * s + m
-                            batch_ids_v.append(np.full(len(module_index),
-                                               idx, dtype=voxels.dtype))
-                            counts[idx] = len(module_index)
-
-                    voxels = np.vstack(voxels_v)
-                    features = np.vstack(features_v)
-                    batch_ids = np.concatenate(batch_ids_v)
-
-                # Stack the coordinates with the features
-                tensor = np.hstack([batch_ids[:, None], voxels, features])
-                coord_cols = np.arange(1, 1+voxels.shape[1])
-                data[key] = TensorBatch(
-                        tensor.astype(features.dtype), counts,
-                        has_batch_col=True, coord_cols=coord_cols)
+                    data[key] = self.split_sparse(batch, key, module_cache)
 
             elif isinstance(ref_obj, tuple) and len(ref_obj) == 2:
                 # Case where an index and an offset is provided per entry.
                 # Stack the indexes, do not add a batch column
                 tensor  = np.concatenate(
-                        [sample[key][0] for sample in batch], axis=1)
+                        [sample[key][0] for sample in batch], axis=-1)
                 counts  = [sample[key][0].shape[-1] for sample in batch]
                 offsets = [sample[key][1] for sample in batch]
 
                 if len(tensor.shape) == 1:
-                    data[key] = IndexBatch(tensor, counts, offsets)
+                    data[key] = IndexBatch(tensor, offsets, counts)
                 else:
                     data[key] = EdgeIndexBatch(
                             tensor, counts, offsets, directed=True)
@@ -190,18 +148,10 @@ class CollateAll:
                     counts = [len(sample[key]) for sample in batch]
 
                 else:
-                    features_v = []
-                    counts = np.empty(
-                            batch_size*self.geo.num_modules, dtype=np.int64)
-                    for s, sample in enumerate(batch):
-                        features = sample[key]
-                        for m in range(self.geo.num_modules):
-                            module_index = np.where(sources[s][:, 0] == m)[0]
-                            features_v.append(features[module_index])
-                            idx = self.geo.num_modules * s + m
-                            counts[idx] = len(module_index)
-
-                    tensor = np.vstack(features_v)
+                    # Assign each row to the module which produced it
+                    module_ids = [source[:, 0] for source in sources]
+                    tensor, _, counts = self.sort_modules(
+                            [sample[key] for sample in batch], module_ids)
 
                 data[key] = TensorBatch(tensor, counts)
 
@@ -210,3 +160,144 @@ class CollateAll:
                 data[key] = [sample[key] for sample in batch]
 
         return data
+
+    def split_sparse(self, batch, key, module_cache):
+        """Splits the sparse tensors of a batch by module.
+
+        Each point is assigned to its closest module and shifted to the target
+        module. Each [batch, module] pair is given its own batch ID.
+
+        The module assignment of the voxels of each entry is cached, such that
+        it can be reused for other keys which share the same coordinates.
+
+        Parameters
+        ----------
+        batch : List[Dict]
+            List of dictionaries of parsed information, one per event
+        key : str
+            Key of the (voxels, features, meta) tuple to split
+        module_cache : List[List[tuple]]
+            List of module assignments already computed for each entry
+
+        Returns
+        -------
+        TensorBatch
+            (N, 1 + D + F) Batch of sparse tensors with one batch ID per
+            [batch, module] pair
+        """
+        # Assign each voxel of each entry to a module
+        voxels_b, features_b, module_ids_b = [], [], []
+        for s, sample in enumerate(batch):
+            voxels, features, meta = sample[key]
+            shifted, module_ids = self.assign_modules(
+                    voxels, meta, module_cache[s])
+            voxels_b.append(shifted)
+            features_b.append(features)
+            module_ids_b.append(module_ids)
+
+        # Order the voxels by [batch, module] pair
+        voxels, perm, counts = self.sort_modules(voxels_b, module_ids_b)
+
+        # Fill the batch tensor, column block by column block
+        num_coords = voxels.shape[1]
+        features = np.concatenate(features_b)
+        tensor = np.empty(
+                (len(perm), 1 + num_coords + features.shape[1]),
+                dtype=features.dtype)
+        tensor[:, 0] = np.repeat(np.arange(len(counts)), counts)
+        tensor[:, 1:1 + num_coords] = voxels
+        np.take(features, perm, axis=0, out=tensor[:, 1 + num_coords:])
+
+        return TensorBatch(tensor, counts, has_batch_col=True,
+                           coord_cols=np.arange(1, 1 + num_coords))
+
+    def assign_modules(self, voxels, meta, cache):
+        """Assigns each voxel of an entry to a module, shifts it to the target.
+
+        If there is more than one point per row and they are in separate
+        volumes, the row is assigned to the lowest module ID.
+
+        Parameters
+        ----------
+        voxels : np.ndarray
+            (N, 3*k) Voxel coordinates (k points per row)
+        meta : Meta
+            Metadata of the voxelized image
+        cache : List[tuple]
+            List of module assignments already computed for this entry
+
+        Returns
+        -------
+        shifted : np.ndarray
+            (N, 3*k) Voxel coordinates, shifted to the target module
+        module_ids : np.ndarray
+            (N) Module ID of each row (N_m if the row is not in any module)
+        """
+        # If the same voxels have already been assigned, reuse
+        lower, size = np.asarray(meta.lower), np.asarray(meta.size)
+        for ref_voxels, ref_lower, ref_size, shifted, module_ids in cache:
+            if (ref_voxels is voxels or
+                (ref_voxels.shape == voxels.shape and
+                 np.array_equal(ref_lower, lower) and
+                 np.array_equal(ref_size, size) and
+                 np.array_equal(ref_voxels, voxels))):
+                return shifted, module_ids
+
+        # Find the module each point belongs to by proximity
+        num_modules = self.geo.num_modules
+        points = meta.to_cm(voxels.reshape(-1, 3), center=True)
+        point_ids = self.geo.get_closest_module(points)
+        valid = (point_ids > -1) & (point_ids < num_modules)
+        point_ids = np.where(valid, point_ids, num_modules)
+
+        # Shift every point to the target module in one go
+        shifts = np.zeros((num_modules + 1, 3))
+        shifts[:num_modules] = (self.geo.centers[self.target_id] -
+                                self.geo.centers)
+        points = (points + shifts[point_ids]).astype(points.dtype, copy=False)
+        shifted = meta.to_px(points, floor=True).reshape(-1, voxels.shape[1])
+
+        # Assign each row to the lowest module ID among its points
+        module_ids = point_ids.reshape(len(voxels), voxels.shape[1]//3)
+        module_ids = module_ids.min(axis=1)
+
+        cache.append((voxels, lower, size, shifted, module_ids))
+
+        return shifted, module_ids
+
+    def sort_modules(self, tensors, module_ids):
+        """Orders the rows of a list of tensors by [batch, module] pair.
+
+        Parameters
+        ----------
+        tensors : List[np.ndarray]
+            (B) List of tensors, one per entry
+        module_ids : List[np.ndarray]
+            (B) Module ID of each row of each tensor. Rows with an invalid
+            module ID are dropped.
+
+        Returns
+        -------
+        tensor : np.ndarray
+            (N, F) Stacked tensor, ordered by batch ID
+        perm : np.ndarray
+            (N) Index of the ordered rows in the stacked input tensors
+        counts : np.ndarray
+            (B*N_m) Number of rows in each [batch, module] pair
+        """
+        # Build one batch ID per [batch, module] pair
+        num_modules = self.geo.num_modules
+        batch_size = len(tensors)
+        batch_ids = np.concatenate(
+                [num_modules*s + np.asarray(ids, dtype=np.int64)
+                 for s, ids in enumerate(module_ids)])
+        valid = np.concatenate(
+                [(ids > -1) & (ids < num_modules) for ids in module_ids])
+
+        # Sort the valid rows by batch ID (stable, to preserve the ordering)
+        index = np.where(valid)[0]
+        perm = index[np.argsort(batch_ids[index], kind='stable')]
+        counts = np.bincount(
+                batch_ids[index], minlength=batch_size*num_modules)
+
+        return np.concatenate(tensors)[perm], perm, counts
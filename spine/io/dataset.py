@@ -1,12 +1,14 @@
 """Contains dataset classes to be used by the model."""
 
+import yaml
 from torch.utils.data import Dataset
 
 from spine.utils.factory import module_dict, instantiate
 from spine.utils.augment import Augmenter
 
 from . import parse
-from .read import LArCVReader
+from .read import LArCVReader, FlatReader
+from .cache import ParserCache
 
 PARSER_DICT  = module_dict(parse)
 
@@ -26,10 +28,23 @@ class LArCVDataset(Dataset):
 
     This class utilizes the :class:`LArCVReader` class. It uses it to
     load data and to push it through the parsers.
+
+    If `parsed` is set, the `file_keys` must instead point to flat event
+    stores produced by `bin/convert_to_flat.py`, in which the output of the
+    parsers was stored once and for all. The entries are then loaded with the
+    :class:`FlatReader` class and the parsers are not run. The flat event
+    stores hold the raw output of the parsers: the augmentation, if requested,
+    is applied to every entry that is loaded.
+
+    If `cache` is set, the output of the parsers is stored in a two-tier
+    (memory and disk) :class:`ParserCache`, such that each entry is only read
+    and parsed once over multiple epochs. The augmentation is applied after
+    the cache, such that it is still randomized each time an entry is loaded.
     """
     name = 'larcv'
 
-    def __init__(self, schema, dtype, augment=None, **kwargs):
+    def __init__(self, schema, dtype, augment=None, parsed=False, cache=None,
+                 **kwargs):
         """Instantiates the LArCVDataset.
 
         Parameters
@@ -45,8 +60,13 @@ class LArCVDataset(Dataset):
             Data type to cast the input data to (to match the downstream model)
         augment : dict, optional
             Augmentation strategy configuration
+        parsed : bool, default False
+            If `True`, load the pre-parsed data products from flat event stores
+        cache : dict, optional
+            Parser output cache configuration (see :class:`ParserCache`)
         **kwargs : dict, optional
-            Additional arguments to pass to the LArCVReader class
+            Additional arguments to pass to the LArCVReader class (or to the
+            FlatReader class, if `parsed` is `True`)
         """
         # Loop over parsers
         self.parsers = {}
@@ -67,7 +87,50 @@ class LArCVDataset(Dataset):
             self.augmenter = Augmenter(**augment)
 
         # Instantiate the reader
-        self.reader = LArCVReader(tree_keys=tree_keys, **kwargs)
+        self.parsed = parsed
+        if not parsed:
+            self.reader = LArCVReader(tree_keys=tree_keys, **kwargs)
+        else:
+            self.reader = FlatReader(**kwargs)
+            self.check_parsed(schema, dtype)
+
+        # Initialize the parser output cache
+        self.cache = None
+        if cache is not None:
+            assert not parsed, (
+                    "Pre-parsed data products are not cached, they are "
+                    "already loaded without running the parsers.")
+            self.cache = ParserCache(schema, dtype, **cache)
+
+    def check_parsed(self, schema, dtype):
+        """Checks that the pre-parsed files match the requested schema.
+
+        Parameters
+        ----------
+        schema : dict
+            Dictionary of (string, dictionary) parser configuration pairs
+        dtype : str
+            Data type to cast the input data to
+        """
+        for file_path in self.reader.file_paths:
+            # Check that all the data products are available
+            header = FlatReader.read_header(file_path)
+            missing = [k for k in schema if k not in header['keys']]
+            assert not missing, (
+                    f"The pre-parsed file {file_path} does not contain the "
+                    f"following data products: {missing}.")
+
+            # If the parsing configuration was stored, check that it matches
+            if 'cfg' in header:
+                cfg = yaml.safe_load(header['cfg'])
+                assert cfg.get('dtype', dtype) == dtype, (
+                        f"The pre-parsed file {file_path} was produced with "
+                        f"dtype {cfg['dtype']}, but {dtype} is requested.")
+                for key, parser_cfg in cfg.get('schema', {}).items():
+                    assert key not in schema or schema[key] == parser_cfg, (
+                            f"The {key} data product of the pre-parsed file "
+                            f"{file_path} was produced with a different "
+                             "parser configuration.")
 
     def __len__(self):
         """Returns the lenght of the dataset (in number of batches).
@@ -92,9 +155,6 @@ class LArCVDataset(Dataset):
         dict
             Dictionary of data product names and their associated data
         """
-        # Read in a specific entry
-        data_dict = self.reader[idx]
-
         # Get the index
         entry_idx = self.reader.entry_index[idx]
         file_idx = self.reader.get_file_index(idx)
@@ -102,19 +162,57 @@ class LArCVDataset(Dataset):
         result = {'index': entry_idx, 'file_index': file_idx,
                   'file_entry_index': file_entry_idx}
 
-        # Loop over data products, execute parsers
+        # Fetch the parsed data products from the cache, if available
+        file_path = self.reader.file_paths[file_idx]
+        products = None
+        if self.cache is not None:
+            products = self.cache.get(file_path, file_entry_idx)
+
+        # Otherwise, read the entry and run the parsers
+        if products is None:
+            products = self.parse(idx)
+            if self.cache is not None:
+                self.cache.put(file_path, file_entry_idx, products)
+
+        # If requested, augment the data products (on a copy, such that the
+        # cached or pre-parsed products are augmented anew at every load)
+        if self.augmenter is not None:
+            products = self.augmenter(dict(products))
+
+        result.update(products)
+
+        return result
+
+    def parse(self, idx):
+        """Reads one entry and runs the parsers on it.
+
+        Parameters
+        ----------
+        idx : int
+            Index of the dataset entry to load
+
+        Returns
+        -------
+        dict
+            Dictionary of data product names and their parsed data
+        """
+        # Read in a specific entry
+        data_dict = self.reader[idx]
+
+        # Loop over data products, execute parsers (or fetch their output)
+        products = {}
         for name, parser in self.parsers.items():
+            if self.parsed:
+                products[name] = data_dict[name]
+                continue
+
             try:
-                result[name] = parser(data_dict)
+                products[name] = parser(data_dict)
             except Exception as err:
                 print(f"Failed to produce {name} using {parser}")
                 raise err
 
-        # If requested, augment the data
-        if self.augmenter is not None:
-            result = self.augmenter(result)
-
-        return result
+        return products
 
     def data_keys(self):
         """Returns a list of data product names.
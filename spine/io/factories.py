@@ -7,6 +7,7 @@ from torch.utils.data import DataLoader
 from spine.utils.factory import module_dict, instantiate
 
 from . import dataset, sample, collate, read, write
+from .shared import SharedMemoryLoader
 
 DATASET_DICT = module_dict(dataset)
 SAMPLER_DICT = module_dict(sample)
@@ -20,7 +21,8 @@ __all__ = ['loader_factory', 'dataset_factory', 'sampler_factory',
 
 def loader_factory(dataset, dtype, batch_size=None, minibatch_size=None,
                    shuffle=True, sampler=None, num_workers=0, collate_fn=None,
-                   entry_list=None, distributed=False, world_size=0, rank=0):
+                   entry_list=None, distributed=False, world_size=0, rank=0,
+                   shared_memory=None):
     """Instantiates a DataLoader based on configuration.
 
     Dataset comes from `dataset_factory`.
@@ -52,6 +54,11 @@ def loader_factory(dataset, dtype, batch_size=None, minibatch_size=None,
         Total number of GPUs using the sampler
     rank : int, default 0
         Unique identifier of the process sampling data
+    shared_memory : Union[bool, dict], optional
+        If provided, the workers send the parsed entries to the main process
+        through a ring of shared-memory slabs rather than pickling them. Can
+        be a dictionary of parameters of :class:`SharedMemoryLoader`
+        (`slab_size`, `num_slabs`)
 
     Returns
     -------
@@ -79,10 +86,28 @@ def loader_factory(dataset, dtype, batch_size=None, minibatch_size=None,
     if collate_fn is not None:
         collate_fn = collate_factory(collate_fn)
 
-    # Initialize the loader
+    # Initialize the loader. Batched samplers define the batches themselves
+    if sampler is not None and getattr(sampler, 'batched', False):
+        batch_kwargs = {'batch_sampler': sampler}
+    else:
+        batch_kwargs = {'batch_size': minibatch_size, 'shuffle': shuffle,
+                        'sampler': sampler}
+
+    if isinstance(shared_memory, bool):
+        shared_memory = {} if shared_memory else None
+
+    if shared_memory is not None and num_workers > 0:
+        return SharedMemoryLoader(
+                dataset, num_workers=num_workers, collate_fn=collate_fn,
+                **batch_kwargs, **shared_memory)
+
+    if shared_memory is not None:
+        warn("The shared memory transport is only used with `num_workers` "
+             "> 0. Loading the data in the main process.")
+
     loader = DataLoader(
-            dataset, batch_size=minibatch_size, shuffle=shuffle,
-            sampler=sampler, num_workers=num_workers, collate_fn=collate_fn)
+            dataset, num_workers=num_workers, collate_fn=collate_fn,
+            **batch_kwargs)
 
     return loader
 
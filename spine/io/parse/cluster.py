@@ -84,30 +84,21 @@ class Cluster2DParser(ParserBase):
         # Get the cluster from the appropriate projection
         cluster_event_p = cluster_event.cluster_pixel_2d(self.projection_id)
 
-        # Loop over clusters, store information
+        # Fetch the voxels of all clusters at once
         meta = cluster_event_p.meta()
-        num_clusters = cluster_event_p.size()
-        clusters_voxels, clusters_features = [], []
-        for i in range(num_clusters):
-            cluster = cluster_event_p.as_vector()[i]
-            num_points = cluster.as_vector().size()
-            if num_points > 0:
-                x = np.empty(num_points, dtype=self.itype)
-                y = np.empty(num_points, dtype=self.itype)
-                value = np.empty(num_points, dtype=self.ftype)
-                larcv.as_flat_arrays(cluster, meta, x, y, value)
-                cluster_id = np.full(num_points, i, dtype=self.ftype)
-                clusters_voxels.append(np.stack([x, y], axis=1))
-                clusters_features.append(np.column_stack([value, cluster_id]))
-
-        # If there are no non-empty clusters, return. Concatenate otherwise
-        if not clusters_voxels:
+        np_voxels, values, counts = fill_cluster_voxels(
+                cluster_event_p.as_vector(), meta, 2, self.itype, self.ftype)
+
+        # If there are no non-empty clusters, return
+        if not len(np_voxels):
             return (np.empty((0, 2), dtype=self.ftype),
                     np.empty((0, 2), dtype=self.ftype),
                     Meta.from_larcv(meta))
 
-        np_voxels   = np.concatenate(clusters_voxels, axis=0)
-        np_features = np.concatenate(clusters_features, axis=0)
+        # Assign the cluster ID to each of the voxels
+        cluster_ids = np.repeat(
+                np.arange(len(counts), dtype=self.ftype), counts)
+        np_features = np.column_stack([values, cluster_ids])
 
         return np_voxels, np_features, Meta.from_larcv(meta)
 
@@ -299,46 +290,33 @@ class Cluster3DParser(ParserBase):
                     labels['pinter'] = np.asarray(labels['pinter'])
                     labels['pinter'][mpr_mask] = -1
 
-        # Loop over clusters, store information
-        clusters_voxels, clusters_features = [], []
-        id_offset = 0
-        for i in range(num_clusters):
-            cluster = cluster_event.as_vector()[i]
-            num_points = cluster.as_vector().size()
-            if num_points > 0:
-                # Get the position and pixel value from EventSparseTensor3D
-                x = np.empty(num_points, dtype=self.itype)
-                y = np.empty(num_points, dtype=self.itype)
-                z = np.empty(num_points, dtype=self.itype)
-                value = np.empty(num_points, dtype=self.ftype)
-                larcv.as_flat_arrays(cluster, meta, x, y, z, value)
-                voxels = np.stack([x, y, z], axis=1)
-                clusters_voxels.append(voxels)
-
-                # Append the cluster-wise information
-                features = [value]
-                for l in labels.values():
-                    val = l[i] if i < num_particles else -1
-                    features.append(
-                            np.full(num_points, val, dtype=self.ftype))
-
-                # If requested, break cluster into detached pieces
-                if self.break_clusters:
-                    frag_labels = dbscan(
-                            voxels, self.break_eps, self.break_metric)
-                    features[1] = id_offset + frag_labels
-                    id_offset += max(frag_labels) + 1
-
-                clusters_features.append(np.column_stack(features))
-
-        # If there are no non-empty clusters, return. Concatenate otherwise
-        if not clusters_voxels:
+        # Fetch the voxels of all clusters at once
+        np_voxels, values, counts = fill_cluster_voxels(
+                cluster_event.as_vector(), meta, 3, self.itype, self.ftype)
+
+        # If there are no non-empty clusters, return
+        if not len(np_voxels):
             return (np.empty((0, 3), dtype=self.itype),
                     np.empty((0, len(labels) + 1), dtype=self.ftype),
                     Meta.from_larcv(meta))
 
-        np_voxels   = np.concatenate(clusters_voxels, axis=0)
-        np_features = np.concatenate(clusters_features, axis=0)
+        # Broadcast the cluster-wise information to each of the voxels
+        np_features = np.empty(
+                (len(np_voxels), len(labels) + 1), dtype=self.ftype)
+        np_features[:, 0] = values
+        np_features[:, 1:] = broadcast_cluster_labels(
+                counts, labels, num_particles, self.ftype)
+
+        # If requested, break cluster into detached pieces
+        if self.break_clusters:
+            offsets = np.cumsum(counts) - counts
+            id_offset = 0
+            for i in np.where(counts > 0)[0]:
+                index = slice(offsets[i], offsets[i] + counts[i])
+                frag_labels = dbscan(
+                        np_voxels[index], self.break_eps, self.break_metric)
+                np_features[index, 1] = id_offset + frag_labels
+                id_offset += max(frag_labels) + 1
 
         # If requested, remove duplicate voxels (cluster overlaps) and
         # match the semantics to those of the provided reference
@@ -508,3 +486,80 @@ class Cluster3DMultiModuleParser(Cluster3DParser):
         np_features[:, 0] = charges.flatten()
 
         return np_voxels, np_features, meta
+
+
+def fill_cluster_voxels(cluster_set, meta, num_dims, itype, ftype):
+    """Fetches the voxels of all the clusters in a cluster set at once.
+
+    The coordinates and values of all clusters are written into a single
+    preallocated buffer, such that no per-cluster array has to be
+    concatenated afterwards.
+
+    Parameters
+    ----------
+    cluster_set : List[larcv.VoxelSet]
+        (C) List of clusters
+    meta : Union[larcv.ImageMeta, larcv.Voxel3DMeta]
+        Metadata of the image the clusters live in
+    num_dims : int
+        Number of dimensions of the image (2 or 3)
+    itype : type
+        Data type of the coordinates
+    ftype : type
+        Data type of the values
+
+    Returns
+    -------
+    voxels : np.ndarray
+        (N, num_dims) Coordinates of the voxels in all clusters
+    values : np.ndarray
+        (N) Values of the voxels in all clusters
+    counts : np.ndarray
+        (C) Number of voxels in each cluster
+    """
+    # Count the voxels in each cluster, build the cluster offsets
+    num_clusters = cluster_set.size()
+    counts = np.empty(num_clusters, dtype=np.int64)
+    for i in range(num_clusters):
+        counts[i] = cluster_set[i].as_vector().size()
+    offsets = np.cumsum(counts) - counts
+
+    # Fill each cluster directly into its slice of the output buffers
+    num_voxels = int(np.sum(counts))
+    coords = np.empty((num_dims, num_voxels), dtype=itype)
+    values = np.empty(num_voxels, dtype=ftype)
+    for i in np.where(counts > 0)[0]:
+        index = slice(offsets[i], offsets[i] + counts[i])
+        larcv.as_flat_arrays(
+                cluster_set[int(i)], meta, *coords[:, index], values[index])
+
+    return np.ascontiguousarray(coords.T), values, counts
+
+
+def broadcast_cluster_labels(counts, labels, num_particles, dtype):
+    """Broadcasts cluster-wise labels to each of the voxels of the clusters.
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        (C) Number of voxels in each cluster
+    labels : Dict[str, Union[List, np.ndarray]]
+        (L) Dictionary of cluster-wise labels, each of length `num_particles`
+    num_particles : int
+        Number of clusters associated with a particle. The labels of the
+        clusters beyond this number are set to -1
+    dtype : type
+        Data type of the output labels
+
+    Returns
+    -------
+    np.ndarray
+        (N, L) Labels of each of the voxels
+    """
+    # Build a (C, L) matrix of cluster labels
+    label_mat = np.full((len(counts), len(labels)), -1, dtype=dtype)
+    for i, values in enumerate(labels.values()):
+        label_mat[:num_particles, i] = np.asarray(values)[:num_particles]
+
+    # Repeat each cluster row as many times as there are voxels in it
+    return np.repeat(label_mat, counts, axis=0)
@@ -2,3 +2,4 @@
 
 from .larcv import *
 from .hdf5 import *
+from .flat import *
@@ -10,6 +10,8 @@ from warnings import warn
 
 import numpy as np
 
+from .index import FileIndex
+
 
 class ReaderBase:
     """Parent reader class which provides common functions between all readers.
@@ -21,6 +23,11 @@ class ReaderBase:
        provided parameters, checks that they exist (throws if they do not)
     3. Essential `__len__` and `__getitem__` methods. Must define the
        `get` function in the inheriting class for both of them to work.
+    4. Method to fetch the number of entries and the run information of each
+       file, optionally cached in a persistent :class:`FileIndex`
+
+    The map from (run, event) pairs to entries is only built the first time
+    it is accessed.
 
     Attributes
     ----------
@@ -48,7 +55,37 @@ class ReaderBase:
     file_offsets = None
     file_index = None
     run_info = None
-    run_map = None
+    _run_map = None
+    _run_map_info = None
+
+    @property
+    def run_map(self):
+        """Map from (run, event) pairs onto entry_index indexes.
+
+        The map is built from the run information the first time it is
+        accessed, as this is expensive for large datasets.
+
+        Returns
+        -------
+        Dict[Tuple[int], int]
+            Maps each available (run, event) pair onto an entry_index index
+        """
+        if self._run_map is None and self._run_map_info is not None:
+            self._run_map = {
+                    tuple(v):i for i, v in enumerate(self._run_map_info)}
+
+        return self._run_map
+
+    def reset_run_map(self, run_info):
+        """Sets the run information used to build the run map.
+
+        Parameters
+        ----------
+        run_info : np.ndarray
+            (N, 2) Array of (run, event) pairs, one per entry_index index
+        """
+        self._run_map = None
+        self._run_map_info = run_info
 
     def __len__(self):
         """Returns the number of entries in the file(s).
@@ -139,6 +176,60 @@ class ReaderBase:
                 break
         print("")
 
+    def process_file_info(self, scan_fn, index_path=None, run_info=False):
+        """Fetches the number of entries and the run information of each file.
+
+        If an index path is provided, the information is read from the index
+        and only the files which are missing from it (or which have been
+        modified since they were indexed) are scanned. The index is then
+        updated on disk.
+
+        Parameters
+        ----------
+        scan_fn : callable
+            Function which takes a file path and returns its number of entries
+            and an (N, 3) array of (run, subrun, event) triplets (or `None`)
+        index_path : str, optional
+            Path to the persistent file index
+        run_info : bool, default False
+            If `True`, the run information of each file must be available
+
+        Returns
+        -------
+        counts : np.ndarray
+            (F) Number of entries in each file
+        run_info : np.ndarray
+            (N, 2) Array of (run, event) pairs, one per entry (`None` if
+            `run_info` is `False`)
+        """
+        # Fetch the file information, from the index if available
+        if index_path is not None:
+            index = FileIndex(index_path)
+            counts, run_infos = index.scan(self.file_paths, scan_fn, run_info)
+            index.save_if_modified()
+
+        else:
+            counts = np.empty(len(self.file_paths), dtype=np.int64)
+            run_infos = []
+            for i, path in enumerate(self.file_paths):
+                counts[i], info = scan_fn(path)
+                run_infos.append(info)
+
+        if not run_info:
+            return counts, None
+
+        # Concatenate the run information, keep the (run, event) pairs
+        for path, info in zip(self.file_paths, run_infos):
+            assert info is not None, (
+                    f"No run information available in {path} to create "
+                    "the run map.")
+
+        run_infos = [np.asarray(info).reshape(-1, 3) for info in run_infos]
+        run_infos = np.concatenate(run_infos) if len(run_infos) else (
+                np.empty((0, 3), dtype=np.int64))
+
+        return counts, run_infos[:, [0, 2]]
+
     def process_run_info(self):
         """Process the run information.
 
@@ -153,10 +244,9 @@ class ReaderBase:
             if has_duplicates:
                 warn("There are duplicated (run, event) pairs.")
 
-        # If run_info is set, flip it into a map from info to entry
-        self.run_map = None
-        if self.run_info is not None:
-            self.run_map = {tuple(v):i for i, v in enumerate(self.run_info)}
+        # If run_info is set, it is flipped into a map from info to entry
+        # the first time the map is accessed
+        self.reset_run_map(self.run_info)
 
     def process_entry_list(self, n_entry=None, n_skip=None, entry_list=None,
                            skip_entry_list=None, run_event_list=None,
@@ -253,8 +343,7 @@ class ReaderBase:
             entry_index = entry_index[entry_list]
 
             if self.run_info is not None:
-                run_info = self.run_info[entry_list]
-                self.run_map = {tuple(v):i for i, v in enumerate(run_info)}
+                self.reset_run_map(self.run_info[entry_list])
 
         assert len(entry_index), "Must at least have one entry to load."
 
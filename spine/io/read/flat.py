@@ -0,0 +1,403 @@
+"""Contains a reader class dedicated to loading data from flat event stores."""
+
+import os
+import json
+import pickle
+
+import numpy as np
+
+import spine.data
+from spine.utils.decorators import inherit_docstring
+from spine.io.write.flat import FLAT_MAGIC, FLAT_FORMAT
+
+from .base import ReaderBase
+
+__all__ = ['FlatReader']
+
+
+@inherit_docstring(ReaderBase)
+class FlatReader(ReaderBase):
+    """Class which reads information stored in flat event stores.
+
+    This class inherits from the :class:`ReaderBase` class. It loads the
+    memory-mappable files produced by the :class:`FlatWriter` class, in which
+    each data product is stored as one contiguous array for all entries,
+    along with an array of entry offsets.
+
+    Each file is memory-mapped once per process. Loading an entry is a
+    constant-time slice of the mapped arrays: the tensors returned are views
+    into the file which are only read from disk when they are accessed. By
+    default, the files are mapped in copy-on-write mode, such that the views
+    can be modified in place without affecting the file.
+
+    Keys which the writer could not store as arrays are stored as pickled
+    byte strings. Unpickling can execute arbitrary code, so these keys are
+    only loaded if `allow_pickle` is set, for files from a trusted source.
+    """
+    name = 'flat'
+
+    def __init__(self, file_keys, limit_num_files=None, max_print_files=10,
+                 n_entry=None, n_skip=None, entry_list=None,
+                 skip_entry_list=None, run_event_list=None,
+                 skip_run_event_list=None, create_run_map=False,
+                 run_info_key='run_info', index_path=None, mmap_mode='c',
+                 allow_pickle=False):
+        """Initalize the flat event store reader.
+
+        Parameters
+        ----------
+        file_keys : list
+            List of paths to the flat event store files to be read
+        limit_num_files : int, optional
+            Integer limiting number of files to be taken per data directory
+        max_print_files : int, default 10
+            Maximum number of loaded file names to be printed
+        n_entry : int, optional
+            Maximum number of entries to load
+        n_skip : int, optional
+            Number of entries to skip at the beginning
+        entry_list : list
+            List of integer entry IDs to add to the index
+        skip_entry_list : list
+            List of integer entry IDs to skip from the index
+        run_event_list: list((int, int)), optional
+            List of [run, event] pairs to add to the index
+        skip_run_event_list: list((int, int)), optional
+            List of [run, event] pairs to skip from the index
+        create_run_map : bool, default False
+            Initialize a map between [run, event] pairs and entries
+        run_info_key : str, default 'run_info'
+            Name of the data product which contains the run info of the event
+        index_path : str, optional
+            Path to a persistent index of the number of entries and the run
+            information in each file (see :class:`FileIndex`)
+        mmap_mode : str, default 'c'
+            Memory-map mode, one of 'r' (read-only) or 'c' (copy-on-write)
+        allow_pickle : bool, default False
+            If `True`, allow loading the keys stored as pickled objects. This
+            is unsafe for files from an untrusted source, as unpickling can
+            execute arbitrary code
+        """
+        # Process the list of files
+        self.process_file_paths(file_keys, limit_num_files, max_print_files)
+
+        # If an entry list is requested based on run/event ID, create map
+        if run_event_list is not None or skip_run_event_list is not None:
+            create_run_map = True
+
+        # Count the entries in each file (and fetch the run information, if
+        # requested or if the file information is to be indexed)
+        key = run_info_key if (create_run_map or index_path) else None
+        counts, self.run_info = self.process_file_info(
+                lambda path: self.scan_file(path, key),
+                index_path, create_run_map)
+
+        # Build a map from index to file ID
+        self.num_entries = int(np.sum(counts))
+        self.file_offsets = np.cumsum(counts) - counts
+        self.file_index = np.repeat(np.arange(len(self.file_paths)), counts)
+
+        # Dump the number of entries to load
+        print(f"Total number of entries in the file(s): {self.num_entries}\n")
+
+        # Process the run information
+        self.process_run_info()
+
+        # Process the entry list
+        self.process_entry_list(
+                n_entry, n_skip, entry_list, skip_entry_list,
+                run_event_list, skip_run_event_list)
+
+        # Initialize the memory maps (one per file, built on first access)
+        assert mmap_mode in ['r', 'c'], (
+                f"Memory-map mode not recognized: {mmap_mode}. Must be one "
+                 "of 'r' or 'c'.")
+        self.mmap_mode = mmap_mode
+        self.allow_pickle = allow_pickle
+        self.reset_maps()
+
+    def __getstate__(self):
+        """Drops the memory maps before the reader gets pickled (e.g. when
+        sent to a DataLoader worker).
+
+        Returns
+        -------
+        dict
+            Picklable state of the reader
+        """
+        state = self.__dict__.copy()
+        state['_maps'] = None
+
+        return state
+
+    def __setstate__(self, state):
+        """Restores the reader state after unpickling.
+
+        Parameters
+        ----------
+        state : dict
+            Picklable state of the reader
+        """
+        self.__dict__.update(state)
+        self.reset_maps()
+
+    def reset_maps(self):
+        """Initializes an empty memory map pool.
+
+        The pool is bound to the current process: if the reader is forked
+        (e.g. by a DataLoader worker), it gets rebuilt on the next access.
+        """
+        self._pid = os.getpid()
+        self._maps = {}
+
+    @staticmethod
+    def read_header(file_path):
+        """Reads the header of a flat event store file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the flat event store file
+
+        Returns
+        -------
+        dict
+            Description of the content of the file
+        """
+        with open(file_path, 'rb') as in_file:
+            magic = in_file.read(len(FLAT_MAGIC))
+            assert magic == FLAT_MAGIC, (
+                    f"File {file_path} is not a flat event store.")
+            size = int(np.frombuffer(in_file.read(8), dtype=np.uint64)[0])
+            header = json.loads(in_file.read(size).decode('utf-8'))
+
+        assert header['format'] <= FLAT_FORMAT, (
+                f"File {file_path} was produced with a more recent layout "
+                f"version ({header['format']}) than supported ({FLAT_FORMAT}).")
+
+        return header
+
+    @staticmethod
+    def scan_file(file_path, run_info_key=None):
+        """Counts the entries in a file and fetches their run information.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the flat event store file
+        run_info_key : str, optional
+            Name of the data product which contains the run info of the event
+
+        Returns
+        -------
+        num_entries : int
+            Number of entries in the file
+        run_info : np.ndarray
+            (N, 3) Array of (run, subrun, event) triplets, one per entry. If
+            no run information is requested (or available), returns `None`.
+        """
+        # Count the entries
+        header = FlatReader.read_header(file_path)
+        num_entries = header['num_entries']
+
+        # Fetch the run information, if requested and available
+        run_info = None
+        if run_info_key is not None and run_info_key in header['keys']:
+            buffer = np.memmap(file_path, dtype=np.uint8, mode='r')
+            spec = header['keys'][run_info_key]
+            run_info = np.empty((num_entries, 3), dtype=np.int64)
+            for i in range(num_entries):
+                info = FlatReader.load_value(buffer, spec, i)
+                run_info[i] = [info.run, info.subrun, info.event]
+
+        return num_entries, run_info
+
+    def get_map(self, file_idx):
+        """Returns the memory map and the header of one of the files.
+
+        Parameters
+        ----------
+        file_idx : int
+            Index of the file in the file list
+
+        Returns
+        -------
+        buffer : np.ndarray
+            Memory-mapped content of the file
+        header : dict
+            Description of the content of the file
+        """
+        if self._pid != os.getpid():
+            self.reset_maps()
+
+        if file_idx not in self._maps:
+            file_path = self.file_paths[file_idx]
+            buffer = np.memmap(file_path, dtype=np.uint8, mode=self.mmap_mode)
+            self._maps[file_idx] = (
+                    np.asarray(buffer), self.read_header(file_path))
+
+        return self._maps[file_idx]
+
+    def get(self, idx):
+        """Returns a specific entry in the file.
+
+        Parameters
+        ----------
+        idx : int
+            Integer entry ID to access
+
+        Returns
+        -------
+        data : dict
+            Ditionary of data products corresponding to one event
+        """
+        # Get the appropriate entry index
+        assert idx < len(self.entry_index)
+        file_idx  = self.get_file_index(idx)
+        entry_idx = self.get_file_entry_index(idx)
+
+        # Slice each data product
+        buffer, header = self.get_map(file_idx)
+        data = {'file_index': file_idx}
+        for key, spec in header['keys'].items():
+            data[key] = self.load_value(
+                    buffer, spec, entry_idx, self.allow_pickle)
+
+        return data
+
+    @staticmethod
+    def get_array(buffer, spec):
+        """Returns a view of one of the arrays stored in a file.
+
+        Parameters
+        ----------
+        buffer : np.ndarray
+            Memory-mapped content of the file
+        spec : dict
+            Description of the array (offset, dtype, shape)
+
+        Returns
+        -------
+        np.ndarray
+            View of the array
+        """
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        size = int(np.prod(shape))*dtype.itemsize
+        start = spec['offset']
+
+        return buffer[start:start + size].view(dtype).reshape(shape)
+
+    @staticmethod
+    def load_value(buffer, spec, entry, allow_pickle=False):
+        """Loads the value of one key for one entry.
+
+        Parameters
+        ----------
+        buffer : np.ndarray
+            Memory-mapped content of the file
+        spec : dict
+            Description of how the key is stored
+        entry : int
+            Index of the entry in the file
+        allow_pickle : bool, default False
+            If `True`, allow loading values stored as pickled objects
+
+        Returns
+        -------
+        object
+            Value of the key for this entry
+        """
+        kind = spec['kind']
+        if kind == 'tuple':
+            return tuple(FlatReader.load_value(buffer, s, entry, allow_pickle)
+                         for s in spec['items'])
+
+        if kind == 'objects':
+            return FlatReader.load_objects(buffer, spec, entry)
+
+        data = FlatReader.get_array(buffer, spec['data'])
+        if kind == 'scalar':
+            return data[entry]
+
+        offsets = FlatReader.get_array(buffer, spec['offsets'])
+        start, end = offsets[entry], offsets[entry + 1]
+        if kind == 'tensor':
+            return data[start:end]
+
+        if kind == 'jagged':
+            elem_offsets = FlatReader.get_array(buffer, spec['elem_offsets'])
+            value = np.empty(end - start, dtype=object)
+            for i, j in enumerate(range(start, end)):
+                value[i] = data[elem_offsets[j]:elem_offsets[j + 1]]
+
+            if 'default' in spec:
+                default = spec['default']
+                return spine.data.ObjectList(
+                        list(value), default=np.empty(
+                            default['shape'], dtype=default['dtype']))
+
+            return value
+
+        if kind == 'string':
+            return data[start:end].tobytes().decode('utf-8')
+
+        if kind == 'pickle':
+            if not allow_pickle:
+                raise ValueError(
+                        "This key is stored as pickled objects, which are "
+                        "not loaded by default as unpickling can execute "
+                        "arbitrary code. Set `allow_pickle` to `True` to "
+                        "load it from a trusted file.")
+
+            return pickle.loads(data[start:end].tobytes())
+
+        raise ValueError(f"Storage kind not recognized: {kind}")
+
+    @staticmethod
+    def load_objects(buffer, spec, entry):
+        """Builds back the data object(s) of one key for one entry.
+
+        Parameters
+        ----------
+        buffer : np.ndarray
+            Memory-mapped content of the file
+        spec : dict
+            Description of how the object attributes are stored
+        entry : int
+            Index of the entry in the file
+
+        Returns
+        -------
+        Union[object, ObjectList]
+            Data object or list of data objects for this entry
+        """
+        # Fetch the range of objects which belong to this entry
+        offsets = FlatReader.get_array(buffer, spec['offsets'])
+        start, end = offsets[entry], offsets[entry + 1]
+
+        # Fetch the values of each attribute for all the objects at once
+        columns = {}
+        for attr, attr_spec in spec['attrs'].items():
+            data = FlatReader.get_array(buffer, attr_spec['data'])
+            if attr_spec['kind'] == 'scalar':
+                columns[attr] = data[start:end]
+                continue
+
+            attr_offsets = FlatReader.get_array(buffer, attr_spec['offsets'])
+            values = [data[attr_offsets[j]:attr_offsets[j + 1]]
+                      for j in range(start, end)]
+            if attr_spec['kind'] == 'string':
+                values = [v.tobytes().decode('utf-8') for v in values]
+            columns[attr] = values
+
+        # Build the objects
+        obj_class = getattr(spine.data, spec['class_name'])
+        names = list(columns)
+        objects = [obj_class(**dict(zip(names, values)))
+                   for values in zip(*columns.values())]
+
+        if spec['scalar']:
+            return objects[0]
+
+        return spine.data.ObjectList(objects, default=obj_class())
@@ -1,5 +1,9 @@
 """Contains a reader class dedicated to loading data from HDF5 files."""
 
+import os
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+
 import h5py
 import numpy as np
 
@@ -11,6 +15,11 @@ from .base import ReaderBase
 
 __all__ = ['HDF5Reader']
 
+# Maximum ratio between the number of `events` rows spanned by the requested
+# entries of a file and the number of entries, below which the rows are read
+# in one contiguous slice (rather than selected by index)
+MAX_SPAN_RATIO = 2
+
 
 @inherit_docstring(ReaderBase)
 class HDF5Reader(ReaderBase):
@@ -22,14 +31,37 @@ class HDF5Reader(ReaderBase):
       - An `events` dataset with all the region references
       - One dataset per data product corresponding to each region reference in
         the `events` dataset
+
+    By default, the file is reopened every time an entry is loaded. If the
+    `chunk_size` parameter is provided, the reader instead keeps a pool of
+    open file handles and loads blocks of consecutive entries at once. If
+    `prefetch` is also set, the next block is loaded on a background thread
+    while the current one is being consumed. This mode is meant to be used
+    with sequential samplers: an entry which is neither in the block of the
+    previous entry nor in the next one is loaded on its own, without
+    prefetching, such that shuffled access does not load whole blocks.
+
+    Stored objects (particles, interactions, etc.) are built back into their
+    data classes by default. The `object_mode` parameter can be used to skip
+    building them, for all object keys or for some keys only:
+      - `objects`: list of data class objects (default)
+      - `columns`: structured array with one row per object, one column
+        per attribute, as stored in the file
+      - `lazy`: :class:`ObjectColumns` view which gives access to the columns
+        and only builds an object when it is accessed
     """
     name = 'hdf5'
 
+    # List of recognized object loading modes
+    _object_modes = ['objects', 'columns', 'lazy']
+
     def __init__(self, file_keys, limit_num_files=None, max_print_files=10,
                  n_entry=None, n_skip=None, entry_list=None,
                  skip_entry_list=None, run_event_list=None,
                  skip_run_event_list=None, create_run_map=False,
-                 build_classes=True, run_info_key='run_info'):
+                 build_classes=True, run_info_key='run_info',
+                 chunk_size=None, prefetch=False, index_path=None,
+                 object_mode='objects'):
         """Initalize the HDF5 file reader.
 
         Parameters
@@ -59,6 +91,22 @@ class HDF5Reader(ReaderBase):
             If the stored object is a class, build it back
         run_info_key : str, default 'run_info'
             Name of the data product which contains the run info of the event
+        chunk_size : int, optional
+            If specified, keep the files open and load blocks of `chunk_size`
+            consecutive entries of the index at once. Only useful with
+            sequential samplers, shuffled entries are loaded one at a time
+        prefetch : bool, default False
+            If `True`, load the next block of entries on a background thread.
+            Requires `chunk_size` to be specified.
+        index_path : str, optional
+            Path to a persistent index of the number of entries and the run
+            information in each file (see :class:`FileIndex`). If provided,
+            only the files missing from the index (or modified since they
+            were indexed) are opened at initialization.
+        object_mode : Union[str, Dict[str, str]], default 'objects'
+            How to load the stored objects, one of 'objects', 'columns' or
+            'lazy'. Can be provided as a dictionary which maps object keys
+            onto a mode, in which case the other keys are loaded as objects
         """
         # Process the list of files
         self.process_file_paths(file_keys, limit_num_files, max_print_files)
@@ -67,41 +115,21 @@ class HDF5Reader(ReaderBase):
         if run_event_list is not None or skip_run_event_list is not None:
             create_run_map = True
 
-        # Loop over the input files, build a map from index to file ID
-        self.num_entries  = 0
-        self.file_index   = []
-        self.file_offsets = np.empty(len(self.file_paths), dtype=np.int64)
-        self.run_info     = None if not create_run_map else []
-        for i, path in enumerate(self.file_paths):
-            with h5py.File(path, 'r') as in_file:
-                # Check that there are events in the file
-                assert 'events' in in_file, (
-                        "File does not contain an event tree")
-
-                # If requested, register the [run, event] information pair
-                if create_run_map:
-                    assert run_info_key in in_file, (
-                            f"Must provide {run_info_key} to create run map")
-                    run_info = in_file[run_info_key]
-                    for r, e in zip(run_info['run'], run_info['event']):
-                        self.run_info.append([r, e])
-
-                # Update the total number of entries
-                num_entries = len(in_file['events'])
-                self.file_index.append(i*np.ones(num_entries, dtype=np.int64))
-                self.file_offsets[i] = self.num_entries
-                self.num_entries += num_entries
+        # Count the entries in each file (and fetch the run information, if
+        # requested or if the file information is to be indexed)
+        key = run_info_key if (create_run_map or index_path) else None
+        counts, self.run_info = self.process_file_info(
+                lambda path: self.scan_file(path, key),
+                index_path, create_run_map)
+
+        # Build a map from index to file ID
+        self.num_entries = int(np.sum(counts))
+        self.file_offsets = np.cumsum(counts) - counts
+        self.file_index = np.repeat(np.arange(len(self.file_paths)), counts)
 
         # Dump the number of entries to load
         print(f"Total number of entries in the file(s): {self.num_entries}\n")
 
-        # Concatenate the file indexes into one
-        self.file_index = np.concatenate(self.file_index)
-
-        # Turn file index and run info into np.ndarray
-        if self.run_info is not None:
-            self.run_info = np.vstack(self.run_info)
-
         # Process the run information
         self.process_run_info()
 
@@ -113,6 +141,162 @@ class HDF5Reader(ReaderBase):
         # Store other attributes
         self.build_classes = build_classes
 
+        # Process the object loading mode(s)
+        if isinstance(object_mode, str):
+            self.object_mode, self.object_modes = object_mode, {}
+        else:
+            self.object_mode, self.object_modes = 'objects', object_mode
+        for mode in [self.object_mode, *self.object_modes.values()]:
+            assert mode in self._object_modes, (
+                    f"Object loading mode not recognized: {mode}. Must be "
+                    f"one of {self._object_modes}.")
+
+        # Initialize the chunked reading mode, if requested
+        assert chunk_size is None or chunk_size > 0, (
+                "If `chunk_size` is provided, it must be larger than 0.")
+        assert not prefetch or chunk_size is not None, (
+                "Must provide a `chunk_size` to prefetch blocks of entries.")
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+        self.reset_handles()
+
+    @staticmethod
+    def scan_file(file_path, run_info_key=None):
+        """Counts the entries in a file and fetches their run information.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the HDF5 file
+        run_info_key : str, optional
+            Name of the data product which contains the run info of the event
+
+        Returns
+        -------
+        num_entries : int
+            Number of entries in the file
+        run_info : np.ndarray
+            (N, 3) Array of (run, subrun, event) triplets, one per entry. If
+            no run information is requested (or available), returns `None`.
+        """
+        with h5py.File(file_path, 'r') as in_file:
+            # Check that there are events in the file
+            assert 'events' in in_file, (
+                    "File does not contain an event tree")
+
+            # Fetch the run information, if requested and available
+            run_info = None
+            if run_info_key is not None and run_info_key in in_file:
+                info = in_file[run_info_key]
+                run_info = np.column_stack(
+                        [info[k] for k in ['run', 'subrun', 'event']])
+
+            return len(in_file['events']), run_info
+
+    def __getstate__(self):
+        """Drops the open file handles and the prefetching thread pool before
+        the reader gets pickled (e.g. when sent to a DataLoader worker).
+
+        Returns
+        -------
+        dict
+            Picklable state of the reader
+        """
+        state = self.__dict__.copy()
+        for key in ['_handles', '_blocks', '_futures', '_executor', '_lock']:
+            state[key] = None
+
+        return state
+
+    def __setstate__(self, state):
+        """Restores the reader state after unpickling.
+
+        Parameters
+        ----------
+        state : dict
+            Picklable state of the reader
+        """
+        self.__dict__.update(state)
+        self.reset_handles()
+
+    def __del__(self):
+        """Releases the open file handles when the reader is deleted."""
+        try:
+            self.close()
+        except Exception: # pylint: disable=W0718
+            pass
+
+    def process_entry_list(self, *args, **kwargs):
+        """Restricts the list of entries, drops the cached blocks.
+
+        Parameters
+        ----------
+        *args : list
+            Positional arguments passed to the base class method
+        **kwargs : dict, optional
+            Keyword arguments passed to the base class method
+        """
+        super().process_entry_list(*args, **kwargs)
+        if getattr(self, '_blocks', None) is not None:
+            self.clear_blocks()
+
+    def clear_blocks(self):
+        """Drops the cached blocks of entries and the pending prefetches."""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._blocks.clear()
+        self._last_idx = None
+
+    def reset_handles(self):
+        """Initializes an empty file handle pool and block cache.
+
+        The pool is bound to the current process: if the reader is forked
+        (e.g. by a DataLoader worker), it gets rebuilt on the next access.
+        """
+        self._pid = os.getpid()
+        self._handles = {}
+        self._blocks = {}
+        self._futures = {}
+        self._executor = None
+        self._lock = Lock()
+        self._last_idx = None
+
+    def close(self):
+        """Closes all open file handles and stops the prefetching thread."""
+        if getattr(self, '_pid', None) != os.getpid():
+            return
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        for in_file in self._handles.values():
+            in_file.close()
+
+        self.reset_handles()
+
+    def get_handle(self, file_idx):
+        """Returns an open handle to one of the files in the list.
+
+        Parameters
+        ----------
+        file_idx : int
+            Index of the file in the file list
+
+        Returns
+        -------
+        h5py.File
+            Open HDF5 file instance
+        """
+        if self._pid != os.getpid():
+            self.reset_handles()
+
+        with self._lock:
+            if file_idx not in self._handles:
+                self._handles[file_idx] = h5py.File(
+                        self.file_paths[file_idx], 'r')
+
+            return self._handles[file_idx]
+
     def get(self, idx):
         """Returns a specific entry in the file.
 
@@ -128,6 +312,11 @@ class HDF5Reader(ReaderBase):
         """
         # Get the appropriate entry index
         assert idx < len(self.entry_index)
+
+        # If requested, load the entry from a block of entries
+        if self.chunk_size is not None:
+            return self.get_chunked(idx)
+
         file_idx  = self.get_file_index(idx)
         entry_idx = self.get_file_entry_index(idx)
 
@@ -140,6 +329,140 @@ class HDF5Reader(ReaderBase):
 
         return data
 
+    def get_chunked(self, idx):
+        """Returns a specific entry in the file, using the block cache.
+
+        Each entry of a block is only handed out once, such that the
+        returned dictionaries are never shared between two calls. An entry
+        requested a second time is simply reloaded from its open file.
+
+        Blocks are only loaded (and prefetched) when the entries are accessed
+        in order, i.e. when the entry belongs to the block of the previous
+        entry or to the next one. Otherwise, only the entry itself is loaded.
+
+        Parameters
+        ----------
+        idx : int
+            Integer entry ID to access
+
+        Returns
+        -------
+        data : dict
+            Ditionary of data products corresponding to one event
+        """
+        # Make sure the cache belongs to this process
+        if self._pid != os.getpid():
+            self.reset_handles()
+
+        # If the entry does not follow the previous one, load it on its own
+        block_id = idx//self.chunk_size
+        last_idx = self._last_idx
+        if (last_idx is not None and
+            block_id - last_idx//self.chunk_size not in (0, 1)):
+            self.clear_blocks()
+            self._last_idx = idx
+            return self.load_entries([idx])[idx]
+
+        self._last_idx = idx
+
+        # Fetch the block the entry belongs to, load it if needed
+        if block_id not in self._blocks:
+            future = self._futures.pop(block_id, None)
+            if future is not None:
+                self._blocks[block_id] = future.result()
+            else:
+                self._blocks[block_id] = self.load_block(block_id)
+
+        # Only keep the current block in memory, prefetch the next one
+        for key in list(self._blocks):
+            if key != block_id:
+                del self._blocks[key]
+        for key in list(self._futures):
+            if key != block_id + 1:
+                self._futures.pop(key).cancel()
+
+        num_blocks = (len(self.entry_index) - 1)//self.chunk_size + 1
+        if (self.prefetch and block_id + 1 < num_blocks and
+            block_id + 1 not in self._futures):
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            self._futures[block_id + 1] = self._executor.submit(
+                    self.load_block, block_id + 1)
+
+        # Return the entry, if it has not yet been handed out
+        data = self._blocks[block_id].pop(idx, None)
+        if data is None:
+            data = self.load_entries([idx])[idx]
+
+        return data
+
+    def load_block(self, block_id):
+        """Loads all the entries of a block of the entry index.
+
+        Parameters
+        ----------
+        block_id : int
+            Index of the block of `chunk_size` entries to load
+
+        Returns
+        -------
+        Dict[int, dict]
+            Dictionary which maps each index in the block onto its data
+        """
+        start = block_id*self.chunk_size
+        stop = min(start + self.chunk_size, len(self.entry_index))
+
+        return self.load_entries(np.arange(start, stop))
+
+    def load_entries(self, indexes):
+        """Loads a set of entries using the pool of open files.
+
+        The `events` rows of each file are read in one contiguous slice, if
+        the requested entries are dense enough, or selected by sorted index.
+
+        Parameters
+        ----------
+        indexes : np.ndarray
+            List of integer entry IDs to access
+
+        Returns
+        -------
+        Dict[int, dict]
+            Dictionary which maps each index onto its data
+        """
+        # Fetch the file and in-file entry index of each requested entry
+        indexes = np.asarray(indexes, dtype=np.int64)
+        entry_index = self.entry_index[indexes]
+        file_index = self.file_index[entry_index]
+        file_entry_index = entry_index - self.file_offsets[file_index]
+
+        # Loop over the files represented in the list
+        result = {}
+        for file_idx in np.unique(file_index):
+            # Read all the event rows needed from this file at once. Only read
+            # a contiguous slice if it is not much larger than what is needed
+            in_file = self.get_handle(file_idx)
+            mask = np.where(file_index == file_idx)[0]
+            rows = np.unique(file_entry_index[mask])
+            first, last = rows[0], rows[-1]
+            if last - first + 1 <= MAX_SPAN_RATIO*len(rows):
+                events = in_file['events'][first:last + 1]
+                positions = file_entry_index[mask] - first
+            else:
+                events = in_file['events'][rows]
+                positions = np.searchsorted(rows, file_entry_index[mask])
+
+            # Load the data products of each entry
+            for i, pos in zip(mask, positions):
+                event = events[pos]
+                data = {'file_index': file_idx}
+                for key in event.dtype.names:
+                    self.load_key(in_file, event, data, key)
+
+                result[indexes[i]] = data
+
+        return result
+
     def load_key(self, in_file, event, data, key):
         """Fetch a specific key for a specific event.
 
@@ -167,22 +490,8 @@ class HDF5Reader(ReaderBase):
 
             else:
                 # If the dataset has multiple attributes, it contains an object.
-                # Start by fetching the appropriate class to rebuild
                 array = in_file[key][region_ref]
-                class_name = in_file[key].attrs['class_name']
-                obj_class = getattr(spine.data, class_name)
-
-                # Load the object
-                names = array.dtype.names
-                data[key] = []
-                for i, el in enumerate(array):
-                    obj_dict = dict(zip(names, el))
-                    if self.build_classes:
-                        data[key].append(obj_class(**obj_dict))
-                    else:
-                        data[key].append(obj_dict)
-                if in_file[key].attrs['scalar']:
-                    data[key] = data[key][0]
+                data[key] = self.load_objects(in_file[key], array, key)
 
         else:
             # If the reference points at a group, unpack
@@ -203,3 +512,46 @@ class HDF5Reader(ReaderBase):
                                 -1, in_file[key][f'element_{i}'].shape[1])
 
             data[key] = ret
+
+    def load_objects(self, dataset, array, key):
+        """Builds back the objects stored in a structured array.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+            Dataset in which the objects are stored
+        array : np.ndarray
+            Structured array of stored object attributes, one row per object
+        key: str
+            Name of the dataset in the entry
+
+        Returns
+        -------
+        Union[object, List[object], np.ndarray, ObjectColumns]
+            Object(s) in the requested format
+        """
+        # If the objects are not to be built, return the structured array
+        scalar = dataset.attrs['scalar']
+        mode = self.object_modes.get(key, self.object_mode)
+        if mode == 'columns':
+            return array[0] if scalar else array
+
+        # Fetch the appropriate class to rebuild
+        class_name = dataset.attrs['class_name']
+        obj_class = getattr(spine.data, class_name)
+        if mode == 'lazy' and not scalar:
+            return spine.data.ObjectColumns(array, obj_class)
+
+        # Build the objects, one column at a time to avoid fetching
+        # each attribute of each row of the structured array separately
+        names = array.dtype.names
+        columns = [array[name] for name in names]
+        objects = []
+        for values in zip(*columns):
+            obj_dict = dict(zip(names, values))
+            if self.build_classes:
+                objects.append(obj_class(**obj_dict))
+            else:
+                objects.append(obj_dict)
+
+        return objects[0] if scalar else objects
@@ -0,0 +1,227 @@
+"""Contains a persistent index of the files read by the data readers.
+
+Building the list of entries of a large dataset requires opening every file
+to count its entries and, if a run map is requested, to read the run
+information of every entry. The :class:`FileIndex` class stores this
+information in a sidecar file, such that it only has to be computed once per
+file. Each file is identified by its absolute path, size and modification
+time: a file which has been modified since it was indexed is considered stale
+and gets scanned again.
+"""
+
+import os
+from warnings import warn
+
+import numpy as np
+
+__all__ = ['FileIndex']
+
+
+class FileIndex:
+    """Persistent index of the number of entries and the run information
+    of each entry in a list of files.
+
+    The index is stored as a single `.npz` archive with the following arrays:
+      - `paths`: absolute path of each indexed file
+      - `sizes`: size of each file, in bytes
+      - `mtimes`: modification time of each file, in nanoseconds
+      - `counts`: number of entries in each file
+      - `has_run_info`: whether the run information of the file is stored
+      - `run_info`: (run, subrun, event) triplet of each entry, concatenated
+        over all the files (files without run information are skipped)
+
+    The archive is only loaded the first time the index is accessed.
+
+    Attributes
+    ----------
+    path : str
+        Path to the index file
+    modified : bool
+        Whether the index has been updated since it was loaded
+    """
+
+    def __init__(self, path):
+        """Initialize the file index.
+
+        Parameters
+        ----------
+        path : str
+            Path to the index file. If it does not exist, an empty index is
+            initialized and the file will be created on :meth:`save`.
+        """
+        self.path = path
+        self.modified = False
+        self._files = None
+
+    def __len__(self):
+        """Returns the number of files in the index.
+
+        Returns
+        -------
+        int
+            Number of files in the index
+        """
+        return len(self.files)
+
+    @property
+    def files(self):
+        """Dictionary which maps each indexed file path onto its information.
+
+        Returns
+        -------
+        Dict[str, dict]
+            Information about each file in the index
+        """
+        if self._files is None:
+            self.load()
+
+        return self._files
+
+    def load(self):
+        """Loads the index from disk, if it exists."""
+        self._files = {}
+        if not os.path.isfile(self.path):
+            return
+
+        with np.load(self.path) as archive:
+            paths, sizes = archive['paths'], archive['sizes']
+            mtimes, counts = archive['mtimes'], archive['counts']
+            has_run_info, run_info = archive['has_run_info'], archive['run_info']
+
+        offset = 0
+        for i, path in enumerate(paths):
+            info = None
+            if has_run_info[i]:
+                info = run_info[offset:offset + counts[i]]
+                offset += counts[i]
+
+            self._files[str(path)] = {
+                    'size': int(sizes[i]), 'mtime': int(mtimes[i]),
+                    'count': int(counts[i]), 'run_info': info}
+
+    def save(self):
+        """Writes the index to disk.
+
+        The archive is written to a temporary file first and then moved in
+        place, such that concurrent readers never see a partial index.
+        """
+        # Convert the index to flat arrays
+        paths = list(self.files.keys())
+        infos = list(self.files.values())
+        run_info = [info['run_info'] for info in infos
+                    if info['run_info'] is not None]
+        arrays = {
+            'paths': np.array(paths, dtype=str),
+            'sizes': np.array([info['size'] for info in infos], dtype=np.int64),
+            'mtimes': np.array(
+                [info['mtime'] for info in infos], dtype=np.int64),
+            'counts': np.array(
+                [info['count'] for info in infos], dtype=np.int64),
+            'has_run_info': np.array(
+                [info['run_info'] is not None for info in infos], dtype=bool),
+            'run_info': (np.concatenate(run_info) if len(run_info)
+                         else np.empty((0, 3), dtype=np.int64))
+        }
+
+        # Write the archive atomically
+        tmp_path = f'{self.path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, self.path)
+        self.modified = False
+
+    def get(self, file_path, run_info=False):
+        """Fetches the information about one file, if it is up to date.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file
+        run_info : bool, default False
+            If `True`, the run information of the file must be available
+
+        Returns
+        -------
+        dict
+            Dictionary with the number of entries (`count`) and the run
+            information (`run_info`) of the file. If the file is not in the
+            index or if it is stale, returns `None`.
+        """
+        info = self.files.get(os.path.abspath(file_path), None)
+        if info is None:
+            return None
+
+        stat = os.stat(file_path)
+        if info['size'] != stat.st_size or info['mtime'] != stat.st_mtime_ns:
+            return None
+
+        if run_info and info['run_info'] is None:
+            return None
+
+        return info
+
+    def update(self, file_path, count, run_info=None):
+        """Registers the information about one file in the index.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file
+        count : int
+            Number of entries in the file
+        run_info : np.ndarray, optional
+            (N, 3) Array of (run, subrun, event) triplets, one per entry
+        """
+        if run_info is not None:
+            run_info = np.asarray(run_info, dtype=np.int64).reshape(-1, 3)
+            assert len(run_info) == count, (
+                    f"The number of run information triplets ({len(run_info)}) "
+                    f"does not match the number of entries ({count}).")
+
+        stat = os.stat(file_path)
+        self.files[os.path.abspath(file_path)] = {
+                'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                'count': int(count), 'run_info': run_info}
+        self.modified = True
+
+    def scan(self, file_paths, scan_fn, run_info=False):
+        """Fetches the information about a list of files, scanning the files
+        which are missing from the index or stale.
+
+        Parameters
+        ----------
+        file_paths : List[str]
+            List of file paths
+        scan_fn : callable
+            Function which takes a file path and returns its number of entries
+            and run information (or `None` if it is not available)
+        run_info : bool, default False
+            If `True`, the run information of each file must be available
+
+        Returns
+        -------
+        counts : np.ndarray
+            (F) Number of entries in each file
+        run_info : List[np.ndarray]
+            (F) Run information of each file (`None` if not available)
+        """
+        counts = np.empty(len(file_paths), dtype=np.int64)
+        run_infos = []
+        for i, path in enumerate(file_paths):
+            info = self.get(path, run_info)
+            if info is None:
+                self.update(path, *scan_fn(path))
+                info = self.get(path)
+
+            counts[i] = info['count']
+            run_infos.append(info['run_info'])
+
+        return counts, run_infos
+
+    def save_if_modified(self):
+        """Writes the index to disk if it was updated, warns if not possible.
+        """
+        if self.modified:
+            try:
+                self.save()
+            except OSError as err:
+                warn(f"Could not update the file index at {self.path}: {err}")
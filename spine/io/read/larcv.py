@@ -33,7 +33,7 @@ class LArCVReader(ReaderBase):
                  max_print_files=10, n_entry=None, n_skip=None,
                  entry_list=None, skip_entry_list=None, run_event_list=None,
                  skip_run_event_list=None, create_run_map=False,
-                 run_info_key=None):
+                 run_info_key=None, index_path=None):
         """Initialize the LArCV file reader.
 
         Parameters
@@ -63,6 +63,12 @@ class LArCVReader(ReaderBase):
             files, this can be quite expensive (must load every entry).
         run_info_key : str, optional
             Key of the tree in the file to get the run information from
+        index_path : str, optional
+            Path to a persistent index of the number of entries and the run
+            information in each file (see :class:`FileIndex`). If provided,
+            only the files missing from the index (or modified since they
+            were indexed) are opened at initialization. The entry counts of
+            the other trees are then assumed to match that of the first tree.
         """
         # Process the file_paths
         self.process_file_paths(file_keys, limit_num_files, max_print_files)
@@ -71,9 +77,74 @@ class LArCVReader(ReaderBase):
         if run_event_list is not None or skip_run_event_list is not None:
             create_run_map = True
 
-        # Prepare TTrees and load files
-        self.trees = {}
+        # Check that the run information can be loaded, if needed
+        if create_run_map:
+            assert run_info_key is not None and run_info_key in tree_keys, (
+                    "Must provide the `run_info_key` if a run maps is needed. "
+                    "The key must appear in the list of `tree_keys`")
+
+        # If a file index is provided, fetch the file information from it
+        self.trees = {key: None for key in tree_keys}
         self.trees_ready = False
+        if index_path is not None:
+            self.load_file_index(
+                    tree_keys[0], run_info_key, index_path, create_run_map)
+
+        else:
+            self.load_file_info(
+                    tree_keys, run_info_key, create_run_map)
+
+        # Process the run information
+        self.process_run_info()
+
+        # Process the entry list
+        self.process_entry_list(
+                n_entry, n_skip, entry_list, skip_entry_list,
+                run_event_list, skip_run_event_list)
+
+    def load_file_index(self, tree_key, run_info_key, index_path,
+                        create_run_map):
+        """Fetches the number of entries and the run information of each file
+        from a persistent file index.
+
+        Parameters
+        ----------
+        tree_key : str
+            Key of the tree used to count the entries in each file
+        run_info_key : str
+            Key of the tree in the file to get the run information from
+        index_path : str
+            Path to the persistent file index
+        create_run_map : bool
+            Whether the run information must be loaded
+        """
+        # Fetch the file information
+        counts, self.run_info = self.process_file_info(
+                lambda path: self.scan_file(path, tree_key, run_info_key),
+                index_path, create_run_map)
+
+        # Build the file offsets and the file index
+        self.num_entries = int(np.sum(counts))
+        self.file_offsets = np.cumsum(counts) - counts
+        self.file_index = np.repeat(np.arange(len(self.file_paths)), counts)
+
+        # Dump the number of entries to load
+        print(f"Total number of entries in the file(s): {self.num_entries}\n")
+
+    def load_file_info(self, tree_keys, run_info_key, create_run_map):
+        """Fetches the number of entries and the run information of each file
+        by chaining all the files.
+
+        Parameters
+        ----------
+        tree_keys : List[str]
+            List of data keys to load from the LArCV files
+        run_info_key : str
+            Key of the tree in the file to get the run information from
+        create_run_map : bool
+            Whether the run information must be loaded
+        """
+        # Prepare TTrees and load files
         self.file_offsets = np.empty(len(self.file_paths), dtype=np.int64)
         file_counts = []
         for key in tree_keys:
@@ -96,8 +167,6 @@ class LArCVReader(ReaderBase):
                         f"in other data products ({self.num_entries}).")
             else:
                 self.num_entries = chain.GetEntries()
-
-            self.trees[key] = None
         print("")
 
         # Dump the number of entries to load
@@ -110,9 +179,6 @@ class LArCVReader(ReaderBase):
         # If requested, must extract the run information for each entry
         if create_run_map:
             # Initialize the TChain object
-            assert run_info_key is not None and run_info_key in tree_keys, (
-                    "Must provide the `run_info_key` if a run maps is needed. "
-                    "The key must appear in the list of `tree_keys`")
             chain = ROOT.TChain(f'{run_info_key}_tree') # pylint: disable=E1101
             for f in self.file_paths:
                 chain.AddFile(f)
@@ -124,14 +190,6 @@ class LArCVReader(ReaderBase):
                 source = getattr(chain, f'{run_info_key}_branch')
                 self.run_info[i] = [source.run(), source.event()]
 
-        # Process the run information
-        self.process_run_info()
-
-        # Process the entry list
-        self.process_entry_list(
-                n_entry, n_skip, entry_list, skip_entry_list,
-                run_event_list, skip_run_event_list)
-
     def get(self, idx):
         """Returns a specific entry in the file.
 
@@ -169,6 +227,45 @@ class LArCVReader(ReaderBase):
 
         return data
 
+    @staticmethod
+    def scan_file(file_path, tree_key, run_info_key=None):
+        """Counts the entries in a file and fetches their run information.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the LArCV file
+        tree_key : str
+            Key of the tree used to count the entries in the file
+        run_info_key : str, optional
+            Key of the tree in the file to get the run information from
+
+        Returns
+        -------
+        num_entries : int
+            Number of entries in the file
+        run_info : np.ndarray
+            (N, 3) Array of (run, subrun, event) triplets, one per entry. If
+            no run information is requested, returns `None`.
+        """
+        # Count the entries
+        f = ROOT.TFile.Open(file_path, 'r') # pylint: disable=E1101
+        num_entries = getattr(f, f'{tree_key}_tree').GetEntries()
+
+        # Fetch the run information, if requested
+        run_info = None
+        if run_info_key is not None:
+            tree = getattr(f, f'{run_info_key}_tree')
+            run_info = np.empty((tree.GetEntries(), 3), dtype=np.int64)
+            for i in range(len(run_info)):
+                tree.GetEntry(i)
+                source = getattr(tree, f'{run_info_key}_branch')
+                run_info[i] = [source.run(), source.subrun(), source.event()]
+
+        f.Close()
+
+        return num_entries, run_info
+
     @staticmethod
     def list_data(file_path):
         """Dumps top-level information about the contents of a LArCV root file.
@@ -1,6 +1,8 @@
 """Used to define which dataset entries to load at each iteration"""
 
+import math
 import time
+from warnings import warn
 
 import numpy as np
 
@@ -8,7 +10,7 @@ from torch.utils.data import Sampler
 from torch.utils.data.distributed import DistributedSampler
 
 __all__ = ['SequentialBatchSampler', 'RandomSequenceBatchSampler',
-           'BootstrapBatchSampler']
+           'BootstrapBatchSampler', 'BudgetBatchSampler']
 
 
 class AbstractBatchSampler(Sampler):
@@ -18,7 +20,12 @@ class AbstractBatchSampler(Sampler):
     Just define the __len__ and __iter__ functions. __init__ defines
     self.num_samples and self.batch_size as well as a self._random
     RNG, if needed.
+
+    Samplers which set the `batched` attribute to `True` yield lists of
+    entries (one per batch) rather than single entries. They are to be
+    given to the loader as a `batch_sampler`.
     """
+    batched = False
 
     def __init__(self, dataset, batch_size, seed=None, drop_last=True):
         """Check and store the values passed to the initializer,
@@ -37,9 +44,7 @@ class AbstractBatchSampler(Sampler):
             multiple of the batch_size (if needed)
         """
         # Initialize parent class
-        # TODO: `data_source` id deprecated, will need to remove with newer
-        # version of pytorch (2.2.0 and above)
-        super().__init__(data_source=None)
+        super().__init__()
 
         # Initialize the random number generator with a seed
         if seed is None:
@@ -153,6 +158,148 @@ class BootstrapBatchSampler(AbstractBatchSampler):
         return iter(np.concatenate(batches))
 
 
+class BudgetBatchSampler(AbstractBatchSampler):
+    """Samples batches of variable size which do not exceed a budget.
+
+    Rather than grouping a fixed number of entries, this sampler groups
+    entries in random order until the next one would take the total size of
+    the batch (e.g. number of voxels or edges) above a budget. The size of
+    each entry is read from a precomputed `.npy` size index which contains
+    one size per entry in the files (see `bin/build_size_index.py`).
+
+    The batches of an epoch are drawn from the seeded random number
+    generator as soon as the length of the sampler is requested, such that
+    the number of batches is known before iterating and the batch
+    composition is reproducible for a given seed.
+
+    .. code-block:: yaml
+
+        sampler:
+          name: budget
+          budget: 1000000
+          size_index: /path/to/size_index.npy
+    """
+    name = 'budget'
+    batched = True
+
+    def __init__(self, dataset, budget, size_index, batch_size=None,
+                 max_batch_size=None, shuffle=True, seed=None):
+        """Check and store the values passed to the initializer,
+        load the size index.
+
+        Parameters
+        ----------
+        dataset : torch.utils.data.Dataset
+            Dataset to sampler from
+        budget : int
+            Maximum total size of the entries in a batch. An entry which is
+            larger than the budget on its own forms its own batch
+        size_index : str
+            Path to a `.npy` file which contains the size of each entry
+        batch_size : int, optional
+            Not used, the number of entries per batch is set by the budget
+        max_batch_size : int, optional
+            Maximum number of entries per batch
+        shuffle : bool, default True
+            If `True`, shuffle the entries before grouping them in batches
+        seed : int, optional
+            Seed to use for random sampling
+        """
+        # Initialize the parent class (keep every entry)
+        super().__init__(dataset, 1, seed, drop_last=False)
+
+        # Check that the budget is a sensible value
+        assert budget > 0, "The `budget` must be a positive number."
+        assert max_batch_size is None or max_batch_size > 0, (
+                "If provided, `max_batch_size` must be a positive integer.")
+        self.budget = budget
+        self.batch_size = batch_size
+        self.max_batch_size = max_batch_size
+        self.shuffle = shuffle
+
+        # Load the size index, restrict it to the entries of the dataset
+        sizes = np.load(size_index)
+        if hasattr(dataset, 'reader'):
+            entry_index = dataset.reader.entry_index
+            assert len(sizes) > np.max(entry_index), (
+                    f"The size index ({len(sizes)} entries) does not cover "
+                     "all the entries of the dataset.")
+            sizes = sizes[entry_index]
+
+        assert len(sizes) == self.num_samples, (
+                f"The size index ({len(sizes)} entries) does not match the "
+                f"number of entries in the dataset ({self.num_samples}).")
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+
+        num_over = np.sum(self.sizes > budget)
+        if num_over:
+            warn(f"{num_over} entries are larger than the budget ({budget}) "
+                  "on their own, each will form its own batch.")
+
+        # Batches of the upcoming epoch
+        self._batches = None
+
+    def __len__(self):
+        """Provides the number of batches in the upcoming epoch.
+
+        Returns
+        -------
+        int
+            Number of batches
+        """
+        return len(self.batches)
+
+    @property
+    def batches(self):
+        """List of batches of the upcoming epoch, drawn when first accessed.
+
+        Returns
+        -------
+        List[np.ndarray]
+            List of entry indexes in each batch
+        """
+        if self._batches is None:
+            self._batches = self.build_batches()
+
+        return self._batches
+
+    def build_batches(self):
+        """Groups the entries into batches which do not exceed the budget.
+
+        Returns
+        -------
+        List[np.ndarray]
+            List of entry indexes in each batch
+        """
+        # Define the order in which the entries are grouped
+        order = np.arange(self.num_samples, dtype=int)
+        if self.shuffle:
+            self._random.shuffle(order)
+
+        # Greedily fill each batch until it is full
+        batches, start, total = [], 0, 0
+        for i, size in enumerate(self.sizes[order]):
+            count = i - start
+            full = (self.max_batch_size is not None and
+                    count == self.max_batch_size)
+            if count and (full or total + size > self.budget):
+                batches.append(order[start:i])
+                start, total = i, 0
+
+            total += size
+
+        batches.append(order[start:])
+
+        return batches
+
+    def __iter__(self):
+        """Iterates over the batches of the epoch, draws the next ones."""
+        batches = self.batches
+        self._batches = None
+
+        return iter([batch.tolist() for batch in batches])
+
+
 class DistributedProxySampler(DistributedSampler):
     """Sampler that restricts data loading to a subset of input sampler indices.
 
@@ -176,10 +323,13 @@ class DistributedProxySampler(DistributedSampler):
 
         Notes
         -----
-        Input sampler is assumed to be of constant size.
+        Input sampler is assumed to be of constant size, unless it is a
+        batched sampler. In that case, whole batches are distributed to the
+        replicas in turn.
         """
         # Make sure the batch_size is a multiple of the number of replicas
-        assert sampler.batch_size%num_replicas == 0, (
+        self.batched = getattr(sampler, 'batched', False)
+        assert self.batched or sampler.batch_size%num_replicas == 0, (
                 f"The `batch_size` ({sampler.batch_size}) must be a multiple "
                 f"of the number of replicas ({num_replicas}) in the "
                  "distributed training process.")
@@ -187,16 +337,36 @@ class DistributedProxySampler(DistributedSampler):
         # Initialiaze the parent distributed sampler
         super().__init__(
                 sampler, num_replicas=num_replicas, rank=rank,
-                drop_last=sampler.drop_last, shuffle=False)
+                drop_last=sampler.drop_last or self.batched, shuffle=False)
 
         # Store the underlying sampler and its parameters
         self.sampler = sampler
         self.batch_size = sampler.batch_size
 
+    def __len__(self):
+        """Provides the number of entries (or batches) sampled by this rank.
+
+        Returns
+        -------
+        int
+            Number of entries (or batches) to sample
+        """
+        if self.batched:
+            return len(self.sampler)//self.num_replicas
+
+        return self.num_samples
+
     def __iter__(self):
         """Overrides the basic iterator with one that takes into account
         the number of replicas and the rank of the sampler.
         """
+        # If the sampler produces batches, give every replica the same number
+        # of whole batches in turn, drop the remainder
+        if self.batched:
+            num_batches = len(self)*self.num_replicas
+            batches = list(self.sampler)[:num_batches]
+            return iter(batches[self.rank::self.num_replicas])
+
         # Fetch the list of non-distributed indices
         indices = list(self.sampler)
 
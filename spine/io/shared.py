@@ -0,0 +1,475 @@
+"""Shared-memory transport of parsed data between loader workers.
+
+By default, every batch produced by a :class:`torch.utils.data.DataLoader`
+worker is pickled and sent back to the main process through a pipe, which
+involves serializing and copying every voxel and label tensor it contains.
+
+The classes in this module provide an alternative transport:
+- Each worker writes the arrays of the parsed entries of a batch into one
+  slab of a ring of shared-memory segments and only sends back a light
+  descriptor of where each array lives;
+- The main process maps the arrays of the slab without copying them, hands
+  them to the collate function (which builds the batch tensors from them)
+  and releases the slab so that the worker can reuse it.
+"""
+
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from warnings import warn
+
+import numpy as np
+from torch.utils.data import DataLoader, get_worker_info
+
+__all__ = ['SharedMemoryRing', 'SharedMemoryCollate', 'SharedMemoryLoader']
+
+# Alignment of the arrays stored in a slab, in bytes
+SHARED_ALIGN = 64
+
+
+@dataclass
+class SharedArray:
+    """Descriptor of an array stored in a shared-memory slab.
+
+    Attributes
+    ----------
+    offset : int
+        Location of the first byte of the array in the slab
+    dtype : str
+        Data type of the array
+    shape : tuple
+        Shape of the array
+    """
+    offset: int
+    dtype: str
+    shape: tuple
+
+
+@dataclass
+class SharedBatch:
+    """Descriptor of a batch of parsed entries stored in a shared-memory slab.
+
+    Attributes
+    ----------
+    slab_id : int
+        Index of the slab in the ring. If `None`, the batch could not fit
+        in a slab and the entries hold the arrays themselves.
+    entries : List[dict]
+        List of parsed entries in which arrays are replaced by descriptors
+    """
+    slab_id: int
+    entries: list
+
+
+class SharedMemoryRing:
+    """Ring of shared-memory slabs used to transfer parsed entries from
+    loader workers to the main process.
+
+    Each worker owns `num_slabs` slabs of the ring, such that there is no
+    need to synchronize the workers between themselves. A status flag per
+    slab records whether it is free (0) or holds a batch which has not been
+    collated yet (1). Only the owning worker sets the flag of a slab and only
+    the main process clears it, once the batch is collated.
+    """
+
+    def __init__(self, num_workers, num_slabs, slab_size):
+        """Allocates the shared-memory slabs.
+
+        Parameters
+        ----------
+        num_workers : int
+            Number of loader workers
+        num_slabs : int
+            Number of slabs per worker. Must be larger than the number of
+            batches each worker can have in flight at any one time
+        slab_size : int
+            Size of each slab, in bytes
+        """
+        # Allocate the slabs and the status flags
+        self.num_workers = num_workers
+        self.num_slabs = num_slabs
+        self.slab_size = slab_size
+        self.slabs = [SharedMemory(create=True, size=slab_size)
+                      for _ in range(num_workers*num_slabs)]
+        self.flags = SharedMemory(create=True, size=num_workers*num_slabs)
+
+        # Record which process owns the shared memory
+        self.owner = os.getpid()
+        self.status[:] = 0
+        self.overflow = False
+
+        # Make sure the shared memory is freed when the ring is garbage
+        # collected or when the process exits, whichever comes first
+        self._finalizer = weakref.finalize(
+                self, self.free, self.slabs, self.flags, self.owner)
+
+    def __getstate__(self):
+        """Drops the numpy views of the slabs before the ring gets pickled.
+
+        Returns
+        -------
+        dict
+            Picklable state of the ring
+        """
+        state = self.__dict__.copy()
+        state.pop('_buffers', None)
+        state.pop('_status', None)
+        state.pop('_finalizer', None)
+
+        return state
+
+    @property
+    def buffers(self):
+        """Byte views of each of the slabs in the ring.
+
+        Returns
+        -------
+        List[np.ndarray]
+            (S) List of slab buffers
+        """
+        if getattr(self, '_buffers', None) is None:
+            self._buffers = [np.ndarray(slab.size, dtype=np.uint8,
+                                        buffer=slab.buf) for slab in self.slabs]
+
+        return self._buffers
+
+    @property
+    def status(self):
+        """Status flag of each of the slabs in the ring.
+
+        Returns
+        -------
+        np.ndarray
+            (S) Array of slab status flags
+        """
+        if getattr(self, '_status', None) is None:
+            self._status = np.ndarray(
+                    len(self.slabs), dtype=np.uint8, buffer=self.flags.buf)
+
+        return self._status
+
+    def acquire(self):
+        """Waits for one of the slabs of the current worker to be free.
+
+        Returns
+        -------
+        int
+            Index of the free slab
+        """
+        # Fetch the range of slabs owned by this worker
+        info = get_worker_info()
+        worker_id = info.id if info is not None else 0
+        first = worker_id*self.num_slabs
+        slab_ids = range(first, first + self.num_slabs)
+
+        # Wait until one of them has been released by the main process
+        while True:
+            for slab_id in slab_ids:
+                if not self.status[slab_id]:
+                    return slab_id
+
+            time.sleep(1e-4)
+
+    def pack(self, batch):
+        """Writes the arrays of a list of parsed entries into a free slab.
+
+        Parameters
+        ----------
+        batch : List[dict]
+            List of parsed entries
+
+        Returns
+        -------
+        SharedBatch
+            Descriptor of the batch
+        """
+        # Copy each array of each entry in the slab
+        slab_id = self.acquire()
+        buffer = self.buffers[slab_id]
+        entries, offset = [], 0
+        try:
+            for sample in batch:
+                entry = {}
+                for key, value in sample.items():
+                    entry[key], offset = self.store(buffer, offset, value)
+                entries.append(entry)
+
+        except MemoryError:
+            # If the batch does not fit in a slab, send it as is
+            if not self.overflow:
+                warn(f"A batch does not fit in a {self.slab_size} bytes "
+                      "shared-memory slab, it is sent through a pipe. "
+                      "Consider increasing the slab size.")
+                self.overflow = True
+
+            return SharedBatch(None, batch)
+
+        # Flag the slab as in use
+        self.status[slab_id] = 1
+
+        return SharedBatch(slab_id, entries)
+
+    @staticmethod
+    def store(buffer, offset, value):
+        """Writes a parsed value into a slab, if it holds arrays.
+
+        Only standalone arrays and arrays within the (voxels, features, meta)
+        or (index, offset) tuples produced by the parsers are moved to the
+        slab. These are the values that the collate function copies into
+        fresh batch tensors, which allows the slab to be reused once the
+        batch is collated. Every other value is sent as is.
+
+        Parameters
+        ----------
+        buffer : np.ndarray
+            Byte view of the slab
+        offset : int
+            Location of the first free byte in the slab
+        value : object
+            Parsed value
+
+        Returns
+        -------
+        object
+            Descriptor of the value
+        int
+            Location of the first free byte in the slab after the value
+        """
+        # Dispatch
+        if isinstance(value, tuple) and len(value) in (2, 3):
+            items = []
+            for item in value:
+                if isinstance(item, np.ndarray) and item.dtype != object:
+                    item, offset = SharedMemoryRing.store(buffer, offset, item)
+                items.append(item)
+
+            return tuple(items), offset
+
+        if not isinstance(value, np.ndarray) or value.dtype == object:
+            return value, offset
+
+        # Copy the array into the slab
+        start = -(-offset//SHARED_ALIGN)*SHARED_ALIGN
+        end = start + value.nbytes
+        if end > len(buffer):
+            raise MemoryError("The array does not fit in the slab.")
+
+        view = buffer[start:end].view(value.dtype).reshape(value.shape)
+        view[...] = value
+
+        return SharedArray(start, value.dtype.str, value.shape), end
+
+    def load(self, shared_batch):
+        """Maps the arrays of a batch stored in a slab.
+
+        Parameters
+        ----------
+        shared_batch : SharedBatch
+            Descriptor of the batch
+
+        Returns
+        -------
+        List[dict]
+            List of parsed entries, which arrays are views of the slab
+        """
+        # If the batch was sent as is, nothing to do
+        if shared_batch.slab_id is None:
+            return shared_batch.entries
+
+        # Replace the descriptors with views of the slab
+        buffer = self.buffers[shared_batch.slab_id]
+        def fetch(value):
+            if isinstance(value, SharedArray):
+                dtype = np.dtype(value.dtype)
+                end = value.offset + dtype.itemsize*int(np.prod(value.shape))
+                return buffer[value.offset:end].view(dtype).reshape(
+                        value.shape)
+
+            if isinstance(value, tuple):
+                return tuple(fetch(item) for item in value)
+
+            return value
+
+        return [{key: fetch(value) for key, value in entry.items()}
+                for entry in shared_batch.entries]
+
+    def release(self, shared_batch):
+        """Frees the slab which holds a batch, once it is collated.
+
+        Parameters
+        ----------
+        shared_batch : SharedBatch
+            Descriptor of the batch
+        """
+        if shared_batch.slab_id is not None:
+            self.status[shared_batch.slab_id] = 0
+
+    def close(self):
+        """Frees the shared memory, if this process owns it."""
+        if os.getpid() != self.owner or self.flags is None:
+            return
+
+        self._buffers, self._status = None, None
+        self._finalizer()
+        self.slabs, self.flags = [], None
+
+    @staticmethod
+    def free(slabs, flags, owner):
+        """Frees shared memory segments, if this process owns them.
+
+        Parameters
+        ----------
+        slabs : List[SharedMemory]
+            List of slabs in the ring
+        flags : SharedMemory
+            Status flags of the slabs
+        owner : int
+            ID of the process which owns the shared memory
+        """
+        if os.getpid() != owner:
+            return
+
+        for shm in [*slabs, flags]:
+            try:
+                shm.close()
+            except BufferError:
+                # Some views are still in use, the memory is freed when
+                # they go out of scope
+                pass
+            shm.unlink()
+
+
+class SharedMemoryCollate:
+    """Collate function run in the loader workers when the shared-memory
+    transport is used.
+
+    Rather than collating the parsed entries, it writes them into the shared
+    memory ring and returns a descriptor of the batch. The attributes of the
+    underlying collate function are accessible through this class.
+    """
+
+    def __init__(self, collate_fn, ring):
+        """Stores the underlying collate function and the ring.
+
+        Parameters
+        ----------
+        collate_fn : callable
+            Function used to collate the entries in the main process
+        ring : SharedMemoryRing
+            Ring of shared-memory slabs
+        """
+        self.collate_fn = collate_fn
+        self.ring = ring
+
+    def __getattr__(self, name):
+        """Fetches missing attributes from the underlying collate function.
+
+        Parameters
+        ----------
+        name : str
+            Name of the attribute
+        """
+        if name in ('collate_fn', 'ring'):
+            raise AttributeError(name)
+
+        return getattr(self.collate_fn, name)
+
+    def __call__(self, batch):
+        """Packs a list of parsed entries into the shared memory ring.
+
+        Parameters
+        ----------
+        batch : List[dict]
+            List of parsed entries
+
+        Returns
+        -------
+        SharedBatch
+            Descriptor of the batch
+        """
+        return self.ring.pack(batch)
+
+
+class SharedMemoryLoader(DataLoader):
+    """Data loader which transfers the parsed entries from its workers to the
+    main process through shared memory.
+
+    The workers only parse the entries and copy their arrays into the shared
+    memory ring. The batch is collated in the main process, directly from
+    the shared memory, which avoids pickling and piping the arrays through.
+
+    The collate function must copy every array it receives into new batch
+    tensors, as the underlying memory is reused once the batch is collated
+    (this is the case of :class:`CollateAll`).
+    """
+
+    def __init__(self, dataset, collate_fn, num_workers, slab_size=128,
+                 num_slabs=None, prefetch_factor=2, **kwargs):
+        """Initialize the loader and the shared memory ring.
+
+        Parameters
+        ----------
+        dataset : torch.utils.data.Dataset
+            Dataset to load the entries from
+        collate_fn : callable
+            Function used to collate the entries in the main process
+        num_workers : int
+            Number of loader workers (must be positive)
+        slab_size : float, default 128
+            Size of each shared-memory slab in MB. Batches which do not fit
+            in a slab are sent through the regular pipe.
+        num_slabs : int, optional
+            Number of slabs per worker. By default, allocates as many slabs as
+            batches a worker can have in flight at any one time.
+        prefetch_factor : int, default 2
+            Number of batches loaded in advance by each worker
+        **kwargs : dict, optional
+            Additional arguments passed to :class:`DataLoader`
+        """
+        # Check that the transport is usable
+        assert num_workers > 0, (
+                "The shared memory transport requires at least one worker.")
+        assert collate_fn is not None, (
+                "The shared memory transport requires a collate function.")
+        assert not kwargs.get('persistent_workers', False), (
+                "The shared memory transport does not support persistent "
+                "workers.")
+
+        # Initialize the ring. Each worker has at most `prefetch_factor`
+        # batches in flight, plus the one being collated
+        if num_slabs is None:
+            num_slabs = prefetch_factor + 2
+        assert num_slabs > prefetch_factor, (
+                "There must be more slabs per worker than prefetched batches.")
+        self.ring = SharedMemoryRing(
+                num_workers, num_slabs, int(slab_size*1024**2))
+
+        # Initialize the underlying loader
+        super().__init__(
+                dataset, num_workers=num_workers,
+                collate_fn=SharedMemoryCollate(collate_fn, self.ring),
+                prefetch_factor=prefetch_factor, **kwargs)
+
+    def __iter__(self):
+        """Collates each batch from shared memory as it is received.
+
+        Yields
+        ------
+        object
+            Collated batch
+        """
+        # Free the slabs left in use by a previous, interrupted iteration
+        # (its workers are shut down before this point is reached)
+        self.ring.status[:] = 0
+
+        # Loop over the batches
+        collate_fn = self.collate_fn.collate_fn
+        for shared_batch in super().__iter__():
+            try:
+                data = collate_fn(self.ring.load(shared_batch))
+            finally:
+                self.ring.release(shared_batch)
+
+            yield data
@@ -2,3 +2,4 @@
 
 from .csv import *
 from .hdf5 import *
+from .flat import *
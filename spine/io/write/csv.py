@@ -1,6 +1,9 @@
 """Module to write log files to CSV."""
 
 import os
+from abc import ABC, abstractmethod
+
+from spine.utils.cleanup import close_on_exit
 
 __all__ = ['CSVWriter']
 
@@ -20,11 +23,22 @@ class CSVWriter:
           writer:
             name: csv
             file_name: output.csv
+
+    By default, the file is reopened and one row is written every time
+    :meth:`append` is called. If `buffer_size` is provided, the rows are
+    instead accumulated in memory, one list per column, and formatted and
+    written in blocks of `buffer_size` rows. The content of the file is
+    identical in both modes. The buffer is flushed when :meth:`close` is
+    called, which happens automatically when the writer is deleted or when
+    the process exits.
+
+    The rows can also be stored in a columnar format (`parquet` or `feather`)
+    by specifying the `backend` parameter. This requires `pyarrow`.
     """
     name = 'csv'
 
-    def __init__(self, file_name='output.csv', overwrite=False, append=False, 
-                 accept_missing=False):
+    def __init__(self, file_name='output.csv', overwrite=False, append=False,
+                 accept_missing=False, buffer_size=None, backend='csv'):
         """Initialize the basics of the output file.
 
         Parameters
@@ -37,11 +51,24 @@ class CSVWriter:
             If True, add more rows to an existing CSV file
         accept_missing : bool, default True
             Tolerate missing keys
+        buffer_size : int, optional
+            If specified, number of rows to accumulate before writing them
+            to file in one block
+        backend : str, default 'csv'
+            Output file format, one of 'csv', 'parquet' or 'feather'
         """
         # Check that output file does not already exist, if requestes
         if not overwrite and os.path.isfile(file_name):
             raise FileExistsError(f"File with name {file_name} already exists.")
 
+        # Initialize the output backend
+        assert backend in BACKENDS, (
+                f"CSVWriter backend not recognized: {backend}. Must be one "
+                f"of {list(BACKENDS.keys())}.")
+        assert not append or backend == 'csv', (
+                "Only CSV files can be appended.")
+        self.backend = BACKENDS[backend](file_name)
+
         # Store persistent attributes
         self.file_name = file_name
         self.append_file = append
@@ -55,7 +82,21 @@ class CSVWriter:
                          "the prescribed path before data is written to it.")
 
             with open(self.file_name, 'r', encoding='utf-8') as out_file:
-                self.result_keys = out_file.readline().split(',')
+                self.result_keys = out_file.readline().rstrip('\n').split(',')
+
+        # Initialize the row buffer
+        assert buffer_size is None or buffer_size > 0, (
+                "If `buffer_size` is provided, it must be larger than 0.")
+        self.buffer_size = buffer_size
+        self.buffer = None
+        self.buffer_count = 0
+        if self.result_keys is not None:
+            self.buffer = {k: [] for k in self.result_keys}
+
+        # Make sure the buffer is flushed and the file is finalized on exit
+        self._finalizer = None
+        if buffer_size is not None or backend != 'csv':
+            self._finalizer = close_on_exit(self)
 
     def create(self, result_blob):
         """Initialize the header of the CSV file, record the keys to be stored.
@@ -67,11 +108,10 @@ class CSVWriter:
         """
         # Save the list of keys to store
         self.result_keys = list(result_blob.keys())
+        self.buffer = {k: [] for k in self.result_keys}
 
         # Create a header and write it to file
-        with open(self.file_name, 'w', encoding='utf-8') as out_file:
-            header_str = ','.join(self.result_keys)
-            out_file.write(header_str + '\n')
+        self.backend.create(self.result_keys)
 
     def append(self, result_blob):
         """Append the CSV file with the output.
@@ -109,11 +149,38 @@ class CSVWriter:
                     new_result_blob[k] = v
                 result_blob = new_result_blob
 
-        # Append file
-        with open(self.file_name, 'a', encoding='utf-8') as out_file:
-            result_str = ','.join(
-                    [str(result_blob[k]) for k in self.result_keys])
-            out_file.write(result_str + '\n')
+        # Add the row to the buffer
+        for k in self.result_keys:
+            self.buffer[k].append(result_blob[k])
+        self.buffer_count += 1
+
+        # Write the buffer to file, if it is full (or if there is no buffer)
+        if self.buffer_size is None or self.buffer_count >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the content of the buffer to file."""
+        if not self.buffer_count:
+            return
+
+        self.backend.write(self.result_keys, self.buffer)
+        self.buffer = {k: [] for k in self.result_keys}
+        self.buffer_count = 0
+
+    def __del__(self):
+        """Flushes the remaining rows and finalizes the file if the writer is
+        dropped without being closed."""
+        if getattr(self, '_finalizer', None) is not None:
+            self.close()
+
+    def close(self):
+        """Flushes the buffer and finalizes the output file.
+
+        This function is called automatically when the writer is deleted
+        or when the process exits.
+        """
+        self.flush()
+        self.backend.close()
 
     @staticmethod
     def array_diff(array_x, array_y):
@@ -135,3 +202,185 @@ class CSVWriter:
             Set of keys that appear in `array_x` but not in `array_y`.
         """
         return set(array_x).difference(set(array_y))
+
+
+class CSVBackend:
+    """Writes blocks of rows to a CSV file.
+
+    Each value is formatted with `str`, such that the output is identical
+    whether the rows are written one at a time or in blocks.
+    """
+    name = 'csv'
+
+    def __init__(self, file_name):
+        """Stores the output file name.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the output file
+        """
+        self.file_name = file_name
+
+    def create(self, keys):
+        """Writes the header of the file.
+
+        Parameters
+        ----------
+        keys : List[str]
+            List of column names
+        """
+        with open(self.file_name, 'w', encoding='utf-8') as out_file:
+            out_file.write(','.join(keys) + '\n')
+
+    def write(self, keys, columns):
+        """Appends a block of rows to the file.
+
+        Parameters
+        ----------
+        keys : List[str]
+            List of column names
+        columns : Dict[str, list]
+            Values of each column in the block
+        """
+        # Format each column at once, then assemble the rows. The values are
+        # formatted with `str` rather than by numpy: `astype(str)` converts
+        # each number to its shortest representation one by one as well (it
+        # is not faster), while fixed formats (`savetxt`) change the output
+        str_columns = [list(map(str, columns[k])) for k in keys]
+        rows = map(','.join, zip(*str_columns))
+
+        # Append file
+        with open(self.file_name, 'a', encoding='utf-8') as out_file:
+            out_file.write('\n'.join(rows) + '\n')
+
+    def close(self):
+        """Nothing to finalize, the file is closed after each block."""
+
+
+class ArrowBackend(ABC):
+    """Writes blocks of rows to a columnar file using `pyarrow`.
+
+    The schema is inferred from the first block of rows. The subsequent blocks
+    are cast to that schema and appended to the open file, which is finalized
+    when :meth:`close` is called.
+    """
+    name = None
+
+    def __init__(self, file_name):
+        """Stores the output file name, checks that `pyarrow` is available.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the output file
+        """
+        try:
+            import pyarrow # pylint: disable=C0415
+        except ModuleNotFoundError as err:
+            raise ImportError(
+                    f"The `{self.name}` CSVWriter backend requires "
+                    "`pyarrow`.") from err
+
+        self.pa = pyarrow
+        self.file_name = file_name
+        self.writer = None
+        self.schema = None
+        self.closed = False
+
+    def create(self, keys):
+        """The columns are only known when the first block is written.
+
+        Parameters
+        ----------
+        keys : List[str]
+            List of column names
+        """
+
+    def write(self, keys, columns):
+        """Appends a block of rows to the file.
+
+        Parameters
+        ----------
+        keys : List[str]
+            List of column names
+        columns : Dict[str, list]
+            Values of each column in the block
+        """
+        assert not self.closed, "Cannot write to a closed file."
+        table = self.pa.table({k: columns[k] for k in keys})
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = self.open(table.schema)
+        else:
+            table = table.cast(self.schema)
+
+        self.writer.write_table(table)
+
+    @abstractmethod
+    def open(self, schema):
+        """Place-holder method to be defined in each Arrow backend.
+
+        Parameters
+        ----------
+        schema : pyarrow.Schema
+            Schema of the columns
+
+        Returns
+        -------
+        object
+            Open file writer, which provides `write_table` and `close`
+        """
+        raise NotImplementedError('Must define the `open` function')
+
+    def close(self):
+        """Finalizes the output file."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.closed = True
+
+
+class ParquetBackend(ArrowBackend):
+    """Writes blocks of rows to a Parquet file, one row group per block."""
+    name = 'parquet'
+
+    def open(self, schema):
+        """Opens the Parquet file.
+
+        Parameters
+        ----------
+        schema : pyarrow.Schema
+            Schema of the columns
+
+        Returns
+        -------
+        pyarrow.parquet.ParquetWriter
+            Parquet file writer
+        """
+        import pyarrow.parquet # pylint: disable=C0415
+        return pyarrow.parquet.ParquetWriter(self.file_name, schema)
+
+
+class FeatherBackend(ArrowBackend):
+    """Writes blocks of rows to a Feather (Arrow IPC) file."""
+    name = 'feather'
+
+    def open(self, schema):
+        """Opens the Feather file.
+
+        Parameters
+        ----------
+        schema : pyarrow.Schema
+            Schema of the columns
+
+        Returns
+        -------
+        pyarrow.ipc.RecordBatchFileWriter
+            Arrow IPC file writer
+        """
+        return self.pa.ipc.new_file(self.file_name, schema)
+
+
+# Available output backends
+BACKENDS = {b.name: b for b in [CSVBackend, ParquetBackend, FeatherBackend]}
@@ -0,0 +1,945 @@
+"""Module to write data products to a memory-mappable flat event store.
+
+A flat event store is a single binary file which contains, for each data
+product key, the values of all the entries concatenated into one contiguous
+array, along with an array of entry offsets. Loading an entry is then a
+constant-time slice of a memory-mapped array, with no copy involved.
+
+The file is structured as follows:
+  - An 8-byte magic string (`SPINEFLT`)
+  - The size of the header in bytes, as a little-endian 64-bit integer
+  - A JSON header which describes how each key is stored
+  - The arrays, each aligned to 64 bytes from the start of the file
+"""
+
+import os
+import json
+import pickle
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+
+import yaml
+import numpy as np
+
+import spine.data
+from spine.version import __version__
+from spine.utils.cleanup import close_on_exit
+
+__all__ = ['FlatWriter']
+
+# Magic string at the start of every flat event store file
+FLAT_MAGIC = b'SPINEFLT'
+
+# Alignment of the arrays in the file, in bytes
+FLAT_ALIGN = 64
+
+# Version of the file layout
+FLAT_FORMAT = 2
+
+
+class FlatWriter:
+    """Writes data products to a memory-mappable flat event store.
+
+    Each key is stored according to the type of its value in the first entry:
+      - `scalar`: one number per entry, stored as a single array
+      - `tensor`: one array of numbers per entry, concatenated along the first
+        axis, with an array of (N + 1) entry offsets
+      - `jagged`: one list of arrays per entry (e.g. cluster indexes), stored
+        as one concatenated array with element and entry offsets
+      - `string`: one string per entry, stored as UTF-8 bytes
+      - `objects`: one data object (e.g. `Meta`) or one list of data objects
+        (e.g. `Particle`) per entry, each attribute stored as its own array
+      - `tuple`: one tuple per entry, each item stored as its own key
+      - `pickle`: anything else, stored as one serialized byte string per
+        entry. The reader only loads these keys if explicitly allowed to
+
+    Typical configuration should look like:
+
+    .. code-block:: yaml
+
+        io:
+          ...
+          writer:
+            name: flat
+            file_name: output.flat
+            keys:
+              - data
+              - seg_label
+              - ...
+
+    The entries are spilled to temporary files as they are appended and the
+    output file is only assembled when :meth:`close` is called, which happens
+    automatically when the writer is deleted or when the process exits.
+    """
+    name = 'flat'
+
+    def __init__(self, file_name=None, keys=None, skip_keys=None,
+                 overwrite=False, prefix=None, split=False):
+        """Initializes the basics of the output file.
+
+        Parameters
+        ----------
+        file_name : str, optional
+            Name of the output flat event store file
+        keys : List[str], optional
+            List of data product keys to store. If not specified, store everything
+        skip_keys: List[str], optionl
+            List of data product keys to skip
+        overwrite : bool, default False
+            If `True`, overwrite the output file if it already exists
+        prefix : str, optional
+            Input file prefix. It will be use to form the output file name,
+            provided that no file_name is explicitely provided
+        split : bool, default False
+            If `True`, split the output to produce one file per input file
+        """
+        # If the output file name is not provided, use the input file prefix(es)
+        if not file_name:
+            assert prefix is not None, (
+                    "If the output `file_name` is not provided, must provide"
+                    "the input file `prefix` to build it from.")
+            if not split:
+                file_name = f'{prefix}_spine.flat'
+            else:
+                file_name = [f'{pre}_spine.flat' for pre in prefix]
+
+        elif split:
+            dir_name = os.path.dirname(file_name)
+            if dir_name:
+                dir_name += '/'
+            base_name = os.path.splitext(os.path.basename(file_name))[0]
+            file_name = [f'{dir_name}{pre}_{base_name}.flat' for pre in prefix]
+
+        # Check that the output file(s) do(es) not already exist, if requested
+        file_names = [file_name] if not split else file_name
+        if not overwrite:
+            for f in file_names:
+                if os.path.isfile(f):
+                    raise FileExistsError(f"File with name {f} already exists.")
+
+        # Check that the required/skipped keys make sense
+        assert (keys is None) | (skip_keys is None), (
+                "Must not specify both `keys` or `skip_keys`.")
+
+        # Store persistent attributes
+        self.file_name = file_name
+        self.split = split
+        self.keys = keys
+        self.skip_keys = skip_keys
+        self.stored_keys = None
+        self.cfg = None
+        self.stores = [FlatStore(f) for f in file_names]
+        self.closed = False
+
+        # Make sure the output file(s) are assembled on exit
+        self._finalizer = close_on_exit(self)
+
+    def get_stored_keys(self, data):
+        """Get the list of data product keys to store.
+
+        Parameters
+        ----------
+        data : dict
+            Dictionary of data products
+
+        Returns
+        -------
+        List[str]
+            List of data keys to store to file
+        """
+        if self.keys is not None:
+            for key in self.keys:
+                assert key in data, (
+                        f"Cannot store {key} as it does not appear "
+                         "in the dictionary of data products.")
+            keys = ['index'] + [k for k in self.keys if k != 'index']
+
+        else:
+            skip_keys = self.skip_keys or []
+            for key in skip_keys:
+                if key not in data:
+                    raise KeyError(
+                            f"Key {key} appears in `skip_keys` but does not "
+                             "appear in the dictionary of data products.")
+            keys = [k for k in data if k not in skip_keys]
+
+        return keys
+
+    def __call__(self, data, cfg=None):
+        """Append the flat event store with the content of a batch.
+
+        Parameters
+        ----------
+        data : dict
+            Dictionary of data products
+        cfg : dict
+            Dictionary containing the complete SPINE configuration
+        """
+        assert not self.closed, "Cannot append a closed flat event store."
+
+        # Fetch the list of keys to store the first time around
+        if self.stored_keys is None:
+            self.stored_keys = self.get_stored_keys(data)
+        if cfg is not None:
+            self.cfg = cfg
+
+        # Fetch the batch size. If the data is not nested, there is one entry
+        single = np.isscalar(data['index'])
+        batch_size = 1 if single else len(data['index'])
+
+        # Loop over the entries in the batch
+        for batch_id in range(batch_size):
+            # Fetch the store to append
+            store_id = 0
+            if self.split:
+                file_index = data['file_index']
+                store_id = file_index if single else file_index[batch_id]
+
+            # Fetch the value of each key for this entry
+            entry = {}
+            for key in self.stored_keys:
+                value = data[key]
+                if not single and not np.isscalar(value):
+                    value = value[batch_id]
+                entry[key] = value
+
+            self.stores[store_id].append(entry)
+
+    def __del__(self):
+        """Assembles the output file(s) if the writer is garbage collected
+        before :meth:`close` is called."""
+        if getattr(self, '_finalizer', None) is not None:
+            self.close()
+
+    def close(self):
+        """Assembles the output file(s) from the appended entries.
+
+        This function is called automatically when the writer is deleted
+        or when the process exits.
+        """
+        if self.closed:
+            return
+
+        for store in self.stores:
+            store.finalize(self.cfg)
+        self.closed = True
+
+
+class FlatStore:
+    """Accumulates the entries of one flat event store file."""
+
+    def __init__(self, file_name):
+        """Initializes an empty store.
+
+        Parameters
+        ----------
+        file_name : str
+            Path to the output file
+        """
+        self.file_name = file_name
+        self.columns = None
+        self.num_entries = 0
+
+    def append(self, entry):
+        """Appends one entry to the store.
+
+        Parameters
+        ----------
+        entry : dict
+            Dictionary of data product values for one entry
+        """
+        # If this is the first entry, initialize one column per key
+        dir_name = os.path.dirname(os.path.abspath(self.file_name))
+        if self.columns is None:
+            self.columns = {}
+            for key, value in entry.items():
+                self.columns[key] = FlatColumn.create(key, value, dir_name)
+
+        # Append each column
+        assert entry.keys() == self.columns.keys(), (
+                "The list of keys must be identical for all entries.")
+        for key, value in entry.items():
+            self.columns[key].append(value)
+        self.num_entries += 1
+
+    def finalize(self, cfg=None):
+        """Writes the header and the content of the columns to file.
+
+        Parameters
+        ----------
+        cfg : dict, optional
+            Dictionary containing the complete SPINE configuration
+        """
+        # Build the header, with the offset of each array in the file. The
+        # offsets are computed assuming the largest possible header size
+        # representation, then the header is padded to match.
+        columns = self.columns or {}
+        header = {'version': __version__, 'format': FLAT_FORMAT,
+                  'num_entries': self.num_entries, 'keys': {}}
+        if cfg is not None:
+            header['cfg'] = yaml.dump(cfg)
+
+        streams = []
+        for key, column in columns.items():
+            header['keys'][key] = column.spec(streams)
+
+        # Reserve the header space, then place the arrays after it
+        def place(start):
+            offset = start
+            for stream in streams:
+                offset = -(-offset//FLAT_ALIGN)*FLAT_ALIGN
+                stream.spec['offset'] = offset
+                offset += stream.nbytes
+
+        prev_size = -1
+        header_bytes = b''
+        while len(header_bytes) != prev_size:
+            prev_size = len(header_bytes)
+            data_start = len(FLAT_MAGIC) + 8 + prev_size
+            data_start = -(-data_start//FLAT_ALIGN)*FLAT_ALIGN
+            place(data_start)
+            header_bytes = json.dumps(header).encode('utf-8')
+
+        # Write the file under a temporary name, then move it in place, such
+        # that an incomplete file never appears under the final name
+        tmp_name = f'{self.file_name}.tmp'
+        with open(tmp_name, 'wb') as out_file:
+            out_file.write(FLAT_MAGIC)
+            out_file.write(np.uint64(len(header_bytes)).tobytes())
+            out_file.write(header_bytes)
+            for stream in streams:
+                out_file.write(b'\0'*(stream.spec['offset'] - out_file.tell()))
+                stream.copy_to(out_file)
+
+        os.replace(tmp_name, self.file_name)
+
+        # Release the temporary files
+        for stream in streams:
+            stream.close()
+
+
+class FlatStream:
+    """Contiguous array of values spilled to a temporary file."""
+
+    def __init__(self, dir_name, dtype=None, shape=()):
+        """Initializes an empty stream.
+
+        Parameters
+        ----------
+        dir_name : str
+            Directory in which to create the temporary file
+        dtype : np.dtype, optional
+            Data type of the array. If not specified, or if the stream is
+            still empty, it is set by the first non-empty array appended to
+            the stream. It is promoted if a later array cannot be cast to it
+            safely
+        shape : tuple, default ()
+            Shape of each element of the array
+        """
+        self.dir_name = dir_name
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        self.shape = tuple(shape)
+        self.length = 0
+        self.file = None
+        self.spec = None
+
+    @property
+    def nbytes(self):
+        """Number of bytes in the stream."""
+        if self.dtype is None:
+            return 0
+        return self.length*self.dtype.itemsize*int(np.prod(self.shape))
+
+    def append(self, array):
+        """Appends an array of elements to the stream.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Array of elements to append
+        """
+        array = np.asarray(array)
+        if self.dtype is None or (self.length == 0 and len(array)):
+            self.dtype = array.dtype
+        elif len(array) and not np.can_cast(array.dtype, self.dtype):
+            self.promote(np.promote_types(self.dtype, array.dtype))
+        assert array.shape[1:] == self.shape, (
+                f"Cannot append an array of shape {array.shape} to a stream "
+                f"of elements of shape {self.shape}.")
+        if self.file is None:
+            self.file = tempfile.TemporaryFile(dir=self.dir_name)
+
+        self.file.write(np.ascontiguousarray(array, dtype=self.dtype).tobytes())
+        self.length += len(array)
+
+    def promote(self, dtype):
+        """Casts the elements already in the stream to a wider data type.
+
+        Parameters
+        ----------
+        dtype : np.dtype
+            New data type of the array
+        """
+        if self.file is not None:
+            self.file.seek(0)
+            array = np.frombuffer(self.file.read(), dtype=self.dtype)
+            self.file.close()
+            self.file = tempfile.TemporaryFile(dir=self.dir_name)
+            self.file.write(array.astype(dtype).tobytes())
+
+        self.dtype = np.dtype(dtype)
+
+    def describe(self, streams):
+        """Registers the stream and returns its description.
+
+        Parameters
+        ----------
+        streams : List[FlatStream]
+            List of streams to write to file, in order
+
+        Returns
+        -------
+        dict
+            Description of the array (offset, dtype, shape)
+        """
+        dtype = self.dtype if self.dtype is not None else np.dtype(np.float32)
+        self.spec = {'offset': None, 'dtype': dtype.str,
+                     'shape': [self.length, *self.shape]}
+        streams.append(self)
+
+        return self.spec
+
+    def copy_to(self, out_file):
+        """Copies the content of the stream to the output file.
+
+        Parameters
+        ----------
+        out_file : file
+            Open output file
+        """
+        if self.file is not None:
+            self.file.seek(0)
+            shutil.copyfileobj(self.file, out_file)
+
+    def close(self):
+        """Releases the temporary file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class FlatColumn(ABC):
+    """Base class of all the ways a key can be stored.
+
+    Attributes
+    ----------
+    kind : str
+        Storage kind (to be found in the file header)
+    """
+    kind = None
+
+    @staticmethod
+    def create(key, value, dir_name):
+        """Picks the storage kind of a key based on its first value.
+
+        Parameters
+        ----------
+        key : str
+            Data product key
+        value : object
+            Value of the key in the first entry
+        dir_name : str
+            Directory in which to create the temporary files
+
+        Returns
+        -------
+        FlatColumn
+            Column which stores the key
+        """
+        if isinstance(value, tuple):
+            return TupleColumn(key, value, dir_name)
+        if isinstance(value, str):
+            return StringColumn(key, value, dir_name)
+        if is_data_object(value):
+            return ObjectColumn(key, value, dir_name)
+        if is_empty_list(value):
+            return DeferredColumn(key, value, dir_name)
+        if is_number(value):
+            return ScalarColumn(key, value, dir_name)
+        if (isinstance(value, np.ndarray) and is_numeric(value.dtype) and
+            value.ndim in [1, 2]):
+            return TensorColumn(key, value, dir_name)
+        if is_array_list(value):
+            return JaggedColumn(key, value, dir_name)
+
+        return PickleColumn(key, value, dir_name)
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column.
+
+        Parameters
+        ----------
+        key : str
+            Data product key
+        value : object
+            Value of the key in the first entry
+        dir_name : str
+            Directory in which to create the temporary files
+        """
+        self.key = key
+
+    @abstractmethod
+    def append(self, value):
+        """Appends the value of the key for one entry.
+
+        Parameters
+        ----------
+        value : object
+            Value of the key in the entry
+        """
+        raise NotImplementedError('Must define the `append` function')
+
+    @abstractmethod
+    def spec(self, streams):
+        """Registers the arrays of the column and describes them.
+
+        Parameters
+        ----------
+        streams : List[FlatStream]
+            List of streams to write to file, in order
+
+        Returns
+        -------
+        dict
+            Description of the column, to be stored in the file header
+        """
+        raise NotImplementedError('Must define the `spec` function')
+
+    def check(self, valid, value):
+        """Raises an informative error if a value cannot be stored.
+
+        Parameters
+        ----------
+        valid : bool
+            Whether the value is valid or not
+        value : object
+            Value of the key in the entry
+        """
+        if not valid:
+            raise TypeError(
+                    f"Cannot store value of type {type(value)} in the "
+                    f"`{self.kind}` column of {self.key}. The type of a key "
+                     "must be the same for all entries.")
+
+
+class ScalarColumn(FlatColumn):
+    """Stores one number per entry."""
+    kind = 'scalar'
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column streams."""
+        super().__init__(key, value, dir_name)
+        self.data = FlatStream(dir_name, np.asarray(value).dtype)
+
+    def append(self, value):
+        """Appends the value of the key for one entry."""
+        self.check(is_number(value), value)
+        self.data.append([value])
+
+    def spec(self, streams):
+        """Describes the column data."""
+        return {'kind': self.kind, 'data': self.data.describe(streams)}
+
+
+class TensorColumn(FlatColumn):
+    """Stores one array per entry, concatenated along the first axis."""
+    kind = 'tensor'
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column streams."""
+        super().__init__(key, value, dir_name)
+        self.data = FlatStream(dir_name, value.dtype, value.shape[1:])
+        self.offsets = [0]
+
+    def append(self, value):
+        """Appends the value of the key for one entry."""
+        self.check(isinstance(value, np.ndarray), value)
+        self.data.append(value)
+        self.offsets.append(self.data.length)
+
+    def spec(self, streams):
+        """Describes the column data and entry offsets."""
+        offsets = FlatStream(self.data.dir_name, np.int64)
+        offsets.append(np.array(self.offsets, dtype=np.int64))
+        return {'kind': self.kind, 'data': self.data.describe(streams),
+                'offsets': offsets.describe(streams)}
+
+
+class JaggedColumn(FlatColumn):
+    """Stores one list of arrays per entry, concatenated in a single array.
+
+    If the lists are object lists, the shape and data type of their default
+    array is recorded, such that they can be typed when read back empty.
+    """
+    kind = 'jagged'
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column streams."""
+        super().__init__(key, value, dir_name)
+        ref_value = value[0] if len(value) else value.default
+        self.data = FlatStream(dir_name, ref_value.dtype, ref_value.shape[1:])
+        self.ndim = ref_value.ndim
+        self.elem_offsets = [0]
+        self.offsets = [0]
+        self.default = None
+        if hasattr(value, 'default'):
+            self.default = {'dtype': value.default.dtype.str,
+                            'shape': list(value.default.shape)}
+
+    def append(self, value):
+        """Appends the value of the key for one entry."""
+        self.check(isinstance(value, (list, np.ndarray)), value)
+        for el in value:
+            self.check(isinstance(el, np.ndarray) and el.ndim == self.ndim, el)
+            self.data.append(el)
+            self.elem_offsets.append(self.data.length)
+        self.offsets.append(len(self.elem_offsets) - 1)
+
+    def spec(self, streams):
+        """Describes the column data, element offsets and entry offsets."""
+        spec = {'kind': self.kind, 'data': self.data.describe(streams)}
+        for name in ['elem_offsets', 'offsets']:
+            stream = FlatStream(self.data.dir_name, np.int64)
+            stream.append(np.array(getattr(self, name), dtype=np.int64))
+            spec[name] = stream.describe(streams)
+        if self.default is not None:
+            spec['default'] = self.default
+
+        return spec
+
+
+class StringColumn(FlatColumn):
+    """Stores one string per entry, encoded as UTF-8 bytes."""
+    kind = 'string'
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column streams."""
+        super().__init__(key, value, dir_name)
+        self.data = FlatStream(dir_name, np.uint8)
+        self.offsets = [0]
+
+    def append(self, value):
+        """Appends the encoded value of the key for one entry."""
+        self.check(isinstance(value, str), value)
+        self.data.append(np.frombuffer(value.encode('utf-8'), dtype=np.uint8))
+        self.offsets.append(self.data.length)
+
+    def spec(self, streams):
+        """Describes the column data and entry offsets."""
+        offsets = FlatStream(self.data.dir_name, np.int64)
+        offsets.append(np.array(self.offsets, dtype=np.int64))
+        return {'kind': self.kind, 'data': self.data.describe(streams),
+                'offsets': offsets.describe(streams)}
+
+
+class ObjectColumn(FlatColumn):
+    """Stores one data object or one list of data objects per entry.
+
+    Each attribute of the objects is stored as its own array, with one row
+    per object, in the same way the HDF5 writer stores them as columns of a
+    structured array:
+      - Scalar attributes are stored as a single array
+      - Array attributes are concatenated, with an array of object offsets
+      - String attributes are stored as UTF-8 bytes, with object offsets
+
+    The objects are built back from their attributes when they are read.
+    """
+    kind = 'objects'
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column streams."""
+        super().__init__(key, value, dir_name)
+        # Fetch a reference object (the default one if the list is empty)
+        self.scalar = not isinstance(value, list)
+        if self.scalar:
+            ref_obj = value
+        else:
+            ref_obj = value[0] if len(value) else value.default
+        self.obj_class = type(ref_obj)
+        self.dir_name = dir_name
+
+        # Initialize one stream per object attribute
+        self.attrs = {}
+        for attr, val in ref_obj.as_dict().items():
+            if isinstance(val, str):
+                attr_kind, data = 'string', FlatStream(dir_name, np.uint8)
+            elif is_number(val):
+                dtype = np.asarray(val).dtype
+                if dtype == bool:
+                    dtype = np.uint8
+                attr_kind, data = 'scalar', FlatStream(dir_name, dtype)
+            elif isinstance(val, np.ndarray) and is_numeric(val.dtype):
+                attr_kind = 'array'
+                data = FlatStream(dir_name, val.dtype, val.shape[1:])
+            else:
+                raise TypeError(
+                        f"Attribute {attr} of {self.obj_class.__name__} has "
+                        f"an unrecognized type: {type(val)}")
+
+            self.attrs[attr] = {'kind': attr_kind, 'data': data,
+                                'offsets': [0]}
+
+        self.offsets = [0]
+
+    def append(self, value):
+        """Appends the attributes of the object(s) of one entry."""
+        self.check(self.scalar != isinstance(value, list), value)
+        objects = [value] if self.scalar else value
+        for obj in objects:
+            self.check(type(obj) is self.obj_class, obj)
+
+        # Append each attribute of all the objects at once
+        obj_dicts = [obj.as_dict() for obj in objects]
+        for attr, column in self.attrs.items():
+            values = [obj_dict[attr] for obj_dict in obj_dicts]
+            if column['kind'] == 'scalar':
+                # Force bool onto shorts (restored by the data classes)
+                array = np.array(values)
+                if array.dtype == bool:
+                    array = array.astype(np.uint8)
+                column['data'].append(array)
+                continue
+
+            if column['kind'] == 'string':
+                values = [v.encode('utf-8') for v in values]
+                column['data'].append(
+                        np.frombuffer(b''.join(values), dtype=np.uint8))
+            elif len(values):
+                column['data'].append(np.concatenate(values))
+
+            offsets = column['offsets']
+            for v in values:
+                offsets.append(offsets[-1] + len(v))
+
+        self.offsets.append(self.offsets[-1] + len(objects))
+
+    def spec(self, streams):
+        """Describes the object class, entry offsets and attribute arrays."""
+        offsets = FlatStream(self.dir_name, np.int64)
+        offsets.append(np.array(self.offsets, dtype=np.int64))
+        spec = {'kind': self.kind, 'class_name': self.obj_class.__name__,
+                'scalar': self.scalar, 'offsets': offsets.describe(streams),
+                'attrs': {}}
+        for attr, column in self.attrs.items():
+            attr_spec = {'kind': column['kind'],
+                         'data': column['data'].describe(streams)}
+            if column['kind'] != 'scalar':
+                offsets = FlatStream(self.dir_name, np.int64)
+                offsets.append(np.array(column['offsets'], dtype=np.int64))
+                attr_spec['offsets'] = offsets.describe(streams)
+
+            spec['attrs'][attr] = attr_spec
+
+        return spec
+
+
+class PickleColumn(FlatColumn):
+    """Stores one serialized object per entry."""
+    kind = 'pickle'
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column streams."""
+        super().__init__(key, value, dir_name)
+        self.data = FlatStream(dir_name, np.uint8)
+        self.offsets = [0]
+
+    def append(self, value):
+        """Appends the serialized value of the key for one entry."""
+        self.data.append(np.frombuffer(pickle.dumps(value), dtype=np.uint8))
+        self.offsets.append(self.data.length)
+
+    def spec(self, streams):
+        """Describes the column data and entry offsets."""
+        offsets = FlatStream(self.data.dir_name, np.int64)
+        offsets.append(np.array(self.offsets, dtype=np.int64))
+        return {'kind': self.kind, 'data': self.data.describe(streams),
+                'offsets': offsets.describe(streams)}
+
+
+class TupleColumn(FlatColumn):
+    """Stores one tuple per entry, one column per item."""
+    kind = 'tuple'
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column streams."""
+        super().__init__(key, value, dir_name)
+        self.items = [FlatColumn.create(f'{key}[{i}]', v, dir_name)
+                      for i, v in enumerate(value)]
+
+    def append(self, value):
+        """Appends the value of the key for one entry."""
+        self.check(isinstance(value, tuple) and
+                   len(value) == len(self.items), value)
+        for column, item in zip(self.items, value):
+            column.append(item)
+
+    def spec(self, streams):
+        """Describes the column of each item."""
+        return {'kind': self.kind,
+                'items': [column.spec(streams) for column in self.items]}
+
+
+class DeferredColumn(FlatColumn):
+    """Holds the empty lists stored under a key until the first non-empty
+    value decides how the key is stored."""
+
+    def __init__(self, key, value, dir_name):
+        """Initializes the column."""
+        super().__init__(key, value, dir_name)
+        self.dir_name = dir_name
+        self.values = []
+        self.column = None
+
+    @property
+    def kind(self):
+        """Storage kind of the underlying column, once it is known."""
+        return self.column.kind if self.column is not None else None
+
+    def append(self, value):
+        """Appends the value of the key for one entry."""
+        # Until a non-empty value is found, simply record the empty ones
+        if self.column is None:
+            if is_empty_list(value):
+                self.values.append(value)
+                return
+
+            self.set_column(FlatColumn.create(self.key, value, self.dir_name))
+
+        self.column.append(value)
+
+    def set_column(self, column):
+        """Sets the column which stores the key, fills the empty entries.
+
+        Parameters
+        ----------
+        column : FlatColumn
+            Column which stores the key
+        """
+        self.column = column
+        for value in self.values:
+            self.column.append(value)
+        self.values = None
+
+    def spec(self, streams):
+        """Describes the underlying column (jagged if all lists are empty)."""
+        if self.column is None:
+            self.set_column(JaggedColumn(
+                self.key, [np.empty(0, dtype=np.int64)], self.dir_name))
+
+        return self.column.spec(streams)
+
+
+def is_empty_list(value):
+    """Checks whether a value is an empty list (not an empty object list).
+
+    Parameters
+    ----------
+    value : object
+        Value to check
+
+    Returns
+    -------
+    bool
+        `True` if the value is an empty list
+    """
+    return (isinstance(value, list) and not len(value) and
+            not hasattr(value, 'default'))
+
+
+def is_data_object(value):
+    """Checks whether a value is a data object or a list of data objects.
+
+    Only the data classes defined in :mod:`spine.data` are recognized, as
+    they are the only objects which can be built back from their attributes.
+
+    Parameters
+    ----------
+    value : object
+        Value to check
+
+    Returns
+    -------
+    bool
+        `True` if the value is a data object or a list of data objects
+    """
+    objects = [value]
+    if isinstance(value, list):
+        objects = value
+        if not len(value):
+            if not hasattr(value, 'default'):
+                return False
+            objects = [value.default]
+
+    obj_class = type(objects[0])
+    return (hasattr(obj_class, 'as_dict') and
+            getattr(spine.data, obj_class.__name__, None) is obj_class and
+            all(type(obj) is obj_class for obj in objects))
+
+
+def is_array_list(value):
+    """Checks whether a value is a list of numeric arrays.
+
+    Parameters
+    ----------
+    value : object
+        Value to check
+
+    Returns
+    -------
+    bool
+        `True` if the value is a non-empty list of arrays, or an object list
+        of arrays with a default array
+    """
+    if not isinstance(value, (list, np.ndarray)):
+        return False
+    arrays = list(value)
+    if hasattr(value, 'default'):
+        arrays.append(value.default)
+
+    return len(arrays) > 0 and all(
+            isinstance(v, np.ndarray) and is_numeric(v.dtype) and
+            v.ndim in [1, 2] for v in arrays)
+
+
+def is_numeric(dtype):
+    """Checks whether a data type is a boolean or a number.
+
+    Parameters
+    ----------
+    dtype : np.dtype
+        Data type
+
+    Returns
+    -------
+    bool
+        `True` if the data type can be memory-mapped as is
+    """
+    return dtype.kind in 'biuf'
+
+
+def is_number(value):
+    """Checks whether a value is a single boolean or number.
+
+    Parameters
+    ----------
+    value : object
+        Value to check
+
+    Returns
+    -------
+    bool
+        `True` if the value is a scalar number
+    """
+    return (isinstance(value, (bool, int, float, np.bool_, np.number)) and
+            np.isscalar(value))
@@ -1,6 +1,8 @@
 """Module to write the output of the reconstruction to file."""
 
 import os
+from queue import Queue
+from threading import Thread
 from dataclasses import dataclass
 
 import yaml
@@ -10,6 +12,7 @@ import numpy as np
 import spine.data
 
 from spine.version import __version__
+from spine.utils.cleanup import close_on_exit
 
 __all__ = ['HDF5Writer']
 
@@ -34,11 +37,19 @@ class HDF5Writer:
               - input_data
               - segmentation
               - ...
+
+    By default, the output file is reopened and appended entry by entry every
+    time the writer is called. If `buffer_size` is provided, the entries are
+    instead accumulated in memory and written in bulk (one resize and one
+    write per dataset) once the buffer is full. If `threaded` is also set,
+    the buffer is flushed on a dedicated writer thread which keeps the output
+    file(s) open until :meth:`close` is called.
     """
     name = 'hdf5'
 
     def __init__(self, file_name=None, keys=None, skip_keys=None, dummy_ds=None,
-                 overwrite=False, append=False, prefix=None, split=False):
+                 overwrite=False, append=False, prefix=None, split=False,
+                 buffer_size=None, threaded=True):
         """Initializes the basics of the output file.
 
         Parameters
@@ -61,6 +72,12 @@ class HDF5Writer:
             provided that no file_name is explicitely provided
         split : bool, default False
             If `True`, split the output to produce one file per input file
+        buffer_size : int, optional
+            If specified, number of entries to accumulate in memory before
+            writing them to file in bulk
+        threaded : bool, default True
+            If `True`, flush the buffer on a dedicated writer thread. Only
+            relevant when `buffer_size` is specified.
         """
         # If the output file name is not provided, use the input file prefix(es)
         if not file_name:
@@ -114,6 +131,21 @@ class HDF5Writer:
         self.type_dict   = None
         self.event_dtype = None
 
+        # Initialize the buffered writing mode, if requested
+        assert buffer_size is None or buffer_size > 0, (
+                "If `buffer_size` is provided, it must be larger than 0.")
+        self.buffer_size = buffer_size
+        self.threaded = threaded
+        self.buffer = {}
+        self.buffer_count = 0
+        self.handles = {}
+        self.queue = None
+        self.thread = None
+        self.thread_error = None
+        self._finalizer = None
+        if buffer_size is not None:
+            self._finalizer = close_on_exit(self)
+
     @dataclass
     class DataFormat:
         """Data structure to hold writing parameters.
@@ -175,6 +207,11 @@ class HDF5Writer:
     def get_stored_keys(self, data):
         """Get the list of data product keys to store.
 
+        The long-form attributes of the reconstructed/truth objects (`points`,
+        `depositions`, etc.) are not stored with each object. If objects are
+        requested, the per-entry buffers they can be restored from are stored
+        along with them, once per entry.
+
         Parameters
         ----------
         data : dict
@@ -212,6 +249,10 @@ class HDF5Writer:
                         f"Cannot store {key} as it does not appear "
                          "in the dictionary of data products.")
 
+            # Add the buffers needed to restore the objects, if any
+            for key in self.keys:
+                keys.update(self.get_buffer_keys(data, key))
+
         # Add dummy keys to the list, if requested
         if self.dummy_ds is not None:
             for key in self.dummy_ds:
@@ -222,6 +263,47 @@ class HDF5Writer:
 
         return keys
 
+    @staticmethod
+    def get_buffer_keys(data, key):
+        """Get the list of shared buffers the long-form attributes of the
+        objects stored under a certain key are gathered from.
+
+        Parameters
+        ----------
+        data : dict
+            Dictionary of data products
+        key : str
+            Dictionary key name
+
+        Returns
+        -------
+        Set[str]
+            Set of buffer keys which appear in the dictionary of data products
+        """
+        # Only consider lists of objects
+        value = data[key]
+        if np.isscalar(value) or not isinstance(value, list) or not len(value):
+            return set()
+
+        entries = value if isinstance(value[0], list) else [value]
+
+        # List the buffers the objects actually gather their attributes from.
+        # The objects of an entry share their buffers, check the first one
+        buffer_keys = set()
+        for objects in entries:
+            if not isinstance(objects, list) or not len(objects):
+                continue
+
+            obj = objects[0]
+            if not hasattr(obj, 'is_lazy'):
+                return set()
+
+            for attr, (buffer_key, _) in obj._lazy_attrs.items():
+                if obj.is_lazy(attr):
+                    buffer_keys.add(buffer_key)
+
+        return {k for k in buffer_keys if k in data}
+
     def register_key(self, data, key):
         """Identify the dtype and shape objects to be dealt with.
 
@@ -458,6 +540,11 @@ class HDF5Writer:
             self.create(data, cfg)
             self.ready = True
 
+        # If requested, buffer the entries rather than writing them directly
+        if self.buffer_size is not None:
+            self.buffer_entries(data, batch_size)
+            return
+
         # Append file(s)
         if not self.split:
             with h5py.File(self.file_name, 'a') as out_file:
@@ -472,6 +559,363 @@ class HDF5Writer:
                     for batch_id in np.where(file_ids == file_id)[0]:
                         self.append_entry(out_file, data, batch_id)
 
+    def buffer_entries(self, data, batch_size):
+        """Adds the entries of a batch to the buffer, flushes it if it is full.
+
+        Parameters
+        ----------
+        data : dict
+            Dictionary of data products
+        batch_size : int
+            Number of entries in the batch
+        """
+        # Check that the writer thread has not failed
+        self.check_thread()
+
+        # Fetch the output file name of each entry
+        if not self.split:
+            file_names = [self.file_name]*batch_size
+        else:
+            file_names = [self.file_name[i] for i in data['file_index']]
+
+        # Store the information needed to write each entry
+        for batch_id in range(batch_size):
+            entry = {}
+            for key in self.keys:
+                entry[key] = self.get_entry_value(data, key, batch_id)
+
+            self.buffer.setdefault(file_names[batch_id], []).append(entry)
+            self.buffer_count += 1
+
+        # If the buffer is full, flush it
+        if self.buffer_count >= self.buffer_size:
+            self.flush()
+
+    def get_entry_value(self, data, key, batch_id):
+        """Fetches the value of a key for a specific entry to be buffered.
+
+        Objects are converted to structured arrays immediately and arrays
+        are copied, such that the buffer is not affected by downstream
+        modifications of the data products.
+
+        Parameters
+        ----------
+        data : dict
+            Dictionary of data products
+        key : string
+            Dictionary key name
+        batch_id : int
+            Batch ID to be stored
+
+        Returns
+        -------
+        Union[np.ndarray, list]
+            Value of the key for this entry
+        """
+        val = self.type_dict[key]
+        if val.merge or isinstance(val.width, list):
+            return self.copy_value(data[key][batch_id])
+
+        if np.isscalar(data[key]):
+            array = [data[key]]
+        else:
+            array = data[key][batch_id]
+            if val.scalar:
+                array = [array]
+
+        if val.dtype in self.object_dtypes:
+            objects = np.empty(len(array), val.dtype)
+            for i, obj in enumerate(array):
+                objects[i] = tuple(obj.as_dict().values())
+            array = objects
+        else:
+            array = self.copy_value(array)
+
+        return array
+
+    @staticmethod
+    def copy_value(value):
+        """Copies the arrays contained in a value to be buffered.
+
+        Parameters
+        ----------
+        value : Union[np.ndarray, list, tuple, object]
+            Array, (nested) list of arrays or scalar
+
+        Returns
+        -------
+        Union[np.ndarray, list, tuple, object]
+            Copy of the value which does not share memory with the input
+        """
+        if isinstance(value, np.ndarray) and value.dtype == object:
+            copy = np.empty(value.shape, dtype=object)
+            for i, v in enumerate(value.flat):
+                copy.flat[i] = HDF5Writer.copy_value(v)
+            return copy
+
+        if isinstance(value, np.ndarray):
+            return value.copy()
+
+        if isinstance(value, tuple):
+            return tuple(HDF5Writer.copy_value(v) for v in value)
+
+        if isinstance(value, list):
+            return [HDF5Writer.copy_value(v) for v in value]
+
+        return value
+
+    def flush(self):
+        """Writes the content of the buffer to file.
+
+        If the writer is threaded, the buffer is handed over to the writer
+        thread and this function returns immediately.
+        """
+        # If there is nothing to write, nothing to do
+        if not self.buffer_count:
+            return
+
+        # Hand the buffer over
+        buffer, self.buffer, self.buffer_count = self.buffer, {}, 0
+        if not self.threaded:
+            self.write_buffer(buffer)
+        else:
+            if self.thread is None:
+                self.queue = Queue(maxsize=2)
+                self.thread = Thread(target=self.run_thread, daemon=True)
+                self.thread.start()
+            self.queue.put(buffer)
+
+    def run_thread(self):
+        """Writes buffers to file as they come in, until it receives `None`."""
+        while True:
+            buffer = self.queue.get()
+            if buffer is None:
+                break
+            if self.thread_error is None:
+                try:
+                    self.write_buffer(buffer)
+                except Exception as err: # pylint: disable=W0718
+                    self.thread_error = err
+
+        self.close_handles()
+
+    def check_thread(self):
+        """Raises the error encountered by the writer thread, if any."""
+        if self.thread_error is not None:
+            err, self.thread_error = self.thread_error, None
+            raise RuntimeError(
+                    "The HDF5 writer thread failed to write to file.") from err
+
+    def __del__(self):
+        """Writes out the buffer if the writer is deleted before being
+        closed."""
+        if getattr(self, '_finalizer', None) is not None:
+            self.close()
+
+    def close(self):
+        """Flushes the buffer, stops the writer thread and closes the file(s).
+
+        This function is called automatically when the writer is deleted
+        or when the process exits.
+        """
+        self.flush()
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread, self.queue = None, None
+        else:
+            self.close_handles()
+
+        self.check_thread()
+
+    def close_handles(self):
+        """Closes the output files kept open by the buffered writer."""
+        for out_file in self.handles.values():
+            out_file.close()
+        self.handles = {}
+
+    def write_buffer(self, buffer):
+        """Writes a buffer of entries to their respective output files.
+
+        Parameters
+        ----------
+        buffer : Dict[str, List[dict]]
+            Lists of entries to store in each output file
+        """
+        for file_name, entries in buffer.items():
+            if file_name not in self.handles:
+                self.handles[file_name] = h5py.File(file_name, 'a')
+            self.write_entries(self.handles[file_name], entries)
+            self.handles[file_name].flush()
+
+    def write_entries(self, out_file, entries):
+        """Stores a list of buffered entries.
+
+        Each dataset is resized once and written to in one contiguous slab.
+
+        Parameters
+        ----------
+        out_file : h5py.File
+            HDF5 file instance
+        entries : List[dict]
+            List of buffered entries to store
+        """
+        # Initialize the new events
+        events = np.empty(len(entries), self.event_dtype)
+
+        # Store each key for all entries at once
+        for key in self.keys:
+            val = self.type_dict[key]
+            values = [entry[key] for entry in entries]
+            if not val.merge and not isinstance(val.width, list):
+                self.store_bulk(out_file[key], events, key, values)
+            elif not val.merge:
+                self.store_jagged_bulk(out_file, events, key, values)
+            else:
+                self.store_flat_bulk(out_file, events, key, values)
+
+        # Append events
+        event_ds = out_file['events']
+        event_id = len(event_ds)
+        event_ds.resize(event_id + len(events), axis=0)
+        event_ds[event_id:event_id + len(events)] = events
+
+    @staticmethod
+    def append_slab(dataset, slab):
+        """Appends a contiguous slab to a dataset with a single resize.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+            HDF5 dataset instance
+        slab : np.ndarray
+            Array to append to the dataset
+
+        Returns
+        -------
+        int
+            Index of the first row of the slab in the dataset
+        """
+        first_id = len(dataset)
+        dataset.resize(first_id + len(slab), axis=0)
+        dataset[first_id:first_id + len(slab)] = slab
+
+        return first_id
+
+    @staticmethod
+    def extend(dataset, arrays):
+        """Appends a list of arrays to a dataset in a single write.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+            HDF5 dataset instance
+        arrays : List[Union[np.ndarray, list]]
+            List of arrays to append to the dataset
+
+        Returns
+        -------
+        np.ndarray
+            (N + 1) Boundaries of each array in the dataset
+        """
+        # Compute the boundaries of each array in the slab
+        bounds = np.zeros(len(arrays) + 1, dtype=np.int64)
+        bounds[1:] = np.cumsum([len(a) for a in arrays])
+
+        # Fill the slab, write it
+        slab = np.empty((bounds[-1], *dataset.shape[1:]), dtype=dataset.dtype)
+        for i, array in enumerate(arrays):
+            if len(array):
+                slab[bounds[i]:bounds[i+1]] = array
+
+        return bounds + HDF5Writer.append_slab(dataset, slab)
+
+    @staticmethod
+    def store_bulk(dataset, events, key, arrays):
+        """Stores a list of arrays (one per entry) in a dataset and stores
+        their mapping in the event dataset.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+            HDF5 dataset instance
+        events : np.ndarray
+            Array of events to be stored
+        key: str
+            Name of the dataset in the file
+        arrays : List[np.ndarray]
+            List of arrays to be stored, one per entry
+        """
+        bounds = HDF5Writer.extend(dataset, arrays)
+        for i in range(len(arrays)):
+            events[key][i] = dataset.regionref[bounds[i]:bounds[i+1]]
+
+    @staticmethod
+    def store_jagged_bulk(out_file, events, key, array_lists):
+        """Stores a list of jagged lists of arrays (one per entry) in the file
+        and stores an index mapping for each array element in the event
+        dataset.
+
+        Parameters
+        ----------
+        out_file : h5py.File
+            HDF5 file instance
+        events : np.ndarray
+            Array of events to be stored
+        key: str
+            Name of the dataset in the file
+        array_lists : List[List[np.ndarray]]
+            List of lists of arrays to be stored, one per entry
+        """
+        # Store each element of the lists in its own dataset
+        index = out_file[key]['index']
+        refs = np.empty((len(array_lists), index.shape[1]), dtype=index.dtype)
+        for j in range(index.shape[1]):
+            dataset = out_file[key][f'element_{j}']
+            arrays = [array_list[j] for array_list in array_lists]
+            bounds = HDF5Writer.extend(dataset, arrays)
+            for i in range(len(array_lists)):
+                refs[i, j] = dataset.regionref[bounds[i]:bounds[i+1]]
+
+        # Store one row of references per entry
+        first_id = HDF5Writer.append_slab(index, refs)
+        for i in range(len(array_lists)):
+            events[key][i] = index.regionref[first_id + i:first_id + i + 1]
+
+    @staticmethod
+    def store_flat_bulk(out_file, events, key, array_lists):
+        """Stores a list of concatenated lists of arrays (one per entry) in the
+        file and stores their index mapping in the event dataset.
+
+        Parameters
+        ----------
+        out_file : h5py.File
+            HDF5 file instance
+        events : np.ndarray
+            Array of events to be stored
+        key: str
+            Name of the dataset in the file
+        array_lists : List[List[np.ndarray]]
+            List of lists of arrays to be stored, one per entry
+        """
+        # Store all the elements of all entries in one slab
+        dataset = out_file[key]['elements']
+        arrays = [array for array_list in array_lists for array in array_list]
+        bounds = HDF5Writer.extend(dataset, arrays)
+
+        # Store one reference per element
+        index = out_file[key]['index']
+        refs = np.empty(len(arrays), dtype=index.dtype)
+        for i in range(len(arrays)):
+            refs[i] = dataset.regionref[bounds[i]:bounds[i+1]]
+
+        # Store a reference to the element references of each entry
+        last_id = HDF5Writer.append_slab(index, refs)
+        for i, array_list in enumerate(array_lists):
+            first_id = last_id
+            last_id += len(array_list)
+            events[key][i] = index.regionref[first_id:last_id]
+
     def append_entry(self, out_file, data, batch_id):
         """Stores one entry.
 
@@ -562,10 +562,9 @@ class FullChain(torch.nn.Module):
                 clusts = res_gs['clusts']
                 clust_shapes = res_gs['clust_shapes']
                 filter_index = res_gs['filter_index'].index
-                for i, f in enumerate(clusts.index_list):
-                    clusts.data[i] = filter_index[f]
-
-                clusts.offsets = data.edges[:-1]
+                clusts = IndexBatch(
+                        filter_index[clusts.full_index], data.edges[:-1],
+                        clusts.counts, clusts.single_counts, flat=True)
 
                 # Append
                 fragments = fragments.merge(clusts.to_numpy())
@@ -341,7 +341,7 @@ class GrapPA(torch.nn.Module):
             shapes.data = shapes.data.astype(np.int64)
 
         # Initialize the input graph
-        edge_index, dist_mat, closest_index = self.graph_constructor(
+        edge_index, edge_dist, closest_index = self.graph_constructor(
                 data_np, clusts, shapes, groups)
 
         result['edge_index'] = edge_index
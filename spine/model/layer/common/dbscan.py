@@ -1,5 +1,7 @@
 """Module which does connected-components (dense) clustering using DBSCAN."""
 
+from collections import defaultdict
+
 import numpy as np
 import torch
 from sklearn.cluster import DBSCAN as sklearn_dbscan
@@ -7,8 +9,9 @@ from sklearn.cluster import DBSCAN as sklearn_dbscan
 from spine.data import TensorBatch, IndexBatch
 
 from spine.utils.globals import (
-        SHOWR_SHP, TRACK_SHP, MICHL_SHP, DELTA_SHP, COORD_COLS, PPN_SHAPE_COL,
-        COORD_START_COLS, COORD_END_COLS)
+        SHOWR_SHP, TRACK_SHP, MICHL_SHP, DELTA_SHP, COORD_COLS, SHAPE_COL,
+        PPN_SHAPE_COL, COORD_START_COLS, COORD_END_COLS)
+from spine.utils.numba_local import batch_dbscan
 from spine.utils.ppn import PPNPredictor
 from spine.utils.point_break_clustering import PointBreakClusterer
 
@@ -24,8 +27,16 @@ class DBSCAN(torch.nn.Module):
       leftovers based on proximity to existing instances.
     - Use a graph-based method to cluster tracks based on PPN vertices. This
       technique can only be used on tracks.
+
+    The classes which are clustered with pure DBSCAN and a `min_samples` of 1
+    are clustered for all the entries in the batch at once: the voxels are
+    bucketed in a single cell list keyed by (entry, shape, cell) and the
+    clusters are resolved in a single union-find pass.
     """
 
+    # Metrics supported by the batched DBSCAN implementation
+    _batch_metrics = ('euclidean', 'cityblock', 'chebyshev')
+
     def __init__(self, eps=1.8, min_samples=1, min_size=3, metric='euclidean', 
                  shapes=[SHOWR_SHP, TRACK_SHP, MICHL_SHP, DELTA_SHP],
                  break_shapes=[TRACK_SHP], break_mask_radius=5.0,
@@ -99,14 +110,22 @@ class DBSCAN(torch.nn.Module):
                     "must provide a PPN predictor configuration.")
             self.ppn_predictor = PPNPredictor(**ppn_predictor)
 
-        # Initialize one clustering algorithm per class
+        # Initialize one clustering algorithm per class. The classes which can
+        # be clustered for the whole batch at once do not need one
         self.clusterers = []
+        self.batch_shape_ids = []
         for k, c in enumerate(shapes):
+            clusterer = None
             if c not in break_shapes:
-                dbscan = sklearn_dbscan(
-                        eps=self.eps[k], min_samples=self.min_samples[k],
-                        metric=self.metric[k])
-                clusterer = lambda x, _: dbscan.fit(x).labels_
+                if (self.min_samples[k] == 1 and
+                    self.metric[k] in self._batch_metrics):
+                    self.batch_shape_ids.append(k)
+                else:
+                    dbscan = sklearn_dbscan(
+                            eps=self.eps[k], min_samples=self.min_samples[k],
+                            metric=self.metric[k])
+                    clusterer = (
+                            lambda x, _, dbscan=dbscan: dbscan.fit(x).labels_)
             else:
                 method = break_track_method
                 if c != TRACK_SHP:
@@ -167,13 +186,20 @@ class DBSCAN(torch.nn.Module):
             points_np = points.to_numpy()
             point_shapes_np = point_shapes.to_numpy()
 
+        # Cluster the classes which do not need a dedicated clusterer for all
+        # the entries in the batch at once
+        voxels_np = data_np.tensor[:, COORD_COLS]
+        batch_clusts = self.cluster_batch(
+                voxels_np, seg_pred_np.tensor, data_np.counts)
+
         # Loop over the entries in the batch
         offsets = data.edges[:-1]
-        clusts, shapes, counts, single_counts = [], [], [], []
+        clusts, shapes, counts = [], [], []
         for b in range(data.batch_size):
             # Fetch the necessary data products, in numpy format
             voxels_b = data_np[b][:, COORD_COLS]
             seg_pred_b = seg_pred_np[b]
+            points_b = None
             if points is not None:
                 points_b = points_np[b]
                 point_shapes_b = point_shapes_np[b]
@@ -182,51 +208,143 @@ class DBSCAN(torch.nn.Module):
                 points_b = points_b[point_shapes_b != DELTA_SHP]
 
             # Loop over the shapes to cluster
-            clusts_b, counts_b, shapes_b = [], [], []
+            clusts_b, shapes_b = [], []
             for k, s in enumerate(self.shapes):
-                # Restrict the voxels to the current class
-                break_class = s in self.break_shapes
-                shape_mask = seg_pred_b == s
-                if s == TRACK_SHP and break_class and self.track_include_delta:
-                    shape_mask |= seg_pred_b == DELTA_SHP
-
-                shape_index = np.where(shape_mask)[0]
-                if not len(shape_index):
-                    continue
-
-                # Run clustering
-                voxels_b_s = voxels_b[shape_index]
-                labels = self.clusterers[k](voxels_b_s, points_b)
-
-                # If delta points were added to track points, remove them
-                if s == TRACK_SHP and break_class and self.track_include_delta:
-                    labels[seg_pred_b[shape_index] == DELTA_SHP] = -1
-
-                # Build clusters for this class
-                clusts_b_s = []
-                for c in np.unique(labels):
-                    clust = np.where(labels == c)[0]
-                    if c > -1 and len(clust) > self.min_size[k]:
-                        clusts_b_s.append(int(offsets[b]) + clust)
-                        counts_b.append(len(clust))
- 
+                # Fetch the batched clusters or run the class clusterer
+                if self.clusterers[k] is None:
+                    clusts_b_s = batch_clusts[b].get(k, [])
+                else:
+                    clusts_b_s = self.cluster_entry(
+                            k, voxels_b, seg_pred_b, points_b)
+
                 clusts_b.extend(clusts_b_s)
                 shapes_b.append(s * np.ones(len(clusts_b_s), dtype=np.int64))
 
             # Update the output
-            clusts.extend(clusts_b)
+            clusts.append(clusts_b)
             shapes.extend(shapes_b)
             counts.append(len(clusts_b))
-            single_counts.extend(counts_b)
 
         # Initialize an IndexBatch and return it
-        clusts_nb    = np.empty(len(clusts), dtype=object)
-        clusts_nb[:] = clusts
-
-        index = IndexBatch(clusts_nb, offsets, counts, single_counts)
+        index = IndexBatch.from_list(clusts, offsets)
         if len(shapes):
             shapes = TensorBatch(np.concatenate(shapes), counts)
         else:
             shapes = TensorBatch(np.empty(0, dtype=np.int64), counts)
 
         return index, shapes
+
+    def cluster_batch(self, voxels, seg_pred, counts):
+        """Clusters the voxels of the classes which are clustered with pure
+        DBSCAN for all the entries of a batch at once.
+
+        Each voxel is assigned to an (entry, shape) group. The groups are
+        clustered together, one call per distance metric in use.
+
+        Parameters
+        ----------
+        voxels : np.ndarray
+            (N, 3) Voxel coordinates of the whole batch
+        seg_pred : np.ndarray
+            (N) Segmentation value for each voxel
+        counts : np.ndarray
+            (B) Number of voxels in each entry of the batch
+
+        Returns
+        -------
+        List[Dict[int, List[np.ndarray]]]
+            (B) For each entry, maps the index of each class in `shapes` onto
+            its list of clusters (voxel indexes relative to the entry)
+        """
+        # Initialize the output
+        batch_size = len(counts)
+        clusts = [defaultdict(list) for _ in range(batch_size)]
+        if not len(self.batch_shape_ids) or not len(voxels):
+            return clusts
+
+        # Assign each voxel to an (entry, shape) group
+        num_shapes = len(self.shapes)
+        batch_ids = np.repeat(np.arange(batch_size), counts)
+        offsets = np.cumsum(counts) - counts
+        groups = np.full(len(voxels), -1, dtype=np.int64)
+        for k in self.batch_shape_ids:
+            mask = seg_pred == self.shapes[k]
+            groups[mask] = batch_ids[mask]*num_shapes + k
+
+        # Define the radius of each group. The batched DBSCAN uses a strict
+        # inequality, nudge the radii to match the sklearn definition (<=)
+        eps = np.nextafter(np.asarray(self.eps, dtype=np.float64), np.inf)
+        eps = np.tile(eps, batch_size)
+
+        # Cluster the groups which share a distance metric together
+        metrics = np.array(self.metric)[groups % num_shapes]
+        for metric in np.unique(np.array(self.metric)[self.batch_shape_ids]):
+            # Order the voxels by group, such that the clusters are labeled
+            # by (entry, shape, first voxel)
+            index = np.where((groups > -1) & (metrics == metric))[0]
+            if not len(index):
+                continue
+            index = index[np.argsort(groups[index], kind='stable')]
+            groups_m = groups[index]
+            labels = batch_dbscan(voxels[index], groups_m, eps, metric)
+
+            # Build the clusters, only keep those above the size threshold
+            perm = np.argsort(labels, kind='stable')
+            sizes = np.bincount(labels)
+            firsts = perm[np.cumsum(sizes) - sizes]
+            for clust, g in zip(np.split(index[perm], np.cumsum(sizes)[:-1]),
+                                groups_m[firsts]):
+                b, k = divmod(int(g), num_shapes)
+                if len(clust) > self.min_size[k]:
+                    clusts[b][k].append(clust - offsets[b])
+
+        return clusts
+
+    def cluster_entry(self, k, voxels, seg_pred, points=None):
+        """Clusters the voxels of one class in one entry using the
+        clusterer of that class.
+
+        Parameters
+        ----------
+        k : int
+            Index of the class in `shapes`
+        voxels : np.ndarray
+            (N, 3) Voxel coordinates of the entry
+        seg_pred : np.ndarray
+            (N) Segmentation value for each voxel
+        points : np.ndarray, optional
+            (P, 3) Points used to break up instances in the entry
+
+        Returns
+        -------
+        List[np.ndarray]
+            List of clusters (voxel indexes relative to the entry)
+        """
+        # Restrict the voxels to the current class
+        s = self.shapes[k]
+        break_class = s in self.break_shapes
+        include_delta = (
+                s == TRACK_SHP and break_class and self.track_include_delta)
+        shape_mask = seg_pred == s
+        if include_delta:
+            shape_mask |= seg_pred == DELTA_SHP
+
+        shape_index = np.where(shape_mask)[0]
+        if not len(shape_index):
+            return []
+
+        # Run clustering
+        labels = self.clusterers[k](voxels[shape_index], points)
+
+        # If delta points were added to track points, remove them
+        if include_delta:
+            labels[seg_pred[shape_index] == DELTA_SHP] = -1
+
+        # Build clusters for this class
+        clusts = []
+        for c in np.unique(labels):
+            clust = np.where(labels == c)[0]
+            if c > -1 and len(clust) > self.min_size[k]:
+                clusts.append(shape_index[clust])
+
+        return clusts
@@ -325,8 +325,8 @@ class ClustGeoEdgeEncoder(torch.nn.Module):
         edge_index : EdgeIndexBatch
             Incidence map between clusters
         closest_index : Union[np.ndarray, torch.Tensor], optional
-            (C, C) : Combined index of the closest pair of voxels per
-            pair of clusters
+            (E) : Combined index of the closest pair of voxels per
+            edge of the directed index
         **kwargs : dict, optional
             Additional objects no used by this encoder
 
@@ -377,15 +377,15 @@ class ClustGeoEdgeEncoder(torch.nn.Module):
         edge_index : EdgeIndexBatch
             Incidence map between clusters
         closest_index : Union[np.ndarray, torch.Tensor], optional
-            (C, C) : Combined index of the closest pair of voxels per
-            pair of clusters
+            (E) : Combined index of the closest pair of voxels per
+            edge of the directed index
         """
         # Get the voxel set
         voxels = data.tensor[:, COORD_COLS]
 
         # Here is a torch-based implementation of cluster_edge_features
         feats = []
-        for e in edge_index.directed_index_t:
+        for k, e in enumerate(edge_index.directed_index_t):
 
             # Get the voxels in the clusters connected by the edge
             x1 = voxels[clusts.index_list[e[0]]]
@@ -396,7 +396,7 @@ class ClustGeoEdgeEncoder(torch.nn.Module):
                 d12 = local_cdist(x1, x2)
                 imin = torch.argmin(d12)
             else:
-                imin = closest_index[e[0], e[1]]
+                imin = closest_index[k]
 
             i1, i2 = imin//len(x2), imin%len(x2)
             v1 = x1[i1,:] # closest point in c1
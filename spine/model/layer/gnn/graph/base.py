@@ -8,7 +8,7 @@ import numpy as np
 from spine.data import EdgeIndexBatch
 
 from spine.utils.globals import COORD_COLS
-from spine.utils.gnn.network import inter_cluster_distance
+from spine.utils.gnn.network import radius_cluster_graph
 
 
 class GraphBase:
@@ -87,27 +87,30 @@ class GraphBase:
 
         Returns
         -------
-        np.ndarray
+        EdgeIndexBatch
             (2, E) Tensor of edges
+        np.ndarray
+            (E') Length of each edge of the directed index (one per
+            connection if the graph is undirected)
+        np.ndarray
+            (E') Combined index of the closest voxel pair of each edge of
+            the directed index (one per connection if undirected)
         """
-        # Generate the inter-cluster distsnce matrix, if needed
-        dist_mat, closest_index = None, None
+        # Find the pairs of nodes which can be connected, if needed
+        neighbors = None
         if self.compute_dist:
-            dist_mat, closest_index = inter_cluster_distance(
-                    data.tensor[:, COORD_COLS], clusts.index_list,
-                    clusts.counts, method=self.dist_method,
-                    algorithm=self.dist_algorithm, return_index=True)
+            neighbors = self.get_neighbors(data, clusts)
 
         # Generate the edge index
         edge_index, edge_counts = self.generate(
-                data=data, clusts=clusts, dist_mat=dist_mat)
+                data=data, clusts=clusts, neighbors=neighbors)
 
         # Cut on the edge length, if specified
         if self.max_length is not None:
-            assert dist_mat is not None, (
-                    "Must provide `dist_mat` to restrict edge length.")
+            assert neighbors is not None, (
+                    "Must provide `neighbors` to restrict edge length.")
             edge_index, edge_counts = self.restrict(
-                    edge_index, edge_counts, dist_mat, classes)
+                    edge_index, edge_counts, neighbors, classes)
 
         # Disconnect nodes from separate groups, if specified
         if groups is not None:
@@ -142,13 +145,53 @@ class GraphBase:
         edge_index = EdgeIndexBatch(
                 edge_index, edge_counts, offsets, self.directed)
 
-        return edge_index, dist_mat, closest_index
+        # Fetch the length and the closest voxel pair of each connection
+        edge_dist, closest_index = None, None
+        if neighbors is not None:
+            edge_dist, closest_index = self.get_lengths(
+                    edge_index.directed_index, neighbors, clusts.single_counts)
+
+        return edge_index, edge_dist, closest_index
+
+    def get_neighbors(self, data, clusts):
+        """Finds the pairs of nodes which can be connected by the graph,
+        along with the distance between their closest voxels.
+
+        By default, this finds all the pairs of nodes which are closer than
+        the maximum edge length (all the pairs of nodes in each entry if
+        there is no length limitation). This can be overridden by graph
+        constructors which only need a specific subset of pairs.
+
+        Parameters
+        ----------
+        data : TensorBatch
+            (N, 1 + D + N_f) Tensor of voxel/value pairs
+        clusts : IndexBatch
+            (C) Cluster indexes
+
+        Returns
+        -------
+        np.ndarray
+            (2, P) Pairs of nodes
+        np.ndarray
+            (P) Distance between each pair of nodes (see `dist_method`)
+        np.ndarray
+            (P) Combined index of the closest voxels of each pair of nodes
+        """
+        max_length = np.inf
+        if self.max_length is not None:
+            max_length = np.max(self.max_length)
+
+        return radius_cluster_graph(
+                data.tensor[:, COORD_COLS], clusts.index_list, max_length,
+                clusts.counts, method=self.dist_method,
+                algorithm=self.dist_algorithm)
 
     def generate(self):
         """This function must be overridden in the constructor definition."""
         raise NotImplementedError("Must define the `generate` function")
 
-    def restrict(self, edge_index, edge_counts, dist_mat, classes=None):
+    def restrict(self, edge_index, edge_counts, neighbors, classes=None):
         """Function that restricts an incidence matrix of a graph
         to the edges below a certain length.
 
@@ -161,8 +204,9 @@ class GraphBase:
             (2, E) Tensor of edges
         edge_counts : np.ndarray
             (B) : Number of edges in each entry of the batch
-        dist_mat : np.ndarray
-            (C, C) Tensor of pair-wise cluster distances
+        neighbors : Tuple[np.ndarray]
+            Pairs of nodes which can be connected and their distances, as
+            returned by :meth:`get_neighbors`
         classes : TensorBatch, optional
             (C) List of class for each cluster in the graph
 
@@ -171,15 +215,16 @@ class GraphBase:
         np.ndarray
             (2,E) Restricted tensor of edges
         """
+        # Fetch the length of each edge (infinite if it is not a neighbor)
+        dists = self.get_lengths(edge_index, neighbors)
+
         # Restrict the input set of edges based on a edge length cut
         if classes is None or np.isscalar(self.max_length):
             # If classes are not provided, apply a static cut to all edges
-            dists = dist_mat[(edge_index[0], edge_index[1])]
             mask = np.where(dists < self.max_length)[0]
 
         else:
             # If classes are provided, apply the cut based on the class
-            dists = dist_mat[(edge_index[0], edge_index[1])]
             edge_classes = classes.tensor[edge_index]
             max_lengths = self.max_length[(edge_classes[0], edge_classes[1])]
             mask = np.where(dists < max_lengths)[0]
@@ -189,6 +234,64 @@ class GraphBase:
 
         return edge_index[:,mask], edge_counts
 
+    @staticmethod
+    def get_lengths(edge_index, neighbors, sizes=None):
+        """Fetches the length of a set of edges from a set of neighbors.
+
+        Parameters
+        ----------
+        edge_index : np.ndarray
+            (2, E) Tensor of edges
+        neighbors : Tuple[np.ndarray]
+            Pairs of nodes which can be connected and their distances, as
+            returned by :meth:`get_neighbors`
+        sizes : np.ndarray, optional
+            (C) Number of voxels in each node. If provided, the combined index
+            of the closest voxel pair of each edge is also returned
+
+        Returns
+        -------
+        np.ndarray
+            (E) Length of each edge (infinite if it is not a neighbor pair)
+        np.ndarray, optional
+            (E) Combined index of the closest voxel pair of each edge
+        """
+        # Build a unique key for each pair of nodes, irrespective of order
+        pairs, dists, closest = neighbors
+        num_nodes = 1 + max(np.max(pairs, initial=-1),
+                            np.max(edge_index, initial=-1))
+        lower, upper = np.min(edge_index, axis=0), np.max(edge_index, axis=0)
+        pair_keys = np.min(pairs, axis=0)*num_nodes + np.max(pairs, axis=0)
+        edge_keys = lower*num_nodes + upper
+
+        # Look for each edge in the sorted list of pairs
+        perm = np.argsort(pair_keys)
+        pair_keys = pair_keys[perm]
+        pos = np.minimum(
+                np.searchsorted(pair_keys, edge_keys), max(len(perm) - 1, 0))
+
+        lengths = np.full(len(edge_keys), np.inf, dtype=dists.dtype)
+        index = np.zeros(len(edge_keys), dtype=np.int64)
+        if len(perm):
+            found = np.where(pair_keys[pos] == edge_keys)[0]
+            lengths[found] = dists[perm[pos[found]]]
+            index[found] = closest[perm[pos[found]]]
+
+        # Self-loops have no length
+        lengths[lower == upper] = 0.
+
+        if sizes is None:
+            return lengths
+
+        # The closest index is given from the lower to the upper node of each
+        # pair, flip it for the edges which point the other way
+        flip = np.where(edge_index[0] > edge_index[1])[0]
+        size_lower, size_upper = sizes[lower[flip]], sizes[upper[flip]]
+        index[flip] = ((index[flip] % size_upper)*size_lower +
+                       index[flip]//size_upper)
+
+        return lengths, index
+
     def update_counts(self, counts, mask):
         """Updates the number of elements per entry in the batch, provided
         a mask which restricts the number of valid elements in the batch.
@@ -18,13 +18,18 @@ class CompleteGraph(GraphBase):
     """
     name = 'complete'
 
-    def generate(self, clusts, **kwargs):
+    def generate(self, clusts, neighbors=None, **kwargs):
         """Generates a complete graph on a set of batched nodes.
 
+        If the edge length is limited, only the pairs of nodes which are
+        close enough to be connected are produced.
+
         Parameters
         ----------
         clusts : IndexBatch
             (C) Cluster indexes
+        neighbors : Tuple[np.ndarray], optional
+            Pairs of nodes which can be connected and their distances
         **kwargs : dict, optional
             Unused graph generation arguments
 
@@ -35,6 +40,15 @@ class CompleteGraph(GraphBase):
         np.ndarray
             (B) Number of edges in each entry of the batch
         """
+        # If the neighbors are provided, they are ordered as a complete graph
+        if neighbors is not None:
+            edge_index = neighbors[0]
+            edge_counts = np.bincount(
+                    clusts.batch_ids[edge_index[0]],
+                    minlength=clusts.batch_size)
+
+            return edge_index, edge_counts
+
         return self._generate(clusts.counts)
 
     @staticmethod
@@ -1,9 +1,9 @@
 """k Nearest-neighbor (kNN) graph constructor for GNNs."""
 
 import numpy as np
-import numba as nb
 
-import spine.utils.numba_local as nbl
+from spine.utils.globals import COORD_COLS
+from spine.utils.gnn.network import knn_cluster_graph
 
 from .base import GraphBase
 
@@ -40,7 +40,31 @@ class KNNGraph(GraphBase):
         # Store attribute
         self.k = k
 
-    def generate(self, clusts, dist_mat, **kwargs):
+    def get_neighbors(self, data, clusts):
+        """Finds the k nearest neighbors of each node.
+
+        Parameters
+        ----------
+        data : TensorBatch
+            (N, 1 + D + N_f) Tensor of voxel/value pairs
+        clusts : IndexBatch
+            (C) Cluster indexes
+
+        Returns
+        -------
+        np.ndarray
+            (2, P) Edges from each node to its nearest neighbors
+        np.ndarray
+            (P) Distance between each pair of nodes (see `dist_method`)
+        np.ndarray
+            (P) Combined index of the closest voxels of each pair of nodes
+        """
+        return knn_cluster_graph(
+                data.tensor[:, COORD_COLS], clusts.index_list, self.k,
+                clusts.counts, method=self.dist_method,
+                algorithm=self.dist_algorithm)
+
+    def generate(self, clusts, neighbors, **kwargs):
         """Generates an incidence matrix that connects nodes that share an
         edge in their corresponding kNN graph.
 
@@ -48,8 +72,8 @@ class KNNGraph(GraphBase):
         ----------
         clusts : IndexBatch
             (C) Cluster indexes
-        dist_mat : Union[np.ndarray, torch.Tensor]
-            (C, C) Matrix of pair-wise distances between clusters in the batch
+        neighbors : Tuple[np.ndarray]
+            Edges from each node to its nearest neighbors and their lengths
         **kwargs : dict, optional
             Unused graph generation arguments
 
@@ -57,29 +81,11 @@ class KNNGraph(GraphBase):
         -------
         np.ndarray
             (2, E) Tensor of edges
+        np.ndarray
+            (B) Number of edges in each entry of the batch
         """
-        return self._generate(
-                clusts.batch_ids, self.k, dist_mat, self.directed)
-
-    @staticmethod
-    @nb.njit(cache=True)
-    def _generate(batch_ids: nb.int64[:],
-                  k: nb.int64,
-                  dist_mat: nb.float64[:,:],
-                  directed: bool = False) -> nb.int64[:,:]:
-        # Use the available distance matrix to build a kNN graph
-        ret = np.empty((0, 2), dtype=np.int64)
-        for b in np.unique(batch_ids):
-            clust_ids = np.where(batch_ids == b)[0]
-            if len(clust_ids) > 1:
-                subk = min(k+1, len(clust_ids))
-                submat = nbl.submatrix(dist_mat, clust_ids, clust_ids)
-                for i in range(len(submat)):
-                    idxs = np.argsort(submat[i])[1:subk]
-                    edges = np.empty((subk-1,2), dtype=np.int64)
-                    for j, idx in enumerate(np.sort(idxs)):
-                        edges[j] = [clust_ids[i], clust_ids[idx]]
-                    if len(edges):
-                        ret = np.vstack((ret, edges))
-
-        return ret.T
+        edge_index = neighbors[0]
+        edge_counts = np.bincount(
+                clusts.batch_ids[edge_index[0]], minlength=clusts.batch_size)
+
+        return edge_index, edge_counts
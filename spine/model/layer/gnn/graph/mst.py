@@ -1,18 +1,14 @@
 """MST graph constructor for GNNs."""
 
 import numpy as np
-import numba as nb
-
+from scipy.sparse import coo_matrix
 from scipy.sparse.csgraph import minimum_spanning_tree
 
-import spine.utils.numba_local as nbl
-
 from .base import GraphBase
 
 __all__ = ['MSTGraph']
 
 
-
 class MSTGraph(GraphBase):
     """Generates graphs based on the minimum-spanning tree (MST) of the input
     node locations.
@@ -24,16 +20,20 @@ class MSTGraph(GraphBase):
     """
     name = 'mst'
 
-    def generate(self, clusts, dist_mat, **kwargs):
+    def generate(self, clusts, neighbors, **kwargs):
         """Generates an incidence matrix that connects nodes that share an
         edge in their corresponding Euclidean MST graph.
 
+        If the edge length is limited, the minimum spanning forest of the
+        pairs of nodes closer than the maximum length is used. It contains
+        exactly the edges of the full MST which are shorter than that length.
+
         Parameters
         ----------
         clusts : IndexBatch
             (C) Cluster indexes
-        dist_mat : Union[np.ndarray, torch.Tensor]
-            (C, C) Matrix of pair-wise distances between clusters in the batch
+        neighbors : Tuple[np.ndarray]
+            Pairs of nodes which can be connected and their distances
         **kwargs : dict, optional
             Unused graph generation arguments
 
@@ -41,28 +41,26 @@ class MSTGraph(GraphBase):
         -------
         np.ndarray
             (2, E) Tensor of edges
+        np.ndarray
+            (B) Number of edges in each entry of the batch
         """
-        return self._generate(clusts.batch_ids, dist_mat, self.directed)
+        # Build a sparse adjacency matrix. There are no pairs across entries,
+        # so the spanning forest of the batch is the union of those of each
+        # entry. Pairs of nodes at zero distance are not considered as edges.
+        pairs, dists, _ = neighbors
+        num_nodes = len(clusts.index_list)
+        mask = np.where(dists > 0.)[0]
+        adj_mat = coo_matrix(
+                (dists[mask], (pairs[0, mask], pairs[1, mask])),
+                shape=(num_nodes, num_nodes))
 
-    @staticmethod
-    @nb.njit(cache=True)
-    def _generate(batch_ids: nb.int64[:],
-                  dist_mat: nb.float64[:,:],
-                  directed: bool = False) -> nb.int64[:,:]:
-        # For each batch, find the list of edges, append it
-        edge_list = []
-        num_edges = 0
-        ret = np.empty((0, 2), dtype=np.int64)
-        for b in np.unique(batch_ids):
-            clust_ids = np.where(batch_ids == b)[0]
-            if len(clust_ids) > 1:
-                submat = np.triu(nbl.submatrix(dist_mat, clust_ids, clust_ids))
-                # Suboptimal. Ideally want to reimplement in Numba, tall order.
-                with nb.objmode(mst_mat = 'float32[:,:]'): 
-                    mst_mat = minimum_spanning_tree(submat)
-                    mst_mat = mst_mat.toarray().astype(np.float32)
-                edges = np.where(mst_mat > 0.)
-                edges = np.vstack((clust_ids[edges[0]],clust_ids[edges[1]])).T
-                ret   = np.vstack((ret, edges))
+        # Find the minimum spanning forest, order edges as in a complete graph
+        mst_mat = minimum_spanning_tree(adj_mat).tocoo()
+        lower = np.minimum(mst_mat.row, mst_mat.col).astype(np.int64)
+        upper = np.maximum(mst_mat.row, mst_mat.col).astype(np.int64)
+        perm = np.argsort(lower*num_nodes + upper)
+        edge_index = np.vstack((lower[perm], upper[perm]))
+        edge_counts = np.bincount(
+                clusts.batch_ids[edge_index[0]], minlength=clusts.batch_size)
 
-        return ret.T
+        return edge_index, edge_counts
@@ -27,6 +27,11 @@ class PostBase(ABC):
         Type of `points` attribute to use for the truth particles
     units : str
         Units in which the objects must be expressed (one of 'px' or 'cm')
+    parallel : bool
+        Whether the entries of a batch can be processed independently, in
+        separate worker processes. Only set this for post-processors which
+        keep no state between entries and only modify the objects of the
+        entry they process in place
     """
     name = None
     aliases = ()
@@ -34,6 +39,7 @@ class PostBase(ABC):
     keys = None
     truth_point_mode = 'points'
     units = 'cm'
+    parallel = False
 
     # List of recognized object types
     _obj_types = ('fragment', 'particle', 'interaction')
@@ -170,7 +176,24 @@ class PostBase(ABC):
         dict
             Update to the input dictionary
         """
-        # Fetch the input dictionary
+        # Run the post-processor
+        return self.process(self.get_input(data, entry))
+
+    def get_input(self, data, entry=None):
+        """Fetches the data products needed by the post-processor.
+
+        Parameters
+        ----------
+        data : dict
+            Dicitionary of data products
+        entry : int, optional
+            Entry in the batch
+
+        Returns
+        -------
+        dict
+            Dictionary of data products used by the post-processor
+        """
         data_filter = {}
         for key, req in self.keys.items():
             # If this key is needed, check that it exists
@@ -184,8 +207,7 @@ class PostBase(ABC):
                 if entry is not None:
                     data_filter[key] = data[key][entry]
 
-        # Run the post-processor
-        return self.process(data_filter)
+        return data_filter
 
     def get_index(self, obj):
         """Get a certain pre-defined index attribute of an object.
@@ -231,6 +253,29 @@ class PostBase(ABC):
         else:
             return getattr(obj, self.truth_point_mode)
 
+    def get_bounding_box(self, obj):
+        """Get the cached bounding box of a certain pre-defined point
+        attribute of an object.
+
+        The :class:`TruthFragment`, :class:`TruthParticle` and
+        :class:`TruthInteraction` objects points are obtained using the
+        `truth_point_mode` attribute of the class.
+
+        Parameters
+        ----------
+        obj : Union[FragmentBase, ParticleBase, InteractionBase]
+            Fragment, Particle or Interaction object
+
+        Results
+        -------
+        np.ndarray
+           (2, 3) Lower and upper bounds of the point coordinates
+        """
+        if not obj.is_truth:
+            return obj.get_bounding_box('points')
+        else:
+            return obj.get_bounding_box(self.truth_point_mode)
+
     def get_sources(self, obj):
         """Get a certain pre-defined sources attribute of an object.
 
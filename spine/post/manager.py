@@ -1,22 +1,94 @@
 """Manages the operation of post-processors."""
 
+from copy import deepcopy
 from warnings import warn
+from multiprocessing import get_context
 from collections import defaultdict, OrderedDict
 
 import numpy as np
 
-from spine.utils.stopwatch import StopwatchManager
+from spine.utils.jit import run_serially
+from spine.utils.stopwatch import StopwatchManager, Time
 
 from .factories import post_processor_factory
 
+# Post-processors owned by a worker process of the parallel manager
+WORKER_MODULES = None
+
+
+def init_worker(cfgs, parent_path):
+    """Builds the post-processors in a worker process, once at startup.
+
+    Parameters
+    ----------
+    cfgs : Dict[str, dict]
+        Configuration of each post-processor to run in the worker
+    parent_path : str
+        Path to the analysis tools configuration file
+    """
+    # The workers share the cores, do not let each of them use all of them
+    run_serially()
+
+    global WORKER_MODULES # pylint: disable=W0603
+    WORKER_MODULES = OrderedDict()
+    for key, cfg in cfgs.items():
+        WORKER_MODULES[key] = post_processor_factory(
+                key, cfg, parent_path=parent_path)
+
+
+def process_entry(keys, data):
+    """Runs a sequence of post-processors on one entry in a worker process.
+
+    Parameters
+    ----------
+    keys : List[str]
+        Names of the post-processors to run, in order
+    data : dict
+        Data products of one entry needed by the post-processors
+
+    Returns
+    -------
+    result : dict
+        Update to the input dictionary
+    data : dict
+        Input data products, as modified by the post-processors
+    times : Dict[str, Time]
+        Time spent running each post-processor on the entry
+    """
+    result, times = {}, {}
+    for key in keys:
+        # Run the post-processor
+        module = WORKER_MODULES[key]
+        start = Time.current()
+        result_k = module.process(module.get_input(data))
+        times[key] = Time.current() - start
+
+        # Make its output available to the next post-processors
+        if result_k is not None:
+            data.update(result_k)
+            result.update(result_k)
+
+    return result, data, times
+
 
 class PostManager:
     """Manager in charge of handling post-processing scripts.
-    
+
     It loads all the post-processor objects once and feeds them data.
+
+    If `num_workers` is specified, the entries of a batch are distributed
+    among a pool of worker processes. The pool is started from a fork server,
+    such that the workers do not inherit the threads of the main process, and
+    each worker builds its own post-processors once, when it starts. Each
+    entry is sent once through every consecutive post-processor which can
+    run in parallel. The input objects modified by the workers are merged
+    back into the objects of the main process, such that references between
+    them are preserved. Post-processors only run in the workers if they set
+    `parallel = True` (i.e. they only modify the objects of the entry they
+    process, in place).
     """
 
-    def __init__(self, cfg, parent_path=None):
+    def __init__(self, cfg, parent_path=None, num_workers=0):
         """Initialize the post-processing manager.
 
         Parameters
@@ -25,6 +97,9 @@ class PostManager:
             Post-processor configurations
         parent_path : str, optional
             Path to the analysis tools configuration file
+        num_workers : int, default 0
+            Number of worker processes used to process the entries of a batch
+            in parallel. If 0, the entries are processed in the main process.
         """
         # Loop over the post-processor modules and get their priorities
         keys = np.array(list(cfg.keys()))
@@ -36,15 +111,37 @@ class PostManager:
         # Add the modules to a processor list in decreasing order of priority
         self.watch = StopwatchManager()
         self.modules = OrderedDict()
+        cfgs = {}
         keys = keys[np.argsort(-priorities)]
         for k in keys:
             # Profile the module
             self.watch.initialize(k)
 
             # Append
+            cfgs[k] = deepcopy(cfg[k])
             self.modules[k] = post_processor_factory(
                     k, cfg[k], parent_path=parent_path)
 
+        # Group consecutive modules which can run in the worker processes
+        assert num_workers >= 0, "The number of workers must be positive."
+        self.num_workers = num_workers
+        self.groups = []
+        for k, module in self.modules.items():
+            parallel = num_workers > 0 and module.parallel
+            if parallel and len(self.groups) and self.groups[-1][0]:
+                self.groups[-1][1].append(k)
+            else:
+                self.groups.append((parallel, [k]))
+
+        # If there are modules to run in parallel, start the pool of workers
+        self.pool = None
+        if any(parallel for parallel, _ in self.groups):
+            worker_cfgs = {k: cfgs[k] for k, m in self.modules.items()
+                           if m.parallel}
+            self.pool = get_context('forkserver').Pool(
+                    num_workers, initializer=init_worker,
+                    initargs=(worker_cfgs, parent_path))
+
     def __call__(self, data):
         """Pass one batch of data through the post-processors.
 
@@ -53,30 +150,191 @@ class PostManager:
         data : dict
             Dictionary of data products
         """
-        # Loop over the post-processor modules
+        # Loop over the groups of post-processor modules
         single_entry = np.isscalar(data['index'])
-        for key, module in self.modules.items():
-            # Run the post-processor on each entry
-            self.watch.start(key)
-            if single_entry:
-                result = module(data)
+        num_entries = None if single_entry else len(data['index'])
+        for parallel, keys in self.groups:
+            # Run a group of parallel modules on each entry in the workers
+            if parallel and not single_entry:
+                result = self.process_parallel(keys, data, num_entries)
+                self.update(data, result, num_entries)
+                continue
+
+            # Otherwise, run the module on each entry in the main process
+            for key in keys:
+                module = self.modules[key]
+                self.watch.start(key)
+                if single_entry:
+                    result = module(data)
+
+                else:
+                    result = defaultdict(list)
+                    for entry in range(num_entries):
+                        result_e = module(data, entry)
+                        if result_e is not None:
+                            for k, v in result_e.items():
+                               result[k].append(v)
+
+                self.watch.stop(key)
+
+                # Update the input dictionary
+                if result is not None:
+                    self.update(data, result, num_entries)
+
+    def close(self):
+        """Shuts down the pool of worker processes, if there is one."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    @staticmethod
+    def update(data, result, num_entries=None):
+        """Updates the input dictionary with the output of a post-processor.
 
+        Parameters
+        ----------
+        data : dict
+            Dictionary of data products
+        result : dict
+            Update to the input dictionary
+        num_entries : int, optional
+            Number of entries in the batch, if the data is batched
+        """
+        for key, val in result.items():
+            if num_entries is not None:
+                assert len(val) == num_entries, (
+                        f"The number {key} ({len(val)}) does not match "
+                        f"the number of entries ({num_entries}).")
+            data[key] = val
+
+    def process_parallel(self, keys, data, num_entries):
+        """Runs a group of post-processors on all the entries of a batch, in
+        parallel.
+
+        Parameters
+        ----------
+        keys : List[str]
+            Names of the post-processors to run, in order
+        data : dict
+            Dictionary of data products
+        num_entries : int
+            Number of entries in the batch
+
+        Returns
+        -------
+        dict
+            Update to the input dictionary
+        """
+        # Fetch the data products needed by any of the modules
+        start = Time.current()
+        input_keys = []
+        for key in keys:
+            for k in self.modules[key].keys:
+                if k in data and k not in input_keys:
+                    input_keys.append(k)
+
+        # Dispatch the entries to the workers, once for the whole group
+        args = [(keys, {k: data[k][entry] for k in input_keys})
+                for entry in range(num_entries)]
+        outputs = self.pool.starmap(process_entry, args)
+
+        # Merge the modified inputs back, collect the results
+        result = defaultdict(list)
+        times = {key: Time(0., 0.) for key in keys}
+        for entry, (result_e, data_e, times_e) in enumerate(outputs):
+            for k in input_keys:
+                self.merge(data[k], entry, data_e[k])
+            for k, v in result_e.items():
+                result[k].append(v)
+            for key, time_e in times_e.items():
+                times[key] += time_e
+
+        # Share the elapsed time between the modules in proportion to the
+        # time the workers spent running each of them, add the worker CPU time
+        elapsed = Time.current() - start
+        total = sum(time.wall for time in times.values())
+        for key, time in times.items():
+            frac = time.wall/total if total > 0. else 1./len(keys)
+            self.watch.record(
+                    key, Time(elapsed.wall*frac, elapsed.cpu*frac + time.cpu))
+
+        return result
+
+    @staticmethod
+    def merge(values, entry, value):
+        """Merges an entry modified in a worker process back into the batch.
+
+        Objects are updated in place, such that other references to the same
+        objects (e.g. particles shared by interactions) see the update.
+
+        Parameters
+        ----------
+        values : list
+            Values of a data product for each entry in the batch
+        entry : int
+            Entry in the batch
+        value : object
+            Value of the data product returned by the worker for this entry
+        """
+        orig = values[entry]
+        if PostManager.is_object_list(orig) and len(orig) == len(value):
+            memo = set()
+            for orig_obj, obj in zip(orig, value):
+                PostManager.update_object(orig_obj, obj, memo)
+
+        elif (isinstance(orig, np.ndarray) and orig.dtype != object and
+              orig.flags.writeable and orig.shape == value.shape and
+              orig.dtype == value.dtype):
+            orig[...] = value
+
+        elif hasattr(orig, '__dict__') and type(orig) is type(value):
+            PostManager.update_object(orig, value, set())
+
+        else:
+            values[entry] = value
+
+    @staticmethod
+    def update_object(orig, obj, memo):
+        """Recursively copies the attributes of an object onto another.
+
+        Lists of objects are updated element by element, rather than replaced.
+
+        Parameters
+        ----------
+        orig : object
+            Object to update
+        obj : object
+            Object to copy the attributes from
+        memo : set
+            Set of object IDs already updated
+        """
+        if id(orig) in memo:
+            return
+        memo.add(id(orig))
+
+        for attr, val in vars(obj).items():
+            cur = getattr(orig, attr, None)
+            if (PostManager.is_object_list(cur) and
+                PostManager.is_object_list(val) and len(cur) == len(val)):
+                for orig_el, el in zip(cur, val):
+                    PostManager.update_object(orig_el, el, memo)
             else:
-                num_entries = len(data['index'])
-                result = defaultdict(list)
-                for entry in range(num_entries):
-                    result_e = module(data, entry)
-                    if result_e is not None:
-                        for k, v in result_e.items():
-                           result[k].append(v)
-
-            self.watch.stop(key)
-
-            # Update the input dictionary
-            if result is not None:
-                for key, val in result.items():
-                    if not single_entry:
-                        assert len(val) == num_entries, (
-                                f"The number {key} ({len(val)}) does not match "
-                                f"the number of entries ({num_entries}).")
-                    data[key] = val
+                setattr(orig, attr, val)
+
+    @staticmethod
+    def is_object_list(value):
+        """Checks whether a value is a list of objects with attributes.
+
+        Parameters
+        ----------
+        value : object
+            Value to check
+
+        Returns
+        -------
+        bool
+            `True` if the value is a non-empty list of objects
+        """
+        return (isinstance(value, (list, tuple)) and len(value) > 0 and
+                np.all([hasattr(v, '__dict__') for v in value]))
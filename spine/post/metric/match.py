@@ -74,6 +74,10 @@ class MatchProcessor(PostBase):
         ghost : bool, default False
             Whether a deghosting process was applied (in which case the indexes
             of the reco and the truth particles do not align)
+        sparse : bool, default False
+            If `True`, only compute the non-zero overlaps between objects,
+            rather than a dense overlap matrix. This is much cheaper for
+            events with a large number of objects.
         """
         fn: object = None
         match_mode: str = 'both'
@@ -81,6 +85,7 @@ class MatchProcessor(PostBase):
         min_overlap: float = 0.
         weight_overlap: bool = False
         ghost: bool = False
+        sparse: bool = False
 
         # Valid match modes
         _match_modes = ['reco_to_truth', 'truth_to_reco', 'both', 'all']
@@ -101,9 +106,14 @@ class MatchProcessor(PostBase):
                 f"Must be one of {self._overlap_modes}.")
 
             # Check that the overlap mode and weighting are compatible
-            assert not self.weight_overlap or overlap in ['iou', 'dice'], (
+            assert (not self.weight_overlap or
+                    self.overlap_mode in ['iou', 'dice']), (
                     "Only IoU and Dice-based overlap functions can be weighted.")
 
+            # Check that the overlap mode can produce sparse overlaps
+            assert not self.sparse or self.overlap_mode != 'chamfer', (
+                    "The Chamfer distance does not support sparse matching.")
+
             # Initialize the match overlap function
             prefix = 'overlap' if not self.weight_overlap else 'overlap_weighted'
             self.fn = getattr(
@@ -163,14 +173,14 @@ class MatchProcessor(PostBase):
             else:
                 # The indexes of reco and truth point to different point sets.
                 # In this case, convert the positions to indexes
-                reco_input = []
+                reco_input = nb.typed.List()
                 for p in reco_objs:
                     coords = self.get_points(p)
                     if p.units != 'px':
                         coords = meta.to_px(coords, floor=True)
                     reco_input.append(meta.index(coords))
 
-                truth_input = []
+                truth_input = nb.typed.List()
                 for p in truth_objs:
                     coords = self.get_points(p)
                     if p.units != 'px':
@@ -182,6 +192,12 @@ class MatchProcessor(PostBase):
             reco_input = nb.typed.List([self.get_points(p) for p in reco_objs])
             truth_input = nb.typed.List([self.get_points(p) for p in truth_objs])
 
+        # If requested, only compute the non-zero overlaps
+        if matcher.sparse:
+            return self.process_sparse(
+                    reco_objs, truth_objs, reco_input, truth_input, matcher,
+                    name)
+
         # Pass lists to the matching function to compute overlaps
         if len(reco_input) and len(truth_input):
             ovl_matrix = matcher.fn(reco_input, truth_input)
@@ -192,7 +208,7 @@ class MatchProcessor(PostBase):
         if matcher.overlap_mode != 'chamfer':
             ovl_valid = ovl_matrix > matcher.min_overlap
         else:
-            ovl_valid = ovl_matrix < match.min_overlap
+            ovl_valid = ovl_matrix < matcher.min_overlap
 
         # Produce matches
         result = {}
@@ -210,6 +226,108 @@ class MatchProcessor(PostBase):
 
         return result
 
+    def process_sparse(self, reco_objs, truth_objs, reco_input, truth_input,
+                       matcher, name):
+        """Match all the requested objects in a single category, using
+        only the non-zero overlaps between objects.
+
+        Parameters
+        ----------
+        reco_objs : List[object]
+            List of reconstructed objects
+        truth_objs : List[object]
+            List of truth objects
+        reco_input : nb.typed.List
+            List of reconstructed object indexes
+        truth_input : nb.typed.List
+            List of truth object indexes
+        matcher : MatchProcessor.Matcher
+            Matching method and function
+        name : str
+            Object type name
+        """
+        # Compute the non-zero overlaps, apply the selection cut
+        if len(reco_input) and len(truth_input):
+            pairs, overlaps = spine.utils.match.overlap_sparse(
+                    reco_input, truth_input, matcher.overlap_mode,
+                    matcher.weight_overlap)
+        else:
+            pairs = np.empty((0, 2), dtype=np.int64)
+            overlaps = np.empty(0, dtype=np.float32)
+
+        valid = overlaps > matcher.min_overlap
+        pairs, overlaps = pairs[valid], overlaps[valid]
+
+        # Produce matches
+        result = {}
+        if matcher.match_mode != 'truth_to_reco':
+            pairs_r2t, overlaps_r2t = self.generate_matches_sparse(
+                    reco_objs, truth_objs, pairs, overlaps)
+            result[f'{name}_matches_r2t'] = pairs_r2t
+            result[f'{name}_matches_r2t_overlap'] = overlaps_r2t
+
+        if matcher.match_mode != 'reco_to_truth':
+            pairs_t2r, overlaps_t2r = self.generate_matches_sparse(
+                    truth_objs, reco_objs, pairs[:, ::-1], overlaps)
+            result[f'{name}_matches_t2r'] = pairs_t2r
+            result[f'{name}_matches_t2r_overlap'] = overlaps_t2r
+
+        return result
+
+    @staticmethod
+    def generate_matches_sparse(source_objs, target_objs, pairs, overlaps):
+        """Generate pairs for a set of sources and targets, given a list of
+        valid (source, target) overlaps.
+
+        Parameters
+        ----------
+        source_objs : List[object]
+            (N) List of source objects
+        target_objs : List[object]
+            (M) List of truth objects
+        pairs : np.ndarray
+            (E, 2) List of valid (source, target) index pairs
+        overlaps : np.ndarray
+            (E) Overlap of each valid pair
+
+        Returns
+        -------
+        pairs : List[tuple]
+            (N) List of (source, target) matched pairs (best match only)
+        overlaps : List[float]
+            (N) List of overlap between each source and the best matched target
+        """
+        # Order the valid pairs by source, then by decreasing overlap
+        perm = np.lexsort((pairs[:, 1], -overlaps, pairs[:, 0]))
+        pairs, overlaps = pairs[perm], overlaps[perm]
+        bounds = np.searchsorted(
+                pairs[:, 0], np.arange(len(source_objs) + 1))
+
+        # Build the matches
+        match_pairs, pair_overlaps = [], []
+        for i, s in enumerate(source_objs):
+            start, end = bounds[i], bounds[i + 1]
+            if start == end:
+                # If there are no matches, fill dummy values
+                s.is_matched = False
+                s.match_ids = np.empty(0, dtype=np.int64)
+                s.match_overlaps = np.empty(0, dtype=np.float32)
+
+                match_pairs.append((s, None))
+                pair_overlaps.append(-1.)
+
+            else:
+                # If there are matches, they are ordered by decreasing overlap
+                s.is_matched = True
+                s.match_ids = pairs[start:end, 1]
+                s.match_overlaps = overlaps[start:end]
+
+                best_idx = s.match_ids[0]
+                match_pairs.append((s, target_objs[best_idx]))
+                pair_overlaps.append(s.match_overlaps[0])
+
+        return match_pairs, pair_overlaps
+
     @staticmethod
     def generate_matches(source_objs, target_objs, ovl_matrix, ovl_valid):
         """Generate pairs for a srt of sources and targets.
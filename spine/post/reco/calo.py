@@ -16,6 +16,7 @@ class CalorimetricEnergyProcessor(PostBase):
     """
     name = 'calo_ke'
     aliases = ['reconstruct_calo_energy']
+    parallel = True
 
     def __init__(self, scaling=1., shower_fudge=1., obj_type='particle',
                  run_mode='reco', truth_dep_mode='depositions'):
@@ -16,6 +16,7 @@ class DirectionProcessor(PostBase):
     """
     name = 'direction'
     aliases = ['reconstruct_directions']
+    parallel = True
 
     def __init__(self, neighborhood_radius=-1, optimize=True,
                  obj_type='particle', truth_point_mode='points',
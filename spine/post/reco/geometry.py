@@ -19,6 +19,7 @@ class ContainmentProcessor(PostBase):
     """
     name = 'containment'
     aliases = ['check_containment']
+    parallel = True
 
     def __init__(self, margin, cathode_margin=None, detector=None,
                  boundary_file=None, source_file=None, mode='module',
@@ -84,6 +85,7 @@ class ContainmentProcessor(PostBase):
             self.margin = margin
 
         # Store parameters
+        self.use_source = mode == 'source'
         self.allow_multi_module = allow_multi_module
 
         # Store the particle size thresholds in a dictionary
@@ -113,24 +115,38 @@ class ContainmentProcessor(PostBase):
 
         # Loop over particle objects
         for k in self.fragment_keys + self.particle_keys:
-            for obj in data[k]:
-                # Make sure the particle coordinates are expressed in cm
+            # Make sure the particle coordinates are expressed in cm
+            objects = data[k]
+            if not len(objects):
+                continue
+            for obj in objects:
                 self.check_units(obj)
 
-                # Get point coordinates
-                points = self.get_points(obj)
-                if not len(points):
-                    obj.is_contained = True
-                    continue
+            # Fetch the cached bounding box of each object. A point cloud is
+            # contained in a box-shaped volume if and only if its box is
+            boxes = np.array([self.get_bounding_box(obj) for obj in objects])
+            lower, upper = boxes[:, 0], boxes[:, 1]
+
+            # Check the containment of all the objects at once
+            if not self.use_meta:
+                mask = None
+                if self.use_source:
+                    sources = [obj.sources for obj in objects]
+                    counts = [len(s) for s in sources]
+                    mask = self.geo.get_contributor_mask(
+                            np.vstack(sources), counts)
+
+                contained = self.geo.check_box_containment(
+                        lower, upper, mask, self.allow_multi_module)
+            else:
+                contained = (
+                        (lower > (meta.lower + self.margin)).all(axis=1) &
+                        (upper < (meta.upper - self.margin)).all(axis=1))
 
-                # Check particle containment
-                if not self.use_meta:
-                    obj.is_contained = self.geo.check_containment(
-                            points, obj.sources, self.allow_multi_module)
-                else:
-                    obj.is_contained = (
-                            (points > (meta.lower + self.margin)).all() and
-                            (points < (meta.upper - self.margin)).all())
+            # Objects with no points are considered contained
+            contained |= (lower > upper).any(axis=1)
+            for obj, is_contained in zip(objects, contained):
+                obj.is_contained = bool(is_contained)
 
         # Loop over interaction objects
         for k in self.interaction_keys:
@@ -156,6 +172,7 @@ class FiducialProcessor(PostBase):
     """
     name = 'fiducial'
     aliases = ['check_fiducial']
+    parallel = True
 
     def __init__(self, margin, cathode_margin=None, detector=None,
                  boundary_file=None, mode='module', run_mode='both',
@@ -225,21 +242,28 @@ class FiducialProcessor(PostBase):
 
         # Loop over interaction objects
         for k in self.interaction_keys:
-            for inter in data[k]:
+            interactions = data[k]
+            if not len(interactions):
+                continue
+
+            # Get the vertex coordinates
+            vertices = np.empty((len(interactions), 3))
+            for i, inter in enumerate(interactions):
                 # Make sure the interaction coordinates are expressed in cm
                 self.check_units(inter)
-
-                # Get point coordinates
                 if not inter.is_truth:
-                    vertex = inter.vertex
+                    vertices[i] = inter.vertex
                 else:
-                    vertex = getattr(inter, self.truth_vertex_mode)
-                vertex = vertex.reshape(-1,3)
+                    vertices[i] = getattr(inter, self.truth_vertex_mode)
 
-                # Check containment
-                if not self.use_meta:
-                    inter.is_fiducial = self.geo.check_containment(vertex)
-                else:
-                    inter.is_fiducial = (
-                            (vertex > (meta.lower + self.margin)).all() and
-                            (vertex < (meta.upper - self.margin)).all())
+            # Check containment of all vertices at once (a single point is
+            # its own bounding box)
+            if not self.use_meta:
+                fiducial = self.geo.check_box_containment(vertices, vertices)
+            else:
+                fiducial = (
+                        (vertices > (meta.lower + self.margin)).all(axis=1) &
+                        (vertices < (meta.upper - self.margin)).all(axis=1))
+
+            for inter, is_fiducial in zip(interactions, fiducial):
+                inter.is_fiducial = bool(is_fiducial)
@@ -20,6 +20,7 @@ class ParticleShapeLogicProcessor(PostBase):
     """
     name = 'shape_logic'
     aliases = ['enforce_particle_semantics']
+    parallel = True
 
     def __init__(self, enforce_pid=True, enforce_primary=True):
         """Store information about which particle properties should
@@ -80,6 +81,7 @@ class ParticleThresholdProcessor(PostBase):
     """
     name = 'particle_threshold'
     aliases = ['adjust_particle_properties']
+    parallel = True
 
     def __init__(self, shower_pid_thresholds=None, track_pid_thresholds=None,
                  primary_threshold=None):
@@ -158,6 +160,7 @@ class InteractionTopologyProcessor(PostBase):
     """
     name = 'topology_threshold'
     aliases = ['adjust_interaction_topology']
+    parallel = True
 
     def __init__(self, ke_thresholds, reco_ke_mode='ke',
                  truth_ke_mode='energy_deposit', run_mode='both'):
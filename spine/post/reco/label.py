@@ -18,6 +18,7 @@ class ChildrenProcessor(PostBase):
     """
     name = 'children_count'
     aliases = ['count_children']
+    parallel = True
 
     def __init__(self, mode='shape', obj_type='particle'):
         """Initialize the children counting parameters.
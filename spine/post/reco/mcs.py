@@ -18,6 +18,7 @@ class MCSEnergyProcessor(PostBase):
     """
     name = 'mcs_ke'
     aliases = ['reconstruct_mcs_energy']
+    parallel = True
 
     def __init__(self, tracking_mode='bin_pca', segment_length=5.0,
                  split_angle=False, res_a=0.25, res_b=1.25,
@@ -14,6 +14,7 @@ class TrackExtremaProcessor(PostBase):
     name = 'track_extrema'
     aliases = ['assign_track_extrema']
     keys = {'ppn_candidates': False}
+    parallel = True
 
     def __init__(self, method='local', obj_type='particle', **kwargs):
         """Initialize the track end point assignment parameters.
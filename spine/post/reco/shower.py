@@ -19,6 +19,7 @@ class ConversionDistanceProcessor(PostBase):
     """
     name = 'shower_conversion_distance'
     aliases = ['shower_separation_processor']
+    parallel = True
     
     def __init__(self, threshold=-1.0, vertex_mode='vertex'):
         """Specify the EM shower conversion distance threshold and
@@ -167,6 +168,7 @@ class ShowerMultiArmCheck(PostBase):
     """
     name = 'shower_multi_arm_check'
     aliases = ['shower_multi_arm']
+    parallel = True
     
     def __init__(self, threshold=0.25, min_samples=20, eps=0.02):
         """Specify the threshold for the number of arms of showers.
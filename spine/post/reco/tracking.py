@@ -21,6 +21,7 @@ class CSDAEnergyProcessor(PostBase):
     """
     name = 'csda_ke'
     aliases = ['reconstruct_csda_energy']
+    parallel = True
 
     def __init__(self, tracking_mode='step_next',
                  include_pids=[MUON_PID, PION_PID, PROT_PID, KAON_PID],
@@ -98,6 +99,7 @@ class TrackValidityProcessor(PostBase):
     """
     name = 'track_validity'
     aliases = ['track_validity_processor']
+    parallel = True
 
     def __init__(self, threshold=3., ke_threshold=50.,
                  check_small_track=False, **kwargs):
@@ -14,6 +14,7 @@ class VertexProcessor(PostBase):
     """Reconstruct one vertex for each interaction in the provided list."""
     name = 'vertex'
     aliases = ['reconstruct_vertex']
+    parallel = True
 
     def __init__(self, include_shapes=[SHOWR_SHP, TRACK_SHP],
                  use_primaries=True, update_primaries=False,
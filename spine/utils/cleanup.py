@@ -0,0 +1,39 @@
+"""Module with tools to release resources when the process exits."""
+
+import weakref
+
+__all__ = ['close_on_exit']
+
+
+def close_on_exit(obj):
+    """Registers an object to be closed when the process exits.
+
+    Unlike `atexit.register(obj.close)`, this only holds a weak reference to
+    the object, which can still be garbage collected before the process
+    exits. The finalizer cannot reach the object once it is collected: an
+    object dropped before exit must close itself (e.g. in its `__del__`).
+
+    Parameters
+    ----------
+    obj : object
+        Object with a `close` method
+
+    Returns
+    -------
+    weakref.finalize
+        Finalizer which closes the object, if it is still alive
+    """
+    return weakref.finalize(obj, close_ref, weakref.ref(obj))
+
+
+def close_ref(ref):
+    """Closes an object through a weak reference, if it is still alive.
+
+    Parameters
+    ----------
+    ref : weakref.ref
+        Weak reference to an object with a `close` method
+    """
+    obj = ref()
+    if obj is not None:
+        obj.close()
@@ -1,10 +1,10 @@
 """Connected component clustering module."""
 
 import numpy as np
-from scipy.sparse import coo_matrix, csgraph
 import torch
 
 from spine.data import TensorBatch
+from spine.utils.numba_local import union_find
 
 from .orphan import OrphanAssigner
 
@@ -35,20 +35,25 @@ class ConnectedComponentClusterer:
 
     def __call__(self, node_coords, edge_index, edge_assn,
                  node_clusts, edge_clusts, min_size=None):
-        """Loop over the list of batch entries and semantic classes and
-        label points use connected-component clustering.
+        """Label points of all batch entries and semantic classes at once
+        using connected-component clustering.
+
+        The graphs of all (entry, shape) pairs are merged into a single graph,
+        the connected components of which are found in a single union-find
+        pass. The clusters are numbered by entry, shape and first node.
 
         Parameters
         ----------
         node_coords : TensorBatch
             (N, 3) Set of point coordinates
         edge_index : TensorBatch
-            (E, 2) Set of edge source and target indices
+            (E, 2) Set of edge source and target indices, relative to the
+            list of nodes of the (entry, shape) pair they belong to
         edge_assn : TensorBatch
             (E) Boolean assignment for each edge (0 for off, 1 for on)
-        node_clusts : List[List[List[int]]]
+        node_clusts : IndexBatch
             (B, S) One list of node indices per (batch ID, shape) pair
-        edge_clusts : List[List[List[int]]]
+        edge_clusts : IndexBatch
             (B, S) One list of edge indices per (batch ID, shape) pair
         min_size : int, optional
             Override the minimum cluster size set in the configuration
@@ -68,122 +73,89 @@ class ConnectedComponentClusterer:
             edge_index = edge_index.to_numpy()
             edge_assn = edge_assn.to_numpy()
 
-        # Loop over the unique entries in the batch
-        node_pred_list = []
-        for b in range(node_coords.batch_size):
-            # Make predictions for one entry
-            node_pred_b = self.fit_predict_entry(
-                    node_coords[b], edge_index[b], edge_assn[b],
-                    node_clusts[b], edge_clusts[b], min_size)
+        # Narrow down the input to the nodes and edges that are clustered
+        num_graphs = len(node_clusts.single_counts)
+        assert num_graphs == len(edge_clusts.single_counts), (
+                "There should be one index per semantic class for both "
+                "nodes and edges. Got different size arrays.")
+        assert edge_index.shape[1] == 2, (
+                "The edge index must be of shape (E, 2)")
+        node_index = node_clusts.full_index
+        edge_ids = edge_clusts.full_index
+        node_groups = node_clusts.index_ids
+        edge_groups = edge_clusts.index_ids
+
+        # Express the edges which are turned on in terms of the position of
+        # their nodes in the list of clustered nodes. The nodes are ordered
+        # by (entry, shape), such that the components are too
+        edge_on = edge_assn.tensor[edge_ids] == 1
+        starts = node_clusts.single_edges[:-1][edge_groups[edge_on]]
+        edges = starts[:, None] + edge_index.tensor[edge_ids[edge_on]]
+
+        # Find the connected components of the whole batch at once
+        node_pred = union_find(
+                edges.astype(np.int64), len(node_index), return_inverse=True)
+
+        # If min_size is set, downselect the points considered labeled
+        min_size = min_size if min_size is not None else self.min_size
+        if min_size > 1:
+            sizes = np.bincount(node_pred)
+            node_pred[sizes[node_pred] < min_size] = -1
 
-            node_pred_list.append(node_pred_b)
+        # If requested, assign the orphans of each (entry, shape) pair
+        if self.orphan_assigner is not None:
+            node_pred = self.assign_orphans(
+                    node_coords.tensor[node_index], node_pred,
+                    node_clusts.single_edges)
+
+        # Number the clusters consecutively in each entry, by (shape, label)
+        valid = np.where(node_pred > -1)[0]
+        num_labels = np.max(node_pred) + 1 if len(valid) else 1
+        keys = node_groups[valid]*num_labels + node_pred[valid]
+        uniques, inverse = np.unique(keys, return_inverse=True)
+        clust_batch_ids = node_clusts.batch_ids[uniques//num_labels]
+        clust_counts = np.bincount(
+                clust_batch_ids, minlength=node_coords.batch_size)
+        clust_offsets = np.cumsum(clust_counts) - clust_counts
+        inverse = inverse.flatten()
+        node_pred[valid] = inverse - clust_offsets[clust_batch_ids[inverse]]
 
         # Aggregate the node assignments into a batched object. If the input
         # is a torch tensor, convert the output
-        node_pred = np.concatenate(node_pred_list)
-        node_pred = TensorBatch(node_pred, counts=node_coords.counts)
+        node_pred_full = np.full(len(node_coords.tensor), -1, dtype=np.int64)
+        node_pred_full[node_index] = node_pred
+        node_pred = TensorBatch(node_pred_full, counts=node_coords.counts)
         if tensor_input:
             node_pred = node_pred.to_tensor(dtype=torch.long, device=device)
 
         return node_pred
 
-    def fit_predict_entry(self, node_coords, edge_index, edge_assn,
-                          node_clusts, edge_clusts, min_size=None):
-        """Assign cluster labels to graph nodes based on edge assignments
-        in one entry.
-
-        Parameters
-        ----------
-        node_coords : np.ndarray
-            (N, 3) Set of point coordinates
-        edge_index : np.ndarray
-            (E, 2) Set of edge source and target indices
-        edge_assn : np.ndarray
-            (E) Boolean assignment for each edge (0 for off, 1 for on)
-        node_clusts : List[List[int]]
-            (B, S) One list of node indices per (batch ID, shape) pair
-        edge_clusts : List[List[int]]
-            (B, S) One list of edge indices per (batch ID, shape) pair
-        min_size : int, optional
-            Override the minimum cluster size set in the configuration
-
-        Returns
-        -------
-        np.ndarry
-            (N) Cluster assignments for each of the points in the input
-        """
-        # Narrow down the input to this specific entry
-        assert len(node_clusts) == len(edge_clusts), (
-                "There should be one index per semantic class for both "
-                "nodes and edges. Got different size arrays.")
-
-        # Loop over the semantic classes
-        offset = 0
-        node_pred = -np.ones(len(node_coords), dtype=int)
-        for (nindex, eindex) in zip(node_clusts, edge_clusts):
-            # Get predictions for a specifc (batch ID, shape) pair
-            node_pred_s = self.fit_predict_one(
-                    node_coords[nindex], edge_index[eindex],
-                    edge_assn[eindex], offset, min_size)
-
-            # Update the list of node assignments, offset the cluster
-            # counter to make sure there is no overlap between shapes
-            if len(nindex):
-                node_pred[nindex] = node_pred_s
-                offset = int(node_pred.max()) + 1
-        
-        return node_pred
-
-    def fit_predict_one(self, node_coords, edge_index, edge_assn, offset,
-                        min_size=None):
-        """Assign cluster labels to graph nodes based on edge assignments
-        in one graph, i.e. one (entry, shape) pair.
+    def assign_orphans(self, node_coords, node_pred, edges):
+        """Assign the orphaned nodes of each graph, i.e. each (entry, shape)
+        pair, to one of the clusters of the same graph.
 
         Parameters
         ----------
         node_coords : np.ndarray
-            (N, 3) Set of point coordinates
-        edge_index : np.ndarray
-            (E, 2) Set of edge source and target indices
-        edge_assn : np.ndarray
-            (E) Boolean assignment for each edge (0 for off, 1 for on)
-        offset : int
-            Offset to apply to assigned nodes
-        min_size : int, optional
-            Override the minimum cluster size set in the configuration
+            (N, 3) Set of point coordinates, ordered by graph
+        node_pred : np.ndarray
+            (N) Cluster assignments (-1 for orphans), ordered by graph
+        edges : np.ndarray
+            (G + 1) Boundaries between the nodes of successive graphs
 
         Returns
         -------
-        np.ndarry
-            (N) Cluster assignments for each of the points in the input
+        np.ndarray
+            (N) Updated cluster assignments
         """
-        # Narrow down the list of edges to those turned on
-        assert edge_index.shape[1] == 2, (
-                "The edge index must be of shape (E, 2)")
-        edges = edge_index[edge_assn == 1]
-
-        # Convert the set of edges to a coordinate-format sparse adjacency matrix
-        num_nodes = len(node_coords)
-        edge_assn = np.ones(len(edges), dtype=int)
-        adj = coo_matrix((edge_assn, tuple(edges.T)), (num_nodes, num_nodes))
-
-        # Find connected components, allow for unidirectional connections
-        _, node_pred = csgraph.connected_components(adj, connection='weak')
-        node_pred = node_pred.astype(np.int64)
-
-        # If min_size is set, downselect the points considered labeled
-        min_size = min_size if min_size is not None else self.min_size
-        if min_size > 1:
-            _, inverse, counts = np.unique(
-                    node_pred, return_inverse=True, return_counts=True)
-            orphan_mask = np.where(counts[inverse] < min_size)[0]
-            node_pred[orphan_mask] = -1
-
-        # If requested, assign the orphans
-        if self.orphan_assigner is not None:
-            node_pred = self.orphan_assigner(node_coords, node_pred)
-
-        # Offset the valid assignments
-        node_pred[node_pred != -1] += offset
+        # Loop over the graphs which contain orphans. The labels only need to
+        # be unique within each graph
+        node_pred = node_pred.copy()
+        orphan_ids = np.searchsorted(
+                edges, np.where(node_pred == -1)[0], side='right') - 1
+        for g in np.unique(orphan_ids):
+            index = slice(edges[g], edges[g + 1])
+            node_pred[index] = self.orphan_assigner(
+                    node_coords[index], node_pred[index])
 
         return node_pred
@@ -164,6 +164,9 @@ class Geometry:
         if self.boundaries.shape[1] == 2:
             self.build_planes()
 
+        # Build the lookup tables used to assign points to volumes
+        self.build_lookups()
+
         # Containment volumes to be defined by the user
         self._cont_volumes = None
         self._cont_use_source = False
@@ -288,6 +291,119 @@ class Geometry:
                 # Store the drift direction for each TPC
                 self.drift_dirs[m, t] = (-1)**side * drift_dir
 
+    def build_lookups(self):
+        """Builds the lookup tables used to assign points to detector volumes.
+
+        Along each axis, space is partitioned by a sorted list of cuts. A
+        point is assigned to a cell of the resulting grid with one binary
+        search per axis and the cell is mapped to a volume through a table:
+        - Modules: the cuts sit halfway between module centers, such that
+          each cell holds the points closest to the module at its center;
+        - TPCs: the cuts are the TPC boundaries, such that each cell is
+          either contained in a single TPC or outside of all of them.
+
+        Also builds a map from each logical [module ID, tpc ID] pair to the
+        TPCs it contributes to, as defined by the sources.
+        """
+        # Module lookup: each cell corresponds to a grid point of module
+        # centers, assign it to the module closest to that grid point
+        coords = [np.unique(self.centers[:, d]) for d in range(3)]
+        self._module_cuts = [(c[1:] + c[:-1])/2 for c in coords]
+        grid = np.stack(np.meshgrid(*coords, indexing='ij'), axis=-1)
+        dists = np.linalg.norm(grid[..., None, :] - self.centers, axis=-1)
+        self._module_table = np.argmin(dists, axis=-1).astype(np.int32)
+
+        # TPC lookup: mark the cells which are contained in each TPC. Fill
+        # in reverse order such that the lowest TPC index is kept, if any
+        self._tpc_cuts = [np.unique(self.tpcs[:, d]) for d in range(3)]
+        mids = [np.concatenate(([-np.inf], (c[1:] + c[:-1])/2, [np.inf]))
+                for c in self._tpc_cuts]
+        self._tpc_table = np.full([len(m) for m in mids], -1, dtype=np.int64)
+        for t in range(self.num_tpcs - 1, -1, -1):
+            tpc = self.tpcs[t]
+            masks = [(m > tpc[d, 0]) & (m < tpc[d, 1])
+                     for d, m in enumerate(mids)]
+            self._tpc_table[np.ix_(*masks)] = t
+
+        # Source map: flag the TPCs each logical source contributes to
+        sources = self.sources.reshape(self.num_tpcs, -1, 2)
+        shape = np.max(sources.reshape(-1, 2), axis=0) + 1
+        self._source_map = np.zeros((*shape, self.num_tpcs), dtype=bool)
+        for t, tpc_sources in enumerate(sources):
+            tpc_sources = tpc_sources[(tpc_sources > -1).all(axis=-1)]
+            self._source_map[tpc_sources[:, 0], tpc_sources[:, 1], t] = True
+
+    @staticmethod
+    def lookup(points, cuts, table):
+        """Finds the cell of a partitioned space each point belongs to and
+        maps it to a value using a lookup table.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            (N, 3) Set of point coordinates
+        cuts : List[np.ndarray]
+            (3) Sorted list of cuts along each axis
+        table : np.ndarray
+            (N_x + 1, N_y + 1, N_z + 1) Value of each cell
+
+        Returns
+        -------
+        np.ndarray
+            (N) Value of the cell each point belongs to
+        np.ndarray
+            (N) Whether each point lies exactly on one of the cuts
+        """
+        index = []
+        on_cut = np.zeros(len(points), dtype=bool)
+        for d, axis_cuts in enumerate(cuts):
+            index.append(np.searchsorted(axis_cuts, points[:, d]))
+            if len(axis_cuts):
+                closest = np.minimum(index[-1], len(axis_cuts) - 1)
+                on_cut |= axis_cuts[closest] == points[:, d]
+
+        return table[tuple(index)], on_cut
+
+    def get_contributor_mask(self, sources, counts=None):
+        """Gets the TPCs which contributed to each object in a list, as
+        defined in this geometry.
+
+        Parameters
+        ----------
+        sources : np.ndarray
+            (N, 2) Array of [module ID, tpc ID] pairs, one per voxel
+        counts : np.ndarray, optional
+            (B) Number of voxels in each object. If not specified, all voxels
+            are assumed to belong to a single object
+
+        Returns
+        -------
+        np.ndarray
+            (B, N_m*N_t) Mask of contributing TPCs for each object
+        """
+        # Give each unique (object, source) pair a key
+        sources = np.asarray(sources, dtype=np.int64).reshape(-1, 2)
+        if counts is None:
+            counts = [len(sources)]
+        num_objects = len(counts)
+        obj_ids = np.repeat(np.arange(num_objects), counts)
+
+        shape = self._source_map.shape[:2]
+        valid = np.where((sources > -1).all(axis=1) &
+                         (sources[:, 0] < shape[0]) &
+                         (sources[:, 1] < shape[1]))[0]
+        keys = np.unique((obj_ids[valid]*shape[0] + sources[valid, 0])*shape[1]
+                         + sources[valid, 1])
+
+        # Combine the TPCs each source of an object contributes to
+        mask = np.zeros((num_objects, self.num_tpcs), dtype=bool)
+        source_map = self._source_map.reshape(-1, self.num_tpcs)
+        num_sources = shape[0]*shape[1]
+        np.logical_or.at(
+                mask, keys//num_sources, source_map[keys%num_sources])
+
+        return mask
+
     def get_contributors(self, sources):
         """Gets the list of [module ID, tpc ID] pairs that contributed to a
         particle or interaction object, as defined in this geometry.
@@ -303,16 +419,9 @@ class Geometry:
             (2, N_t) Pair of arrays: the first contains the list of
             contributing modules, the second of contributing tpcs.
         """
-        sources = np.unique(sources, axis=0)
-        contributor_mask = np.zeros(self.boundaries.shape[:2], dtype=bool)
-        for m, module_source in enumerate(self.sources):
-            for t, tpc_source in enumerate(module_source):
-                for source in sources:
-                    if (tpc_source == source).all(axis=-1).any(axis=-1):
-                        contributor_mask[m, t] = True
-                        break
+        contributor_mask = self.get_contributor_mask(sources)[0]
 
-        return np.where(contributor_mask)
+        return np.where(contributor_mask.reshape(self.boundaries.shape[:2]))
 
     def get_tpc_index(self, sources, module_id, tpc_id):
         """Gets the list of indices of points that belong to a specify
@@ -353,21 +462,28 @@ class Geometry:
         List[np.ndarray]
             List of index of points that belong to each TPC
         """
-        # Compute the distance from the points to each TPC
-        distances = np.empty((self.num_tpcs, len(points)))
-        for t in range(self.num_tpcs):
-            module_id = t//self.num_tpcs_per_module
-            tpc_id = t%self.num_tpcs_per_module
-            offsets = self.get_tpc_offsets(points, module_id, tpc_id)
-            distances[t] = np.linalg.norm(offsets, axis=1)
-
-        # For each TPC, append the list of point indices associated with it
-        tpc_indexes = []
-        argmins = np.argmin(distances, axis=0)
-        for t in range(self.num_tpcs):
-            tpc_indexes.append(np.where(argmins == t)[0])
-
-        return tpc_indexes
+        # Assign the points which live inside a TPC using the lookup table
+        tpc_ids, on_cut = self.lookup(points, self._tpc_cuts, self._tpc_table)
+
+        # For the points outside of all TPCs or on a TPC boundary, compute the
+        # distance from the points to each TPC and pick the closest
+        missing = np.where((tpc_ids < 0) | on_cut)[0]
+        if len(missing):
+            distances = np.empty((self.num_tpcs, len(missing)))
+            for t in range(self.num_tpcs):
+                module_id = t//self.num_tpcs_per_module
+                tpc_id = t%self.num_tpcs_per_module
+                offsets = self.get_tpc_offsets(
+                        points[missing], module_id, tpc_id)
+                distances[t] = np.linalg.norm(offsets, axis=1)
+
+            tpc_ids[missing] = np.argmin(distances, axis=0)
+
+        # For each TPC, get the list of point indices associated with it
+        perm = np.argsort(tpc_ids, kind='stable')
+        counts = np.bincount(tpc_ids, minlength=self.num_tpcs)
+
+        return np.split(perm, np.cumsum(counts)[:-1])
 
     def get_closest_module(self, points):
         """For each point, find the ID of the closest module.
@@ -382,20 +498,9 @@ class Geometry:
         np.ndarray
             (N) List of module indexes, one per input point
         """
-        module_ids = np.empty(len(points), dtype = np.int32)
-        for module_id, c in enumerate(self.centers):
-            # Find out the boundaries of the volume closest to this module
-            dists = self.centers - c
-            lower_pad = np.zeros(dists.shape)
-            upper_pad = np.zeros(dists.shape)
-            lower_pad[dists >= 0], upper_pad[dists <= 0] = np.inf, np.inf
-            lower = c + np.max(dists - lower_pad, axis=0) / 2
-            upper = c + np.min(dists + upper_pad, axis=0) / 2
-
-            # Assign all points within those boundaries to this module
-            mask = np.all(points > lower, axis = 1) \
-                    & np.all(points < upper, axis = 1)
-            module_ids[mask] = module_id
+        # Each module owns the volume which extends halfway to its neighbors
+        module_ids, _ = self.lookup(
+                points, self._module_cuts, self._module_table)
 
         return module_ids
 
@@ -609,21 +714,164 @@ class Geometry:
         else:
             volumes = self._cont_volumes
 
-        # Loop over volumes, make sure the cloud is contained in at least one
+        # Make sure the cloud (or each point) is contained in at least one
+        # of the volumes, check all volumes at once
+        volumes = np.asarray(volumes)
         if summarize:
-            contained = False
-            for v in volumes:
-                if (points > v[:, 0]).all() and (points < v[:, 1]).all():
-                    contained = True
-                    break
+            points = np.asarray(points).reshape(-1, 3)
+            lower, upper = self.get_bounding_boxes(points)
+            contained = ((lower[:, None] > volumes[..., 0]).all(axis=-1) &
+                         (upper[:, None] < volumes[..., 1]).all(axis=-1))
+            contained = bool(contained.any())
         else:
-            contained = np.zeros(len(points), dtype=bool)
-            for v in volumes:
-                contained |= ((points > v[:, 0]).all(axis=1) &
-                              (points < v[:, 1]).all(axis=1))
+            contained = ((points[:, None] > volumes[..., 0]).all(axis=-1) &
+                         (points[:, None] < volumes[..., 1]).all(axis=-1))
+            contained = contained.any(axis=-1)
 
         return contained
 
+    def check_containment_batch(self, points, counts, sources=None,
+                                allow_multi_module=False):
+        """Check whether each point cloud in a batch of stacked point clouds
+        is contained in the containment volumes, all at once.
+
+        A point cloud is contained in a box-shaped volume if and only if its
+        bounding box is. The bounding boxes of all point clouds are computed
+        in a single pass over the points and are then checked against all
+        the containment volumes at once.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            (N, 3) Set of point coordinates of all point clouds
+        counts : np.ndarray
+            (B) Number of points in each point cloud
+        sources : np.ndarray, optional
+            (N, 2) : List of [module ID, tpc ID] pairs that created each point
+        allow_multi_module : bool, default `False`
+            Whether to allow particles/interactions to span multiple modules
+
+        Returns
+        -------
+        np.ndarray
+            (B) Whether each point cloud is contained or not
+        """
+        # If the containment volumes are not defined, throw
+        if self._cont_volumes is None:
+            raise ValueError("Must call `define_containment_volumes` first.")
+
+        # Compute the bounding box of each point cloud
+        counts = np.asarray(counts, dtype=np.int64)
+        lower, upper = self.get_bounding_boxes(points, counts)
+
+        # If sources are provided, get the contributing TPCs of each cloud
+        mask = None
+        if self._cont_use_source:
+            assert sources is not None and len(points) == len(sources), (
+                    "Need to provide sources to make a source-based check.")
+            mask = self.get_contributor_mask(sources, counts)
+
+        return self.check_box_containment(
+                lower, upper, mask, allow_multi_module)
+
+    def check_box_containment(self, lower, upper, contributor_mask=None,
+                              allow_multi_module=False):
+        """Check whether each axis-aligned bounding box in a batch is
+        contained in the containment volumes, all at once.
+
+        The containment volumes are boxes, hence a point cloud is contained
+        if and only if its bounding box is. This allows to check the
+        containment of objects which cache their bounding box without
+        going through their points.
+
+        Parameters
+        ----------
+        lower : np.ndarray
+            (B, 3) Lower bounds of each box
+        upper : np.ndarray
+            (B, 3) Upper bounds of each box
+        contributor_mask : np.ndarray, optional
+            (B, T) Mask of the TPCs which contributed to each point cloud
+            (see :meth:`get_contributor_mask`). Required in `source` mode
+        allow_multi_module : bool, default `False`
+            Whether to allow particles/interactions to span multiple modules
+
+        Returns
+        -------
+        np.ndarray
+            (B) Whether each box is contained or not
+        """
+        # If the containment volumes are not defined, throw
+        if self._cont_volumes is None:
+            raise ValueError("Must call `define_containment_volumes` first.")
+
+        # If sources are provided, only consider source volumes
+        lower, upper = np.asarray(lower), np.asarray(upper)
+        volumes = self._cont_volumes
+        if self._cont_use_source:
+            # Define the smallest box containing all contributing TPCs
+            assert (contributor_mask is not None and
+                    len(contributor_mask) == len(lower)), (
+                    "Need to provide sources to make a source-based check.")
+            mask = contributor_mask
+            vol_lower = np.where(
+                    mask[..., None], volumes[:, :, 0], np.inf).min(axis=1)
+            vol_upper = np.where(
+                    mask[..., None], volumes[:, :, 1], -np.inf).max(axis=1)
+            contained = (lower > vol_lower).all(axis=1)
+            contained &= (upper < vol_upper).all(axis=1)
+
+            # If requested, reject point clouds which span multiple modules
+            if not allow_multi_module:
+                module_mask = mask.reshape(len(mask), self.num_modules, -1)
+                contained &= np.sum(module_mask.any(axis=-1), axis=-1) < 2
+
+        else:
+            # Check that each box is contained in at least one volume
+            contained = ((lower[:, None] > volumes[..., 0]).all(axis=-1) &
+                         (upper[:, None] < volumes[..., 1]).all(axis=-1))
+            contained = contained.any(axis=-1)
+
+        return contained
+
+    @staticmethod
+    def get_bounding_boxes(points, counts=None):
+        """Computes the axis-aligned bounding box of a batch of stacked point
+        clouds in a single pass.
+
+        Empty point clouds are given inverted (infinite) boxes, which are
+        contained in any volume.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            (N, 3) Set of point coordinates of all point clouds
+        counts : np.ndarray, optional
+            (B) Number of points in each point cloud. If not specified, all
+            points are assumed to belong to a single point cloud
+
+        Returns
+        -------
+        np.ndarray
+            (B, 3) Lower bounds of each point cloud
+        np.ndarray
+            (B, 3) Upper bounds of each point cloud
+        """
+        # Initialize the boxes
+        if counts is None:
+            counts = np.array([len(points)], dtype=np.int64)
+        lower = np.full((len(counts), 3), np.inf)
+        upper = np.full((len(counts), 3), -np.inf)
+
+        # Reduce the non-empty point clouds
+        nonempty = np.where(counts > 0)[0]
+        if len(nonempty):
+            starts = (np.cumsum(counts) - counts)[nonempty]
+            lower[nonempty] = np.minimum.reduceat(points, starts, axis=0)
+            upper[nonempty] = np.maximum.reduceat(points, starts, axis=0)
+
+        return lower, upper
+
     def define_containment_volumes(self, margin, cathode_margin=None,
                                    mode ='module'):
         """This function defines a list of volumes to check containment against.
@@ -16,8 +16,6 @@ from spine.data import TensorBatch, IndexBatch, EdgeIndexBatch
 import spine.utils.numba_local as nbl
 from spine.utils.metrics import sbd, ami, ari, pur_eff
 
-int_array = nb.int64[:]
-
 
 def edge_assignment_batch(edge_index, group_ids):
     """Batched version of :func:`edge_assignment`.
@@ -129,24 +127,21 @@ def edge_assignment_score_batch(edge_index, edge_pred, clusts):
     edge_index_list = []
     group_ids = np.empty(len(clusts.index_list), dtype=np.int64)
     scores = np.empty(edge_index.batch_size, dtype=edge_pred.dtype)
-    edge_counts = np.empty(edge_index.batch_size, dtype=np.int64)
     offset = 0
     for b in range(edge_index.batch_size):
         lower, upper = clusts.edges[b], clusts.edges[b+1]
         edge_index_b, group_ids_b, score_b = edge_assignment_score(
                 edge_index[b], edge_pred[b], clusts.counts[b])
 
-        edge_index_list.append(edge_index_b + edge_index.offsets[b])
+        edge_index_list.append(edge_index_b)
         group_ids[lower:upper] = offset + group_ids_b
         scores[b] = score_b
-        edge_counts[b] = len(edge_index_b)
         if upper - lower > 0:
             offset = np.max(group_ids[lower:upper]) + 1
 
     # Make a new EdgeIndexBatch out of the selected edges
-    new_edge_index = EdgeIndexBatch(
-            np.vstack(edge_index_list).T, edge_counts,
-            edge_index.offsets, directed=True)
+    new_edge_index = EdgeIndexBatch.from_list(
+            edge_index_list, edge_index.offsets, directed=True)
 
     return new_edge_index, TensorBatch(group_ids, clusts.counts), scores
 
@@ -384,50 +379,13 @@ def edge_assignment_forest(edge_index, edge_pred, group_ids):
     return edge_assn, edge_valid
 
 
-@nb.njit(cache=True)
-def union_find(edge_index: nb.int64[:,:],
-               num_nodes: nb.int64) -> (
-                       nb.int64[:], nb.types.DictType(nb.int64, nb.int64[:])):
-    """Implementation of the Union-Find algorithm.
-
-    This algorithm forms group based on the connectivity of its consistuents.
-    If two entities are connected, they belong to the same group.
-
-    Parameters
-    ----------
-    edge_index : np.ndarray
-        (E, 2) Sparse incidence matrix
-    num_nodes : int
-        Number of nodes in the graph, C
-
-    Returns
-    -------
-    np.ndarray
-        (C) Node group IDs
-    Dict[int, np.ndarray]
-        Dictionary which maps group IDs onto constituent cluster IDs
-    """
-    # Find the group_ids by merging groups when they are connected
-    group_ids = np.arange(n, dtype=np.int64)
-    for e in edge_index:
-        if group_ids[e[0]] != group_ids[e[1]]:
-            group_ids[group_ids == group_ids[e[1]]] = group_ids[e[0]]
-
-    # Build group dictionary
-    groups = nb.typed.Dict.empty(nb.int64, int_array)
-    for g in np.unique(group_ids):
-        groups[g] = np.where(group_ids == g)[0]
-
-    return group_ids, groups
-
-
 @nb.njit(cache=True)
 def node_assignment(edge_index: nb.int64[:,:],
                     edge_pred: nb.int64[:,:],
                     num_nodes: nb.int64) -> nb.int64[:]:
     """Assigns each node to a group, based on the edge assigment provided.
 
-    This uses the locally-defined union find implementation.
+    This uses the union-find implementation of :mod:`spine.utils.numba_local`.
 
     Parameters
     ----------
@@ -446,7 +404,7 @@ def node_assignment(edge_index: nb.int64[:,:],
     # Loop over on edges, reset the group IDs of connected node
     on_edges = edge_index[np.where(edge_pred[:, 1] > edge_pred[:, 0])[0]]
 
-    return union_find(on_edges, num_nodes)[0]
+    return nbl.union_find(on_edges, num_nodes, return_inverse=False)
 
 
 @nb.njit(cache=True)
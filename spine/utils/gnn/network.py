@@ -23,7 +23,7 @@ def get_cluster_edge_features_batch(data, clusts, edge_index,
     edge_index : EdgeIndexBatch
         (2, E) Sparse incidence matrix
     closest_index : Union[np.ndarray, torch.Tensor], optional
-        (C, C) : Combined index of the closest pair of voxels per edge
+        (E) : Combined index of the closest pair of voxels per edge
     algorithm : str, default 'brute'
         Method used to compute the inter-cluster distance
 
@@ -85,9 +85,11 @@ def get_cluster_edge_features(data, clusts, edge_index,
     clusts : List[np.ndarray]
         (C) List of arrays of voxels IDs in each cluster
     edge_index : Union[np.ndarray, torch.Tensor]
-        (2, E) Incidence map between voxels
+        (E, 2) Incidence map between clusters
     closest_index : Union[np.ndarray, torch.Tensor], optional
-        (C, C) : Combined index of the closest pair of voxels per edge
+        (E) : Combined index of the closest pair of voxels per edge. A
+        (C, C) matrix of combined indexes for each pair of clusters is
+        also accepted
     algorithm : str, default 'brute'
         Method used to compute the inter-cluster distance
 
@@ -99,6 +101,10 @@ def get_cluster_edge_features(data, clusts, edge_index,
     if not len(clusts):
         return np.empty((0, 19), dtype=data.dtype) # Cannot type empty list
 
+    # If the closest index is provided for each pair of clusters, fetch edges
+    if closest_index is not None and len(closest_index.shape) == 2:
+        closest_index = closest_index[edge_index[:, 0], edge_index[:, 1]]
+
     return _get_cluster_edge_features(
             data, clusts, edge_index, closest_index, algorithm)
     # return _get_cluster_edge_features_vec(
@@ -121,10 +127,10 @@ def _get_cluster_edge_features(data: nb.float32[:,:],
 
         # Find the closest set point in each cluster
         if closest_index is not None:
-            imin = closest_index[c1, c2]
+            imin = closest_index[k]
             i1, i2 = imin//len(x2), imin%len(x2)
         else:
-            i1, j2, _ = nbl.closest_pair(x1, x2, algorithm)
+            i1, i2, _ = nbl.closest_pair(x1, x2, algorithm)
         v1 = x1[i1,:]
         v2 = x2[i2,:]
 
@@ -154,9 +160,10 @@ def _get_cluster_edge_features_vec(data: nb.float32[:,:],
     # Get the closest points of approach IDs for each edge
     if closest_index is None:
         lend, idxs1, idxs2 = _get_edge_distances(
-                data[:,COORD_COLS], clusts, edge_index, algorithm)
+                data[:,COORD_COLS], clusts, edge_index.T, algorithm)
     else:
-        idxs1, idxs2 = closest_index[(edge_index[0], edge_index[1])]
+        idxs1, idxs2 = _get_closest_voxels(
+                clusts, edge_index.T, closest_index)
 
     # Get the points that correspond to the first voxels
     v1 = data[idxs1][:, COORD_COLS]
@@ -240,7 +247,8 @@ def _get_voxel_edge_features(data: nb.float32[:,:],
 
 
 @numbafy(cast_args=['voxels'], list_args=['clusts'])
-def get_edge_distances(voxels, clusts, edge_index, algorithm='brute'):
+def get_edge_distances(voxels, clusts, edge_index, closest_index=None,
+                       algorithm='brute'):
     """For each edge, finds the closest points of approach (CPAs) between the
     two voxel clusters it connects, and the distance that separates them.
 
@@ -256,6 +264,12 @@ def get_edge_distances(voxels, clusts, edge_index, algorithm='brute'):
         (C) List of arrays of voxel IDs in each cluster
     edge_index : Union[np.ndarray, torch.Tensor]
         (2, E) Incidence matrix
+    closest_index : np.ndarray, optional
+        (E) Combined index of the closest pair of voxels per edge, as
+        returned by :func:`inter_cluster_distance` with `max_dist`. If
+        provided, the closest pairs are not searched for again
+    algorithm : str, default 'brute'
+        Algorithm used to compute the 'voxel' distance
 
     Returns
     -------
@@ -266,6 +280,13 @@ def get_edge_distances(voxels, clusts, edge_index, algorithm='brute'):
     np.ndarray
         (E) List of voxel IDs corresponding to the second edge cluster CPA
     """
+    # If the closest pairs are known, simply fetch the voxel IDs
+    if closest_index is not None:
+        resi, resj = _get_closest_voxels(clusts, edge_index, closest_index)
+        lend = np.linalg.norm(voxels[resi] - voxels[resj], axis=1)
+
+        return lend.astype(voxels.dtype), resi, resj
+
     return _get_edge_distances(voxels, clusts, edge_index, algorithm)
 
 @nb.njit(parallel=True, cache=True)
@@ -276,9 +297,9 @@ def _get_edge_distances(voxels: nb.float32[:,:],
                                 nb.float32[:], nb.int64[:], nb.int64[:]):
 
     # Loop over the provided edges 
-    lend = np.empty(len(edge_index), dtype=voxels.dtype)
-    resi = np.empty(len(edge_index), dtype=np.int64)
-    resj = np.empty(len(edge_index), dtype=np.int64)
+    lend = np.empty(edge_index.shape[1], dtype=voxels.dtype)
+    resi = np.empty(edge_index.shape[1], dtype=np.int64)
+    resj = np.empty(edge_index.shape[1], dtype=np.int64)
     indxi, indxj = edge_index
     for k in nb.prange(len(indxi)):
         i, j = indxi[k], indxj[k]
@@ -295,13 +316,36 @@ def _get_edge_distances(voxels: nb.float32[:,:],
 
     return lend, resi, resj
 
+@nb.njit(cache=True)
+def _get_closest_voxels(clusts: nb.types.List(nb.int64[:]),
+                        edge_index: nb.int64[:,:],
+                        closest_index: nb.int64[:]) -> (
+                                nb.int64[:], nb.int64[:]):
+
+    # Convert the combined index of each edge into a pair of voxel IDs
+    resi = np.empty(edge_index.shape[1], dtype=np.int64)
+    resj = np.empty(edge_index.shape[1], dtype=np.int64)
+    for k in range(edge_index.shape[1]):
+        i, j = edge_index[0, k], edge_index[1, k]
+        imin = closest_index[k]
+        resi[k] = clusts[i][imin//len(clusts[j])]
+        resj[k] = clusts[j][imin%len(clusts[j])]
+
+    return resi, resj
+
 
 @numbafy(cast_args=['voxels'], list_args=['clusts'])
 def inter_cluster_distance(voxels, clusts, counts=None, method='voxel',
-                           algorithm='brute', return_index=False):
+                           algorithm='brute', return_index=False,
+                           max_dist=None):
     """Finds the inter-cluster distance between every pair of clusters within
     each batch, returned as a block-diagonal matrix.
 
+    If a maximum distance is provided, only the pairs of clusters closer than
+    that distance are returned, as a sparse list of pairs. The pairs are
+    screened using the bounding box of each cluster, such that the distance
+    is only computed for pairs which can be closer than `max_dist`.
+
     Parameters
     ----------
     voxels : Union[np.ndarray, torch.Tensor]
@@ -319,18 +363,41 @@ def inter_cluster_distance(voxels, clusts, counts=None, method='voxel',
     return_index : bool, default True
         Returns a combined index of the closest pair of voxels for each
         cluster, if the 'voxel' distance method is used
+    max_dist : float, optional
+        If provided, only returns the pairs of clusters closer than this
 
     Returns
     -------
     Union[np.ndarray, torch.Tensor]
-        (C, C) Tensor of pair-wise cluster distances
+        (C, C) Tensor of pair-wise cluster distances. If `max_dist` is
+        specified, (2, E) pairs of clusters (i < j) closer than `max_dist`
+        followed by the (E) distance between them
     Union[np.ndarray, torch.Tensor], optional
-        (C, C) Tensor of pair-wise closest voxel pair
+        (C, C) Tensor of pair-wise closest voxel pair. If `max_dist` is
+        specified, (E) combined index of the closest voxel pair of each pair
     """
     # If there is no counts provided, assume all clusters are in one entry
     if counts is None:
         counts = np.array([len(clusts)], dtype=np.int64)
 
+    if max_dist is not None:
+        # Only evaluate the pairs of clusters which can be close enough
+        assert not return_index or method == 'voxel', (
+                "Cannot return index for centroid method.")
+        if len(clusts) == 0:
+            edge_index, dists, closest_index = (
+                    np.empty((2, 0), dtype=np.int64),
+                    np.empty(0, dtype=voxels.dtype),
+                    np.empty(0, dtype=np.int64))
+        else:
+            edge_index, dists, closest_index = _radius_cluster_graph(
+                    voxels, clusts, counts, float(max_dist), method, algorithm)
+
+        if not return_index:
+            return edge_index, dists
+
+        return edge_index, dists, closest_index
+
     if not return_index:
         # If there are no clusters, return empty
         if len(clusts) == 0:
@@ -408,6 +475,327 @@ def _inter_cluster_distance_index(voxels: nb.float32[:,:],
     return dist_mat, closest_index
 
 
+@numbafy(cast_args=['voxels'], list_args=['clusts'])
+def radius_cluster_graph(voxels, clusts, max_length, counts=None,
+                         method='voxel', algorithm='brute'):
+    """Finds every pair of clusters within each batch entry which are closer
+    to each other than a certain distance.
+
+    The candidate pairs are found by comparing the axis-aligned bounding box
+    of each cluster with those of its neighbors along the first axis (sweep
+    and prune). The closest pair of voxels is only evaluated for the pairs of
+    clusters whose bounding boxes are closer than `max_length`.
+
+    Parameters
+    ----------
+    voxels : Union[np.ndarray, torch.Tensor]
+        (N, D) Tensor of voxel coordinates
+    clusts : List[np.ndarray]
+        (C) List of cluster indexes
+    max_length : float
+        Maximum distance between the closest voxels of two clusters
+    counts : np.ndarray, optional
+        (B) Number of clusters in each entry of the batch
+    method : str, default 'voxel'
+        Method used to compute the inter-cluster distance ('voxel' or
+        'centroid')
+    algorithm : str, default 'brute'
+        Algorithm used to compute the 'voxel' distance. The 'brute' method
+        is exact but slow, 'recursive' uses a fast but approximate method.
+
+    Returns
+    -------
+    np.ndarray
+        (2, E) Pairs of clusters (i < j), ordered as in a complete graph
+    np.ndarray
+        (E) Distance between each pair
+    np.ndarray
+        (E) Combined index of the closest pair of voxels of each pair (0 if
+        the 'centroid' method is used)
+    """
+    # If there is no counts provided, assume all clusters are in one entry
+    if counts is None:
+        counts = np.array([len(clusts)], dtype=np.int64)
+
+    # If there are no clusters, return empty
+    if len(clusts) == 0:
+        return (np.empty((2, 0), dtype=np.int64),
+                np.empty(0, dtype=voxels.dtype), np.empty(0, dtype=np.int64))
+
+    return _radius_cluster_graph(
+            voxels, clusts, counts, float(max_length), method, algorithm)
+
+@nb.njit(cache=True)
+def _radius_cluster_graph(voxels: nb.float32[:,:],
+                          clusts: nb.types.List(nb.int64[:]),
+                          counts: nb.int64[:],
+                          max_length: nb.float64,
+                          method: str = 'voxel',
+                          algorithm: str = 'brute') -> (
+                                  nb.int64[:,:], nb.float32[:], nb.int64[:]):
+
+    # Compute the bounding box of each cluster
+    lower, upper = _cluster_bounds(voxels, clusts)
+
+    # Loop over the entries, sweep the clusters along the first axis
+    num_clusts = len(clusts)
+    keys = [np.int64(0) for _ in range(0)]
+    offset = 0
+    for b in range(len(counts)):
+        c = counts[b]
+        order = offset + np.argsort(lower[offset:offset + c, 0])
+        for k in range(c):
+            i = order[k]
+            for l in range(k + 1, c):
+                # The boxes are sorted along the first axis: once one of them
+                # is too far along that axis, all the following ones are too
+                j = order[l]
+                if lower[j, 0] - upper[i, 0] >= max_length:
+                    break
+
+                # Check the full bounding box distance
+                if _box_distance(lower, upper, i, j) < max_length:
+                    keys.append(min(i, j)*num_clusts + max(i, j))
+
+        offset += c
+
+    # Order the candidate pairs as in a complete graph
+    keys_arr = np.sort(np.array(keys, dtype=np.int64))
+    edge_index = np.empty((2, len(keys_arr)), dtype=np.int64)
+    edge_index[0] = keys_arr//num_clusts
+    edge_index[1] = keys_arr%num_clusts
+
+    # Compute the distance between each candidate pair, restrict
+    if method == 'voxel':
+        dists, closest_index = _cluster_pair_distances(
+                voxels, clusts, edge_index, algorithm, max_length)
+
+    elif method == 'centroid':
+        # The centroid of a cluster lies within its bounding box, the box
+        # distance is also a lower bound on the centroid distance
+        dtype = voxels.dtype
+        centroids = np.empty((num_clusts, voxels.shape[1]), dtype=dtype)
+        for i in range(num_clusts):
+            centroids[i] = nbl.mean(voxels[clusts[i]], axis=0)
+
+        disp = centroids[edge_index[0]] - centroids[edge_index[1]]
+        dists = np.sqrt(np.sum(disp**2, axis=1))
+        closest_index = np.zeros(len(dists), dtype=np.int64)
+
+    else:
+        raise ValueError("Inter-cluster distance method not supported.")
+
+    mask = np.where(dists < max_length)[0]
+
+    return edge_index[:, mask], dists[mask], closest_index[mask]
+
+
+@numbafy(cast_args=['voxels'], list_args=['clusts'])
+def knn_cluster_graph(voxels, clusts, k, counts=None, method='voxel',
+                      algorithm='brute'):
+    """Finds the k nearest clusters of each cluster within each batch entry.
+
+    For each cluster, the other clusters are visited in increasing order of
+    the distance between their axis-aligned bounding boxes, which is a lower
+    bound on the distance between their closest voxels (and between their
+    centroids). The search stops as soon as this lower bound exceeds the
+    distance to the k-th nearest cluster found so far.
+
+    Parameters
+    ----------
+    voxels : Union[np.ndarray, torch.Tensor]
+        (N, D) Tensor of voxel coordinates
+    clusts : List[np.ndarray]
+        (C) List of cluster indexes
+    k : int
+        Number of neighbors to find for each cluster
+    counts : np.ndarray, optional
+        (B) Number of clusters in each entry of the batch
+    method : str, default 'voxel'
+        Method used to compute the inter-cluster distance ('voxel' or
+        'centroid')
+    algorithm : str, default 'brute'
+        Algorithm used to compute the 'voxel' distance. The 'brute' method
+        is exact but slow, 'recursive' uses a fast but approximate method.
+
+    Returns
+    -------
+    np.ndarray
+        (2, E) Edges from each cluster to its neighbors (ordered by index)
+    np.ndarray
+        (E) Distance between each pair
+    np.ndarray
+        (E) Combined index of the closest pair of voxels of each pair,
+        evaluated from the lowest to the highest cluster index (0 if the
+        'centroid' method is used)
+    """
+    # If there is no counts provided, assume all clusters are in one entry
+    if counts is None:
+        counts = np.array([len(clusts)], dtype=np.int64)
+
+    # If there are no clusters, return empty
+    if len(clusts) == 0:
+        return (np.empty((2, 0), dtype=np.int64),
+                np.empty(0, dtype=voxels.dtype), np.empty(0, dtype=np.int64))
+
+    return _knn_cluster_graph(
+            voxels, clusts, counts, int(k), method, algorithm)
+
+@nb.njit(cache=True)
+def _knn_cluster_graph(voxels: nb.float32[:,:],
+                       clusts: nb.types.List(nb.int64[:]),
+                       counts: nb.int64[:],
+                       k: nb.int64,
+                       method: str = 'voxel',
+                       algorithm: str = 'brute') -> (
+                               nb.int64[:,:], nb.float32[:], nb.int64[:]):
+
+    # Compute the bounding box of each cluster
+    lower, upper = _cluster_bounds(voxels, clusts)
+
+    # If needed, compute the centroid of each cluster
+    if method not in ('voxel', 'centroid'):
+        raise ValueError("Inter-cluster distance method not supported.")
+
+    num_clusts = len(clusts)
+    centroids = np.empty((num_clusts, voxels.shape[1]), dtype=voxels.dtype)
+    if method == 'centroid':
+        for i in range(num_clusts):
+            centroids[i] = nbl.mean(voxels[clusts[i]], axis=0)
+
+    # Get the range of clusters and the number of neighbors of each cluster
+    edges = np.zeros(len(counts) + 1, dtype=np.int64)
+    edges[1:] = np.cumsum(counts)
+    starts = np.empty(num_clusts, dtype=np.int64)
+    sizes = np.empty(num_clusts, dtype=np.int64)
+    for b in range(len(counts)):
+        starts[edges[b]:edges[b+1]] = edges[b]
+        sizes[edges[b]:edges[b+1]] = counts[b]
+
+    num_nbrs = np.minimum(k, np.maximum(sizes - 1, 0))
+
+    nbr_offsets = np.zeros(num_clusts + 1, dtype=np.int64)
+    nbr_offsets[1:] = np.cumsum(num_nbrs)
+
+    # Loop over the clusters, find the nearest neighbors of each. This is
+    # not a parallel loop: the graphs are built in the main process, which
+    # forks the data loader and post-processing workers afterwards
+    num_edges = nbr_offsets[-1]
+    edge_index = np.empty((2, num_edges), dtype=np.int64)
+    dists = np.empty(num_edges, dtype=voxels.dtype)
+    closest_index = np.empty(num_edges, dtype=np.int64)
+    for i in range(num_clusts):
+        n = num_nbrs[i]
+        if n == 0:
+            continue
+
+        # Order the other clusters of the entry by bounding box distance
+        start, c = starts[i], sizes[i]
+        others = np.empty(c - 1, dtype=np.int64)
+        bounds = np.empty(c - 1, dtype=np.float64)
+        l = 0
+        for j in range(start, start + c):
+            if j != i:
+                others[l] = j
+                bounds[l] = _box_distance(lower, upper, i, j)
+                l += 1
+
+        order = np.argsort(bounds)
+
+        # Visit the clusters until none can be closer than the k-th neighbor
+        best_ids = np.full(n, -1, dtype=np.int64)
+        best_dists = np.full(n, np.inf, dtype=np.float64)
+        best_index = np.zeros(n, dtype=np.int64)
+        for l in order:
+            if bounds[l] > best_dists[-1]:
+                break
+
+            j = others[l]
+            lo, hi = (np.int64(i), j) if i < j else (j, np.int64(i))
+            if method == 'voxel':
+                ii, jj, dist = nbl.closest_pair(
+                        voxels[clusts[lo]], voxels[clusts[hi]], algorithm)
+            else:
+                ii, jj = 0, 0
+                dist = np.sqrt(np.sum((centroids[i] - centroids[j])**2))
+            if dist < best_dists[-1]:
+                # Insert the new neighbor in the sorted list of neighbors
+                m = n - 1
+                while m > 0 and best_dists[m - 1] > dist:
+                    best_ids[m] = best_ids[m - 1]
+                    best_dists[m] = best_dists[m - 1]
+                    best_index[m] = best_index[m - 1]
+                    m -= 1
+
+                best_ids[m] = j
+                best_dists[m] = dist
+                best_index[m] = ii*len(clusts[hi]) + jj
+
+        # Store the neighbors, ordered by index
+        perm = np.argsort(best_ids)
+        offset = nbr_offsets[i]
+        edge_index[0, offset:offset + n] = i
+        edge_index[1, offset:offset + n] = best_ids[perm]
+        dists[offset:offset + n] = best_dists[perm]
+        closest_index[offset:offset + n] = best_index[perm]
+
+    return edge_index, dists, closest_index
+
+
+@nb.njit(cache=True)
+def _cluster_pair_distances(voxels: nb.float32[:,:],
+                            clusts: nb.types.List(nb.int64[:]),
+                            edge_index: nb.int64[:,:],
+                            algorithm: str = 'brute',
+                            max_dist: nb.float64 = np.inf) -> (
+                                    nb.float32[:], nb.int64[:]):
+
+    # Loop over the provided pairs of clusters (serially, for the same
+    # reason as in `_knn_cluster_graph`)
+    dists = np.empty(edge_index.shape[1], dtype=voxels.dtype)
+    closest_index = np.empty(edge_index.shape[1], dtype=np.int64)
+    for k in range(edge_index.shape[1]):
+        # Identify the two voxels closest to each other in each cluster
+        i, j = edge_index[0, k], edge_index[1, k]
+        ii, jj, dist = nbl.closest_pair(
+                voxels[clusts[i]], voxels[clusts[j]], algorithm,
+                max_dist=max_dist)
+        dists[k] = dist
+        closest_index[k] = ii*len(clusts[j]) + jj
+
+    return dists, closest_index
+
+@nb.njit(cache=True)
+def _cluster_bounds(voxels: nb.float32[:,:],
+                    clusts: nb.types.List(nb.int64[:])) -> (
+                            nb.float32[:,:], nb.float32[:,:]):
+
+    # Loop over the clusters, compute the axis-aligned bounding box of each
+    lower = np.empty((len(clusts), voxels.shape[1]), dtype=voxels.dtype)
+    upper = np.empty((len(clusts), voxels.shape[1]), dtype=voxels.dtype)
+    for i in range(len(clusts)):
+        x = voxels[clusts[i]]
+        for d in range(voxels.shape[1]):
+            lower[i, d] = np.min(x[:, d])
+            upper[i, d] = np.max(x[:, d])
+
+    return lower, upper
+
+@nb.njit(cache=True)
+def _box_distance(lower: nb.float32[:,:],
+                  upper: nb.float32[:,:],
+                  i: nb.int64,
+                  j: nb.int64) -> nb.float64:
+
+    # Distance between the closest points of two axis-aligned bounding boxes
+    dist = 0.
+    for d in range(lower.shape[1]):
+        gap = max(lower[j, d] - upper[i, d], lower[i, d] - upper[j, d], 0.)
+        dist += gap*gap
+
+    return np.sqrt(dist)
+
+
 @numbafy(cast_args=['graph'])
 def get_fragment_edges(graph, clust_ids):
     """Function that converts a set of edges between cluster ids
@@ -0,0 +1,293 @@
+"""Tools to compile the numba kernels ahead of time and report on their cache.
+
+Most of the numba kernels of this package are compiled with `cache=True`:
+once a kernel is compiled for a given signature, its machine code is stored
+in a cache directory (next to the source file, or in the directory pointed
+to by the `NUMBA_CACHE_DIR` environment variable) and loaded by subsequent
+processes instead of being compiled again.
+
+This module provides the tools to:
+- record the signatures each kernel was compiled for during a job;
+- compile a set of recorded signatures ahead of time, such that the cache is
+  warm before short jobs or data loader workers start;
+- report, for each kernel signature, whether it was loaded from the cache or
+  had to be compiled;
+- restrict the parallel kernels (`parallel=True`) when they are launched
+  from concurrent threads or from worker processes.
+"""
+
+import os
+import time
+import pickle
+import importlib
+from warnings import warn
+
+import numba as nb
+from numba.core.caching import NullCache
+from numba.core.registry import CPUDispatcher
+
+__all__ = ['find_kernels', 'save_signatures', 'load_signatures',
+           'compile_kernels', 'get_report', 'format_report',
+           'launch_threads', 'run_serially']
+
+# List of modules which define numba kernels
+JIT_MODULES = (
+        'spine.utils.numba_local',
+        'spine.utils.gnn.cluster',
+        'spine.utils.gnn.network',
+        'spine.utils.gnn.voxels',
+        'spine.utils.gnn.evaluation',
+        'spine.utils.energy_loss',
+        'spine.utils.match',
+        'spine.utils.mcs',
+        'spine.utils.tracking',
+        'spine.utils.vertex',
+        'spine.io.parse.clean_data',
+        'spine.model.layer.gnn.graph.bipartite',
+        'spine.model.layer.gnn.graph.complete',
+        'spine.model.layer.gnn.graph.delaunay'
+)
+
+
+def find_kernels(modules=JIT_MODULES):
+    """Finds the numba kernels defined in a list of modules.
+
+    Parameters
+    ----------
+    modules : List[str], default JIT_MODULES
+        List of module names to scan for numba kernels
+
+    Returns
+    -------
+    Dict[str, CPUDispatcher]
+        Dictionary which maps the full name of each kernel to its dispatcher
+    """
+    kernels = {}
+    for module_name in modules:
+        # Skip the modules which depend on missing optional packages
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as err:
+            warn(f"Could not import {module_name} ({err}), skipping.")
+            continue
+
+        for name, obj in vars(module).items():
+            # Only keep the kernels defined in the module (not imported)
+            if (isinstance(obj, CPUDispatcher) and
+                obj.py_func.__module__ == module_name):
+                kernels[f'{module_name}.{name}'] = obj
+
+    return kernels
+
+
+def save_signatures(file_path, kernels=None):
+    """Stores the signatures each kernel was compiled for in this process.
+
+    If the file already exists, the new signatures are added to the ones it
+    already contains.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the signature file
+    kernels : Dict[str, CPUDispatcher], optional
+        Dictionary of kernels. If not specified, all the known kernels are used
+
+    Returns
+    -------
+    Dict[str, List[tuple]]
+        Dictionary which maps each kernel name to its list of signatures
+    """
+    # Load the existing signatures, if any
+    signatures = {}
+    if os.path.isfile(file_path):
+        signatures = load_signatures(file_path)
+
+    # Add the signatures compiled in this process
+    if kernels is None:
+        kernels = find_kernels()
+    for name, kernel in kernels.items():
+        for sig in kernel.signatures:
+            kernel_sigs = signatures.setdefault(name, [])
+            if sig not in kernel_sigs:
+                kernel_sigs.append(sig)
+
+    # Store
+    with open(file_path, 'wb') as out_file:
+        pickle.dump(signatures, out_file)
+
+    return signatures
+
+
+def load_signatures(file_path):
+    """Loads a set of kernel signatures stored by :func:`save_signatures`.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the signature file
+
+    Returns
+    -------
+    Dict[str, List[tuple]]
+        Dictionary which maps each kernel name to its list of signatures
+    """
+    with open(file_path, 'rb') as in_file:
+        return pickle.load(in_file)
+
+
+def compile_kernels(signatures, kernels=None):
+    """Compiles kernels for a set of signatures, or loads them from the cache.
+
+    Parameters
+    ----------
+    signatures : Dict[str, List[tuple]]
+        Dictionary which maps each kernel name to its list of signatures
+    kernels : Dict[str, CPUDispatcher], optional
+        Dictionary of kernels. If not specified, all the known kernels are used
+
+    Returns
+    -------
+    List[dict]
+        One report row per kernel signature (see :func:`get_report`)
+    """
+    # Loop over the kernel signatures
+    if kernels is None:
+        kernels = find_kernels()
+
+    report = []
+    for name, sigs in signatures.items():
+        for sig in sigs:
+            # If the kernel does not exist anymore, skip
+            row = {'kernel': name, 'signature': str(sig), 'time': 0.}
+            if name not in kernels:
+                row['status'] = 'missing'
+                report.append(row)
+                continue
+
+            # If the signature is already loaded in this process, skip
+            kernel = kernels[name]
+            if sig in kernel.overloads:
+                row['status'] = 'loaded'
+                report.append(row)
+                continue
+
+            # Compile the kernel or load it from the cache
+            start = time.time()
+            try:
+                kernel.compile(sig)
+                row['status'] = get_status(kernel, sig)
+            except Exception: # pylint: disable=W0718
+                # The kernel source may have changed since it was recorded
+                row['status'] = 'failed'
+
+            row['time'] = time.time() - start
+            report.append(row)
+
+    return report
+
+
+def get_report(kernels=None):
+    """Reports on the kernel signatures compiled in this process.
+
+    Parameters
+    ----------
+    kernels : Dict[str, CPUDispatcher], optional
+        Dictionary of kernels. If not specified, all the known kernels are used
+
+    Returns
+    -------
+    List[dict]
+        One report row per kernel signature, with the kernel name, the
+        signature, its status ('hit' if loaded from the cache, 'compiled' if
+        compiled and stored in the cache, 'uncached' if compiled for a kernel
+        which cannot be cached) and the time it took to get it (only known
+        for the signatures compiled by :func:`compile_kernels`)
+    """
+    if kernels is None:
+        kernels = find_kernels()
+
+    report = []
+    for name, kernel in kernels.items():
+        for sig in kernel.signatures:
+            report.append({'kernel': name, 'signature': str(sig),
+                           'status': get_status(kernel, sig), 'time': None})
+
+    return report
+
+
+def get_status(kernel, sig):
+    """Checks whether a kernel signature was loaded from the cache.
+
+    Parameters
+    ----------
+    kernel : CPUDispatcher
+        Numba kernel
+    sig : tuple
+        Signature of the kernel arguments
+
+    Returns
+    -------
+    str
+        One of 'hit', 'compiled' or 'uncached'
+    """
+    if isinstance(kernel._cache, NullCache): # pylint: disable=W0212
+        return 'uncached'
+
+    return 'hit' if kernel.stats.cache_hits[sig] else 'compiled'
+
+
+def format_report(report):
+    """Formats a kernel compilation report as a table.
+
+    Parameters
+    ----------
+    report : List[dict]
+        One report row per kernel signature
+
+    Returns
+    -------
+    str
+        Formatted report
+    """
+    # Build the table
+    lines = [f"{'Kernel':<50} {'Status':<9} {'Time [s]':>8}  Signature"]
+    for row in report:
+        duration = f"{row['time']:.2f}" if row['time'] is not None else '-'
+        lines.append(f"{row['kernel']:<50} {row['status']:<9} "
+                     f"{duration:>8}  {row['signature']}")
+
+    # Add a summary line
+    counts = {}
+    for row in report:
+        counts[row['status']] = counts.get(row['status'], 0) + 1
+    summary = ', '.join(f'{v} {k}' for k, v in sorted(counts.items()))
+    lines.append(f"\n{len(report)} kernel signature(s): {summary or 'none'}")
+
+    return '\n'.join(lines)
+
+
+def launch_threads():
+    """Starts the numba thread pool from the calling thread.
+
+    This must be called from the main thread before other threads launch
+    parallel kernels: the TBB layer hangs at exit if its pool is first
+    started from another thread. If no layer was explicitly requested
+    (through `NUMBA_THREADING_LAYER`), a thread-safe one is picked: the work
+    queue layer, the fallback when TBB is not available, aborts when two
+    threads launch a parallel kernel at the same time.
+    """
+    if nb.config.THREADING_LAYER == 'default':
+        nb.config.THREADING_LAYER = 'threadsafe'
+    nb.get_num_threads()
+
+
+def run_serially():
+    """Runs the parallel numba kernels on a single thread in the calling
+    thread.
+
+    The number of numba threads is a per-thread setting: this is meant to be
+    called at the start of threads or worker processes which run alongside
+    each other, such that they do not each start one thread per core.
+    """
+    nb.set_num_threads(1)
@@ -1,12 +1,233 @@
-"""Functions to find the best overlaps between point sets."""
+"""Functions to find the best overlaps between point sets.
+
+The set-based overlap metrics (count, IoU, Dice and their weighted forms) are
+all derived from a sparse contingency table, which counts the number of
+shared index values between each pair of (x, y) sets. The table is built in a
+single sort-and-merge pass over all the indexes, rather than by intersecting
+every pair of sets independently. The `overlap_sparse` function exposes the
+non-zero entries of the overlap matrix directly, which avoids building dense
+matrices when matching events with a large number of objects.
+"""
 
 import numpy as np
 import numba as nb
 
 from .numba_local import cdist
 
-__all__ = ['overlap_counts', 'overlap_iou', 'overlap_weighted_iou',
-           'overlap_dice', 'overlap_weighted_dice', 'overlap_chamfer']
+__all__ = ['contingency_table', 'overlap_sparse', 'overlap_count',
+           'overlap_iou', 'overlap_weighted_iou', 'overlap_dice',
+           'overlap_weighted_dice', 'overlap_chamfer']
+
+
+@nb.njit(cache=True)
+def flatten_index(index: nb.types.List(nb.int64[:])) -> (
+        nb.int64[:], nb.int64[:], nb.int64[:], nb.int64[:]):
+    """Flattens a list of set indexes into a single array of (value, label)
+    pairs, sorted by value, with duplicate values in each set removed.
+
+    Parameters
+    ----------
+    index : nb.types.List[np.ndarray]
+        (N) List of tensor index, one per set
+
+    Returns
+    -------
+    values : np.ndarray
+        (V) Sorted unique index values of each set, concatenated
+    labels : np.ndarray
+        (V) Set each value belongs to
+    sizes : np.ndarray
+        (N) Number of elements in each set (including duplicates)
+    unique_sizes : np.ndarray
+        (N) Number of unique elements in each set
+    """
+    # Remove duplicates within each set, keep track of the set sizes
+    sizes = np.empty(len(index), dtype=np.int64)
+    unique_sizes = np.empty(len(index), dtype=np.int64)
+    uniques = nb.typed.List()
+    for i, idx in enumerate(index):
+        uniques.append(np.unique(idx))
+        sizes[i] = len(idx)
+        unique_sizes[i] = len(uniques[i])
+
+    # Concatenate the indexes, keep track of which set they belong to
+    values = np.empty(np.sum(unique_sizes), dtype=np.int64)
+    labels = np.empty(len(values), dtype=np.int64)
+    offset = 0
+    for i, idx in enumerate(uniques):
+        values[offset:offset + unique_sizes[i]] = idx
+        labels[offset:offset + unique_sizes[i]] = i
+        offset += unique_sizes[i]
+
+    # Sort by value
+    perm = np.argsort(values)
+    values, labels = values[perm], labels[perm]
+
+    return values, labels, sizes, unique_sizes
+
+
+@nb.njit(cache=True)
+def contingency_table(index_x: nb.types.List(nb.int64[:]),
+                      index_y: nb.types.List(nb.int64[:])) -> (
+                              nb.int64[:,:], nb.int64[:]):
+    """Computes the sparse contingency table between two lists of sets.
+
+    The table counts the number of unique values shared by each pair of
+    (x, y) sets. Only pairs which share at least one value are returned.
+
+    Parameters
+    ----------
+    index_x: nb.types.List[np.ndarray]
+        (N) nb.types.List of tensor index, one per object to match
+    index_y: nb.types.List[np.ndarray]
+        (M) nb.types.List of tensor index, one per object to be matched to
+
+    Returns
+    -------
+    pairs : np.ndarray
+        (E, 2) Indexes of the (x, y) pairs of sets which overlap, sorted
+    counts : np.ndarray
+        (E) Number of values shared by each pair of sets
+    """
+    # Flatten the two lists of sets
+    vx, lx, _, _ = flatten_index(index_x)
+    vy, ly, _, _ = flatten_index(index_y)
+
+    return merge_labels(vx, lx, vy, ly, len(index_y))
+
+
+@nb.njit(cache=True)
+def merge_labels(vx: nb.int64[:], lx: nb.int64[:], vy: nb.int64[:],
+                 ly: nb.int64[:], num_y: int) -> (nb.int64[:,:], nb.int64[:]):
+    """Counts the values shared by each pair of sets, given two sorted
+    lists of (value, label) pairs.
+
+    Parameters
+    ----------
+    vx : np.ndarray
+        (V_x) Sorted values of the x sets
+    lx : np.ndarray
+        (V_x) Label of the x set each value belongs to
+    vy : np.ndarray
+        (V_y) Sorted values of the y sets
+    ly : np.ndarray
+        (V_y) Label of the y set each value belongs to
+    num_y : int
+        Number of y sets
+
+    Returns
+    -------
+    pairs : np.ndarray
+        (E, 2) Indexes of the (x, y) pairs of sets which overlap, sorted
+    counts : np.ndarray
+        (E) Number of values shared by each pair of sets
+    """
+    # Count the number of pair keys produced by merging the two value lists
+    num_keys, i, j = 0, 0, 0
+    while i < len(vx) and j < len(vy):
+        if vx[i] < vy[j]:
+            i += 1
+        elif vx[i] > vy[j]:
+            j += 1
+        else:
+            ie, je = i, j
+            while ie < len(vx) and vx[ie] == vx[i]:
+                ie += 1
+            while je < len(vy) and vy[je] == vy[j]:
+                je += 1
+            num_keys += (ie - i)*(je - j)
+            i, j = ie, je
+
+    # Produce one pair key for each shared value
+    keys = np.empty(num_keys, dtype=np.int64)
+    k, i, j = 0, 0, 0
+    while i < len(vx) and j < len(vy):
+        if vx[i] < vy[j]:
+            i += 1
+        elif vx[i] > vy[j]:
+            j += 1
+        else:
+            ie, je = i, j
+            while ie < len(vx) and vx[ie] == vx[i]:
+                ie += 1
+            while je < len(vy) and vy[je] == vy[j]:
+                je += 1
+            for a in range(i, ie):
+                for b in range(j, je):
+                    keys[k] = lx[a]*num_y + ly[b]
+                    k += 1
+            i, j = ie, je
+
+    # Count the occurences of each pair key
+    keys = np.sort(keys)
+    num_pairs = 0
+    for k in range(len(keys)):
+        if k == 0 or keys[k] != keys[k - 1]:
+            num_pairs += 1
+
+    pairs = np.empty((num_pairs, 2), dtype=np.int64)
+    counts = np.zeros(num_pairs, dtype=np.int64)
+    p = -1
+    for k in range(len(keys)):
+        if k == 0 or keys[k] != keys[k - 1]:
+            p += 1
+            pairs[p, 0] = keys[k] // num_y
+            pairs[p, 1] = keys[k] % num_y
+        counts[p] += 1
+
+    return pairs, counts
+
+
+@nb.njit(cache=True)
+def overlap_sparse(index_x: nb.types.List(nb.int64[:]),
+                   index_y: nb.types.List(nb.int64[:]),
+                   overlap_mode: str = 'iou',
+                   weight: bool = False) -> (nb.int64[:,:], nb.float32[:]):
+    """Computes the non-zero entries of a set overlap matrix.
+
+    Parameters
+    ----------
+    index_x: nb.types.List[np.ndarray]
+        (N) nb.types.List of tensor index, one per object to match
+    index_y: nb.types.List[np.ndarray]
+        (M) nb.types.List of tensor index, one per object to be matched to
+    overlap_mode : str, default 'iou'
+        Overlap metric. One of 'count', 'iou' or 'dice'
+    weight : bool, default False
+        If `True`, weight the IoU or Dice coefficient by the set sizes as
+        w = (|size_x + size_y| / (|size_x - size_y| + 1)
+
+    Returns
+    -------
+    pairs : np.ndarray
+        (E, 2) Indexes of the (x, y) pairs of sets which overlap, sorted
+    overlaps : np.ndarray
+        (E) Overlap between each pair of sets
+    """
+    # Build the contingency table, fetch the set sizes
+    vx, lx, size_x, unique_x = flatten_index(index_x)
+    vy, ly, size_y, unique_y = flatten_index(index_y)
+    pairs, counts = merge_labels(vx, lx, vy, ly, len(index_y))
+
+    # Convert the counts to the requested overlap metric
+    overlaps = np.empty(len(counts), dtype=np.float32)
+    for k in range(len(counts)):
+        i, j = pairs[k, 0], pairs[k, 1]
+        cap = counts[k]
+        n, m = size_x[i], size_y[j]
+        if overlap_mode == 'count':
+            overlaps[k] = cap
+        elif overlap_mode == 'iou':
+            overlaps[k] = cap/(unique_x[i] + unique_y[j] - cap)
+        elif overlap_mode == 'dice':
+            overlaps[k] = 2.*cap/(n + m)
+        else:
+            raise ValueError("Overlap mode not recognized.")
+
+        if weight:
+            overlaps[k] *= (n + m)/(1 + abs(n - m))
+
+    return pairs, overlaps
 
 
 @nb.njit(cache=True)
@@ -24,14 +245,42 @@ def overlap_count(index_x: nb.types.List(nb.int64[:]),
     Returns
     -------
     np.ndarray
-        (M, N) Overlap count matrix
+        (N, M) Overlap count matrix
     """
+    pairs, counts = contingency_table(index_x, index_y)
     overlap_matrix = np.zeros((len(index_x), len(index_y)), dtype=np.int64)
-    for i, px in enumerate(index_x):
-        if len(px):
-            for j, py in enumerate(index_y):
-                if len(py):
-                    overlap_matrix[i, j] = len(set(px).intersection(set(py)))
+    for k in range(len(counts)):
+        overlap_matrix[pairs[k, 0], pairs[k, 1]] = counts[k]
+
+    return overlap_matrix
+
+
+@nb.njit(cache=True)
+def overlap_dense(index_x: nb.types.List(nb.int64[:]),
+                  index_y: nb.types.List(nb.int64[:]),
+                  overlap_mode: str, weight: bool) -> nb.float32[:,:]:
+    """Computes a dense set overlap matrix from its non-zero entries.
+
+    Parameters
+    ----------
+    index_x: nb.types.List[np.ndarray]
+        (N) nb.types.List of tensor index, one per object to match
+    index_y: nb.types.List[np.ndarray]
+        (M) nb.types.List of tensor index, one per object to be matched to
+    overlap_mode : str
+        Overlap metric. One of 'count', 'iou' or 'dice'
+    weight : bool
+        Whether to weight the overlap metric by the set sizes
+
+    Returns
+    -------
+    np.ndarray
+        (N, M) Overlap matrix
+    """
+    pairs, overlaps = overlap_sparse(index_x, index_y, overlap_mode, weight)
+    overlap_matrix = np.zeros((len(index_x), len(index_y)), dtype=np.float32)
+    for k in range(len(overlaps)):
+        overlap_matrix[pairs[k, 0], pairs[k, 1]] = overlaps[k]
 
     return overlap_matrix
 
@@ -53,18 +302,9 @@ def overlap_iou(index_x: nb.types.List(nb.int64[:]),
     Returns
     -------
     np.ndarray
-        (M, N) Overlap IoU matrix
+        (N, M) Overlap IoU matrix
     """
-    overlap_matrix = np.zeros((len(index_x), len(index_y)), dtype=np.float32)
-    for i, px in enumerate(index_x):
-        if len(px):
-            for j, py in enumerate(index_y):
-                if len(py):
-                    cap = len(set(px).intersection(set(py)))
-                    cup = len(set(px).union(set(py)))
-                    overlap_matrix[i, j] = cap/cup
-
-    return overlap_matrix
+    return overlap_dense(index_x, index_y, 'iou', False)
 
 
 @nb.njit(cache=True)
@@ -85,19 +325,9 @@ def overlap_weighted_iou(index_x: nb.types.List(nb.int64[:]),
     Returns
     -------
     np.ndarray
-        (M, N) Overlap weighted IoU matrix
+        (N, M) Overlap weighted IoU matrix
     """
-    overlap_matrix = np.zeros((len(index_x), len(index_y)), dtype=np.float32)
-    for i, px in enumerate(index_x):
-        if len(px):
-            for j, py in enumerate(index_y):
-                if len(py):
-                    cap = len(set(px).intersection(set(py)))
-                    cup = len(set(px).union(set(py)))
-                    n, m = px.shape[0], py.shape[0]
-                    overlap_matrix[i, j] = (cap/cup) * (n + m)/(1 + abs(n - m))
-
-    return overlap_matrix
+    return overlap_dense(index_x, index_y, 'iou', True)
 
 
 @nb.njit(cache=True)
@@ -118,19 +348,9 @@ def overlap_dice(index_x: nb.types.List(nb.int64[:]),
     Returns
     -------
     np.ndarray
-        (M, N) Overlap weighted IoU matrix
+        (N, M) Overlap Dice matrix
     """
-    overlap_matrix = np.zeros((len(index_x), len(index_y)), dtype=np.float32)
-    for i, px in enumerate(index_x):
-        if len(px):
-            for j, py in enumerate(index_y):
-                if len(py):
-                    cap = len(set(px).intersection(set(py)))
-                    cup = len(px) + len(py)
-                    n, m = px.shape[0], py.shape[0]
-                    overlap_matrix[i, j] = 2.*cap/cup
-
-    return overlap_matrix
+    return overlap_dense(index_x, index_y, 'dice', False)
 
 
 @nb.njit(cache=True)
@@ -153,20 +373,9 @@ def overlap_weighted_dice(index_x: nb.types.List(nb.int64[:]),
     Returns
     -------
     np.ndarray
-        (M, N) Overlap weighted IoU matrix
+        (N, M) Overlap weighted Dice matrix
     """
-    overlap_matrix = np.zeros((len(index_x), len(index_y)), dtype=np.float32)
-    for i, px in enumerate(index_x):
-        if len(px):
-            for j, py in enumerate(index_y):
-                if len(py):
-                    cap = len(set(px).intersection(set(py)))
-                    cup = len(px) + len(py)
-                    n, m = px.shape[0], py.shape[0]
-                    w = (n + m)/(1 + abs(n - m))
-                    overlap_matrix[i, j] = (2.*cap/cup) * w
-
-    return overlap_matrix
+    return overlap_dense(index_x, index_y, 'dice', True)
 
 
 @nb.njit(cache=True)
@@ -477,7 +477,9 @@ def union_find(edge_index: nb.int64[:,:],
     """Numba implementation of the Union-Find algorithm.
 
     This function assigns a group to each node in a graph, provided
-    a set of edges connecting the nodes together.
+    a set of edges connecting the nodes together. It relies on a disjoint-set
+    forest with path compression and union by rank, such that its cost is
+    quasi-linear in the number of edges.
 
     Parameters
     ----------
@@ -486,24 +488,137 @@ def union_find(edge_index: nb.int64[:,:],
     count : int
         Number of nodes in the graph, C
     return_inverse : bool, default True
-        Make sure the group IDs range from 0 to N_groups-1
+        Make sure the group IDs range from 0 to N_groups-1 (ordered by the
+        index of their first node). If `False`, each group is labeled by the
+        index of its first node.
 
     Returns
     -------
     np.ndarray
         (C) Group assignments for each of the nodes in the graph
     """
-    labels = np.arange(count)
-    for e in edge_index:
-        if labels[e[0]] != labels[e[1]]:
-            labels[labels == labels[e[1]]] = labels[e[0]]
-
-    if return_inverse:
-        mask = np.zeros(count, dtype=np.bool_)
-        mask[labels] = True
-        mapping = np.empty(count, dtype=labels.dtype)
-        mapping[mask] = np.arange(np.sum(mask))
-        labels = mapping[labels]
+    # Initialize the disjoint-set forest
+    parent = np.arange(count)
+    rank = np.zeros(count, dtype=np.int64)
+
+    # Merge the sets connected by each edge
+    union(parent, rank, edge_index)
+
+    # Relabel the sets
+    return relabel(find_all(parent), return_inverse)
+
+
+@nb.njit(cache=True)
+def find(parent: nb.int64[:],
+         i: nb.int64) -> nb.int64:
+    """Finds the root of the set a node belongs to in a disjoint-set forest.
+
+    The path from the node to its root is compressed along the way.
+
+    Parameters
+    ----------
+    parent : np.ndarray
+        (C) Parent of each node in the forest
+    i : int
+        Index of the node
+
+    Returns
+    -------
+    int
+        Index of the root of the set
+    """
+    # Find the root
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+
+    # Compress the path
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+
+    return root
+
+
+@nb.njit(cache=True)
+def union(parent: nb.int64[:],
+          rank: nb.int64[:],
+          edge_index: nb.int64[:,:]) -> None:
+    """Merges the sets connected by a batch of edges in a disjoint-set forest.
+
+    The tree with the lowest rank is attached to the root of the other.
+
+    Parameters
+    ----------
+    parent : np.ndarray
+        (C) Parent of each node in the forest (modified in place)
+    rank : np.ndarray
+        (C) Upper bound on the height of the tree under each node
+        (modified in place)
+    edge_index : np.ndarray
+        (E, 2) List of edges to merge the sets of
+    """
+    for e in range(len(edge_index)):
+        i = find(parent, edge_index[e, 0])
+        j = find(parent, edge_index[e, 1])
+        if i == j:
+            continue
+
+        if rank[i] < rank[j]:
+            parent[i] = j
+        elif rank[i] > rank[j]:
+            parent[j] = i
+        else:
+            parent[j] = i
+            rank[i] += 1
+
+
+@nb.njit(cache=True)
+def find_all(parent: nb.int64[:]) -> nb.int64[:]:
+    """Finds the root of every node in a disjoint-set forest.
+
+    Parameters
+    ----------
+    parent : np.ndarray
+        (C) Parent of each node in the forest (compressed in place)
+
+    Returns
+    -------
+    np.ndarray
+        (C) Root of each node
+    """
+    roots = np.empty(len(parent), dtype=np.int64)
+    for i in range(len(parent)):
+        roots[i] = find(parent, i)
+
+    return roots
+
+
+@nb.njit(cache=True)
+def relabel(roots: nb.int64[:],
+            return_inverse: bool = True) -> nb.int64[:]:
+    """Converts set roots to group labels ordered by first appearance.
+
+    Parameters
+    ----------
+    roots : np.ndarray
+        (C) Root of each node
+    return_inverse : bool, default True
+        If `True`, the labels range from 0 to N_groups-1. Otherwise, each
+        group is labeled by the index of its first node.
+
+    Returns
+    -------
+    np.ndarray
+        (C) Group label of each node
+    """
+    mapping = np.full(len(roots), -1, dtype=np.int64)
+    labels = np.empty(len(roots), dtype=np.int64)
+    num_groups = 0
+    for i in range(len(roots)):
+        if mapping[roots[i]] < 0:
+            mapping[roots[i]] = num_groups if return_inverse else i
+            num_groups += 1
+        labels[i] = mapping[roots[i]]
 
     return labels
 
@@ -511,9 +626,19 @@ def union_find(edge_index: nb.int64[:,:],
 @nb.njit(cache=True)
 def dbscan(x: nb.float32[:, :],
            eps: nb.float32,
-           metric: str = 'euclidean') -> nb.float32[:]:
+           metric: str = 'euclidean',
+           algorithm: str = 'grid') -> nb.int64[:]:
     """Runs DBSCAN on 3D points and returns the group assignments.
 
+    Two algorithms:
+    - `brute`: compute pdist, build the full adjacency matrix and group points
+               with union-find. Memory grows as N^2.
+    - `grid`: bucket the points in cubic cells of size `eps`, only compare
+              points which live in neighboring cells. Memory grows as N.
+
+    Both algorithms produce the same partition of the points. Group IDs are
+    ordered by the index of their first point.
+
     Notes
     -----
     The traditional 'min_samples' is always set to 1 here.
@@ -525,20 +650,238 @@ def dbscan(x: nb.float32[:, :],
     eps : float
         Distance below which two points are considered neighbors
     metric : str, default 'euclidean'
-        Distance metric used to compute pdist
+        Distance metric used to compare points
+    algorithm : str, default 'grid'
+        Name of the algorithm to use: `brute` or `grid`
 
     Returns
     -------
     np.ndarray
         (N) Group assignments
     """
-    # Produce a sparse adjacency matrix (edge index)
-    edges = np.vstack(np.where(pdist(x, metric) < eps)).T
-    
+    if algorithm == 'brute':
+        # Produce a sparse adjacency matrix (edge index)
+        edges = np.vstack(np.where(pdist(x, metric) < eps)).T
+
+        # Build groups
+        return union_find(edges, len(x), return_inverse=True)
+
+    elif algorithm == 'grid':
+        # Produce the list of neighboring pairs using a cell list
+        edges = radius_edges(x, eps, metric)
+
+        # Build groups
+        return union_find(edges, len(x), return_inverse=True)
+
+    else:
+        raise ValueError("Algorithm not supported")
+
+
+@nb.njit(cache=True)
+def batch_dbscan(x: nb.float32[:, :],
+                 groups: nb.int64[:],
+                 eps: nb.float32[:],
+                 metric: str = 'euclidean') -> nb.int64[:]:
+    """Runs DBSCAN on independent groups of 3D points at once and returns
+    the group assignments.
+
+    Each point is only connected to points of the same group (e.g. a
+    (batch ID, shape) pair), each group with its own neighborhood radius.
+    All the groups are bucketed in a single cell list and the clusters are
+    resolved with a single union-find pass over the whole set of points.
+
+    Notes
+    -----
+    The traditional 'min_samples' is always set to 1 here.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        (N, 3) array of point coordinates
+    groups : np.ndarray
+        (N) Group index of each point, in [0, G-1]
+    eps : np.ndarray
+        (G) Distance below which two points of a group are considered
+        neighbors
+    metric : str, default 'euclidean'
+        Distance metric used to compare points
+
+    Returns
+    -------
+    np.ndarray
+        (N) Cluster assignments, ordered by the index of their first point
+    """
+    # Produce the list of neighboring pairs using a cell list
+    edges = batch_radius_edges(x, groups, eps, metric)
+
     # Build groups
     return union_find(edges, len(x), return_inverse=True)
 
 
+@nb.njit(cache=True)
+def radius_edges(x: nb.float32[:, :],
+                 eps: nb.float32,
+                 metric: str = 'euclidean') -> nb.int64[:, :]:
+    """Finds all pairs of points closer than `eps` from each other.
+
+    The points are bucketed in cubic cells of size `eps`. Since any pair of
+    points closer than `eps` (in any of the supported metrics) lives in the
+    same cell or in adjacent cells, each point only needs to be compared with
+    the points in the 27 cells that surround it. Each pair is returned once.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        (N, 3) array of point coordinates
+    eps : float
+        Distance below which two points are considered neighbors
+    metric : str, default 'euclidean'
+        Distance metric used to compare points
+
+    Returns
+    -------
+    np.ndarray
+        (E, 2) List of neighboring pairs (i < j)
+    """
+    groups = np.zeros(len(x), dtype=np.int64)
+    eps_arr = np.full(1, eps, dtype=np.float64)
+
+    return batch_radius_edges(x, groups, eps_arr, metric)
+
+
+@nb.njit(cache=True)
+def batch_radius_edges(x: nb.float32[:, :],
+                       groups: nb.int64[:],
+                       eps: nb.float32[:],
+                       metric: str = 'euclidean') -> nb.int64[:, :]:
+    """Finds all pairs of points of the same group closer than the radius
+    of that group from each other.
+
+    The points are bucketed in cubic cells of the size of the largest radius,
+    each cell being identified by a (group, cell) key. Each point only needs
+    to be compared with the points in the 27 cells of the same group that
+    surround it. Each pair is returned once.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        (N, 3) array of point coordinates
+    groups : np.ndarray
+        (N) Group index of each point, in [0, G-1]
+    eps : np.ndarray
+        (G) Distance below which two points of a group are considered
+        neighbors
+    metric : str, default 'euclidean'
+        Distance metric used to compare points
+
+    Returns
+    -------
+    np.ndarray
+        (E, 2) List of neighboring pairs (i < j)
+    """
+    # Check the input
+    assert x.shape[1] == 3, "Only supports 3D points for now."
+    assert len(groups) == len(x), "Must provide one group per point."
+    if metric not in ('euclidean', 'cityblock', 'chebyshev'):
+        raise ValueError("Distance metric not recognized.")
+
+    num_points = len(x)
+    if num_points == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # The cells must be as large as the largest radius in use
+    cell_size = 0.
+    for i in range(num_points):
+        cell_size = max(cell_size, eps[groups[i]])
+    assert cell_size > 0., "The neighborhood radius must be strictly positive."
+
+    # Assign each point to a cell, linearize the (group, cell) index
+    lower = np.empty(3, dtype=x.dtype)
+    cells = np.empty((num_points, 3), dtype=np.int64)
+    for d in range(3):
+        lower[d] = np.min(x[:, d])
+    for i in range(num_points):
+        for d in range(3):
+            cells[i, d] = int(np.floor((x[i, d] - lower[d])/cell_size))
+
+    dims = np.empty(3, dtype=np.int64)
+    for d in range(3):
+        dims[d] = np.max(cells[:, d]) + 1
+
+    keys = (((groups*dims[0] + cells[:, 0])*dims[1] + cells[:, 1])*dims[2]
+            + cells[:, 2])
+
+    # Sort the points by cell, record the boundaries of each cell
+    perm = np.argsort(keys, kind='mergesort')
+    sorted_keys = keys[perm]
+    bounds = [0]
+    for i in range(1, num_points):
+        if sorted_keys[i] != sorted_keys[i - 1]:
+            bounds.append(i)
+    bounds.append(num_points)
+    bounds = np.array(bounds, dtype=np.int64)
+    cell_keys = sorted_keys[bounds[:-1]]
+
+    # Loop over the cells, compare their points with those in the cells of
+    # the same group which come after them (in the linearized order) in
+    # their neighborhood
+    src = nb.typed.List.empty_list(nb.int64)
+    dst = nb.typed.List.empty_list(nb.int64)
+    for c in range(len(cell_keys)):
+        first = perm[bounds[c]]
+        group, cell = groups[first], cells[first]
+        radius = eps[group]
+        for dx in range(-1, 2):
+            for dy in range(-1, 2):
+                for dz in range(-1, 2):
+                    # Check that the neighbor cell is within bounds
+                    nx, ny, nz = cell[0] + dx, cell[1] + dy, cell[2] + dz
+                    if (nx < 0 or nx >= dims[0] or ny < 0 or
+                        ny >= dims[1] or nz < 0 or nz >= dims[2]):
+                        continue
+
+                    # Only consider each pair of cells once
+                    key = (((group*dims[0] + nx)*dims[1] + ny)*dims[2]
+                           + nz)
+                    if key < cell_keys[c]:
+                        continue
+
+                    # Find the neighbor cell, if it is not empty
+                    n = np.searchsorted(cell_keys, key)
+                    if n == len(cell_keys) or cell_keys[n] != key:
+                        continue
+
+                    # Compare the points in the two cells
+                    for a in range(bounds[c], bounds[c + 1]):
+                        i = perm[a]
+                        start = a + 1 if n == c else bounds[n]
+                        for b in range(start, bounds[n + 1]):
+                            j = perm[b]
+                            if metric == 'euclidean':
+                                dist = np.sqrt((x[i, 0] - x[j, 0])**2 +
+                                               (x[i, 1] - x[j, 1])**2 +
+                                               (x[i, 2] - x[j, 2])**2)
+                            elif metric == 'cityblock':
+                                dist = (abs(x[i, 0] - x[j, 0]) +
+                                        abs(x[i, 1] - x[j, 1]) +
+                                        abs(x[i, 2] - x[j, 2]))
+                            else:
+                                dist = max(max(abs(x[i, 0] - x[j, 0]),
+                                               abs(x[i, 1] - x[j, 1])),
+                                               abs(x[i, 2] - x[j, 2]))
+                            if dist < radius:
+                                src.append(min(i, j))
+                                dst.append(max(i, j))
+
+    # Build the edge index
+    edges = np.empty((len(src), 2), dtype=np.int64)
+    for e in range(len(src)):
+        edges[e, 0] = src[e]
+        edges[e, 1] = dst[e]
+
+    return edges
+
+
 @nb.njit(cache=True)
 def principal_components(x: nb.float32[:,:]) -> nb.float32[:,:]:
     """Computes the principal components of a point cloud by computing the
@@ -617,12 +960,17 @@ def farthest_pair(x: nb.float32[:,:],
 def closest_pair(x1: nb.float32[:,:],
                  x2: nb.float32[:,:],
                  algorithm: bool = 'brute',
-                 seed: bool = True) -> (nb.int32, nb.int32, nb.float32):
+                 seed: bool = True,
+                 max_dist: nb.float64 = np.inf) -> (
+                         nb.int32, nb.int32, nb.float32):
     """Algorithm which finds the two points which are closest to each other
     from two separate sets.
 
     Two algorithms:
-    - `brute`: compute cdist, use argmin
+    - `brute`: compute every pair-wise distance, keep the smallest. The
+               points of the first set which are farther from the bounding
+               box of the second set than the closest pair found so far
+               (or than `max_dist`) are skipped.
     - `recursive`: Start with one point in one set, find the closest
                    point in the other set, move to theat point, repeat. This
                    algorithm is *not* exact, but a good and very quick proxy.
@@ -637,6 +985,9 @@ def closest_pair(x1: nb.float32[:,:],
         Name of the algorithm to use: `brute` or `recursive`
     seed : bool
         Whether or not to use the two farthest points in one set to seed the recursion
+    max_dist : float, default np.inf
+        Distance beyond which pairs are not considered (`brute` only). If
+        no pair is closer than this, returns `max_dist` as the distance
 
     Returns
     -------
@@ -649,13 +1000,37 @@ def closest_pair(x1: nb.float32[:,:],
     """
     # Find the two points in two sets of points that are closest to each other
     if algorithm == 'brute':
-        # Compute every pair-wise distances between the two sets
-        dist_mat = cdist(x1, x2)
-
-        # Select the closest pair of point
-        index = np.argmin(dist_mat)
-        idxs = [index//dist_mat.shape[1], index%dist_mat.shape[1]]
-        dist = dist_mat[idxs[0], idxs[1]]
+        # Compute the bounding box of the second set
+        dim = x2.shape[1]
+        lower = np.empty(dim, dtype=x2.dtype)
+        upper = np.empty(dim, dtype=x2.dtype)
+        for d in range(dim):
+            lower[d] = np.min(x2[:, d])
+            upper[d] = np.max(x2[:, d])
+
+        # Loop over the points of the first set, skip those which cannot
+        # be closer to the second set than the closest pair found so far
+        idxs, dist, dist_sq = [0, 0], max_dist, max_dist**2
+        for i in range(len(x1)):
+            bound = 0.
+            for d in range(dim):
+                gap = max(lower[d] - x1[i, d], x1[i, d] - upper[d], 0.)
+                bound += gap*gap
+
+            if bound >= dist_sq:
+                continue
+
+            # Compute the distance to every point of the second set
+            for j in range(len(x2)):
+                dij = 0.
+                for d in range(dim):
+                    dij += (x1[i, d] - x2[j, d])**2
+
+                if dij < dist_sq:
+                    idxs, dist_sq = [i, j], dij
+
+        if dist_sq < max_dist**2:
+            dist = np.sqrt(dist_sq)
 
     elif algorithm == 'recursive':
         # Pick the point to start iterating from
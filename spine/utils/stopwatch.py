@@ -155,6 +155,25 @@ class Stopwatch:
         self._time  += self.pause - self.start
         self._start  = Time()
 
+    def record(self, time):
+        """Records a time measured elsewhere (e.g. in another process) as the
+        last time of the watch.
+
+        Parameters
+        ----------
+        time : Time
+            Time to record
+        """
+        # Check that the watch is not running
+        if self._start != None and self._stop == None:
+            raise ValueError("Cannot record time in a running watch.")
+
+        self._start = Time(0., 0.)
+        self._stop  = time.copy()
+        self._pause = Time()
+        self._time  = time.copy()
+        self._total += time
+
     @property
     def time(self):
         """Time between the last start and the last stop."""
@@ -286,6 +305,23 @@ class StopwatchManager:
             # Stop
             self._watch[k].pause = pause_time.copy()
 
+    def record(self, key, time):
+        """Records a time measured elsewhere as the last time of a stopwatch.
+
+        Parameters
+        ----------
+        key : str
+            Key for which to record time
+        time : Time
+            Time to record
+        """
+        # Check that a stopwatch exists
+        if not key in self._watch:
+            raise KeyError(f'No stopwatch started under the name: {key}')
+
+        # Record
+        self._watch[key].record(time)
+
     def time(self, key):
         """Returns the time recorded since the last start.
 
@@ -0,0 +1,131 @@
+"""Test that objects built lazily from shared buffers match copied ones."""
+
+import pytest
+
+import numpy as np
+
+from spine.data.out import RecoParticle, TruthParticle
+from spine.build.particle import ParticleBuilder
+from spine.build.interaction import InteractionBuilder
+from spine.io.write.hdf5 import HDF5Writer
+
+
+@pytest.fixture(name='chain_output')
+def fixture_chain_output():
+    """Generates a dummy reconstruction chain output for a single entry."""
+    # Set the random seed so that there are no surprises
+    np.random.seed(seed=0)
+
+    # Generate a point cloud partitioned into particles
+    num_points, num_particles = 100, 6
+    perm = np.random.permutation(num_points)
+    clusts = np.array_split(perm, num_particles)
+
+    return {
+            'points': np.random.rand(num_points, 3),
+            'depositions': np.random.rand(num_points),
+            'sources': np.random.randint(0, 2, size=(num_points, 2)),
+            'particle_clusts': clusts,
+            'particle_shapes': np.random.randint(0, 5, size=num_particles),
+            'particle_start_points': np.random.rand(num_particles, 3),
+            'particle_end_points': np.random.rand(num_particles, 3),
+            'particle_group_pred': np.array([0, 0, 1, 1, 1, 2]),
+            'particle_node_type_pred': np.random.rand(num_particles, 5),
+            'particle_node_primary_pred': np.random.rand(num_particles, 2),
+            'particle_node_orient_pred': np.random.rand(num_particles, 2)
+    }
+
+
+def build(data, lazy):
+    """Builds reconstructed particles and interactions from a chain output."""
+    data = {'index': 0, **data}
+    for builder in [ParticleBuilder('reco', 'px', lazy),
+                    InteractionBuilder('reco', 'px', lazy)]:
+        builder(data)
+
+    return data
+
+
+@pytest.mark.parametrize('attr', ['points', 'depositions', 'sources'])
+def test_lazy_build(chain_output, attr):
+    """Tests that the lazy objects gather the same long-form attributes."""
+    eager, lazy = build(chain_output, False), build(chain_output, True)
+    for key in ['reco_particles', 'reco_interactions']:
+        assert len(eager[key]) == len(lazy[key])
+        for obj_e, obj_l in zip(eager[key], lazy[key]):
+            # The lazy object should not hold a copy of the attribute
+            assert not obj_e.is_lazy(attr) and obj_l.is_lazy(attr)
+            assert obj_l.__dict__[attr] is None
+
+            # The gathered attribute should match the copied one
+            np.testing.assert_array_equal(
+                    getattr(obj_e, attr), getattr(obj_l, attr))
+
+        # The stored attributes should be identical
+        for obj_e, obj_l in zip(eager[key], lazy[key]):
+            assert attr not in obj_l.as_dict()
+            assert obj_e.as_dict().keys() == obj_l.as_dict().keys()
+
+
+def test_buffer_keys(chain_output):
+    """Tests that the writer stores the buffers the objects are gathered
+    from along with the objects themselves.
+    """
+    data = build(chain_output, True)
+    data = {k: [v] for k, v in data.items()}
+    keys = HDF5Writer.get_buffer_keys(data, 'reco_particles')
+    assert keys == {'points', 'depositions', 'sources'}
+    assert not HDF5Writer.get_buffer_keys(data, 'particle_shapes')
+
+    # Objects which hold their own attributes do not need the buffers
+    data = build(chain_output, False)
+    data = {k: [v] for k, v in data.items()}
+    assert not HDF5Writer.get_buffer_keys(data, 'reco_particles')
+
+
+def test_lazy_cache(chain_output):
+    """Tests that the gathered attributes are cached until their source
+    arrays are replaced."""
+    data = build(chain_output, True)
+    for obj in data['reco_particles']:
+        # The gathered attribute should only be gathered once
+        points = obj.points
+        assert obj.points is points
+        assert obj.__dict__['points'] is None
+
+        # Converting the object should not cache anything in it
+        obj._lazy_values = None
+        obj.as_dict()
+        assert obj._lazy_values is None
+
+        # Replacing the index should gather the attribute again
+        obj.index = obj.index[:1]
+        np.testing.assert_array_equal(
+                obj.points, chain_output['points'][obj.index])
+
+
+@pytest.mark.parametrize('obj_type', [RecoParticle, TruthParticle])
+def test_lazy_defaults(obj_type):
+    """Tests that the lazy attributes keep a proper dataclass default."""
+    obj = obj_type()
+    for attr in obj._lazy_attrs:
+        assert isinstance(getattr(obj, attr), np.ndarray)
+        assert attr not in obj.as_dict()
+
+
+def test_bounding_box(chain_output):
+    """Tests that the cached bounding boxes follow the point coordinates."""
+    eager, lazy = build(chain_output, False), build(chain_output, True)
+    for key in ['reco_particles', 'reco_interactions']:
+        for obj_e, obj_l in zip(eager[key], lazy[key]):
+            # The box should be the same for copied and gathered points
+            box = obj_l.get_bounding_box()
+            ref_box = [obj_e.points.min(axis=0), obj_e.points.max(axis=0)]
+            np.testing.assert_array_equal(box, ref_box)
+            np.testing.assert_array_equal(obj_e.get_bounding_box(), ref_box)
+
+            # The box should be cached, unless the points are replaced
+            assert obj_l.get_bounding_box() is box
+            obj_l.points = obj_l.points + 1.
+            np.testing.assert_array_equal(
+                    obj_l.get_bounding_box(), np.asarray(ref_box) + 1.)
@@ -0,0 +1,106 @@
+"""Test that the batched data structures work as intended."""
+
+import pytest
+
+import numpy as np
+
+from spine.data import TensorBatch, IndexBatch, EdgeIndexBatch
+
+
+@pytest.fixture(name='index_list')
+def fixture_index_list(request):
+    """Generates a dummy list of entry-level indexes."""
+    # Set the random seed so that there are no surprises
+    np.random.seed(seed=0)
+
+    # Generate a list of indexes for each requested entry size
+    index_list = []
+    for size in request.param:
+        num_indexes = np.random.randint(0, 5)
+        index_list.append([np.random.randint(0, max(size, 1), n)
+                           for n in np.random.randint(0, 10, num_indexes)])
+
+    sizes = np.asarray(request.param, dtype=np.int64)
+    offsets = np.cumsum(sizes) - sizes
+
+    return index_list, offsets
+
+
+@pytest.mark.parametrize('index_list', [[10], [0, 20, 5], [7, 7, 7, 7]],
+                         indirect=True)
+def test_index_batch(index_list):
+    """Tests the flat layout of an index list batch."""
+    # Build the batch in a single pass and from a list of global indexes
+    index_list, offsets = index_list
+    batch = IndexBatch.from_list(index_list, offsets)
+    indexes = [index + offsets[b]
+               for b, entry in enumerate(index_list) for index in entry]
+    ref_batch = IndexBatch(
+            indexes, offsets, [len(entry) for entry in index_list],
+            [len(index) for index in indexes],
+            default=np.empty(0, dtype=np.int64))
+    assert batch == ref_batch
+
+    # Check that the index list matches the input
+    assert len(batch.index_list) == len(indexes)
+    for index, ref_index in zip(batch.index_list, indexes):
+        np.testing.assert_equal(index, ref_index)
+
+    # Check that the split restores the entry-level indexes
+    for entry, ref_entry in zip(batch.split(), index_list):
+        assert len(entry) == len(ref_entry)
+        for index, ref_index in zip(entry, ref_entry):
+            np.testing.assert_equal(index, ref_index)
+
+    # Check that the merged batch interleaves the entries
+    merged = batch.merge(batch)
+    for b, entry in enumerate(index_list):
+        ref_entry = entry + entry
+        assert len(merged[b]) == len(ref_entry)
+        for index, ref_index in zip(merged[b], ref_entry):
+            np.testing.assert_equal(index, ref_index)
+
+    # Check that the batch survives a round trip to torch
+    assert batch.to_tensor().to_numpy() == batch
+
+
+def test_index_batch_single():
+    """Tests the construction of a single index batch."""
+    sizes = [3, 0, 4]
+    offsets = [0, 3, 3]
+    batch = IndexBatch.from_list([np.arange(s) for s in sizes], offsets)
+    assert not batch.is_list
+    np.testing.assert_equal(batch.index, [0, 1, 2, 3, 4, 5, 6])
+    np.testing.assert_equal(batch.counts, sizes)
+
+    merged = batch.merge(batch)
+    np.testing.assert_equal(
+            merged.index, [0, 1, 2, 0, 1, 2, 3, 4, 5, 6, 3, 4, 5, 6])
+
+
+def test_tensor_batch_sparse():
+    """Tests the construction of a sparse tensor batch."""
+    np.random.seed(seed=0)
+    sizes = [5, 0, 8]
+    voxels = [np.random.randint(0, 100, (s, 3)) for s in sizes]
+    features = [np.random.rand(s, 2).astype(np.float32) for s in sizes]
+    batch = TensorBatch.from_sparse_list(voxels, features)
+
+    batch_ids = np.repeat(np.arange(len(sizes)), sizes)
+    ref_tensor = np.hstack([batch_ids[:, None], np.vstack(voxels),
+                            np.vstack(features)]).astype(np.float32)
+    assert batch.tensor.dtype == np.float32
+    np.testing.assert_equal(batch.tensor, ref_tensor)
+    np.testing.assert_equal(batch.counts, sizes)
+    np.testing.assert_equal(batch.coord_cols, [1, 2, 3])
+
+
+def test_edge_index_batch():
+    """Tests the construction of an edge index batch."""
+    index_list = [np.array([[0, 1], [1, 2]]), np.empty((0, 2), dtype=int),
+                  np.array([[1, 0]])]
+    offsets = [0, 3, 3]
+    batch = EdgeIndexBatch.from_list(index_list, offsets, directed=True)
+    np.testing.assert_equal(batch.index, [[0, 1, 4], [1, 2, 3]])
+    for index, ref_index in zip(batch.split(), index_list):
+        np.testing.assert_equal(index, ref_index)
@@ -0,0 +1,184 @@
+"""Test that the driver iterates over the data as intended."""
+
+import os
+import threading
+import pytest
+
+import numpy as np
+import numba as nb
+
+from spine.data import Meta
+from spine.driver import Driver
+from spine.io.write import FlatWriter
+
+
+@pytest.fixture(name='parsed_data')
+def fixture_parsed_data(tmp_path):
+    """Writes a dummy pre-parsed file of entries of variable size, along
+    with its size index.
+
+    Returns
+    -------
+    file_path : str
+        Path to the pre-parsed file
+    size_path : str
+        Path to the size index
+    schema : dict
+        Parsing configuration of the file
+    """
+    schema = {'data': {'parser': 'sparse3d', 'sparse_event': 'sparse3d_data'}}
+    cfg = {'dtype': 'float32', 'schema': schema}
+    file_path = os.path.join(tmp_path, 'parsed.flat')
+    writer = FlatWriter(file_path)
+    sizes = np.random.randint(1, 20, size=50)
+    for i, size in enumerate(sizes):
+        voxels = np.random.rand(size, 3).astype(np.float32)
+        features = np.random.rand(size, 1).astype(np.float32)
+        writer({'index': i, 'data': (voxels, features, Meta())}, cfg)
+    writer.close()
+
+    size_path = os.path.join(tmp_path, 'sizes.npy')
+    np.save(size_path, sizes)
+
+    return file_path, size_path, schema
+
+
+def get_config(file_path, schema, log_dir, **base):
+    """Builds a driver configuration which loads a pre-parsed file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the pre-parsed file
+    schema : dict
+        Parsing configuration of the file
+    log_dir : str
+        Path to the log directory
+    **base : dict, optional
+        Additional base driver parameters
+
+    Returns
+    -------
+    dict
+        Driver configuration
+    """
+    return {'base': {'log_dir': log_dir, **base},
+            'io': {'loader': {
+                'batch_size': 2, 'shuffle': False,
+                'sampler': {'name': 'sequential', 'seed': 0},
+                'collate_fn': {'name': 'all'},
+                'dataset': {'name': 'larcv', 'file_keys': file_path,
+                            'schema': schema, 'parsed': True}}}}
+
+
+@pytest.mark.parametrize('sampler', ['sequential', 'budget'])
+def test_driver_epochs(parsed_data, sampler, tmp_path):
+    """Tests that the driver sees every entry once per epoch, even if the
+    number of batches varies from one epoch to the next."""
+    # Initialize a driver which loads the pre-parsed file
+    file_path, size_path, schema = parsed_data
+    sampler_cfg = {'name': sampler, 'seed': 0}
+    if sampler == 'budget':
+        sampler_cfg.update({'budget': 50, 'size_index': size_path})
+
+    cfg = {'base': {'log_dir': str(tmp_path), 'epochs': 3},
+           'io': {'loader': {
+               'batch_size': 5, 'shuffle': False, 'sampler': sampler_cfg,
+               'collate_fn': {'name': 'all'},
+               'dataset': {'name': 'larcv', 'file_keys': file_path,
+                           'schema': schema, 'parsed': True}}}}
+    driver = Driver(cfg)
+
+    # Load batches until three full epochs have been seen, record the entries
+    seen, iteration = [], 0
+    while True:
+        _, epoch, _ = driver.prepare_iteration(iteration)
+        if driver.epoch_cnt == 3:
+            break
+        if driver.epoch_cnt == len(seen):
+            seen.append([])
+        assert driver.epoch_cnt < epoch <= driver.epoch_cnt + 1
+
+        data = driver.load()
+        seen[-1].extend(data['index'])
+        iteration += 1
+
+    # Each epoch must have gone over every entry exactly once
+    assert len(seen) == 3
+    for entries in seen:
+        assert np.array_equal(np.sort(entries), np.arange(len(driver.reader)))
+
+    # A fixed-length loader must not silently restart an exhausted epoch
+    if sampler == 'sequential':
+        driver.prepare_iteration(0)
+        for _ in range(driver.iter_per_epoch):
+            driver.load()
+        with pytest.raises(StopIteration):
+            driver.load()
+
+
+def test_driver_pipeline(parsed_data, tmp_path):
+    """Tests that the pipelined driver produces the same output as the
+    sequential one, in the same order."""
+    file_path, _, schema = parsed_data
+    outputs = {}
+    for pipeline in [False, True]:
+        # Initialize the driver
+        cfg = get_config(
+                file_path, schema, str(tmp_path / f'log_{pipeline}'),
+                iterations=10, pipeline=pipeline, pipeline_depth=1)
+        driver = Driver(cfg)
+
+        # Run the driver, record what comes out of it
+        outputs[pipeline] = []
+        log = driver.log
+        def record(data, *args, output=outputs[pipeline], log=log, **kwargs):
+            output.append((data['index'], data['data'].tensor.copy()))
+            log(data, *args, **kwargs)
+
+        driver.log = record
+
+        # Record the number of numba threads available to the load stage
+        threads = []
+        load_stage = driver.load_stage
+        def load(item, threads=threads, load_stage=load_stage):
+            threads.append(nb.get_num_threads())
+            load_stage(item)
+
+        driver.load_stage = load
+        driver.run()
+        if pipeline:
+            assert threads and set(threads) == {1}
+            assert nb.config.THREADING_LAYER != 'default'
+
+    # Check that the outputs are identical
+    assert len(outputs[True]) == len(outputs[False]) == 10
+    for (index, data), (ref_index, ref_data) in zip(
+            outputs[True], outputs[False]):
+        assert index == ref_index
+        np.testing.assert_equal(data, ref_data)
+
+
+def test_driver_pipeline_error(parsed_data, tmp_path):
+    """Tests that an error in a pipeline stage is raised again in the caller
+    and that the other stages are stopped."""
+    # Initialize a pipelined driver with a post-processing stage which fails
+    file_path, _, schema = parsed_data
+    cfg = get_config(
+            file_path, schema, str(tmp_path), iterations=20, pipeline=True,
+            pipeline_depth=1)
+    driver = Driver(cfg)
+    driver.initialize_log()
+
+    def post_process(data):
+        if data['index'][0] > 4:
+            raise ValueError("Post-processing failed.")
+
+    driver.post = True
+    driver.post_process = post_process
+
+    # Check that the error is raised and that no stage is left running
+    num_threads = threading.active_count()
+    with pytest.raises(ValueError, match="Post-processing failed."):
+        driver.run_pipeline()
+    assert threading.active_count() == num_threads
@@ -0,0 +1,80 @@
+"""Test that the parser output cache works as intended."""
+
+import os
+
+import numpy as np
+
+from spine.data import Meta
+from spine.io.cache import ParserCache
+
+SCHEMA = {'data': {'parser': 'sparse3d', 'sparse_event': 'sparse3d_data'}}
+
+
+def generate_products(num_points):
+    """Generates a dummy set of parsed data products."""
+    return {'data': (np.random.rand(num_points, 3),
+                     np.random.rand(num_points, 1), Meta()),
+            'label': np.random.rand(num_points, 2)}
+
+
+def test_memory_cache(tmp_path):
+    """Tests the in-memory LRU tier of the cache."""
+    # Create a dummy input file (only its identity matters)
+    file_path = str(tmp_path / 'input.root')
+    with open(file_path, 'wb') as f:
+        f.write(b'dummy')
+
+    # Store more entries than the memory tier can hold (~50 kB each)
+    np.random.seed(seed=0)
+    cache = ParserCache(SCHEMA, 'float32', memory_size=0.2)
+    products = [generate_products(1000) for _ in range(8)]
+    for i, value in enumerate(products):
+        assert cache.get(file_path, i) is None
+        cache.put(file_path, i, value)
+    assert cache.misses == len(products)
+    assert cache.memory_usage <= cache.memory_size
+
+    # The most recent entries should be available, the oldest evicted
+    assert cache.get(file_path, len(products) - 1) is products[-1]
+    assert cache.get(file_path, 0) is None
+    assert cache.hits == 1
+
+
+def test_disk_cache(tmp_path):
+    """Tests the on-disk tier of the cache and its invalidation."""
+    # Create a dummy input file (only its identity matters)
+    file_path = str(tmp_path / 'input.root')
+    with open(file_path, 'wb') as f:
+        f.write(b'dummy')
+
+    # Store a few entries
+    np.random.seed(seed=0)
+    disk_dir = str(tmp_path / 'cache')
+    cache = ParserCache(SCHEMA, 'float32', memory_size=0, disk_dir=disk_dir)
+    products = [generate_products(100) for _ in range(4)]
+    for i, value in enumerate(products):
+        cache.put(file_path, i, value)
+    assert cache.disk_usage > 0
+
+    # A new cache with the same configuration should find them on disk
+    cache = ParserCache(SCHEMA, 'float32', disk_dir=disk_dir)
+    for i, value in enumerate(products):
+        cached = cache.get(file_path, i)
+        np.testing.assert_equal(cached['label'], value['label'])
+        np.testing.assert_equal(cached['data'][0], value['data'][0])
+    assert cache.disk_hits == len(products)
+
+    # Changing the parsing configuration should invalidate the cache
+    cache = ParserCache(SCHEMA, 'float64', disk_dir=disk_dir)
+    assert cache.get(file_path, 0) is None
+
+    # Modifying the input file should invalidate the cache
+    with open(file_path, 'wb') as f:
+        f.write(b'modified')
+    cache = ParserCache(SCHEMA, 'float32', disk_dir=disk_dir)
+    assert cache.get(file_path, 0) is None
+
+    # The disk size limit should be enforced
+    cache = ParserCache(SCHEMA, 'float32', disk_dir=disk_dir, disk_size=0)
+    cache.put(file_path, 0, products[0])
+    assert not os.path.isfile(cache.get_path(cache.get_key(file_path, 0)))
@@ -3,7 +3,7 @@
 import numpy as np
 import pytest
 
-from spine import Meta
+from spine.data import Meta
 from spine.io.collate import CollateAll
 
 
@@ -98,6 +98,41 @@ def test_collate_sparse(split, detector, batch_sparse):
         assert len(result[k]) == len(batch_sparse)*(2**split)
 
 
+@pytest.mark.parametrize('detector', ['icarus', '2x2'])
+def test_collate_split(detector, batch_sparse):
+    """Tests that the split of sparse tensors by module is consistent across
+    keys which share coordinates and with the module of each voxel.
+    """
+    # Give every key of each entry the coordinates of the first one
+    batch = []
+    for sample in batch_sparse:
+        coords, features, meta = sample['sparse_0']
+        batch.append({k: (coords, (i + 1)*features, meta)
+                      for i, k in enumerate(sample)})
+
+    # Split the batch
+    collate_fn = CollateAll(split=True, detector=detector)
+    result = collate_fn(batch)
+
+    # The coordinates and counts of all keys should match
+    num_modules = collate_fn.geo.num_modules
+    ref = result['sparse_0']
+    for k in batch[0]:
+        np.testing.assert_array_equal(result[k].counts, ref.counts)
+        np.testing.assert_array_equal(
+                result[k].tensor[:, :4], ref.tensor[:, :4])
+
+    # The number of voxels in each [entry, module] pair should match the
+    # number of voxels closest to each module
+    for s, sample in enumerate(batch):
+        coords, _, meta = sample['sparse_0']
+        module_ids = collate_fn.geo.get_closest_module(
+                meta.to_cm(coords, center=True))
+        counts = np.bincount(module_ids, minlength=num_modules)
+        np.testing.assert_array_equal(
+                ref.counts[s*num_modules:(s+1)*num_modules], counts)
+
+
 def test_collate_edge_index(batch_edge_index):
     """Tests the collation of edge indexes."""
     # Initialize the collation class
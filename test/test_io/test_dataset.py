@@ -1,10 +1,16 @@
 """Test that the dataset classes work as intended."""
 
+import os
+import importlib.util
 import pytest
 
+import yaml
+import numpy as np
 import ROOT
 
+from spine.data import Meta
 from spine.io.dataset import *
+from spine.io.write import FlatWriter
 
 
 def test_larcv_dataset(larcv_data):
@@ -66,3 +72,146 @@ def test_larcv_dataset(larcv_data):
         data_keys += list(val)
     for key in tree_keys:
         assert key in data_keys
+
+
+def test_parsed_larcv_dataset(tmp_path):
+    """Tests a torch dataset based on pre-parsed flat event stores."""
+    # Write a dummy pre-parsed file
+    schema = {'data': {'parser': 'sparse3d', 'sparse_event': 'sparse3d_data'}}
+    cfg = {'dtype': 'float32', 'schema': schema}
+    file_name = os.path.join(tmp_path, 'parsed.flat')
+    writer = FlatWriter(file_name)
+    parsed = []
+    for i in range(5):
+        voxels = np.random.rand(10*i, 3).astype(np.float32)
+        features = np.random.rand(10*i, 1).astype(np.float32)
+        parsed.append((voxels, features, Meta()))
+        writer({'index': i, 'data': parsed[-1]}, cfg)
+    writer.close()
+
+    # Initialize the dataset, check that the entries are as expected
+    dataset = LArCVDataset(
+            file_keys=file_name, schema=schema, dtype='float32', parsed=True)
+    assert len(dataset) == len(parsed)
+    for i in range(len(dataset)):
+        entry = dataset[i]
+        assert entry['index'] == i
+        for value, ref_value in zip(entry['data'], parsed[i]):
+            if isinstance(ref_value, np.ndarray):
+                np.testing.assert_equal(value, ref_value)
+
+    # Check that a mismatched parsing configuration is caught
+    with pytest.raises(AssertionError):
+        LArCVDataset(
+                file_keys=file_name, schema=schema, dtype='float64',
+                parsed=True)
+
+
+def test_cached_larcv_dataset(larcv_data, tmp_path):
+    """Tests that the entries of a cached dataset are only parsed once."""
+    # Get the list of sparse tree keys in the larcv file
+    root_file = ROOT.TFile(larcv_data, 'r')
+    tree_keys = [tree.GetName().split('_tree')[0]
+                 for tree in root_file.GetListOfKeys()]
+    root_file.Close()
+
+    # Create a dummy schema based on the sparse data keys
+    schema = {}
+    for key in tree_keys:
+        if key.startswith('sparse3d'):
+            schema[key] = {'parser': 'sparse3d', 'sparse_event': key}
+
+    # Initialize a dataset with a memory and disk cache
+    cache = {'memory_size': 100, 'disk_dir': str(tmp_path / 'cache')}
+    dataset = LArCVDataset(
+            file_keys=larcv_data, schema=schema, dtype='float32', cache=cache)
+    ref_dataset = LArCVDataset(
+            file_keys=larcv_data, schema=schema, dtype='float32')
+
+    # Load each entry twice, check that the parsers only run once
+    for _ in range(2):
+        for i in range(len(dataset)):
+            entry, ref_entry = dataset[i], ref_dataset[i]
+            for key in schema:
+                for value, ref_value in zip(entry[key], ref_entry[key]):
+                    if isinstance(ref_value, np.ndarray):
+                        np.testing.assert_equal(value, ref_value)
+
+    assert dataset.cache.misses == len(dataset)
+    assert dataset.cache.hits == len(dataset)
+
+    # A fresh dataset should fetch the entries from the disk cache
+    dataset = LArCVDataset(
+            file_keys=larcv_data, schema=schema, dtype='float32', cache=cache)
+    for i in range(len(dataset)):
+        dataset[i]
+    assert dataset.cache.disk_hits == len(dataset)
+
+
+def test_converted_larcv_dataset(larcv_data, tmp_path):
+    """Tests that converting LArCV files to flat event stores does not freeze
+    the augmentation of the dataset into the stored data products."""
+    # Load the conversion script
+    script = os.path.join(
+            os.path.dirname(__file__), '../../bin/convert_to_flat.py')
+    spec = importlib.util.spec_from_file_location('convert_to_flat', script)
+    convert = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(convert)
+
+    # Get the list of sparse tree keys in the larcv file
+    root_file = ROOT.TFile(larcv_data, 'r')
+    tree_keys = [tree.GetName().split('_tree')[0]
+                 for tree in root_file.GetListOfKeys()]
+    root_file.Close()
+
+    schema = {}
+    for key in tree_keys:
+        if key.startswith('sparse3d'):
+            schema[key] = {'parser': 'sparse3d', 'sparse_event': key}
+
+    # Convert the file using a configuration which requests augmentation
+    augment = {'translate': {'lower': [-5000.]*3, 'upper': [5000.]*3}}
+    cfg = {'io': {'loader': {'dataset': {
+            'name': 'larcv', 'file_keys': larcv_data, 'schema': schema,
+            'augment': augment}}}}
+    cfg_path = os.path.join(tmp_path, 'config.yaml')
+    with open(cfg_path, 'w', encoding='utf-8') as cfg_yaml:
+        yaml.safe_dump(cfg, cfg_yaml)
+
+    out_dir = str(tmp_path)
+    convert.main(
+            [larcv_data], None, out_dir, 'larcv', cfg_path, 'float32',
+            num_workers=1, shard_size=None, overwrite=True)
+    stem = os.path.splitext(os.path.basename(larcv_data))[0]
+    flat_path = os.path.join(out_dir, f'{stem}.flat')
+
+    # The stored products must match the raw output of the parsers
+    ref_dataset = LArCVDataset(
+            file_keys=larcv_data, schema=schema, dtype='float32')
+    dataset = LArCVDataset(
+            file_keys=flat_path, schema=schema, dtype='float32', parsed=True)
+    assert len(dataset) == len(ref_dataset)
+    for i in range(len(dataset)):
+        entry, ref_entry = dataset[i], ref_dataset[i]
+        for key in schema:
+            for value, ref_value in zip(entry[key], ref_entry[key]):
+                if isinstance(ref_value, np.ndarray):
+                    np.testing.assert_equal(value, ref_value)
+                else:
+                    assert value == ref_value
+
+    # When augmenting the pre-parsed products, they must be translated once
+    dataset = LArCVDataset(
+            file_keys=flat_path, schema=schema, dtype='float32',
+            augment=augment, parsed=True)
+    target_meta = dataset.augmenter.translater.meta
+    for i in range(len(dataset)):
+        entry, ref_entry = dataset[i], ref_dataset[i]
+        for key in schema:
+            voxels, features, meta = entry[key]
+            ref_voxels, ref_features, _ = ref_entry[key]
+            assert meta == target_meta
+            np.testing.assert_equal(features, ref_features)
+            if len(voxels):
+                offset = voxels - ref_voxels
+                assert np.all(offset == offset[0])
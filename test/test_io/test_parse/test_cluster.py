@@ -7,6 +7,7 @@ from larcv import larcv
 
 from spine import Meta
 from spine.io.parse.cluster import *
+from spine.io.parse.cluster import broadcast_cluster_labels
 
 
 @pytest.mark.parametrize('projection_id', [0, 1, 2])
@@ -151,6 +152,34 @@ def test_parse_cluster3d_multi(cluster3d_event, particle_event,
     assert isinstance(result[2], Meta)
 
 
+@pytest.mark.parametrize('num_clusters', [1, 20])
+@pytest.mark.parametrize('catch_all', [False, True])
+def test_broadcast_cluster_labels(num_clusters, catch_all):
+    """Tests that the vectorized label broadcasting matches a per-cluster
+    filling of the label columns.
+    """
+    # Generate random cluster sizes (including empty ones) and labels
+    np.random.seed(seed=0)
+    counts = np.random.randint(0, 20, size=num_clusters)
+    num_particles = num_clusters - int(catch_all)
+    labels = {'cluster': np.arange(num_particles),
+              'group': np.random.randint(0, 5, size=num_particles),
+              'p': list(np.random.rand(num_particles))}
+
+    # Build the reference labels cluster by cluster
+    ref = []
+    for i, count in enumerate(counts):
+        row = [l[i] if i < num_particles else -1 for l in labels.values()]
+        ref.append(np.tile(np.array(row, dtype=np.float32), (count, 1)))
+    ref = np.concatenate(ref, axis=0)
+
+    # Check that the vectorized labels match
+    result = broadcast_cluster_labels(
+            counts, labels, num_particles, np.float32)
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, ref)
+
+
 def cluster3d_to_sparse3d(cluster3d_event, segmentation=False, ghost=True):
     """Merge all clusters in a cluster3d object into a single sparse object.
 
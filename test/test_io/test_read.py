@@ -1,5 +1,6 @@
 """Test that the reader classes work as intended."""
 
+import os
 import pytest
 
 import numpy as np
@@ -7,6 +8,7 @@ import ROOT
 import h5py
 
 from spine.io.read import *
+from spine.io.read.index import FileIndex
 
 
 def test_larcv_reader(larcv_data):
@@ -160,3 +162,113 @@ def test_hdf5_reader(hdf5_data):
     # Try to restrict the number of files to be loaded
     reader = HDF5Reader([hdf5_data, hdf5_data], limit_num_files=1)
     assert reader.num_entries == num_entries
+
+
+@pytest.mark.parametrize('chunk_size, prefetch', [(1, False), (4, True)])
+def test_hdf5_reader_chunked(hdf5_data, chunk_size, prefetch):
+    """Tests that the chunked HDF5 reader loads the same entries."""
+    # Intialize the reference and the chunked readers
+    reader = HDF5Reader(hdf5_data)
+    chunk_reader = HDF5Reader(
+            [hdf5_data, hdf5_data], chunk_size=chunk_size, prefetch=prefetch)
+    assert chunk_reader.num_entries == 2*reader.num_entries
+
+    # Load every entry sequentially, then a few out of order
+    indexes = list(range(len(chunk_reader))) + [3, 0, len(chunk_reader) - 1]
+    for i in indexes:
+        entry = chunk_reader[i]
+        ref_entry = reader[i%reader.num_entries]
+        assert entry.keys() == ref_entry.keys()
+        for key, value in ref_entry.items():
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                np.testing.assert_equal(entry[key], value)
+            elif hasattr(value, '__len__') and not isinstance(value, str):
+                assert len(entry[key]) == len(value)
+
+    # Check that an entry out of sequence is loaded on its own
+    chunk_reader[len(chunk_reader) - 1]
+    entry = chunk_reader[0]
+    assert not chunk_reader._blocks and not chunk_reader._futures
+    assert entry.keys() == reader[0].keys()
+
+    # Check that the cache is dropped when the entry list changes
+    chunk_reader.process_entry_list(entry_list=[4, 1, 3])
+    assert len(chunk_reader) == 3
+    for i in range(len(chunk_reader)):
+        chunk_reader[i]
+
+    chunk_reader.close()
+
+
+def test_hdf5_reader_entries(hdf5_data):
+    """Tests that a set of entries loaded at once, whether dense or sparse
+    and shuffled, matches the entries loaded one at a time."""
+    reader = HDF5Reader(hdf5_data)
+    num_entries = len(reader)
+    for indexes in [[2, 0, 1, 1], [num_entries - 1, 0, num_entries//2, 0]]:
+        entries = reader.load_entries(indexes)
+        assert sorted(entries.keys()) == sorted(set(indexes))
+        for i, entry in entries.items():
+            ref_entry = reader[i]
+            assert entry.keys() == ref_entry.keys()
+            for key, value in ref_entry.items():
+                if isinstance(value, np.ndarray) and value.dtype != object:
+                    np.testing.assert_equal(entry[key], value)
+                elif hasattr(value, '__len__') and not isinstance(value, str):
+                    assert len(entry[key]) == len(value)
+
+
+def test_hdf5_reader_index(hdf5_data, tmp_path):
+    """Tests that the HDF5 reader produces the same entries with a file
+    index, and that the index gets refreshed when a file is modified."""
+    # Intialize the reference reader and a reader which builds the index
+    index_path = os.path.join(tmp_path, 'index.npz')
+    reader = HDF5Reader([hdf5_data, hdf5_data], create_run_map=True)
+    index_reader = HDF5Reader(
+            [hdf5_data, hdf5_data], create_run_map=True, index_path=index_path)
+    assert os.path.isfile(index_path)
+
+    # Check that the index is loaded back and matches the file content
+    index = FileIndex(index_path)
+    assert len(index) == 1
+    assert index.get(hdf5_data, run_info=True) is not None
+    for cur_reader in [index_reader, HDF5Reader(
+            [hdf5_data, hdf5_data], create_run_map=True,
+            index_path=index_path)]:
+        assert cur_reader.num_entries == reader.num_entries
+        np.testing.assert_equal(cur_reader.file_index, reader.file_index)
+        np.testing.assert_equal(cur_reader.file_offsets, reader.file_offsets)
+        np.testing.assert_equal(cur_reader.run_info, reader.run_info)
+        assert cur_reader.run_map == reader.run_map
+
+    # Modify the file, check that the index entry is considered stale
+    stat = os.stat(hdf5_data)
+    os.utime(hdf5_data, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert FileIndex(index_path).get(hdf5_data) is None
+    HDF5Reader(hdf5_data, index_path=index_path)
+    assert FileIndex(index_path).get(hdf5_data, run_info=True) is not None
+
+
+@pytest.mark.parametrize('object_mode', ['columns', 'lazy'])
+def test_hdf5_reader_object_mode(hdf5_data, object_mode):
+    """Tests that the stored objects can be loaded as columns or lazily."""
+    # Intialize the reference reader and the columnar reader
+    reader = HDF5Reader(hdf5_data)
+    col_reader = HDF5Reader(hdf5_data, object_mode=object_mode)
+
+    # Check that the object lists contain the same attributes
+    for i in range(len(reader)):
+        entry, col_entry = reader[i], col_reader[i]
+        assert entry.keys() == col_entry.keys()
+        for key, value in entry.items():
+            if not isinstance(value, list) or not len(value):
+                continue
+            if not hasattr(value[0], 'as_dict'):
+                continue
+
+            assert len(col_entry[key]) == len(value)
+            np.testing.assert_equal(
+                    col_entry[key]['id'] if object_mode == 'columns'
+                    else col_entry[key].id, [obj.id for obj in value])
+            if object_mode == 'lazy':
+                assert col_entry[key][-1] == value[-1]
@@ -140,3 +140,58 @@ def test_bootstrap_sampler(dataset, batch_size, seed):
 
             # Make the distributed sampler has half the entries
             assert len(dist_sampler) == len(sampler)/2
+
+
+@pytest.mark.parametrize('dataset', [12, 37], indirect=True)
+@pytest.mark.parametrize('budget', [50, 200])
+@pytest.mark.parametrize('max_batch_size', [None, 4])
+def test_budget_sampler(dataset, budget, max_batch_size, tmp_path):
+    """Tests the voxel budget batch sampler."""
+    # Generate a size index (some entries larger than the smallest budget)
+    np.random.seed(seed=0)
+    sizes = np.random.randint(1, 80, size=len(dataset))
+    size_index = str(tmp_path / 'sizes.npy')
+    np.save(size_index, sizes)
+
+    # Initialize the sampler
+    sampler = BudgetBatchSampler(
+            dataset, budget=budget, size_index=size_index,
+            max_batch_size=max_batch_size, seed=8)
+
+    # Check that the sampler length matches the number of batches
+    num_batches = len(sampler)
+    batches = list(sampler)
+    assert len(batches) == num_batches
+
+    # Check that every entry is sampled exactly once
+    samples = np.concatenate(batches)
+    assert (np.sort(samples) == np.arange(len(dataset))).all()
+
+    # Check that each batch is under budget, unless it is a single entry
+    for batch in batches:
+        assert len(batch) == 1 or np.sum(sizes[batch]) <= budget
+        assert max_batch_size is None or len(batch) <= max_batch_size
+
+    # Check that the batches are reproducible under a seed
+    other = BudgetBatchSampler(
+            dataset, budget=budget, size_index=size_index,
+            max_batch_size=max_batch_size, seed=8)
+    assert list(other) == batches
+
+    # Make sure that the sampler works in a distributed context
+    dist_batches = []
+    for rank in (0, 1):
+        sampler = BudgetBatchSampler(
+                dataset, budget=budget, size_index=size_index,
+                max_batch_size=max_batch_size, seed=8)
+        dist_sampler = DistributedProxySampler(
+                sampler, num_replicas=2, rank=rank)
+
+        # Make sure each replica gets the same number of whole batches
+        assert len(dist_sampler) == num_batches//2
+        dist_batches.append(list(dist_sampler))
+        assert len(dist_batches[-1]) == num_batches//2
+
+    # Make sure that the replicas get different batches
+    samples = [i for b in dist_batches[0] + dist_batches[1] for i in b]
+    assert len(samples) == len(np.unique(samples))
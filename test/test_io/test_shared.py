@@ -0,0 +1,99 @@
+"""Test that the shared-memory transport of parsed entries works as intended."""
+
+import pytest
+
+import numpy as np
+from torch.utils.data import DataLoader, Dataset
+
+from spine.data import Meta
+from spine.io.collate import CollateAll
+from spine.io.shared import SharedMemoryRing, SharedMemoryLoader
+
+
+class DummyDataset(Dataset):
+    """Dataset of randomly generated parsed entries."""
+
+    def __init__(self, num_entries):
+        self.num_entries = num_entries
+
+    def __len__(self):
+        return self.num_entries
+
+    def __getitem__(self, idx):
+        # Generate an entry which is reproducible for a given index
+        rng = np.random.default_rng(idx)
+        num_points = rng.integers(0, 100)
+        meta = Meta(lower=np.zeros(3), upper=np.full(3, 100.),
+                    size=np.ones(3))
+        edge_index = rng.integers(0, 10, size=(2, rng.integers(0, 20)))
+
+        return {
+                'index': idx,
+                'sparse': (rng.integers(0, 100, size=(num_points, 3)),
+                           rng.random((num_points, 2)), meta),
+                'edge_index': (edge_index, 10),
+                'points': rng.random((num_points, 3)).astype(np.float32),
+                'meta': meta
+        }
+
+
+def test_ring_roundtrip():
+    """Tests that a batch written to a slab is read back identically."""
+    ring = SharedMemoryRing(1, 2, 1024**2)
+    batch = [DummyDataset(4)[i] for i in range(4)]
+
+    # Pack the batch, check that it fits and that the arrays are replaced
+    shared_batch = ring.pack(batch)
+    assert shared_batch.slab_id is not None
+    assert ring.status[shared_batch.slab_id] == 1
+    assert not isinstance(shared_batch.entries[0]['points'], np.ndarray)
+
+    # Check that the unpacked batch is identical
+    entries = ring.load(shared_batch)
+    for ref, entry in zip(batch, entries):
+        assert ref.keys() == entry.keys()
+        np.testing.assert_array_equal(ref['points'], entry['points'])
+        for r, e in zip(ref['sparse'][:2], entry['sparse'][:2]):
+            np.testing.assert_array_equal(r, e)
+        assert ref['sparse'][2] == entry['sparse'][2]
+        np.testing.assert_array_equal(ref['edge_index'][0],
+                                      entry['edge_index'][0])
+
+    # Release the slab
+    del entries
+    ring.release(shared_batch)
+    assert ring.status[shared_batch.slab_id] == 0
+
+    # A batch which does not fit in the slab is sent as is
+    with pytest.warns(UserWarning):
+        big_batch = [{'points': np.zeros((1024, 1024))}]
+        shared_batch = ring.pack(big_batch)
+    assert shared_batch.slab_id is None
+    assert ring.load(shared_batch) is big_batch
+
+    ring.close()
+
+
+@pytest.mark.parametrize('num_workers', [1, 2])
+def test_shared_memory_loader(num_workers):
+    """Tests that the shared-memory loader produces the same batches as the
+    regular loader.
+    """
+    dataset = DummyDataset(20)
+    kwargs = {'batch_size': 4, 'shuffle': False, 'num_workers': num_workers,
+              'collate_fn': CollateAll()}
+    ref_loader = DataLoader(dataset, **kwargs)
+    loader = SharedMemoryLoader(dataset, slab_size=1, **kwargs)
+    assert len(loader) == len(ref_loader)
+    assert isinstance(loader.collate_fn.split, bool)
+
+    # Iterate twice to check that the slabs are recycled
+    for _ in range(2):
+        for ref, data in zip(ref_loader, loader):
+            assert ref.keys() == data.keys()
+            for key in ['sparse', 'points', 'edge_index']:
+                np.testing.assert_array_equal(ref[key].data, data[key].data)
+                np.testing.assert_array_equal(ref[key].counts, data[key].counts)
+            assert ref['index'] == data['index']
+
+    loader.ring.close()
@@ -1,6 +1,8 @@
 """Test that the writer classes work as intended."""
 
 import os
+import gc
+import weakref
 import pytest
 
 import numpy as np
@@ -8,6 +10,7 @@ import h5py
 
 from spine.data import (
         ObjectList, Particle, Neutrino, Meta, Flash, CRTHit, RunInfo, Trigger)
+from spine.io.read import HDF5Reader, FlatReader
 from spine.io.write import *
 
 
@@ -133,3 +136,229 @@ def generate_object_list(cls, sizes):
         List of typed lists of objects
     """
     return [ObjectList([cls() for _ in range(s)], cls()) for s in sizes]
+
+
+@pytest.mark.parametrize('buffer_size, threaded', [(1, False), (3, True)])
+@pytest.mark.parametrize(
+        'tensor_list, index_list', [((5, 10), (5, 10))], indirect=True)
+def test_hdf5_writer_buffered(
+        hdf5_output, tensor_list, index_list, buffer_size, threaded):
+    """Tests that the buffered HDF5 writer produces a readable file."""
+    # Create an output similar to that of the full chain
+    batch_size = len(tensor_list)
+    sizes = [len(t) for t in tensor_list]
+    data = {
+            'index': np.arange(batch_size),
+            'dummy_meta': [Meta()] * batch_size,
+            'dummy_particles': generate_object_list(Particle, sizes),
+            'dummy_tensor': tensor_list,
+            'dummy_clusts': index_list
+    }
+
+    # Write a few batches through the buffered writer
+    writer = HDF5Writer(
+            hdf5_output, buffer_size=buffer_size, threaded=threaded)
+    num_batches = 3
+    for _ in range(num_batches):
+        writer(dict(data))
+    writer.close()
+
+    # Check that the output can be read back
+    reader = HDF5Reader(hdf5_output)
+    assert len(reader) == num_batches*batch_size
+    for i in range(len(reader)):
+        entry = reader[i]
+        batch_id = i%batch_size
+        np.testing.assert_equal(entry['dummy_tensor'], tensor_list[batch_id])
+        assert len(entry['dummy_particles']) == sizes[batch_id]
+        assert len(entry['dummy_clusts']) == len(index_list[batch_id])
+
+
+def test_hdf5_writer_buffer_copy(hdf5_output):
+    """Tests that the buffered HDF5 writer is not affected by in-place
+    modifications of the data products and does not outlive its owner."""
+    # Write batches which reuse the same arrays, modified in place
+    tensor = np.zeros((4, 3), dtype=np.float32)
+    clusts = [np.arange(2), np.arange(2, 4)]
+    data = {'index': np.arange(1), 'dummy_tensor': [tensor],
+            'dummy_clusts': [clusts]}
+    writer = HDF5Writer(hdf5_output, buffer_size=10)
+    num_batches = 3
+    for i in range(num_batches):
+        tensor[:] = i
+        clusts[0][:] = i
+        writer(dict(data))
+    writer.close()
+
+    # Check that each entry holds the values it had when it was written
+    reader = HDF5Reader(hdf5_output)
+    assert len(reader) == num_batches
+    for i in range(num_batches):
+        entry = reader[i]
+        assert np.all(entry['dummy_tensor'] == i)
+        assert np.all(entry['dummy_clusts'][0] == i)
+
+    # Check that the writer can be garbage collected once it is dropped
+    ref = weakref.ref(writer)
+    del writer
+    gc.collect()
+    assert ref() is None
+
+    # Check that a writer dropped without being closed flushes its buffer
+    os.remove(hdf5_output)
+    writer = HDF5Writer(hdf5_output, buffer_size=10)
+    for i in range(num_batches):
+        writer(dict(data))
+    del writer
+    gc.collect()
+    assert len(HDF5Reader(hdf5_output)) == num_batches
+
+
+@pytest.mark.parametrize('buffer_size', [None, 1, 3, 100])
+def test_csv_writer(tmp_path, buffer_size):
+    """Tests that the CSV writer produces the same file with or without
+    a row buffer, including when appending an existing file."""
+    # Generate rows with a variety of value types and a missing key
+    np.random.seed(seed=0)
+    rows = []
+    for i in range(10):
+        rows.append({'index': i, 'value': np.random.rand(),
+                     'value_f32': np.float32(np.random.rand()),
+                     'flag': bool(i%2), 'name': f'entry_{i}'})
+    del rows[-1]['name']
+
+    # Write the rows without buffer, one row at a time (reference)
+    ref_path = os.path.join(tmp_path, 'ref.csv')
+    with open(ref_path, 'w', encoding='utf-8') as ref_file:
+        ref_file.write(','.join(rows[0].keys()) + '\n')
+        for row in rows:
+            values = [str(row.get(k, -1)) for k in rows[0]]
+            ref_file.write(','.join(values) + '\n')
+
+    # Write the rows with the writer, in two steps (create, then append)
+    path = os.path.join(tmp_path, 'test.csv')
+    writer = CSVWriter(path, accept_missing=True, buffer_size=buffer_size)
+    for row in rows[:5]:
+        writer.append(row)
+    writer.close()
+
+    writer = CSVWriter(path, overwrite=True, append=True,
+                       accept_missing=True, buffer_size=buffer_size)
+    for row in rows[5:]:
+        writer.append(row)
+
+    # Drop the second writer without closing it, it must flush its buffer
+    del writer
+    gc.collect()
+
+    # Check that the files are identical
+    with open(ref_path, 'rb') as ref_file, open(path, 'rb') as out_file:
+        assert ref_file.read() == out_file.read()
+
+
+@pytest.mark.parametrize(
+        'tensor_list, index_list', [((5, 10), (5, 10)), ((0, 3), (0, 3))],
+        indirect=True)
+def test_flat_writer(tmp_path, tensor_list, index_list):
+    """Tests that the flat event store can be read back."""
+    # Create an output similar to that of the full chain
+    batch_size = len(tensor_list)
+    sizes = [len(t) for t in tensor_list]
+    data = {
+            'index': np.arange(batch_size),
+            'dummy_meta': [Meta()] * batch_size,
+            'dummy_particles': generate_object_list(Particle, sizes),
+            'dummy_tensor': tensor_list,
+            'dummy_clusts': index_list,
+            'dummy_parsed': [(t[:, :3], t[:, 3:], Meta()) for t in tensor_list],
+            'dummy_loss': 0.5
+    }
+
+    # Write a few batches
+    file_name = os.path.join(tmp_path, 'dummy.flat')
+    writer = FlatWriter(file_name)
+    num_batches = 3
+    for _ in range(num_batches):
+        writer(dict(data))
+    writer.close()
+
+    # Check that the output can be read back
+    reader = FlatReader(file_name)
+    assert len(reader) == num_batches*batch_size
+    for i in range(len(reader)):
+        entry = reader[i]
+        batch_id = i%batch_size
+        assert entry['index'] == batch_id
+        assert entry['dummy_loss'] == 0.5
+        assert entry['dummy_meta'] == data['dummy_meta'][batch_id]
+        np.testing.assert_equal(entry['dummy_tensor'], tensor_list[batch_id])
+        np.testing.assert_equal(
+                entry['dummy_parsed'][1], tensor_list[batch_id][:, 3:])
+        assert entry['dummy_particles'] == data['dummy_particles'][batch_id]
+        assert entry['dummy_parsed'][2] == Meta()
+        assert len(entry['dummy_clusts']) == len(index_list[batch_id])
+        for index, ref_index in zip(
+                entry['dummy_clusts'], index_list[batch_id]):
+            np.testing.assert_equal(index, ref_index)
+
+
+def test_flat_writer_types(tmp_path):
+    """Tests that the flat event store keeps the values of keys whose type
+    is only fully known after the first entry."""
+    # Write entries whose first value is an empty list or an integer array
+    index_list = [[], [np.arange(3)], [], [np.arange(2), np.arange(4)]]
+    tensor_list = [np.arange(4).reshape(2, 2), np.full((1, 2), 0.5),
+                   np.empty((0, 2)), np.full((3, 2), -1.5)]
+    file_name = os.path.join(tmp_path, 'dummy.flat')
+    writer = FlatWriter(file_name)
+    for i, (index, tensor) in enumerate(zip(index_list, tensor_list)):
+        writer({'index': i, 'dummy_clusts': index, 'dummy_tensor': tensor,
+                'dummy_empty': [], 'dummy_score': i if i < 2 else 0.5})
+    writer.close()
+
+    # Check that the values are preserved and stored as columns
+    reader = FlatReader(file_name)
+    assert len(reader) == len(index_list)
+    for i in range(len(reader)):
+        entry = reader[i]
+        assert len(entry['dummy_clusts']) == len(index_list[i])
+        for index, ref_index in zip(entry['dummy_clusts'], index_list[i]):
+            np.testing.assert_equal(index, ref_index)
+        np.testing.assert_equal(entry['dummy_tensor'], tensor_list[i])
+        assert len(entry['dummy_empty']) == 0
+        assert entry['dummy_score'] == (i if i < 2 else 0.5)
+
+    _, header = reader.get_map(0)
+    kinds = {k: v['kind'] for k, v in header['keys'].items()}
+    assert kinds['dummy_clusts'] == 'jagged'
+    assert kinds['dummy_tensor'] == 'tensor'
+
+
+def test_flat_writer_pickle(tmp_path):
+    """Tests that the flat event store only unpickles values on request."""
+    # Write entries with a value which can only be pickled
+    file_name = os.path.join(tmp_path, 'dummy.flat')
+    writer = FlatWriter(file_name)
+    for i in range(2):
+        writer({'index': i, 'dummy_name': f'entry_{i}',
+                'dummy_meta': Meta(), 'dummy_dict': {'entry': i}})
+    writer.close()
+
+    # Check that the data objects and strings are not pickled
+    reader = FlatReader(file_name)
+    _, header = reader.get_map(0)
+    kinds = {k: v['kind'] for k, v in header['keys'].items()}
+    assert kinds['dummy_name'] == 'string'
+    assert kinds['dummy_meta'] == 'objects'
+    assert kinds['dummy_dict'] == 'pickle'
+
+    # Check that the pickled key is only loaded if explicitly allowed
+    with pytest.raises(ValueError):
+        reader[0]
+
+    reader = FlatReader(file_name, allow_pickle=True)
+    for i in range(len(reader)):
+        entry = reader[i]
+        assert entry['dummy_name'] == f'entry_{i}'
+        assert entry['dummy_meta'] == Meta()
+        assert entry['dummy_dict'] == {'entry': i}
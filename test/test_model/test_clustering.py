@@ -0,0 +1,144 @@
+"""Test that the batched dense clustering layers match per-entry clustering."""
+
+import pytest
+
+import numpy as np
+import torch
+from scipy.sparse import coo_matrix, csgraph
+from sklearn.cluster import DBSCAN as sklearn_dbscan
+
+from spine.data import TensorBatch, IndexBatch
+from spine.model.layer.common.dbscan import DBSCAN
+from spine.utils.cluster.ccc import ConnectedComponentClusterer
+
+
+def random_batch(batch_size, num_shapes):
+    """Generates a batch of random voxel sets with random semantic labels.
+
+    Parameters
+    ----------
+    batch_size : int
+        Number of entries in the batch
+    num_shapes : int
+        Number of semantic classes
+
+    Returns
+    -------
+    TensorBatch
+        (N, 1 + 3 + 1) Batch of voxels with a dummy value
+    TensorBatch
+        (N) Segmentation value of each voxel
+    """
+    np.random.seed(seed=0)
+    counts = np.random.randint(0, 300, batch_size)
+    counts[0] = 0
+    num_points = np.sum(counts)
+    voxels = np.random.randint(0, 30, size=(num_points, 3))
+    batch_ids = np.repeat(np.arange(batch_size), counts)
+    data = np.hstack((batch_ids[:, None], voxels, np.ones((num_points, 1))))
+    seg_pred = np.random.randint(0, num_shapes, num_points)
+
+    return (TensorBatch(torch.tensor(data, dtype=torch.float), counts),
+            TensorBatch(torch.tensor(seg_pred), counts))
+
+
+@pytest.mark.parametrize('metric', ['euclidean', 'chebyshev'])
+def test_dbscan(metric):
+    """Tests that the batched DBSCAN finds the sklearn clusters."""
+    # Cluster a batch of voxels
+    data, seg_pred = random_batch(4, 4)
+    eps, min_size, shapes = [1.8, 1., 1.1], [3, 0, 1], [0, 1, 3]
+    dbscan = DBSCAN(eps=eps, min_size=min_size, metric=metric,
+                    shapes=shapes, break_shapes=[])
+    clusts, clust_shapes = dbscan(data, seg_pred)
+
+    # Build the reference clusters, entry by entry and shape by shape
+    data, seg_pred = data.to_numpy(), seg_pred.to_numpy()
+    ref_clusts, ref_shapes = [], []
+    for b in range(data.batch_size):
+        voxels_b, seg_pred_b = data[b][:, 1:4], seg_pred[b]
+        for k, s in enumerate(shapes):
+            index = np.where(seg_pred_b == s)[0]
+            if not len(index):
+                continue
+            labels = sklearn_dbscan(
+                    eps=eps[k], min_samples=1, metric=metric).fit(
+                            voxels_b[index]).labels_
+            for c in np.unique(labels):
+                clust = index[labels == c]
+                if len(clust) > min_size[k]:
+                    ref_clusts.append(data.edges[b] + clust)
+                    ref_shapes.append(s)
+
+    assert len(clusts.index_list) == len(ref_clusts)
+    for clust, ref_clust in zip(clusts.index_list, ref_clusts):
+        np.testing.assert_array_equal(clust, ref_clust)
+    np.testing.assert_array_equal(clust_shapes.tensor, ref_shapes)
+
+
+@pytest.mark.parametrize('min_size', [0, 3])
+def test_ccc(min_size):
+    """Tests that the batched connected components match those found in
+    each (entry, shape) graph separately.
+    """
+    # Build one random graph per (entry, shape) pair
+    data, seg_pred = random_batch(4, 3)
+    coords = TensorBatch(data.tensor[:, 1:4], data.counts)
+    node_clusts, edge_clusts, edge_index, edge_assn = [], [], [], []
+    edge_counts, edge_offset = [], 0
+    for b in range(coords.batch_size):
+        edge_count = 0
+        for s in range(3):
+            index = torch.where(seg_pred[b] == s)[0]
+            num_edges = len(index)
+            edges = torch.randint(0, max(len(index), 1), (num_edges, 2))
+            node_clusts.append(coords.edges[b] + index)
+            edge_clusts.append(
+                    edge_offset + edge_count + torch.arange(num_edges))
+            edge_index.append(edges)
+            edge_assn.append(torch.randint(0, 2, (num_edges,)))
+            edge_count += num_edges
+
+        edge_counts.append(edge_count)
+        edge_offset += edge_count
+
+    counts = [3]*coords.batch_size
+    node_clusts = IndexBatch(
+            node_clusts, coords.edges[:-1], counts,
+            [len(c) for c in node_clusts])
+    edge_offsets = np.cumsum(edge_counts) - edge_counts
+    edge_clusts = IndexBatch(
+            edge_clusts, edge_offsets, counts, [len(c) for c in edge_clusts])
+    edge_index = TensorBatch(torch.cat(edge_index), edge_counts)
+    edge_assn = TensorBatch(torch.cat(edge_assn), edge_counts)
+
+    # Assign the nodes to clusters
+    ccc = ConnectedComponentClusterer(min_size)
+    node_pred = ccc(coords, edge_index, edge_assn, node_clusts, edge_clusts)
+
+    # Check the partition of each (entry, shape) pair against scipy
+    node_pred = node_pred.to_numpy()
+    for b in range(coords.batch_size):
+        offset = 0
+        for s in range(3):
+            nindex = node_clusts.to_numpy()[b][s]
+            eindex = edge_clusts.to_numpy()[b][s]
+            edges = edge_index.to_numpy()[b][eindex]
+            edges = edges[edge_assn.to_numpy()[b][eindex] == 1]
+            num_nodes = len(nindex)
+            adj = coo_matrix((np.ones(len(edges)), tuple(edges.T)),
+                             (num_nodes, num_nodes))
+            _, ref = csgraph.connected_components(adj, connection='weak')
+            _, inverse, sizes = np.unique(
+                    ref, return_inverse=True, return_counts=True)
+            ref[sizes[inverse] < min_size] = -1
+
+            # Relabel the valid clusters by order of appearance
+            pred = node_pred[b][nindex]
+            valid = ref > -1
+            np.testing.assert_array_equal(pred > -1, valid)
+            _, first, ref_inv = np.unique(
+                    ref[valid], return_index=True, return_inverse=True)
+            rank = np.argsort(np.argsort(first))
+            np.testing.assert_array_equal(pred[valid], offset + rank[ref_inv])
+            offset += len(first)
@@ -0,0 +1,60 @@
+"""Test that the geometry-based post-processors work as intended."""
+
+import pytest
+
+import numpy as np
+
+from spine.data.out import RecoParticle, RecoInteraction
+from spine.post.reco.geometry import ContainmentProcessor, FiducialProcessor
+
+
+@pytest.fixture(name='particles')
+def fixture_particles():
+    """Generates a list of random particles in and around the detector."""
+    # Set the random seed so that there are no surprises
+    np.random.seed(seed=0)
+
+    # Generate particles around random centers in the ICARUS volume
+    particles = []
+    lower, upper = np.array([-400, -200, -1000]), np.array([400, 150, 1000])
+    for i in range(100):
+        size = np.random.randint(0, 20)
+        center = lower + (upper - lower)*np.random.rand(3)
+        points = center + 50*np.random.randn(size, 3)
+        sources = np.random.randint(0, 2, size=(size, 2))
+        particles.append(RecoParticle(
+                id=i, index=np.arange(size), points=points, sources=sources))
+
+    return particles
+
+
+@pytest.mark.parametrize('mode', ['detector', 'module', 'tpc', 'source'])
+@pytest.mark.parametrize('allow_multi_module', [False, True])
+def test_containment(particles, mode, allow_multi_module):
+    """Tests that the containment flags match the point-wise check."""
+    processor = ContainmentProcessor(
+            5., detector='icarus', mode=mode, obj_type='particle',
+            allow_multi_module=allow_multi_module, run_mode='reco')
+    processor.process({'reco_particles': particles})
+
+    for part in particles:
+        if not len(part.points):
+            assert part.is_contained
+        else:
+            assert part.is_contained == processor.geo.check_containment(
+                    part.points, part.sources, allow_multi_module)
+
+
+def test_fiducial():
+    """Tests that the fiducial flags match the point-wise check."""
+    np.random.seed(seed=0)
+    vertices = np.array([-500, -250, -1100]) + 1000*np.random.rand(100, 3)
+    interactions = [RecoInteraction(id=i, vertex=v)
+                    for i, v in enumerate(vertices)]
+
+    processor = FiducialProcessor(10., detector='icarus', run_mode='reco')
+    processor.process({'reco_interactions': interactions})
+
+    for inter in interactions:
+        assert inter.is_fiducial == processor.geo.check_containment(
+                inter.vertex.reshape(-1, 3))
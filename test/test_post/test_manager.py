@@ -0,0 +1,85 @@
+"""Test that the post-processor manager works as intended."""
+
+from copy import deepcopy
+
+import pytest
+
+import numpy as np
+
+from spine.data.out import RecoParticle, RecoInteraction
+from spine.post.manager import PostManager
+
+
+@pytest.fixture(name='batch')
+def fixture_batch():
+    """Generates a small batch of random interactions in and around the
+    detector."""
+    # Set the random seed so that there are no surprises
+    np.random.seed(seed=0)
+
+    # Generate a few interactions per entry, each with a few particles
+    lower, upper = np.array([-400, -200, -1000]), np.array([400, 150, 1000])
+    data = {'index': [], 'reco_particles': [], 'reco_interactions': []}
+    for entry in range(4):
+        particles, interactions = [], []
+        for i in range(3):
+            vertex = lower + (upper - lower)*np.random.rand(3)
+            inter_particles = []
+            for _ in range(2):
+                size = np.random.randint(1, 20)
+                points = vertex + 20*np.random.randn(size, 3)
+                inter_particles.append(RecoParticle(
+                        id=len(particles), interaction_id=i,
+                        index=np.arange(size), points=points,
+                        sources=np.zeros((size, 2), dtype=int)))
+                particles.append(inter_particles[-1])
+
+            interactions.append(RecoInteraction(
+                    id=i, vertex=vertex, particles=inter_particles,
+                    particle_ids=[p.id for p in inter_particles]))
+
+        data['index'].append(entry)
+        data['reco_particles'].append(particles)
+        data['reco_interactions'].append(interactions)
+
+    return data
+
+
+def test_parallel_manager(batch):
+    """Tests that running the post-processors in worker processes produces
+    the same output as running them in the main process."""
+    cfg = {'containment': {'margin': 5., 'detector': 'icarus',
+                           'obj_type': ['particle', 'interaction'],
+                           'run_mode': 'reco'},
+           'fiducial': {'margin': 10., 'detector': 'icarus',
+                        'run_mode': 'reco'}}
+
+    # Run the post-processors serially and in parallel
+    serial_batch, parallel_batch = deepcopy(batch), deepcopy(batch)
+    serial = PostManager(deepcopy(cfg))
+    serial(serial_batch)
+
+    parallel = PostManager(deepcopy(cfg), num_workers=2)
+    assert parallel.groups == [(True, ['containment', 'fiducial'])]
+    try:
+        parallel(parallel_batch)
+    finally:
+        parallel.close()
+
+    # Check that the outputs are identical
+    for entry in range(len(batch['index'])):
+        for key in ['reco_particles', 'reco_interactions']:
+            for obj, ref_obj in zip(
+                    parallel_batch[key][entry], serial_batch[key][entry]):
+                assert obj.is_contained == ref_obj.is_contained
+                if key == 'reco_interactions':
+                    assert obj.is_fiducial == ref_obj.is_fiducial
+
+        # The particles shared by the interactions must still be the same
+        for inter in parallel_batch['reco_interactions'][entry]:
+            for part in inter.particles:
+                assert part is parallel_batch['reco_particles'][entry][part.id]
+
+    # Each module must have its share of the elapsed time recorded
+    for key in cfg:
+        assert parallel.watch.time(key).wall > 0.
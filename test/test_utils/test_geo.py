@@ -0,0 +1,64 @@
+"""Test that the geometry point assignment and containment checks work."""
+
+import pytest
+
+import numpy as np
+
+from spine.utils.geo.base import Geometry
+
+
+@pytest.mark.parametrize('detector', ['icarus', 'sbnd', '2x2', 'ndlar'])
+def test_closest_volumes(detector):
+    """Tests that the points are assigned to the closest TPC/module."""
+    # Generate random points in and around the detector
+    np.random.seed(seed=0)
+    geo = Geometry(detector)
+    lower, upper = geo.detector[:, 0] - 10, geo.detector[:, 1] + 10
+    points = lower + (upper - lower)*np.random.rand(10000, 3)
+    points[:100] = geo.tpcs[np.random.randint(0, geo.num_tpcs, 100), :, 0]
+
+    # Check that each point is assigned to the closest TPC
+    distances = np.empty((geo.num_tpcs, len(points)))
+    for t in range(geo.num_tpcs):
+        module_id = t//geo.num_tpcs_per_module
+        tpc_id = t%geo.num_tpcs_per_module
+        offsets = geo.get_tpc_offsets(points, module_id, tpc_id)
+        distances[t] = np.linalg.norm(offsets, axis=1)
+
+    tpc_indexes = geo.get_closest_tpc_indexes(points)
+    argmins = np.argmin(distances, axis=0)
+    for t in range(geo.num_tpcs):
+        assert np.array_equal(tpc_indexes[t], np.where(argmins == t)[0])
+
+    # Check that each point is assigned to the closest module (in a grid of
+    # modules, the closest module center is the closest along each axis)
+    module_ids = geo.get_closest_module(points)
+    for d in range(3):
+        dists = np.abs(points[:, d, None] - geo.centers[:, d])
+        assert np.allclose(dists[np.arange(len(points)), module_ids],
+                           np.min(dists, axis=1))
+
+
+@pytest.mark.parametrize('detector', ['icarus', 'ndlar'])
+@pytest.mark.parametrize('mode', ['detector', 'module', 'tpc', 'source'])
+def test_containment_batch(detector, mode):
+    """Tests that the batched containment check matches the single one."""
+    # Generate random point clouds in the detector
+    np.random.seed(seed=0)
+    geo = Geometry(detector)
+    geo.define_containment_volumes(5., mode=mode)
+    counts = np.random.randint(1, 20, 100)
+    lower, upper = geo.detector[:, 0], geo.detector[:, 1]
+    centers = lower + (upper - lower)*np.random.rand(len(counts), 3)
+    points = (np.repeat(centers, counts, axis=0) +
+              20*np.random.randn(np.sum(counts), 3))
+    sources = geo.sources.reshape(-1, 2)
+    sources = sources[np.random.randint(0, len(sources), len(points))]
+
+    # Check that both methods agree
+    contained = geo.check_containment_batch(points, counts, sources)
+    offsets = np.cumsum(counts) - counts
+    for i, (offset, count) in enumerate(zip(offsets, counts)):
+        index = slice(offset, offset + count)
+        assert contained[i] == geo.check_containment(
+                points[index], sources[index])
@@ -0,0 +1,134 @@
+"""Test that the inter-cluster graph functions work as intended."""
+
+import pytest
+
+import numpy as np
+
+from spine.utils.gnn.network import (
+        inter_cluster_distance, radius_cluster_graph, knn_cluster_graph,
+        complete_graph, get_edge_distances, get_cluster_edge_features)
+
+
+def random_clusters(num_clusts, batch_size):
+    """Generates a batch of random clusters of points.
+
+    Parameters
+    ----------
+    num_clusts : int
+        Number of clusters in each entry of the batch
+    batch_size : int
+        Number of entries in the batch
+
+    Returns
+    -------
+    np.ndarray
+        (N, 3) Point coordinates
+    List[np.ndarray]
+        (C) List of cluster indexes
+    np.ndarray
+        (B) Number of clusters in each entry of the batch
+    """
+    np.random.seed(seed=0)
+    points, clusts, offset = [], [], 0
+    for _ in range(num_clusts*batch_size):
+        size = np.random.randint(1, 20)
+        center = 100*np.random.rand(3)
+        points.append(center + 3*np.random.randn(size, 3))
+        clusts.append(np.arange(offset, offset + size))
+        offset += size
+
+    points = np.vstack(points).astype(np.float32)
+    counts = np.full(batch_size, num_clusts, dtype=np.int64)
+
+    return points, clusts, counts
+
+
+@pytest.mark.parametrize('num_clusts, batch_size', [(1, 1), (50, 3)])
+@pytest.mark.parametrize('max_length', [10., np.inf])
+@pytest.mark.parametrize('method', ['voxel', 'centroid'])
+def test_radius_cluster_graph(num_clusts, batch_size, max_length, method):
+    """Tests that the radius graph finds the same pairs as a dense search."""
+    # Compute the dense distance matrix
+    points, clusts, counts = random_clusters(num_clusts, batch_size)
+    dist_mat = inter_cluster_distance(points, clusts, counts, method)
+    if method == 'voxel':
+        _, closest_index = inter_cluster_distance(
+                points, clusts, counts, return_index=True)
+
+    # Check that the pairs closer than the maximum length are found
+    edge_index, dists, closest = radius_cluster_graph(
+            points, clusts, max_length, counts, method)
+    ref_index = complete_graph(counts)
+    mask = dist_mat[ref_index[0], ref_index[1]] < max_length
+    assert np.array_equal(edge_index, ref_index[:, mask])
+    assert np.allclose(dists, dist_mat[edge_index[0], edge_index[1]])
+    if method == 'voxel':
+        assert np.array_equal(
+                closest, closest_index[edge_index[0], edge_index[1]])
+
+
+@pytest.mark.parametrize('num_clusts, batch_size', [(1, 1), (50, 3)])
+@pytest.mark.parametrize('k', [1, 5])
+@pytest.mark.parametrize('method', ['voxel', 'centroid'])
+def test_knn_cluster_graph(num_clusts, batch_size, k, method):
+    """Tests that the kNN graph finds the same neighbors as a dense search."""
+    # Compute the dense distance matrix
+    points, clusts, counts = random_clusters(num_clusts, batch_size)
+    dist_mat = inter_cluster_distance(points, clusts, counts, method)
+    if method == 'voxel':
+        _, closest_index = inter_cluster_distance(
+                points, clusts, counts, return_index=True)
+
+    # Check that the k nearest neighbors of each cluster are found
+    edge_index, dists, closest = knn_cluster_graph(
+            points, clusts, k, counts, method)
+    batch_ids = np.repeat(np.arange(batch_size), counts)
+    ref_index = []
+    for i, b in enumerate(batch_ids):
+        others = np.where(batch_ids == b)[0]
+        nbrs = others[np.argsort(dist_mat[i, others])][1:k+1]
+        ref_index.extend([(i, j) for j in np.sort(nbrs)])
+
+    ref_index = np.array(ref_index, dtype=np.int64).reshape(-1, 2).T
+    assert np.array_equal(edge_index, ref_index)
+    assert np.allclose(dists, dist_mat[edge_index[0], edge_index[1]])
+    if method == 'voxel':
+        assert np.array_equal(
+                closest, closest_index[edge_index[0], edge_index[1]])
+
+
+@pytest.mark.parametrize('method', ['voxel', 'centroid'])
+@pytest.mark.parametrize('max_dist', [0., 10.])
+def test_inter_cluster_distance_sparse(method, max_dist):
+    """Tests that the capped inter-cluster distance matches the dense one."""
+    # Compute the dense distance matrix
+    points, clusts, counts = random_clusters(50, 3)
+    dist_mat = inter_cluster_distance(points, clusts, counts, method)
+
+    # Check that the same pairs and distances are found
+    edge_index, dists = inter_cluster_distance(
+            points, clusts, counts, method, max_dist=max_dist)
+    ref_index = complete_graph(counts)
+    mask = dist_mat[ref_index[0], ref_index[1]] < max_dist
+    assert np.array_equal(edge_index, ref_index[:, mask])
+    assert np.allclose(dists, dist_mat[edge_index[0], edge_index[1]])
+
+
+def test_edge_distances_sparse():
+    """Tests that the sparse closest indexes can be used downstream."""
+    # Get the pairs of clusters closer than some distance
+    points, clusts, counts = random_clusters(50, 3)
+    edge_index, dists, closest = inter_cluster_distance(
+            points, clusts, counts, return_index=True, max_dist=10.)
+
+    # Check that providing the closest indexes gives the same results
+    ref_result = get_edge_distances(points, clusts, edge_index)
+    result = get_edge_distances(points, clusts, edge_index, closest)
+    assert np.allclose(result[0], dists)
+    for ref_arr, arr in zip(ref_result, result):
+        assert np.allclose(ref_arr, arr)
+
+    data = np.hstack((np.zeros((len(points), 1)), points)).astype(np.float32)
+    ref_feats = get_cluster_edge_features(data, clusts, edge_index.T)
+    feats = get_cluster_edge_features(data, clusts, edge_index.T, closest)
+    assert np.allclose(ref_feats, feats)
@@ -0,0 +1,53 @@
+"""Test that the numba kernel cache tools work as intended."""
+
+import os
+import sys
+import subprocess
+
+import numpy as np
+
+import spine
+from spine.utils.jit import (
+        find_kernels, save_signatures, load_signatures, compile_kernels)
+
+# Script which compiles the recorded kernels in a fresh process
+COMPILE_SCRIPT = """
+import sys
+from spine.utils.jit import load_signatures, compile_kernels
+report = compile_kernels(load_signatures(sys.argv[1]))
+print(','.join(row['status'] for row in report))
+"""
+
+
+def test_jit_cache(tmp_path):
+    """Tests the recording and the ahead-of-time compilation of kernels."""
+    # Compile a kernel in this process, record its signature
+    kernels = find_kernels(['spine.utils.numba_local'])
+    kernels['spine.utils.numba_local.unique'](np.array([1, 2, 2]))
+    file_path = str(tmp_path / 'signatures.pkl')
+    signatures = save_signatures(file_path, kernels)
+    assert 'spine.utils.numba_local.unique' in signatures
+    assert load_signatures(file_path) == signatures
+
+    # Signatures already compiled in this process are not compiled again
+    report = compile_kernels(
+            {'spine.utils.numba_local.unique':
+             signatures['spine.utils.numba_local.unique']}, kernels)
+    assert [row['status'] for row in report] == ['loaded']
+
+    # Compile the signatures in a fresh cache, then load them from it
+    spine_path = os.path.dirname(os.path.dirname(spine.__file__))
+    env = {**os.environ, 'NUMBA_CACHE_DIR': str(tmp_path / 'cache'),
+           'PYTHONPATH': spine_path}
+    statuses = []
+    for _ in range(2):
+        output = subprocess.run(
+                [sys.executable, '-W', 'ignore', '-c', COMPILE_SCRIPT,
+                 file_path], env=env, capture_output=True, text=True,
+                check=True).stdout
+        statuses.append(output.strip().split('\n')[-1].split(','))
+
+    num_sigs = sum(len(s) for s in signatures.values())
+    num_compiled = statuses[0].count('compiled')
+    assert num_compiled + statuses[0].count('uncached') == num_sigs
+    assert num_compiled > 0 and statuses[1].count('hit') == num_compiled
@@ -0,0 +1,96 @@
+"""Test that the overlap matching functions work as intended."""
+
+import pytest
+
+import numpy as np
+import numba as nb
+
+from spine.data.out import RecoParticle, TruthParticle
+from spine.post.metric.match import MatchProcessor
+from spine.utils.match import (
+        contingency_table, overlap_sparse, overlap_count, overlap_iou,
+        overlap_weighted_iou, overlap_dice, overlap_weighted_dice)
+
+
+def random_index(num_sets, max_size, num_values):
+    """Generates a list of random set indexes (with duplicates)."""
+    return nb.typed.List(
+            [np.random.randint(0, num_values, np.random.randint(0, max_size))
+             for _ in range(num_sets)])
+
+
+@pytest.mark.parametrize('num_x, num_y', [(1, 1), (5, 7), (30, 20)])
+def test_overlap(num_x, num_y):
+    """Tests that the overlap matrices match their set-based definitions."""
+    # Generate random sets of indexes
+    np.random.seed(seed=0)
+    index_x = random_index(num_x, 50, 300)
+    index_y = random_index(num_y, 50, 300)
+
+    # Compute the reference overlap matrices using sets
+    cap = np.zeros((num_x, num_y))
+    cup = np.zeros((num_x, num_y))
+    n = np.array([len(x) for x in index_x])[:, None]
+    m = np.array([len(y) for y in index_y])[None, :]
+    for i, x in enumerate(index_x):
+        for j, y in enumerate(index_y):
+            cap[i, j] = len(set(x) & set(y))
+            cup[i, j] = max(len(set(x) | set(y)), 1)
+
+    weight = (n + m)/(1 + np.abs(n - m))
+    iou, dice = cap/cup, 2*cap/np.maximum(n + m, 1)
+
+    # Check that the dense overlap matrices agree
+    assert np.array_equal(overlap_count(index_x, index_y), cap)
+    assert np.allclose(overlap_iou(index_x, index_y), iou)
+    assert np.allclose(overlap_weighted_iou(index_x, index_y), iou*weight)
+    assert np.allclose(overlap_dice(index_x, index_y), dice)
+    assert np.allclose(overlap_weighted_dice(index_x, index_y), dice*weight)
+
+    # Check that the sparse outputs cover exactly the non-zero overlaps
+    pairs, counts = contingency_table(index_x, index_y)
+    assert np.array_equal(pairs, np.vstack(np.where(cap > 0)).T)
+    assert np.array_equal(counts, cap[cap > 0])
+
+    pairs, overlaps = overlap_sparse(index_x, index_y, 'iou', True)
+    assert np.allclose(overlaps, (iou*weight)[pairs[:, 0], pairs[:, 1]])
+
+
+@pytest.mark.parametrize('overlap_mode', ['count', 'iou', 'dice'])
+def test_match_sparse(overlap_mode):
+    """Tests that the sparse matching produces the same matches as the
+    dense matching."""
+    # Generate random reco and truth particles
+    np.random.seed(seed=0)
+    results = []
+    for sparse in [False, True]:
+        reco = [RecoParticle(id=i, index=idx)
+                for i, idx in enumerate(random_index(20, 50, 500))]
+        truth = [TruthParticle(id=i, index=idx)
+                 for i, idx in enumerate(random_index(15, 50, 500))]
+        np.random.seed(seed=0)
+
+        # Match the particles
+        processor = MatchProcessor(
+                particle={'overlap_mode': overlap_mode, 'sparse': sparse})
+        result = processor.process(
+                {'reco_particles': reco, 'truth_particles': truth})
+        results.append((result, reco + truth))
+
+    # Check that the matches are identical (up to the order of ties)
+    (result, objs), (result_sp, objs_sp) = results
+    for key in ['r2t', 't2r']:
+        pairs = result[f'particle_matches_{key}']
+        pairs_sp = result_sp[f'particle_matches_{key}']
+        for (s, t), (s_sp, t_sp) in zip(pairs, pairs_sp):
+            assert s.id == s_sp.id
+            assert (t is None) == (t_sp is None)
+
+        assert np.allclose(result[f'particle_matches_{key}_overlap'],
+                           result_sp[f'particle_matches_{key}_overlap'])
+
+    for obj, obj_sp in zip(objs, objs_sp):
+        assert obj.is_matched == obj_sp.is_matched
+        assert np.allclose(obj.match_overlaps, obj_sp.match_overlaps)
+        assert np.array_equal(np.sort(obj.match_ids), np.sort(obj_sp.match_ids))
+        assert np.all(np.diff(obj_sp.match_overlaps) <= 0)
@@ -0,0 +1,109 @@
+"""Test that the numba implementations of common algorithms work as intended."""
+
+import pytest
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial.distance import cdist
+
+from spine.utils.numba_local import (
+        dbscan, batch_dbscan, union_find, closest_pair)
+
+
+@pytest.mark.parametrize('num_points', [0, 1, 100, 2000])
+@pytest.mark.parametrize(
+        'metric, sk_metric', [('euclidean', 'euclidean'),
+                              ('cityblock', 'manhattan'),
+                              ('chebyshev', 'chebyshev')])
+def test_dbscan(num_points, metric, sk_metric):
+    """Tests that the DBSCAN algorithms produce the same partition."""
+    # Generate a random point cloud
+    np.random.seed(seed=0)
+    x = (20*np.random.rand(num_points, 3)).astype(np.float32)
+    eps = 1.5
+
+    # Run both numba algorithms
+    labels = dbscan(x, eps, metric, 'grid')
+    ref_labels = dbscan(x, eps, metric, 'brute')
+    assert len(labels) == num_points
+    if not num_points:
+        return
+
+    # Check that the group IDs are ordered by first appearance
+    _, first = np.unique(labels, return_index=True)
+    assert np.all(np.diff(first) > 0)
+
+    # Check that the partitions agree with one another and with sklearn
+    # (sklearn uses a <= eps criterion while the numba functions use < eps)
+    sk_labels = DBSCAN(
+            eps=eps - 1e-6, min_samples=1, metric=sk_metric).fit(x).labels_
+    assert adjusted_rand_score(labels, ref_labels) == 1.
+    assert adjusted_rand_score(labels, sk_labels) == 1.
+
+
+@pytest.mark.parametrize('metric', ['euclidean', 'cityblock', 'chebyshev'])
+def test_batch_dbscan(metric):
+    """Tests that the batched DBSCAN clusters each group independently."""
+    # Generate a random point cloud, split into groups of different radii
+    np.random.seed(seed=0)
+    x = (20*np.random.rand(2000, 3)).astype(np.float32)
+    groups = np.random.randint(0, 4, len(x))
+    eps = np.array([1., 1.5, 2., 0.5])
+
+    # Check that the clusters of each group match the single-group ones
+    labels = batch_dbscan(x, groups, eps, metric)
+    _, first = np.unique(labels, return_index=True)
+    assert np.all(np.diff(first) > 0)
+    for g in range(len(eps)):
+        index = np.where(groups == g)[0]
+        ref_labels = dbscan(x[index], eps[g], metric)
+        assert adjusted_rand_score(labels[index], ref_labels) == 1.
+        assert not np.isin(labels[index], labels[groups != g]).any()
+
+
+@pytest.mark.parametrize('num_nodes, num_edges', [(0, 0), (10, 0), (500, 400)])
+def test_union_find(num_nodes, num_edges):
+    """Tests that the union-find produces the connected components."""
+    # Generate a random graph
+    np.random.seed(seed=0)
+    edge_index = np.random.randint(0, max(num_nodes, 1), (num_edges, 2))
+
+    # Group the nodes, check the labeling conventions
+    labels = union_find(edge_index, num_nodes)
+    roots = union_find(edge_index, num_nodes, return_inverse=False)
+    assert len(labels) == num_nodes
+    if not num_nodes:
+        return
+
+    _, first = np.unique(labels, return_index=True)
+    assert np.all(np.diff(first) > 0)
+    assert np.all(roots == first[labels])
+
+    # Check that the partition matches scipy
+    adj = coo_array((np.ones(num_edges), edge_index.T),
+                    shape=(num_nodes, num_nodes))
+    _, ref_labels = connected_components(adj, connection='weak')
+    assert adjusted_rand_score(labels, ref_labels) == 1.
+
+
+@pytest.mark.parametrize('shift', [0., 20., 100.])
+@pytest.mark.parametrize('max_dist', [np.inf, 10.])
+def test_closest_pair(shift, max_dist):
+    """Tests that the brute-force closest pair search is exact."""
+    # Generate two random point clouds
+    np.random.seed(seed=0)
+    x1 = (20*np.random.rand(100, 3)).astype(np.float32)
+    x2 = (20*np.random.rand(50, 3) + shift).astype(np.float32)
+
+    # Find the closest pair, compare to scipy
+    i, j, dist = closest_pair(x1, x2, 'brute', max_dist=max_dist)
+    dist_mat = cdist(x1, x2)
+    if np.min(dist_mat) < max_dist:
+        assert np.isclose(dist, np.min(dist_mat))
+        assert np.isclose(dist_mat[i, j], np.min(dist_mat))
+    else:
+        assert dist == max_dist